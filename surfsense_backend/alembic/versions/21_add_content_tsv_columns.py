@@ -0,0 +1,95 @@
+"""Add stored content_tsv columns to documents and chunks
+
+Revision ID: 21
+Revises: 20
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy import inspect
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "21"
+down_revision: str | None = "20"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Rows updated per committed backfill batch
+BACKFILL_BATCH_SIZE = 5000
+
+# Table -> (old expression index, new column index)
+SEARCH_INDEXES = {
+    "documents": ("document_search_index", "document_search_tsv_index"),
+    "chunks": ("chucks_search_index", "chucks_search_tsv_index"),
+}
+
+
+def upgrade() -> None:
+    """
+    Add trigger-maintained tsvector columns and backfill them in batches.
+
+    A GENERATED ... STORED column would rewrite each table in one long locking
+    statement, so the column is filled by tsvector_update_trigger for new writes and
+    backfilled in separately committed batches for existing rows.
+    """
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    for table in SEARCH_INDEXES:
+        columns = [col["name"] for col in inspector.get_columns(table)]
+        if "content_tsv" not in columns:
+            op.add_column(table, sa.Column("content_tsv", TSVECTOR(), nullable=True))
+        else:
+            print(f"Column 'content_tsv' already exists on {table}. Skipping.")
+
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_content_tsv_update ON {table}")
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_content_tsv_update
+            BEFORE INSERT OR UPDATE OF content ON {table}
+            FOR EACH ROW EXECUTE FUNCTION
+            tsvector_update_trigger(content_tsv, 'pg_catalog.english', content)
+            """
+        )
+
+    # Commit each batch so the backfill never holds long row locks
+    with op.get_context().autocommit_block():
+        for table, (old_index, new_index) in SEARCH_INDEXES.items():
+            min_id, max_id = bind.execute(
+                sa.text(f"SELECT MIN(id), MAX(id) FROM {table}")
+            ).one()
+
+            if min_id is not None:
+                for start in range(min_id, max_id + 1, BACKFILL_BATCH_SIZE):
+                    bind.execute(
+                        sa.text(
+                            f"""
+                            UPDATE {table}
+                            SET content_tsv = to_tsvector('english', content)
+                            WHERE id >= :start AND id < :end
+                            AND content_tsv IS NULL
+                            """
+                        ),
+                        {"start": start, "end": start + BACKFILL_BATCH_SIZE},
+                    )
+
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {new_index} "
+                f"ON {table} USING gin (content_tsv)"
+            )
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {old_index}")
+
+
+def downgrade() -> None:
+    for table, (old_index, new_index) in SEARCH_INDEXES.items():
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS {old_index} "
+            f"ON {table} USING gin (to_tsvector('english', content))"
+        )
+        op.execute(f"DROP INDEX IF EXISTS {new_index}")
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_content_tsv_update ON {table}")
+        op.drop_column(table, "content_tsv")
@@ -0,0 +1,145 @@
+"""Add search_space_id and document_type to chunks
+
+Revision ID: 22
+Revises: 21
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy import inspect
+from sqlalchemy.dialects.postgresql import ENUM
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "22"
+down_revision: str | None = "21"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Rows updated per committed backfill batch
+BACKFILL_BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    """
+    Copy each chunk's search space and document type from its document.
+
+    Vector search can then filter chunks directly instead of joining documents after
+    the HNSW scan. Triggers keep the copies in sync for new chunks and for documents
+    whose search space or type changes.
+    """
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    columns = [col["name"] for col in inspector.get_columns("chunks")]
+
+    if "search_space_id" not in columns:
+        op.add_column(
+            "chunks", sa.Column("search_space_id", sa.Integer(), nullable=True)
+        )
+    if "document_type" not in columns:
+        op.add_column(
+            "chunks",
+            sa.Column(
+                "document_type",
+                ENUM(name="documenttype", create_type=False),
+                nullable=True,
+            ),
+        )
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION chunks_set_document_fields() RETURNS trigger AS $$
+        BEGIN
+            SELECT search_space_id, document_type
+            INTO NEW.search_space_id, NEW.document_type
+            FROM documents WHERE id = NEW.document_id;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute("DROP TRIGGER IF EXISTS chunks_document_fields ON chunks")
+    op.execute(
+        """
+        CREATE TRIGGER chunks_document_fields
+        BEFORE INSERT OR UPDATE OF document_id ON chunks
+        FOR EACH ROW EXECUTE FUNCTION chunks_set_document_fields()
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION documents_sync_chunk_fields() RETURNS trigger AS $$
+        BEGIN
+            UPDATE chunks
+            SET search_space_id = NEW.search_space_id,
+                document_type = NEW.document_type
+            WHERE document_id = NEW.id;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute("DROP TRIGGER IF EXISTS documents_chunk_fields ON documents")
+    op.execute(
+        """
+        CREATE TRIGGER documents_chunk_fields
+        AFTER UPDATE OF search_space_id, document_type ON documents
+        FOR EACH ROW
+        WHEN (OLD.search_space_id IS DISTINCT FROM NEW.search_space_id
+              OR OLD.document_type IS DISTINCT FROM NEW.document_type)
+        EXECUTE FUNCTION documents_sync_chunk_fields()
+        """
+    )
+
+    # Commit each batch so the backfill never holds long row locks
+    with op.get_context().autocommit_block():
+        min_id, max_id = bind.execute(
+            sa.text("SELECT MIN(id), MAX(id) FROM chunks")
+        ).one()
+
+        if min_id is not None:
+            for start in range(min_id, max_id + 1, BACKFILL_BATCH_SIZE):
+                bind.execute(
+                    sa.text(
+                        """
+                        UPDATE chunks
+                        SET search_space_id = documents.search_space_id,
+                            document_type = documents.document_type
+                        FROM documents
+                        WHERE chunks.document_id = documents.id
+                        AND chunks.id >= :start AND chunks.id < :end
+                        AND chunks.search_space_id IS NULL
+                        """
+                    ),
+                    {"start": start, "end": start + BACKFILL_BATCH_SIZE},
+                )
+
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS "
+            "ix_chunks_search_space_id_document_type "
+            "ON chunks (search_space_id, document_type)"
+        )
+
+    op.alter_column("chunks", "search_space_id", nullable=False)
+    op.alter_column("chunks", "document_type", nullable=False)
+    op.create_foreign_key(
+        "chunks_search_space_id_fkey",
+        "chunks",
+        "searchspaces",
+        ["search_space_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS documents_chunk_fields ON documents")
+    op.execute("DROP FUNCTION IF EXISTS documents_sync_chunk_fields()")
+    op.execute("DROP TRIGGER IF EXISTS chunks_document_fields ON chunks")
+    op.execute("DROP FUNCTION IF EXISTS chunks_set_document_fields()")
+    op.drop_constraint("chunks_search_space_id_fkey", "chunks", type_="foreignkey")
+    op.drop_index("ix_chunks_search_space_id_document_type", table_name="chunks")
+    op.drop_column("chunks", "document_type")
+    op.drop_column("chunks", "search_space_id")
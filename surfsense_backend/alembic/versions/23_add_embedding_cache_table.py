@@ -0,0 +1,43 @@
+"""Add embedding_cache table
+
+Revision ID: 23
+Revises: 22
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "23"
+down_revision: str | None = "22"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create the content-addressed chunk embedding cache."""
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS embedding_cache (
+            model VARCHAR NOT NULL,
+            text_hash VARCHAR(64) NOT NULL,
+            embedding vector NOT NULL,
+            last_used_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            PRIMARY KEY (model, text_hash)
+        );
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_embedding_cache_last_used_at "
+        "ON embedding_cache (last_used_at)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_embedding_cache_created_at "
+        "ON embedding_cache (created_at)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS embedding_cache")
@@ -0,0 +1,103 @@
+"""Add source identity to documents and position to chunks
+
+Revision ID: 24
+Revises: 23
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "24"
+down_revision: str | None = "23"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+SOURCE_INDEX = "uq_documents_search_space_id_connector_id_external_id"
+
+# Connector type -> document_metadata key holding the source item's id
+EXTERNAL_ID_METADATA_KEYS = {
+    "NOTION_CONNECTOR": "page_id",
+    "CONFLUENCE_CONNECTOR": "page_id",
+    "GITHUB_CONNECTOR": "full_path",
+    "LINEAR_CONNECTOR": "issue_id",
+    "JIRA_CONNECTOR": "issue_id",
+    "CLICKUP_CONNECTOR": "task_id",
+    "GOOGLE_CALENDAR_CONNECTOR": "event_id",
+    "GOOGLE_GMAIL_CONNECTOR": "message_id",
+    "AIRTABLE_CONNECTOR": "record_id",
+}
+
+
+def upgrade() -> None:
+    """
+    Add documents.connector_id / external_id and chunks.position.
+
+    Existing connector documents get their identity from document_metadata. A user
+    has at most one connector per type, so the connector is found through the search
+    space's owner. When an item was indexed several times, only its newest document
+    gets the identity; older copies are left as they are.
+    """
+    bind = op.get_bind()
+    inspector = inspect(bind)
+
+    document_columns = [col["name"] for col in inspector.get_columns("documents")]
+    if "connector_id" not in document_columns:
+        op.add_column(
+            "documents",
+            sa.Column(
+                "connector_id",
+                sa.Integer(),
+                sa.ForeignKey("search_source_connectors.id", ondelete="SET NULL"),
+                nullable=True,
+            ),
+        )
+    if "external_id" not in document_columns:
+        op.add_column("documents", sa.Column("external_id", sa.String(), nullable=True))
+
+    chunk_columns = [col["name"] for col in inspector.get_columns("chunks")]
+    if "position" not in chunk_columns:
+        op.add_column("chunks", sa.Column("position", sa.Integer(), nullable=True))
+
+    for connector_type, metadata_key in EXTERNAL_ID_METADATA_KEYS.items():
+        # Keys and types are constants above, so they are inlined rather than bound:
+        # DISTINCT ON must repeat the ORDER BY expression exactly
+        external_id = f"d.document_metadata ->> '{metadata_key}'"
+        op.execute(
+            f"""
+            UPDATE documents
+            SET connector_id = latest.connector_id, external_id = latest.external_id
+            FROM (
+                SELECT DISTINCT ON (d.search_space_id, {external_id})
+                    d.id,
+                    c.id AS connector_id,
+                    {external_id} AS external_id
+                FROM documents d
+                JOIN searchspaces s ON s.id = d.search_space_id
+                JOIN search_source_connectors c
+                    ON c.user_id = s.user_id
+                    AND c.connector_type::text = '{connector_type}'
+                WHERE d.document_type::text = '{connector_type}'
+                AND d.external_id IS NULL
+                AND {external_id} IS NOT NULL
+                ORDER BY d.search_space_id, {external_id}, d.id DESC
+            ) AS latest
+            WHERE documents.id = latest.id
+            """
+        )
+
+    op.execute(
+        f"CREATE UNIQUE INDEX IF NOT EXISTS {SOURCE_INDEX} "
+        "ON documents (search_space_id, connector_id, external_id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute(f"DROP INDEX IF EXISTS {SOURCE_INDEX}")
+    op.drop_column("chunks", "position")
+    op.drop_column("documents", "external_id")
+    op.drop_column("documents", "connector_id")
@@ -0,0 +1,40 @@
+"""Add indexing_checkpoint column to search_source_connectors
+
+Revision ID: 25
+Revises: 24
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "25"
+down_revision: str | None = "24"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Store the progress of an unfinished indexing run on its connector."""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    columns = [col["name"] for col in inspector.get_columns("search_source_connectors")]
+
+    if "indexing_checkpoint" not in columns:
+        op.add_column(
+            "search_source_connectors",
+            sa.Column("indexing_checkpoint", sa.JSON(), nullable=True),
+        )
+    else:
+        print(
+            "Column 'indexing_checkpoint' already exists on search_source_connectors. "
+            "Skipping."
+        )
+
+
+def downgrade() -> None:
+    op.drop_column("search_source_connectors", "indexing_checkpoint")
@@ -0,0 +1,63 @@
+"""Add JobStatus enum and jobs table
+
+Revision ID: 26
+Revises: 25
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "26"
+down_revision: str | None = "25"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create the table background jobs are queued in."""
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'jobstatus') THEN
+                CREATE TYPE jobstatus AS ENUM ('PENDING', 'RUNNING', 'SUCCEEDED', 'FAILED');
+            END IF;
+        END$$;
+        """
+    )
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id SERIAL PRIMARY KEY,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            job_type VARCHAR(100) NOT NULL,
+            payload JSON NOT NULL DEFAULT '{}',
+            status jobstatus NOT NULL DEFAULT 'PENDING',
+            priority INTEGER NOT NULL DEFAULT 0,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL,
+            run_after TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            locked_by VARCHAR(200),
+            locked_at TIMESTAMPTZ,
+            last_error TEXT,
+            search_space_id INTEGER NOT NULL REFERENCES searchspaces(id) ON DELETE CASCADE,
+            log_id INTEGER REFERENCES logs(id) ON DELETE SET NULL
+        );
+        """
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_jobs_id ON jobs (id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_jobs_created_at ON jobs (created_at)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_jobs_job_type ON jobs (job_type)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_jobs_status ON jobs (status)")
+    # Workers claim from this partial index, which only holds the queue itself
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_jobs_pending "
+        "ON jobs (job_type, priority, run_after) WHERE status = 'PENDING'"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS jobs")
+    op.execute("DROP TYPE IF EXISTS jobstatus")
@@ -2,17 +2,20 @@ import asyncio
 import json
 import logging
 import traceback
+from datetime import datetime
 from typing import Any
 
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_core.runnables import RunnableConfig
 from langgraph.types import StreamWriter
+from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # Additional imports for document fetching
 from sqlalchemy.future import select
 
-from app.db import Document, SearchSpace
+from app.config import config as app_config
+from app.db import Chunk, Document, SearchSpace, async_session_maker
 from app.services.connector_service import ConnectorService
 from app.services.query_service import QueryService
 
@@ -25,7 +28,17 @@ from .qna_agent.graph import graph as qna_agent_graph
 from .state import State
 from .sub_section_writer.configuration import SubSectionType
 from .sub_section_writer.graph import graph as sub_section_writer_graph
-from .utils import AnswerOutline, get_connector_emoji, get_connector_friendly_name
+from .utils import (
+    AnswerOutline,
+    StreamProgress,
+    get_connector_emoji,
+    get_connector_friendly_name,
+)
+
+# Stream each report section's new text as an ANSWER_SECTION annotation. Off until
+# surfsense_web handles those annotations; the finished sections are streamed as
+# text either way.
+_STREAM_SECTION_DELTAS = False
 
 
 def extract_sources_from_documents(
@@ -99,6 +112,200 @@ def extract_sources_from_documents(
     return source_objects
 
 
+# Display names for source groups built from user-selected documents
+_USER_SELECTED_TYPE_NAMES = {
+    "LINEAR_CONNECTOR": "Linear Issues (Selected)",
+    "SLACK_CONNECTOR": "Slack (Selected)",
+    "NOTION_CONNECTOR": "Notion (Selected)",
+    "GITHUB_CONNECTOR": "GitHub (Selected)",
+    "YOUTUBE_VIDEO": "YouTube Videos (Selected)",
+    "DISCORD_CONNECTOR": "Discord (Selected)",
+    "JIRA_CONNECTOR": "Jira Issues (Selected)",
+    "EXTENSION": "Browser Extension (Selected)",
+    "CRAWLED_URL": "Web Pages (Selected)",
+    "FILE": "Files (Selected)",
+    "GOOGLE_CALENDAR_CONNECTOR": "Google Calendar (Selected)",
+    "GOOGLE_GMAIL_CONNECTOR": "Google Gmail (Selected)",
+    "CONFLUENCE_CONNECTOR": "Confluence (Selected)",
+    "CLICKUP_CONNECTOR": "ClickUp (Selected)",
+    "AIRTABLE_CONNECTOR": "Airtable (Selected)",
+}
+
+# Maximum number of document IDs bound into a single IN list
+_FETCH_DOCUMENTS_BATCH_SIZE = 1000
+
+
+def _format_iso_time(value: str) -> str:
+    """Format an ISO timestamp as "YYYY-MM-DD HH:MM", or return "" if it has no time."""
+    if "T" not in value:
+        return ""
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return parsed.strftime("%Y-%m-%d %H:%M")
+    except Exception:
+        return ""
+
+
+def _format_user_selected_source(
+    doc_type: str,
+    document_id: int,
+    title: str,
+    content: str,
+    metadata: dict[str, Any],
+) -> dict[str, Any]:
+    """
+    Build the UI source entry for a user-selected document.
+
+    Args:
+        doc_type: The document type value
+        document_id: The document ID
+        title: The document title
+        content: The document content, or at least its first 101 characters
+        metadata: The document metadata
+
+    Returns:
+        Source dictionary with id, title, description and url
+    """
+    preview = content[:100] + "..." if len(content) > 100 else content
+    description = preview
+    url = metadata.get("url", "")
+
+    if doc_type == "LINEAR_CONNECTOR":
+        issue_identifier = metadata.get("issue_identifier", "")
+        issue_title = metadata.get("issue_title", title)
+        issue_state = metadata.get("state", "")
+        comment_count = metadata.get("comment_count", 0)
+
+        title = (
+            f"Linear: {issue_identifier} - {issue_title}"
+            if issue_identifier
+            else f"Linear: {issue_title}"
+        )
+        if issue_state:
+            title += f" ({issue_state})"
+        if comment_count:
+            description += f" | Comments: {comment_count}"
+        url = f"https://linear.app/issue/{issue_identifier}" if issue_identifier else ""
+
+    elif doc_type in ("SLACK_CONNECTOR", "DISCORD_CONNECTOR"):
+        channel_name = metadata.get("channel_name", "Unknown Channel")
+        channel_id = metadata.get("channel_id", "")
+        message_date = metadata.get("start_date", "")
+
+        prefix = "Slack" if doc_type == "SLACK_CONNECTOR" else "Discord"
+        title = f"{prefix}: {channel_name}"
+        if message_date:
+            title += f" ({message_date})"
+
+        if doc_type == "SLACK_CONNECTOR":
+            url = (
+                f"https://slack.com/app_redirect?channel={channel_id}"
+                if channel_id
+                else ""
+            )
+        else:
+            guild_id = metadata.get("guild_id", "")
+            if guild_id and channel_id:
+                url = f"https://discord.com/channels/{guild_id}/{channel_id}"
+            elif channel_id:
+                url = f"https://discord.com/channels/@me/{channel_id}"
+            else:
+                url = ""
+
+    elif doc_type == "NOTION_CONNECTOR":
+        page_id = metadata.get("page_id", "")
+        title = f"Notion: {metadata.get('page_title', title)}"
+        url = f"https://notion.so/{page_id.replace('-', '')}" if page_id else ""
+
+    elif doc_type == "GITHUB_CONNECTOR":
+        title = f"GitHub: {title}"
+        description = metadata.get("description", preview)
+
+    elif doc_type == "YOUTUBE_VIDEO":
+        video_id = metadata.get("video_id", "")
+        channel_name = metadata.get("channel_name", "")
+
+        title = metadata.get("video_title", title)
+        if channel_name:
+            title += f" - {channel_name}"
+        description = metadata.get("description", preview)
+        url = f"https://www.youtube.com/watch?v={video_id}" if video_id else ""
+
+    elif doc_type == "JIRA_CONNECTOR":
+        issue_key = metadata.get("issue_key", "Unknown Issue")
+        status = metadata.get("status", "")
+        priority = metadata.get("priority", "")
+        issue_type = metadata.get("issue_type", "")
+
+        title = f"Jira: {issue_key} - {metadata.get('issue_title', 'Untitled Issue')}"
+        if status:
+            title += f" ({status})"
+        if priority:
+            description += f" | Priority: {priority}"
+        if issue_type:
+            description += f" | Type: {issue_type}"
+
+        base_url = metadata.get("base_url", "")
+        url = f"{base_url}/browse/{issue_key}" if base_url and issue_key else ""
+
+    elif doc_type == "GOOGLE_CALENDAR_CONNECTOR":
+        event_id = metadata.get("event_id", "Unknown Event")
+        calendar_id = metadata.get("calendar_id", "")
+        start_time = metadata.get("start_time", "")
+        location = metadata.get("location", "")
+
+        title = f"Calendar: {metadata.get('event_summary', 'Untitled Event')}"
+        if start_time:
+            title += f" ({_format_iso_time(start_time) or start_time})"
+        if location:
+            description += f" | Location: {location}"
+        if calendar_id and calendar_id != "primary":
+            description += f" | Calendar: {calendar_id}"
+        url = (
+            f"https://calendar.google.com/calendar/event?eid={event_id}"
+            if event_id
+            else ""
+        )
+
+    elif doc_type == "AIRTABLE_CONNECTOR":
+        record_id = metadata.get("record_id", "Unknown Record")
+        created_time = metadata.get("created_time", "")
+
+        title = (
+            f"Airtable: {metadata.get('base_name', 'Unknown Base')} - "
+            f"{metadata.get('table_name', 'Unknown Table')}"
+        )
+        if record_id:
+            title += f" (Record: {record_id[:8]}...)"
+        formatted_time = _format_iso_time(created_time)
+        if formatted_time:
+            title += f" - {formatted_time}"
+        url = ""
+
+    elif doc_type == "EXTENSION":
+        visit_date = metadata.get("VisitedWebPageDateWithTimeInISOString", "")
+
+        title = metadata.get("VisitedWebPageTitle", title)
+        if visit_date:
+            formatted_date = (
+                visit_date.split("T")[0] if "T" in visit_date else visit_date
+            )
+            title += f" (visited: {formatted_date})"
+        url = metadata.get("VisitedWebPageURL", "")
+
+    elif doc_type == "CRAWLED_URL":
+        description = metadata.get(
+            "og:description", metadata.get("ogDescription", preview)
+        )
+
+    return {
+        "id": document_id,
+        "title": title,
+        "description": description,
+        "url": url,
+    }
+
+
 async def fetch_documents_by_ids(
     document_ids: list[int], user_id: str, db_session: AsyncSession
 ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
@@ -110,6 +317,12 @@ async def fetch_documents_by_ids(
     Similar to SearchMode.DOCUMENTS, it fetches full documents and concatenates their chunks.
     Also creates source objects for UI display, grouped by document type.
 
+    Chunks for all requested documents are streamed from one ownership-checked query
+    per batch of _FETCH_DOCUMENTS_BATCH_SIZE IDs, ordered so each document's chunks
+    arrive together. Only the first characters of Document.content are loaded, for
+    the source descriptions. Chunks and sources are returned in the order of
+    document_ids.
+
     Args:
         document_ids: List of document IDs to fetch
         user_id: The user ID to check ownership
@@ -122,376 +335,104 @@ async def fetch_documents_by_ids(
         return [], []
 
     try:
-        # Query documents with ownership check
-        result = await db_session.execute(
-            select(Document)
-            .join(SearchSpace)
-            .filter(Document.id.in_(document_ids), SearchSpace.user_id == user_id)
-        )
-        documents = result.scalars().all()
+        unique_document_ids = list(dict.fromkeys(document_ids))
+        document_positions = {
+            document_id: position
+            for position, document_id in enumerate(unique_document_ids)
+        }
 
-        # Group documents by type for source object creation
-        documents_by_type = {}
-        formatted_documents = []
+        # (document ID, chunk) and (document ID, document type, source) in query
+        # order, re-sorted into the requested order below
+        document_chunks = []
+        document_sources = []
 
-        for doc in documents:
-            # Fetch associated chunks for this document (similar to DocumentHybridSearchRetriever)
-            from app.db import Chunk
+        for batch_start in range(
+            0, len(unique_document_ids), _FETCH_DOCUMENTS_BATCH_SIZE
+        ):
+            batch_ids = unique_document_ids[
+                batch_start : batch_start + _FETCH_DOCUMENTS_BATCH_SIZE
+            ]
 
+            # Query chunks with a document ownership check
             chunks_query = (
-                select(Chunk).where(Chunk.document_id == doc.id).order_by(Chunk.id)
+                select(
+                    Chunk.id,
+                    Chunk.content,
+                    Document.id.label("document_id"),
+                    Document.title,
+                    Document.document_type,
+                    Document.document_metadata,
+                    func.left(Document.content, 101).label("content_preview"),
+                )
+                .join(Document, Chunk.document_id == Document.id)
+                .join(SearchSpace, Document.search_space_id == SearchSpace.id)
+                .filter(Document.id.in_(batch_ids), SearchSpace.user_id == user_id)
+                .order_by(Document.id, Chunk.position, Chunk.id)
             )
-            chunks_result = await db_session.execute(chunks_query)
-            chunks = chunks_result.scalars().all()
-
-            # Return individual chunks instead of concatenated content
-            if chunks:
-                for chunk in chunks:
-                    # Format each chunk to match connector service return format
-                    formatted_chunk = {
-                        "chunk_id": chunk.id,
-                        "content": chunk.content,  # Use individual chunk content
-                        "score": 0.5,  # High score since user explicitly selected these
-                        "document": {
-                            "id": chunk.id,
-                            "title": doc.title,
-                            "document_type": (
-                                doc.document_type.value
-                                if doc.document_type
-                                else "UNKNOWN"
-                            ),
-                            "metadata": doc.document_metadata or {},
-                        },
-                        "source": doc.document_type.value
-                        if doc.document_type
-                        else "UNKNOWN",
-                    }
-                    formatted_documents.append(formatted_chunk)
-
-                    # Group by document type for source objects
-                    doc_type = (
-                        doc.document_type.value if doc.document_type else "UNKNOWN"
-                    )
-                    if doc_type not in documents_by_type:
-                        documents_by_type[doc_type] = []
-                    documents_by_type[doc_type].append(doc)
-
-        # Create source objects for each document type (similar to ConnectorService)
-        source_objects = []
-        connector_id_counter = 100
-
-        for doc_type, docs in documents_by_type.items():
-            sources_list = []
-
-            for doc in docs:
-                metadata = doc.document_metadata or {}
-
-                # Create type-specific source formatting (similar to ConnectorService)
-                if doc_type == "LINEAR_CONNECTOR":
-                    # Extract Linear-specific metadata
-                    issue_identifier = metadata.get("issue_identifier", "")
-                    issue_title = metadata.get("issue_title", doc.title)
-                    issue_state = metadata.get("state", "")
-                    comment_count = metadata.get("comment_count", 0)
-
-                    # Create a more descriptive title for Linear issues
-                    title = (
-                        f"Linear: {issue_identifier} - {issue_title}"
-                        if issue_identifier
-                        else f"Linear: {issue_title}"
-                    )
-                    if issue_state:
-                        title += f" ({issue_state})"
-
-                    # Create description
-                    description = (
-                        doc.content[:100] + "..."
-                        if len(doc.content) > 100
-                        else doc.content
-                    )
-                    if comment_count:
-                        description += f" | Comments: {comment_count}"
-
-                    # Create URL
-                    url = (
-                        f"https://linear.app/issue/{issue_identifier}"
-                        if issue_identifier
-                        else ""
-                    )
-
-                elif doc_type == "SLACK_CONNECTOR":
-                    # Extract Slack-specific metadata
-                    channel_name = metadata.get("channel_name", "Unknown Channel")
-                    channel_id = metadata.get("channel_id", "")
-                    message_date = metadata.get("start_date", "")
-
-                    title = f"Slack: {channel_name}"
-                    if message_date:
-                        title += f" ({message_date})"
+            result = await db_session.stream(chunks_query)
 
-                    description = (
-                        doc.content[:100] + "..."
-                        if len(doc.content) > 100
-                        else doc.content
-                    )
-                    url = (
-                        f"https://slack.com/app_redirect?channel={channel_id}"
-                        if channel_id
-                        else ""
-                    )
-
-                elif doc_type == "NOTION_CONNECTOR":
-                    # Extract Notion-specific metadata
-                    page_title = metadata.get("page_title", doc.title)
-                    page_id = metadata.get("page_id", "")
-
-                    title = f"Notion: {page_title}"
-                    description = (
-                        doc.content[:100] + "..."
-                        if len(doc.content) > 100
-                        else doc.content
-                    )
-                    url = (
-                        f"https://notion.so/{page_id.replace('-', '')}"
-                        if page_id
-                        else ""
-                    )
+            current_document_id = None
+            async for row in result:
+                doc_type = row.document_type.value if row.document_type else "UNKNOWN"
+                metadata = row.document_metadata or {}
 
-                elif doc_type == "GITHUB_CONNECTOR":
-                    title = f"GitHub: {doc.title}"
-                    description = metadata.get(
-                        "description",
-                        (
-                            doc.content[:100] + "..."
-                            if len(doc.content) > 100
-                            else doc.content
-                        ),
+                # Format each chunk to match connector service return format
+                document_chunks.append(
+                    (
+                        row.document_id,
+                        {
+                            "chunk_id": row.id,
+                            "content": row.content,  # Use individual chunk content
+                            "score": 0.5,  # High score since user explicitly selected these
+                            "document": {
+                                "id": row.id,
+                                "title": row.title,
+                                "document_type": doc_type,
+                                "metadata": metadata,
+                            },
+                            "source": doc_type,
+                        },
                     )
-                    url = metadata.get("url", "")
-
-                elif doc_type == "YOUTUBE_VIDEO":
-                    # Extract YouTube-specific metadata
-                    video_title = metadata.get("video_title", doc.title)
-                    video_id = metadata.get("video_id", "")
-                    channel_name = metadata.get("channel_name", "")
-
-                    title = video_title
-                    if channel_name:
-                        title += f" - {channel_name}"
+                )
 
-                    description = metadata.get(
-                        "description",
+                # Add one source entry per document, on its first chunk
+                if row.document_id != current_document_id:
+                    current_document_id = row.document_id
+                    document_sources.append(
                         (
-                            doc.content[:100] + "..."
-                            if len(doc.content) > 100
-                            else doc.content
-                        ),
-                    )
-                    url = (
-                        f"https://www.youtube.com/watch?v={video_id}"
-                        if video_id
-                        else ""
-                    )
-
-                elif doc_type == "DISCORD_CONNECTOR":
-                    # Extract Discord-specific metadata
-                    channel_name = metadata.get("channel_name", "Unknown Channel")
-                    channel_id = metadata.get("channel_id", "")
-                    guild_id = metadata.get("guild_id", "")
-                    message_date = metadata.get("start_date", "")
-
-                    title = f"Discord: {channel_name}"
-                    if message_date:
-                        title += f" ({message_date})"
-
-                    description = (
-                        doc.content[:100] + "..."
-                        if len(doc.content) > 100
-                        else doc.content
-                    )
-
-                    if guild_id and channel_id:
-                        url = f"https://discord.com/channels/{guild_id}/{channel_id}"
-                    elif channel_id:
-                        url = f"https://discord.com/channels/@me/{channel_id}"
-                    else:
-                        url = ""
-
-                elif doc_type == "JIRA_CONNECTOR":
-                    # Extract Jira-specific metadata
-                    issue_key = metadata.get("issue_key", "Unknown Issue")
-                    issue_title = metadata.get("issue_title", "Untitled Issue")
-                    status = metadata.get("status", "")
-                    priority = metadata.get("priority", "")
-                    issue_type = metadata.get("issue_type", "")
-
-                    title = f"Jira: {issue_key} - {issue_title}"
-                    if status:
-                        title += f" ({status})"
-
-                    description = (
-                        doc.content[:100] + "..."
-                        if len(doc.content) > 100
-                        else doc.content
-                    )
-                    if priority:
-                        description += f" | Priority: {priority}"
-                    if issue_type:
-                        description += f" | Type: {issue_type}"
-
-                    # Construct Jira URL if we have the base URL
-                    base_url = metadata.get("base_url", "")
-                    if base_url and issue_key:
-                        url = f"{base_url}/browse/{issue_key}"
-                    else:
-                        url = ""
-
-                elif doc_type == "GOOGLE_CALENDAR_CONNECTOR":
-                    # Extract Google Calendar-specific metadata
-                    event_id = metadata.get("event_id", "Unknown Event")
-                    event_summary = metadata.get("event_summary", "Untitled Event")
-                    calendar_id = metadata.get("calendar_id", "")
-                    start_time = metadata.get("start_time", "")
-                    location = metadata.get("location", "")
-
-                    title = f"Calendar: {event_summary}"
-                    if start_time:
-                        # Format the start time for display
-                        try:
-                            if "T" in start_time:
-                                from datetime import datetime
-
-                                start_dt = datetime.fromisoformat(
-                                    start_time.replace("Z", "+00:00")
-                                )
-                                formatted_time = start_dt.strftime("%Y-%m-%d %H:%M")
-                                title += f" ({formatted_time})"
-                            else:
-                                title += f" ({start_time})"
-                        except Exception:
-                            title += f" ({start_time})"
-
-                elif doc_type == "AIRTABLE_CONNECTOR":
-                    # Extract Airtable-specific metadata
-                    base_name = metadata.get("base_name", "Unknown Base")
-                    table_name = metadata.get("table_name", "Unknown Table")
-                    record_id = metadata.get("record_id", "Unknown Record")
-                    created_time = metadata.get("created_time", "")
-
-                    title = f"Airtable: {base_name} - {table_name}"
-                    if record_id:
-                        title += f" (Record: {record_id[:8]}...)"
-                    if created_time:
-                        # Format the created time for display
-                        try:
-                            if "T" in created_time:
-                                from datetime import datetime
-
-                                created_dt = datetime.fromisoformat(
-                                    created_time.replace("Z", "+00:00")
-                                )
-                                formatted_time = created_dt.strftime("%Y-%m-%d %H:%M")
-                                title += f" - {formatted_time}"
-                        except Exception:
-                            pass
-
-                    description = (
-                        doc.content[:100] + "..."
-                        if len(doc.content) > 100
-                        else doc.content
-                    )
-                    if location:
-                        description += f" | Location: {location}"
-                    if calendar_id and calendar_id != "primary":
-                        description += f" | Calendar: {calendar_id}"
-
-                    # Construct Google Calendar URL
-                    if event_id:
-                        url = (
-                            f"https://calendar.google.com/calendar/event?eid={event_id}"
+                            row.document_id,
+                            doc_type,
+                            _format_user_selected_source(
+                                doc_type,
+                                document_id=row.document_id,
+                                title=row.title,
+                                content=row.content_preview or "",
+                                metadata=metadata,
+                            ),
                         )
-                    else:
-                        url = ""
-
-                elif doc_type == "EXTENSION":
-                    # Extract Extension-specific metadata
-                    webpage_title = metadata.get("VisitedWebPageTitle", doc.title)
-                    webpage_url = metadata.get("VisitedWebPageURL", "")
-                    visit_date = metadata.get(
-                        "VisitedWebPageDateWithTimeInISOString", ""
                     )
 
-                    title = webpage_title
-                    if visit_date:
-                        formatted_date = (
-                            visit_date.split("T")[0]
-                            if "T" in visit_date
-                            else visit_date
-                        )
-                        title += f" (visited: {formatted_date})"
+        # Return documents in the requested order; the sorts are stable, so each
+        # document's chunks keep their position order
+        document_chunks.sort(key=lambda entry: document_positions[entry[0]])
+        document_sources.sort(key=lambda entry: document_positions[entry[0]])
+        formatted_documents = [chunk for _, chunk in document_chunks]
 
-                    description = (
-                        doc.content[:100] + "..."
-                        if len(doc.content) > 100
-                        else doc.content
-                    )
-                    url = webpage_url
-
-                elif doc_type == "CRAWLED_URL":
-                    title = doc.title
-                    description = metadata.get(
-                        "og:description",
-                        metadata.get(
-                            "ogDescription",
-                            (
-                                doc.content[:100] + "..."
-                                if len(doc.content) > 100
-                                else doc.content
-                            ),
-                        ),
-                    )
-                    url = metadata.get("url", "")
-
-                else:  # FILE and other types
-                    title = doc.title
-                    description = (
-                        doc.content[:100] + "..."
-                        if len(doc.content) > 100
-                        else doc.content
-                    )
-                    url = metadata.get("url", "")
-
-                # Create source entry
-                source = {
-                    "id": doc.id,
-                    "title": title,
-                    "description": description,
-                    "url": url,
-                }
-                sources_list.append(source)
-
-            # Create source object for this document type
-            friendly_type_names = {
-                "LINEAR_CONNECTOR": "Linear Issues (Selected)",
-                "SLACK_CONNECTOR": "Slack (Selected)",
-                "NOTION_CONNECTOR": "Notion (Selected)",
-                "GITHUB_CONNECTOR": "GitHub (Selected)",
-                "YOUTUBE_VIDEO": "YouTube Videos (Selected)",
-                "DISCORD_CONNECTOR": "Discord (Selected)",
-                "JIRA_CONNECTOR": "Jira Issues (Selected)",
-                "EXTENSION": "Browser Extension (Selected)",
-                "CRAWLED_URL": "Web Pages (Selected)",
-                "FILE": "Files (Selected)",
-                "GOOGLE_CALENDAR_CONNECTOR": "Google Calendar (Selected)",
-                "GOOGLE_GMAIL_CONNECTOR": "Google Gmail (Selected)",
-                "CONFLUENCE_CONNECTOR": "Confluence (Selected)",
-                "CLICKUP_CONNECTOR": "ClickUp (Selected)",
-                "AIRTABLE_CONNECTOR": "Airtable (Selected)",
-            }
+        # Group sources by document type for source object creation
+        sources_by_type = {}
+        for _, doc_type, source in document_sources:
+            sources_by_type.setdefault(doc_type, []).append(source)
 
+        # Create source objects for each document type (similar to ConnectorService)
+        source_objects = []
+        connector_id_counter = 100
+
+        for doc_type, sources_list in sources_by_type.items():
             source_object = {
                 "id": connector_id_counter,
-                "name": friendly_type_names.get(doc_type, f"{doc_type} (Selected)"),
+                "name": _USER_SELECTED_TYPE_NAMES.get(
+                    doc_type, f"{doc_type} (Selected)"
+                ),
                 "type": f"USER_SELECTED_{doc_type}",
                 "sources": sources_list,
             }
@@ -658,6 +599,87 @@ async def write_answer_outline(
         raise
 
 
+# ConnectorService methods for connectors searched over the user's indexed documents.
+# These all share the (user_query, user_id, search_space_id, top_k, search_mode) signature.
+_CONNECTOR_SEARCH_METHODS = {
+    "YOUTUBE_VIDEO": "search_youtube",
+    "EXTENSION": "search_extension",
+    "CRAWLED_URL": "search_crawled_urls",
+    "FILE": "search_files",
+    "SLACK_CONNECTOR": "search_slack",
+    "NOTION_CONNECTOR": "search_notion",
+    "GITHUB_CONNECTOR": "search_github",
+    "LINEAR_CONNECTOR": "search_linear",
+    "DISCORD_CONNECTOR": "search_discord",
+    "JIRA_CONNECTOR": "search_jira",
+    "GOOGLE_CALENDAR_CONNECTOR": "search_google_calendar",
+    "AIRTABLE_CONNECTOR": "search_airtable",
+    "GOOGLE_GMAIL_CONNECTOR": "search_google_gmail",
+    "CONFLUENCE_CONNECTOR": "search_confluence",
+    "CLICKUP_CONNECTOR": "search_clickup",
+}
+
+# Progress messages streamed once a connector search returns
+_CONNECTOR_FOUND_MESSAGES = {
+    "YOUTUBE_VIDEO": "📹 Found {count} YouTube chunks related to your query",
+    "EXTENSION": "🧩 Found {count} Browser Extension chunks related to your query",
+    "CRAWLED_URL": "🌐 Found {count} Web Pages chunks related to your query",
+    "FILE": "📄 Found {count} Files chunks related to your query",
+    "SLACK_CONNECTOR": "💬 Found {count} Slack messages related to your query",
+    "NOTION_CONNECTOR": "📘 Found {count} Notion pages/blocks related to your query",
+    "GITHUB_CONNECTOR": "🐙 Found {count} GitHub files/issues related to your query",
+    "LINEAR_CONNECTOR": "📊 Found {count} Linear issues related to your query",
+    "TAVILY_API": "🔍 Found {count} Web Search results related to your query",
+    "LINKUP_API": "🔗 Found {count} Linkup results related to your query",
+    "DISCORD_CONNECTOR": "🗨️ Found {count} Discord messages related to your query",
+    "JIRA_CONNECTOR": "🎫 Found {count} Jira issues related to your query",
+    "GOOGLE_CALENDAR_CONNECTOR": "📅 Found {count} calendar events related to your query",
+    "AIRTABLE_CONNECTOR": "🗃️ Found {count} Airtable records related to your query",
+    "GOOGLE_GMAIL_CONNECTOR": "📧 Found {count} Gmail messages related to your query",
+    "CONFLUENCE_CONNECTOR": "📚 Found {count} Confluence pages related to your query",
+    "CLICKUP_CONNECTOR": "📋 Found {count} ClickUp tasks related to your query",
+}
+
+
+async def _search_connector(
+    connector_service: ConnectorService,
+    connector: str,
+    user_query: str,
+    user_id: str,
+    search_space_id: int,
+    top_k: int,
+    search_mode: SearchMode,
+) -> tuple[dict[str, Any] | None, list[dict[str, Any]]]:
+    """
+    Run a single connector search.
+
+    Returns:
+        Tuple of (source_object, chunks). Unknown connectors return (None, []).
+    """
+    if connector == "TAVILY_API":
+        return await connector_service.search_tavily(
+            user_query=user_query, user_id=user_id, top_k=top_k
+        )
+
+    if connector == "LINKUP_API":
+        return await connector_service.search_linkup(
+            user_query=user_query, user_id=user_id, mode="standard"
+        )
+
+    method_name = _CONNECTOR_SEARCH_METHODS.get(connector)
+    if method_name is None:
+        return None, []
+
+    search = getattr(connector_service, method_name)
+    return await search(
+        user_query=user_query,
+        user_id=user_id,
+        search_space_id=search_space_id,
+        top_k=top_k,
+        search_mode=search_mode,
+    )
+
+
 async def fetch_relevant_documents(
     research_questions: list[str],
     user_id: str,
@@ -670,6 +692,7 @@ async def fetch_relevant_documents(
     connector_service: ConnectorService = None,
     search_mode: SearchMode = SearchMode.CHUNKS,
     user_selected_sources: list[dict[str, Any]] | None = None,
+    max_concurrency: int | None = None,
 ) -> list[dict[str, Any]]:
     """
     Fetch relevant documents for research questions using the provided connectors.
@@ -679,6 +702,12 @@ async def fetch_relevant_documents(
     displaying connector names (like "Web Search" instead of "TAVILY_API") and adding
     relevant emojis to indicate the type of source being searched.
 
+    When max_concurrency is greater than 1, every (question, connector) search runs
+    concurrently on its own database session, bounded by max_concurrency. Results are
+    merged in question/connector order either way, and concurrent searches get their
+    source ids during the merge, so the output does not depend on which search
+    finishes first.
+
     Args:
         research_questions: List of research questions to find documents for
         user_id: The user ID
@@ -689,6 +718,10 @@ async def fetch_relevant_documents(
         state: The current state containing the streaming service
         top_k: Number of top results to retrieve per connector per question
         connector_service: An initialized connector service to use for searching
+        search_mode: Whether to search chunks or whole documents
+        user_selected_sources: Source objects for user-selected documents
+        max_concurrency: Maximum number of searches in flight at once. Defaults to
+            CONNECTOR_SEARCH_CONCURRENCY; 1 searches sequentially on db_session
 
     Returns:
         List of relevant documents
@@ -729,493 +762,154 @@ async def fetch_relevant_documents(
     all_raw_documents = []  # Store all raw documents
     all_sources = []  # Store all sources
 
-    for i, user_query in enumerate(research_questions):
-        # Stream question being researched
+    if max_concurrency is None:
+        max_concurrency = app_config.CONNECTOR_SEARCH_CONCURRENCY
+
+    def stream_info(message: str) -> None:
         if streaming_service and writer:
+            writer(
+                {"yield_value": streaming_service.format_terminal_info_delta(message)}
+            )
+
+    def stream_search_error(connector: str, error: Exception) -> None:
+        logging.error(
+            "Error searching connector %s: %s", connector, traceback.format_exc()
+        )
+        print(f"Error searching connector {connector}: {error!s}")
+        if streaming_service and writer:
+            friendly_name = get_connector_friendly_name(connector)
             writer(
                 {
-                    "yield_value": streaming_service.format_terminal_info_delta(
-                        f'🧠 Researching question {i + 1}/{len(research_questions)}: "{user_query[:100]}..."'
+                    "yield_value": streaming_service.format_error(
+                        f"Error searching {friendly_name}: {error!s}"
                     )
                 }
             )
 
-        # Use original research question as the query
-        reformulated_query = user_query
-
-        # Process each selected connector
-        for connector in connectors_to_search:
-            # Stream connector being searched
-            if streaming_service and writer:
-                connector_emoji = get_connector_emoji(connector)
-                friendly_name = get_connector_friendly_name(connector)
-                writer(
-                    {
-                        "yield_value": streaming_service.format_terminal_info_delta(
-                            f"{connector_emoji} Searching {friendly_name} for relevant information..."
-                        )
-                    }
-                )
-
+    def stream_found(connector: str, chunks: list[dict[str, Any]]) -> None:
+        message = _CONNECTOR_FOUND_MESSAGES.get(connector)
+        if message:
+            stream_info(message.format(count=len(chunks)))
+
+    # In CHUNKS mode, search every question against every indexed connector in a
+    # single statement up front; the per-connector searches below reuse the results
+    if search_mode == SearchMode.CHUNKS:
+        document_types = [
+            connector
+            for connector in connectors_to_search
+            if connector in _CONNECTOR_SEARCH_METHODS
+        ]
+        if document_types:
             try:
-                if connector == "YOUTUBE_VIDEO":
-                    (
-                        source_object,
-                        youtube_chunks,
-                    ) = await connector_service.search_youtube(
-                        user_query=reformulated_query,
-                        user_id=user_id,
-                        search_space_id=search_space_id,
-                        top_k=top_k,
-                        search_mode=search_mode,
-                    )
-
-                    # Add to sources and raw documents
-                    if source_object:
-                        all_sources.append(source_object)
-                    all_raw_documents.extend(youtube_chunks)
-
-                    # Stream found document count
-                    if streaming_service and writer:
-                        writer(
-                            {
-                                "yield_value": streaming_service.format_terminal_info_delta(
-                                    f"📹 Found {len(youtube_chunks)} YouTube chunks related to your query"
-                                )
-                            }
-                        )
-
-                elif connector == "EXTENSION":
-                    (
-                        source_object,
-                        extension_chunks,
-                    ) = await connector_service.search_extension(
-                        user_query=reformulated_query,
-                        user_id=user_id,
-                        search_space_id=search_space_id,
-                        top_k=top_k,
-                        search_mode=search_mode,
-                    )
-
-                    # Add to sources and raw documents
-                    if source_object:
-                        all_sources.append(source_object)
-                    all_raw_documents.extend(extension_chunks)
-
-                    # Stream found document count
-                    if streaming_service and writer:
-                        writer(
-                            {
-                                "yield_value": streaming_service.format_terminal_info_delta(
-                                    f"🧩 Found {len(extension_chunks)} Browser Extension chunks related to your query"
-                                )
-                            }
-                        )
-
-                elif connector == "CRAWLED_URL":
-                    (
-                        source_object,
-                        crawled_urls_chunks,
-                    ) = await connector_service.search_crawled_urls(
-                        user_query=reformulated_query,
-                        user_id=user_id,
-                        search_space_id=search_space_id,
-                        top_k=top_k,
-                        search_mode=search_mode,
-                    )
-
-                    # Add to sources and raw documents
-                    if source_object:
-                        all_sources.append(source_object)
-                    all_raw_documents.extend(crawled_urls_chunks)
-
-                    # Stream found document count
-                    if streaming_service and writer:
-                        writer(
-                            {
-                                "yield_value": streaming_service.format_terminal_info_delta(
-                                    f"🌐 Found {len(crawled_urls_chunks)} Web Pages chunks related to your query"
-                                )
-                            }
-                        )
-
-                elif connector == "FILE":
-                    source_object, files_chunks = await connector_service.search_files(
-                        user_query=reformulated_query,
+                async with async_session_maker() as prefetch_session:
+                    await connector_service.with_session(
+                        prefetch_session
+                    ).prefetch_chunk_searches(
+                        user_queries=research_questions,
                         user_id=user_id,
                         search_space_id=search_space_id,
+                        document_types=document_types,
                         top_k=top_k,
-                        search_mode=search_mode,
                     )
-
-                    # Add to sources and raw documents
-                    if source_object:
-                        all_sources.append(source_object)
-                    all_raw_documents.extend(files_chunks)
-
-                    # Stream found document count
-                    if streaming_service and writer:
-                        writer(
-                            {
-                                "yield_value": streaming_service.format_terminal_info_delta(
-                                    f"📄 Found {len(files_chunks)} Files chunks related to your query"
-                                )
-                            }
-                        )
-
-                elif connector == "SLACK_CONNECTOR":
-                    source_object, slack_chunks = await connector_service.search_slack(
-                        user_query=reformulated_query,
-                        user_id=user_id,
-                        search_space_id=search_space_id,
-                        top_k=top_k,
-                        search_mode=search_mode,
-                    )
-
-                    # Add to sources and raw documents
-                    if source_object:
-                        all_sources.append(source_object)
-                    all_raw_documents.extend(slack_chunks)
-
-                    # Stream found document count
-                    if streaming_service and writer:
-                        writer(
-                            {
-                                "yield_value": streaming_service.format_terminal_info_delta(
-                                    f"💬 Found {len(slack_chunks)} Slack messages related to your query"
-                                )
-                            }
-                        )
-
-                elif connector == "NOTION_CONNECTOR":
-                    (
-                        source_object,
-                        notion_chunks,
-                    ) = await connector_service.search_notion(
-                        user_query=reformulated_query,
-                        user_id=user_id,
-                        search_space_id=search_space_id,
-                        top_k=top_k,
-                        search_mode=search_mode,
-                    )
-
-                    # Add to sources and raw documents
-                    if source_object:
-                        all_sources.append(source_object)
-                    all_raw_documents.extend(notion_chunks)
-
-                    # Stream found document count
-                    if streaming_service and writer:
-                        writer(
-                            {
-                                "yield_value": streaming_service.format_terminal_info_delta(
-                                    f"📘 Found {len(notion_chunks)} Notion pages/blocks related to your query"
-                                )
-                            }
-                        )
-
-                elif connector == "GITHUB_CONNECTOR":
-                    (
-                        source_object,
-                        github_chunks,
-                    ) = await connector_service.search_github(
-                        user_query=reformulated_query,
-                        user_id=user_id,
-                        search_space_id=search_space_id,
-                        top_k=top_k,
-                        search_mode=search_mode,
-                    )
-
-                    # Add to sources and raw documents
-                    if source_object:
-                        all_sources.append(source_object)
-                    all_raw_documents.extend(github_chunks)
-
-                    # Stream found document count
-                    if streaming_service and writer:
-                        writer(
-                            {
-                                "yield_value": streaming_service.format_terminal_info_delta(
-                                    f"🐙 Found {len(github_chunks)} GitHub files/issues related to your query"
-                                )
-                            }
-                        )
-
-                elif connector == "LINEAR_CONNECTOR":
-                    (
-                        source_object,
-                        linear_chunks,
-                    ) = await connector_service.search_linear(
-                        user_query=reformulated_query,
-                        user_id=user_id,
-                        search_space_id=search_space_id,
-                        top_k=top_k,
-                        search_mode=search_mode,
-                    )
-
-                    # Add to sources and raw documents
-                    if source_object:
-                        all_sources.append(source_object)
-                    all_raw_documents.extend(linear_chunks)
-
-                    # Stream found document count
-                    if streaming_service and writer:
-                        writer(
-                            {
-                                "yield_value": streaming_service.format_terminal_info_delta(
-                                    f"📊 Found {len(linear_chunks)} Linear issues related to your query"
-                                )
-                            }
-                        )
-
-                elif connector == "TAVILY_API":
-                    (
-                        source_object,
-                        tavily_chunks,
-                    ) = await connector_service.search_tavily(
-                        user_query=reformulated_query, user_id=user_id, top_k=top_k
-                    )
-
-                    # Add to sources and raw documents
-                    if source_object:
-                        all_sources.append(source_object)
-                    all_raw_documents.extend(tavily_chunks)
-
-                    # Stream found document count
-                    if streaming_service and writer:
-                        writer(
-                            {
-                                "yield_value": streaming_service.format_terminal_info_delta(
-                                    f"🔍 Found {len(tavily_chunks)} Web Search results related to your query"
-                                )
-                            }
-                        )
-
-                elif connector == "LINKUP_API":
-                    linkup_mode = "standard"
-
-                    (
-                        source_object,
-                        linkup_chunks,
-                    ) = await connector_service.search_linkup(
-                        user_query=reformulated_query,
-                        user_id=user_id,
-                        mode=linkup_mode,
-                    )
-
-                    # Add to sources and raw documents
-                    if source_object:
-                        all_sources.append(source_object)
-                    all_raw_documents.extend(linkup_chunks)
-
-                    # Stream found document count
-                    if streaming_service and writer:
-                        writer(
-                            {
-                                "yield_value": streaming_service.format_terminal_info_delta(
-                                    f"🔗 Found {len(linkup_chunks)} Linkup results related to your query"
-                                )
-                            }
-                        )
-
-                elif connector == "DISCORD_CONNECTOR":
-                    (
-                        source_object,
-                        discord_chunks,
-                    ) = await connector_service.search_discord(
-                        user_query=reformulated_query,
-                        user_id=user_id,
-                        search_space_id=search_space_id,
-                        top_k=top_k,
-                        search_mode=search_mode,
-                    )
-                    # Add to sources and raw documents
-                    if source_object:
-                        all_sources.append(source_object)
-                    all_raw_documents.extend(discord_chunks)
-                    # Stream found document count
-                    if streaming_service and writer:
-                        writer(
-                            {
-                                "yield_value": streaming_service.format_terminal_info_delta(
-                                    f"🗨️ Found {len(discord_chunks)} Discord messages related to your query"
-                                )
-                            }
-                        )
-
-                elif connector == "JIRA_CONNECTOR":
-                    source_object, jira_chunks = await connector_service.search_jira(
-                        user_query=reformulated_query,
-                        user_id=user_id,
-                        search_space_id=search_space_id,
-                        top_k=top_k,
-                        search_mode=search_mode,
-                    )
-
-                    # Add to sources and raw documents
-                    if source_object:
-                        all_sources.append(source_object)
-                    all_raw_documents.extend(jira_chunks)
-
-                    # Stream found document count
-                    if streaming_service and writer:
-                        writer(
-                            {
-                                "yield_value": streaming_service.format_terminal_info_delta(
-                                    f"🎫 Found {len(jira_chunks)} Jira issues related to your query"
-                                )
-                            }
+            except Exception as e:
+                # The per-connector searches fall back to individual queries
+                logging.error("Error prefetching chunk searches: %s", e)
+
+    # Results keyed by (question index, connector index) so they can be merged in
+    # the same order regardless of which search finishes first. Concurrent searches
+    # also keep the service they ran on, whose placeholder source ids are replaced
+    # during the merge
+    search_results: dict[
+        tuple[int, int],
+        tuple[dict[str, Any] | None, list, ConnectorService | None],
+    ] = {}
+
+    if max_concurrency > 1 and len(research_questions) * len(connectors_to_search) > 1:
+        stream_info(
+            f"⚡ Searching {len(connectors_to_search)} data sources for {len(research_questions)} questions concurrently..."
+        )
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run_search(question_index: int, connector_index: int) -> None:
+            connector = connectors_to_search[connector_index]
+            async with semaphore:
+                try:
+                    # AsyncSession is not safe for concurrent use, so every search
+                    # gets its own session, and draws placeholder source ids that
+                    # are assigned in question/connector order when merging
+                    async with async_session_maker() as task_session:
+                        task_service = connector_service.with_session(
+                            task_session, private_source_ids=True
                         )
-                elif connector == "GOOGLE_CALENDAR_CONNECTOR":
-                    (
-                        source_object,
-                        calendar_chunks,
-                    ) = await connector_service.search_google_calendar(
-                        user_query=reformulated_query,
-                        user_id=user_id,
-                        search_space_id=search_space_id,
-                        top_k=top_k,
-                        search_mode=search_mode,
-                    )
-
-                    # Add to sources and raw documents
-                    if source_object:
-                        all_sources.append(source_object)
-                    all_raw_documents.extend(calendar_chunks)
-
-                    # Stream found document count
-                    if streaming_service and writer:
-                        writer(
-                            {
-                                "yield_value": streaming_service.format_terminal_info_delta(
-                                    f"📅 Found {len(calendar_chunks)} calendar events related to your query"
-                                )
-                            }
+                        source_object, chunks = await _search_connector(
+                            task_service,
+                            connector=connector,
+                            user_query=research_questions[question_index],
+                            user_id=user_id,
+                            search_space_id=search_space_id,
+                            top_k=top_k,
+                            search_mode=search_mode,
                         )
-                elif connector == "AIRTABLE_CONNECTOR":
-                    (
-                        source_object,
-                        airtable_chunks,
-                    ) = await connector_service.search_airtable(
-                        user_query=reformulated_query,
-                        user_id=user_id,
-                        search_space_id=search_space_id,
-                        top_k=top_k,
-                        search_mode=search_mode,
-                    )
-
-                    # Add to sources and raw documents
-                    if source_object:
-                        all_sources.append(source_object)
-                    all_raw_documents.extend(airtable_chunks)
-
-                    # Stream found document count
-                    if streaming_service and writer:
-                        writer(
-                            {
-                                "yield_value": streaming_service.format_terminal_info_delta(
-                                    f"🗃️ Found {len(airtable_chunks)} Airtable records related to your query"
-                                )
-                            }
-                        )
-                elif connector == "GOOGLE_GMAIL_CONNECTOR":
-                    (
-                        source_object,
-                        gmail_chunks,
-                    ) = await connector_service.search_google_gmail(
-                        user_query=reformulated_query,
-                        user_id=user_id,
-                        search_space_id=search_space_id,
-                        top_k=top_k,
-                        search_mode=search_mode,
-                    )
-
-                    # Add to sources and raw documents
-                    if source_object:
-                        all_sources.append(source_object)
-                    all_raw_documents.extend(gmail_chunks)
+                except Exception as e:
+                    stream_search_error(connector, e)
+                    return
+
+            search_results[(question_index, connector_index)] = (
+                source_object,
+                chunks,
+                task_service,
+            )
+            stream_found(connector, chunks)
 
-                    # Stream found document count
-                    if streaming_service and writer:
-                        writer(
-                            {
-                                "yield_value": streaming_service.format_terminal_info_delta(
-                                    f"📧 Found {len(gmail_chunks)} Gmail messages related to your query"
-                                )
-                            }
-                        )
-                elif connector == "CONFLUENCE_CONNECTOR":
-                    (
-                        source_object,
-                        confluence_chunks,
-                    ) = await connector_service.search_confluence(
-                        user_query=reformulated_query,
-                        user_id=user_id,
-                        search_space_id=search_space_id,
-                        top_k=top_k,
-                        search_mode=search_mode,
-                    )
+        await asyncio.gather(
+            *(
+                run_search(question_index, connector_index)
+                for question_index in range(len(research_questions))
+                for connector_index in range(len(connectors_to_search))
+            )
+        )
+    else:
+        for i, user_query in enumerate(research_questions):
+            # Stream question being researched
+            stream_info(
+                f'🧠 Researching question {i + 1}/{len(research_questions)}: "{user_query[:100]}..."'
+            )
 
-                    # Add to sources and raw documents
-                    if source_object:
-                        all_sources.append(source_object)
-                    all_raw_documents.extend(confluence_chunks)
+            # Process each selected connector
+            for j, connector in enumerate(connectors_to_search):
+                # Stream connector being searched
+                connector_emoji = get_connector_emoji(connector)
+                friendly_name = get_connector_friendly_name(connector)
+                stream_info(
+                    f"{connector_emoji} Searching {friendly_name} for relevant information..."
+                )
 
-                    # Stream found document count
-                    if streaming_service and writer:
-                        writer(
-                            {
-                                "yield_value": streaming_service.format_terminal_info_delta(
-                                    f"📚 Found {len(confluence_chunks)} Confluence pages related to your query"
-                                )
-                            }
-                        )
-                elif connector == "CLICKUP_CONNECTOR":
-                    (
-                        source_object,
-                        clickup_chunks,
-                    ) = await connector_service.search_clickup(
-                        user_query=reformulated_query,
+                try:
+                    source_object, chunks = await _search_connector(
+                        connector_service,
+                        connector=connector,
+                        user_query=user_query,
                         user_id=user_id,
                         search_space_id=search_space_id,
                         top_k=top_k,
                         search_mode=search_mode,
                     )
-
-                    # Add to sources and raw documents
-                    if source_object:
-                        all_sources.append(source_object)
-                    all_raw_documents.extend(clickup_chunks)
-
-                    # Stream found document count
-                    if streaming_service and writer:
-                        writer(
-                            {
-                                "yield_value": streaming_service.format_terminal_info_delta(
-                                    f"📋 Found {len(clickup_chunks)} ClickUp tasks related to your query"
-                                )
-                            }
-                        )
-
-            except Exception as e:
-                logging.error("Error in search_airtable: %s", traceback.format_exc())
-                error_message = f"Error searching connector {connector}: {e!s}"
-                print(error_message)
-
-                # Stream error message
-                if streaming_service and writer:
-                    friendly_name = get_connector_friendly_name(connector)
-                    writer(
-                        {
-                            "yield_value": streaming_service.format_error(
-                                f"Error searching {friendly_name}: {e!s}"
-                            )
-                        }
-                    )
-
-                # Continue with other connectors on error
-                continue
-
+                except Exception as e:
+                    stream_search_error(connector, e)
+                    # Continue with other connectors on error
+                    continue
+
+                search_results[(i, j)] = (source_object, chunks, None)
+                stream_found(connector, chunks)
+
+    # Merge in question/connector order so the output is deterministic
+    for key in sorted(search_results):
+        source_object, chunks, task_service = search_results[key]
+        if task_service is not None:
+            connector_service.assign_source_ids(task_service, source_object, chunks)
+        if source_object:
+            all_sources.append(source_object)
+        all_raw_documents.extend(chunks)
     # Deduplicate source objects by ID before streaming
     deduplicated_sources = []
     seen_source_keys = set()
@@ -1691,49 +1385,39 @@ async def process_section_with_documents(
 
         # Variables to track streaming state
         complete_content = ""  # Tracks the complete content received so far
+        progress = StreamProgress()
 
         async for _chunk_type, chunk in sub_section_writer_graph.astream(
             sub_state, config, stream_mode=["values"]
         ):
             if "final_answer" in chunk:
                 new_content = chunk["final_answer"]
-                if new_content and new_content != complete_content:
-                    # Extract only the new content (delta)
+                # Each value is the whole answer so far; only the new tail is sent
+                if new_content and len(new_content) > len(complete_content):
                     delta = new_content[len(complete_content) :]
-
-                    # Update what we've processed so far
                     complete_content = new_content
+                    if section_contents is not None:
+                        section_contents[section_id]["content"] = complete_content
+
+                    if state and state.streaming_service and writer:
+                        if _STREAM_SECTION_DELTAS:
+                            writer(
+                                {
+                                    "yield_value": state.streaming_service.format_section_delta(
+                                        section_id, section_title, delta
+                                    )
+                                }
+                            )
 
-                    # Only stream if there's actual new content
-                    if delta and state and state.streaming_service and writer:
-                        # Update terminal with real-time progress indicator
-                        writer(
-                            {
-                                "yield_value": state.streaming_service.format_terminal_info_delta(
-                                    f"✍️ Writing section {section_id + 1}... ({len(complete_content.split())} words)"
-                                )
-                            }
-                        )
-
-                        # Update section_contents with just the new delta
-                        section_contents[section_id]["content"] += delta
-
-                        # Build UI-friendly content for all sections
-                        complete_answer = []
-                        for i in range(len(section_contents)):
-                            if i in section_contents and section_contents[i]["content"]:
-                                # Add section header
-                                complete_answer.append(
-                                    f"# {section_contents[i]['title']}"
-                                )
-                                complete_answer.append("")  # Empty line after title
-
-                                # Add section content
-                                content_lines = section_contents[i]["content"].split(
-                                    "\n"
-                                )
-                                complete_answer.extend(content_lines)
-                                complete_answer.append("")  # Empty line after content
+                        # Throttled real-time progress indicator
+                        if progress.add(delta):
+                            writer(
+                                {
+                                    "yield_value": state.streaming_service.format_terminal_info_delta(
+                                        f"✍️ Writing section {section_id + 1}... ({progress.words} words)"
+                                    )
+                                }
+                            )
 
         # Set default if no content was received
         if not complete_content:
@@ -1948,6 +1632,7 @@ async def handle_qna_workflow(
         # Track streaming content for real-time updates
         complete_content = ""
         captured_reranked_documents = []
+        progress = StreamProgress()
 
         # Call the QNA agent with streaming
         async for _chunk_type, chunk in qna_agent_graph.astream(
@@ -1955,26 +1640,22 @@ async def handle_qna_workflow(
         ):
             if "final_answer" in chunk:
                 new_content = chunk["final_answer"]
-                if new_content and new_content != complete_content:
-                    # Extract only the new content (delta)
+                # Each value is the whole answer so far; only the new tail is sent
+                if new_content and len(new_content) > len(complete_content):
                     delta = new_content[len(complete_content) :]
                     complete_content = new_content
 
-                    # Stream the real-time answer if there's new content
-                    if delta:
-                        # Update terminal with progress
-                        word_count = len(complete_content.split())
+                    # Throttled progress in the terminal
+                    if progress.add(delta):
                         writer(
                             {
                                 "yield_value": streaming_service.format_terminal_info_delta(
-                                    f"✍️ Writing answer... ({word_count} words)"
+                                    f"✍️ Writing answer... ({progress.words} words)"
                                 )
                             }
                         )
 
-                        writer(
-                            {"yield_value": streaming_service.format_text_chunk(delta)}
-                        )
+                    writer({"yield_value": streaming_service.format_text_chunk(delta)})
 
             # Capture reranked documents from QNA agent for further question generation
             if "reranked_documents" in chunk:
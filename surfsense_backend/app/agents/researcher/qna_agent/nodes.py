@@ -3,6 +3,7 @@ from typing import Any
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_core.runnables import RunnableConfig
 
+from app.services.compute_executor import run_search_compute
 from app.services.reranker_service import RerankerService
 
 from ..utils import (
@@ -64,8 +65,10 @@ async def rerank_documents(state: State, config: RunnableConfig) -> dict[str, An
             ]
 
             # Rerank documents using the user's query
-            reranked_docs = reranker_service.rerank_documents(
-                user_query + "\n" + reformulated_query, reranker_input_docs
+            reranked_docs = await run_search_compute(
+                reranker_service.rerank_documents,
+                user_query + "\n" + reformulated_query,
+                reranker_input_docs,
             )
 
             # Sort by score in descending order
@@ -133,8 +136,8 @@ async def answer_question(state: State, config: RunnableConfig) -> dict[str, Any
         ]
 
         # Optimize documents to fit within token limits
-        optimized_documents, has_optimized_documents = (
-            optimize_documents_for_token_limit(documents, base_messages, llm.model)
+        optimized_documents, has_optimized_documents = await run_search_compute(
+            optimize_documents_for_token_limit, documents, base_messages, llm.model
         )
 
         # Update state based on optimization result
@@ -184,7 +187,9 @@ async def answer_question(state: State, config: RunnableConfig) -> dict[str, Any
     ]
 
     # Log final token count
-    total_tokens = calculate_token_count(messages_with_chat_history, llm.model)
+    total_tokens = await run_search_compute(
+        calculate_token_count, messages_with_chat_history, llm.model
+    )
     print(f"Final token count: {total_tokens}")
 
     # Call the LLM and get the response
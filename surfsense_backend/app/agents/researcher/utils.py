@@ -1,10 +1,16 @@
+import time
+from bisect import bisect_right
+from itertools import accumulate
 from typing import Any, NamedTuple
 
 from langchain.schema import AIMessage, HumanMessage, SystemMessage
 from langchain_core.messages import BaseMessage
-from litellm import get_model_info, token_counter
+from litellm import token_counter
 from pydantic import BaseModel, Field
 
+from app.utils.document_converters import get_model_context_window
+from app.utils.token_count_cache import token_count_cache
+
 
 class Section(BaseModel):
     """A section in the answer outline."""
@@ -33,6 +39,44 @@ class DocumentTokenInfo(NamedTuple):
     token_count: int
 
 
+class StreamProgress:
+    """
+    Word count of a streamed answer, updated from its deltas.
+
+    Counting the words of the whole answer on every delta, and sending a progress
+    message for each one, grows quadratically with the answer's length. The count
+    here only looks at each delta, and progress is due at most once per interval.
+    """
+
+    def __init__(self, interval_seconds: float = 1.0):
+        self.words = 0
+        self.interval_seconds = interval_seconds
+        self._in_word = False
+        self._reported_at = 0.0
+
+    def add(self, delta: str) -> bool:
+        """
+        Count the words of a delta.
+
+        Returns:
+            Whether a progress message is due
+        """
+        if not delta:
+            return False
+
+        self.words += len(delta.split())
+        # A word split across two deltas was counted in both
+        if self._in_word and not delta[0].isspace():
+            self.words -= 1
+        self._in_word = not delta[-1].isspace()
+
+        now = time.monotonic()
+        if now - self._reported_at < self.interval_seconds:
+            return False
+        self._reported_at = now
+        return True
+
+
 def get_connector_emoji(connector_name: str) -> str:
     """Get an appropriate emoji for a connector type."""
     connector_emojis = {
@@ -126,16 +170,14 @@ def format_documents_section(
 def calculate_document_token_costs(
     documents: list[dict[str, Any]], model: str
 ) -> list[DocumentTokenInfo]:
-    """Pre-calculate token costs for each document."""
+    """Pre-calculate token costs for each document, reusing cached counts."""
     document_token_info = []
 
     for i, doc in enumerate(documents):
         formatted_doc = format_document_for_citation(doc)
 
         # Calculate token count for this document
-        token_count = token_counter(
-            messages=[{"role": "user", "content": formatted_doc}], model=model
-        )
+        token_count = token_count_cache.count(formatted_doc, model)
 
         document_token_info.append(
             DocumentTokenInfo(
@@ -152,38 +194,14 @@ def calculate_document_token_costs(
 def find_optimal_documents_with_binary_search(
     document_tokens: list[DocumentTokenInfo], available_tokens: int
 ) -> list[DocumentTokenInfo]:
-    """Use binary search to find the maximum number of documents that fit within token limit."""
+    """Find the longest prefix of documents that fits within the token limit."""
     if not document_tokens or available_tokens <= 0:
         return []
 
-    left, right = 0, len(document_tokens)
-    optimal_docs = []
-
-    while left <= right:
-        mid = (left + right) // 2
-        current_docs = document_tokens[:mid]
-        current_token_sum = sum(doc_info.token_count for doc_info in current_docs)
-
-        if current_token_sum <= available_tokens:
-            optimal_docs = current_docs
-            left = mid + 1
-        else:
-            right = mid - 1
-
-    return optimal_docs
-
-
-def get_model_context_window(model_name: str) -> int:
-    """Get the total context window size for a model (input + output tokens)."""
-    try:
-        model_info = get_model_info(model_name)
-        context_window = model_info.get("max_input_tokens", 4096)  # Default fallback
-        return context_window
-    except Exception as e:
-        print(
-            f"Warning: Could not get model info for {model_name}, using default 4096 tokens. Error: {e}"
-        )
-        return 4096  # Conservative fallback
+    # Token costs are non-negative, so the running totals are sorted and the
+    # cut point is a binary search over them
+    prefix_sums = list(accumulate(doc_info.token_count for doc_info in document_tokens))
+    return document_tokens[: bisect_right(prefix_sums, available_tokens)]
 
 
 def optimize_documents_for_token_limit(
@@ -6,6 +6,8 @@ from chonkie import AutoEmbeddings, CodeChunker, RecursiveChunker
 from dotenv import load_dotenv
 from rerankers import Reranker
 
+from app.services.embedding_server import EmbeddingServerClient
+
 # Get the base directory of the project
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
@@ -13,6 +15,25 @@ env_file = BASE_DIR / ".env"
 load_dotenv(env_file)
 
 
+def parse_int_mapping(value: str) -> dict[str, int]:
+    """
+    Parse a per-name integer setting such as per job type worker concurrency.
+
+    Args:
+        value: Comma-separated name=count pairs, e.g. "process_file_upload=2"
+
+    Returns:
+        Dictionary mapping each name to its integer value
+    """
+    mapping = {}
+    for pair in value.split(","):
+        if not pair.strip():
+            continue
+        name, _, count = pair.partition("=")
+        mapping[name.strip()] = int(count)
+    return mapping
+
+
 def is_ffmpeg_installed():
     """
     Check if ffmpeg is installed on the current system.
@@ -64,7 +85,13 @@ class Config:
 
     # Chonkie Configuration | Edit this to your needs
     EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL")
-    embedding_model_instance = AutoEmbeddings.get_embeddings(EMBEDDING_MODEL)
+    # When set, embeddings come from a shared server (python -m
+    # app.services.embedding_server) instead of a model copy in every process
+    EMBEDDING_SERVER_URL = os.getenv("EMBEDDING_SERVER_URL")
+    if EMBEDDING_SERVER_URL:
+        embedding_model_instance = EmbeddingServerClient(EMBEDDING_SERVER_URL)
+    else:
+        embedding_model_instance = AutoEmbeddings.get_embeddings(EMBEDDING_MODEL)
     chunker_instance = RecursiveChunker(
         chunk_size=getattr(embedding_model_instance, "max_seq_length", 512)
     )
@@ -72,6 +99,67 @@ class Config:
         chunk_size=getattr(embedding_model_instance, "max_seq_length", 512)
     )
 
+    # Number of texts sent to the embedding model per batch during ingestion
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+
+    # Max chunk embeddings kept in the embedding_cache table, keyed by model and chunk
+    # text hash, so re-indexing unchanged chunks skips the model (0 disables)
+    EMBEDDING_CACHE_MAX_ENTRIES = int(
+        os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "1000000")
+    )
+
+    # Connector documents written (with their chunks) per committed batch while
+    # indexing, bounding memory and transaction size for large syncs
+    INDEXING_WRITE_BATCH_SIZE = int(os.getenv("INDEXING_WRITE_BATCH_SIZE", "100"))
+
+    # Connector indexing pipeline (fetch -> format -> dedupe -> summarise -> embed ->
+    # write): items allowed to wait between two stages, concurrent LLM summaries,
+    # documents whose chunks are embedded together, and concurrent embedding batches
+    INDEXING_PIPELINE_QUEUE_SIZE = int(os.getenv("INDEXING_PIPELINE_QUEUE_SIZE", "64"))
+    INDEXING_SUMMARY_CONCURRENCY = int(os.getenv("INDEXING_SUMMARY_CONCURRENCY", "4"))
+    INDEXING_EMBED_BATCH_DOCUMENTS = int(
+        os.getenv("INDEXING_EMBED_BATCH_DOCUMENTS", "16")
+    )
+    INDEXING_EMBED_CONCURRENCY = int(os.getenv("INDEXING_EMBED_CONCURRENCY", "2"))
+
+    # Concurrent LLM calls while summarising one large uploaded document (chunk
+    # summaries and the merges that reduce them to fit the context window)
+    LARGE_DOCUMENT_SUMMARY_CONCURRENCY = int(
+        os.getenv("LARGE_DOCUMENT_SUMMARY_CONCURRENCY", "4")
+    )
+
+    # Thread pools for CPU-bound model work (embedding, chunking, reranking, token
+    # counting). Search and ingestion use separate pools so backfills never delay chat.
+    # QUEUE_SIZE is how many calls may wait for a worker before callers back off.
+    COMPUTE_SEARCH_WORKERS = int(os.getenv("COMPUTE_SEARCH_WORKERS", "4"))
+    COMPUTE_SEARCH_QUEUE_SIZE = int(os.getenv("COMPUTE_SEARCH_QUEUE_SIZE", "64"))
+    COMPUTE_INGESTION_WORKERS = int(os.getenv("COMPUTE_INGESTION_WORKERS", "2"))
+    COMPUTE_INGESTION_QUEUE_SIZE = int(os.getenv("COMPUTE_INGESTION_QUEUE_SIZE", "16"))
+
+    # Number of query embeddings kept in the process-wide retrieval cache (0 disables)
+    QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+
+    # Number of source document token counts kept per process, so research nodes
+    # packing the same documents into the context window tokenize them once (0
+    # disables)
+    TOKEN_COUNT_CACHE_SIZE = int(os.getenv("TOKEN_COUNT_CACHE_SIZE", "50000"))
+
+    # pgvector HNSW iterative scan mode for filtered vector search: relaxed_order,
+    # strict_order or off. On pgvector < 0.8.0, or when off, filtered searches rank
+    # every matching row exactly instead of using the HNSW index.
+    HNSW_ITERATIVE_SCAN = os.getenv("HNSW_ITERATIVE_SCAN") or "relaxed_order"
+
+    # HNSW build parameters for the document and chunk vector indexes. Changing them
+    # only affects newly built indexes; REINDEX to apply them to an existing one.
+    HNSW_M = int(os.getenv("HNSW_M", "16"))
+    HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "64"))
+
+    # Default HNSW candidate list size per search (pgvector default 40 when unset).
+    # Higher values raise recall at the cost of latency.
+    HNSW_EF_SEARCH = (
+        int(os.getenv("HNSW_EF_SEARCH")) if os.getenv("HNSW_EF_SEARCH") else None
+    )
+
     # Reranker's Configuration | Pinecode, Cohere etc. Read more at https://github.com/AnswerDotAI/rerankers?tab=readme-ov-file#usage
     RERANKERS_MODEL_NAME = os.getenv("RERANKERS_MODEL_NAME")
     RERANKERS_MODEL_TYPE = os.getenv("RERANKERS_MODEL_TYPE")
@@ -80,6 +168,60 @@ class Config:
         model_type=RERANKERS_MODEL_TYPE,
     )
 
+    # Maximum number of connector searches a research run keeps in flight at once.
+    # Set to 1 to search connectors sequentially on the request's session.
+    CONNECTOR_SEARCH_CONCURRENCY = int(os.getenv("CONNECTOR_SEARCH_CONCURRENCY", "8"))
+
+    # Gzip the /chat stream for clients that accept it; every part is flushed
+    # immediately, so streaming latency is unchanged
+    CHAT_STREAM_COMPRESSION = (
+        os.getenv("CHAT_STREAM_COMPRESSION", "false").lower() == "true"
+    )
+    CHAT_STREAM_COMPRESSION_LEVEL = int(os.getenv("CHAT_STREAM_COMPRESSION_LEVEL", "6"))
+
+    # Background job queue (see app/services/job_queue.py). Ingestion and connector
+    # syncs are queued in Postgres and run by `python job_worker.py`, which runs up
+    # to JOB_WORKER_CONCURRENCY jobs of each type at once (types not listed there
+    # use JOB_WORKER_DEFAULT_CONCURRENCY). Failed jobs are retried after an
+    # exponential backoff, and running jobs whose worker stopped heartbeating for
+    # JOB_LOCK_TIMEOUT_SECONDS are handed to another worker.
+    JOB_WORKER_CONCURRENCY = parse_int_mapping(os.getenv("JOB_WORKER_CONCURRENCY", ""))
+    JOB_WORKER_DEFAULT_CONCURRENCY = int(
+        os.getenv("JOB_WORKER_DEFAULT_CONCURRENCY", "2")
+    )
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_RETRY_BASE_DELAY_SECONDS = float(
+        os.getenv("JOB_RETRY_BASE_DELAY_SECONDS", "30")
+    )
+    JOB_RETRY_MAX_DELAY_SECONDS = float(os.getenv("JOB_RETRY_MAX_DELAY_SECONDS", "900"))
+    JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "2"))
+    JOB_LOCK_TIMEOUT_SECONDS = int(os.getenv("JOB_LOCK_TIMEOUT_SECONDS", "300"))
+    # Directory uploaded files wait in until a worker processes them; it must be
+    # shared with the job workers (defaults to the system temp directory)
+    UPLOAD_TEMP_DIR = os.getenv("UPLOAD_TEMP_DIR") or None
+
+    # LLM rate-limit governor (see app/services/llm_governor.py). Every user LLM call
+    # waits for a per-provider and a per-LLM config budget of requests per minute,
+    # tokens per minute and concurrent calls (0 or an unlisted provider means no
+    # limit). Provider settings take comma-separated provider=value pairs using
+    # litellm prefixes, e.g. "openai=500,anthropic=50". An LLM config can override
+    # its own limits with "rpm", "tpm" and "max_concurrency" in litellm_params.
+    LLM_PROVIDER_RPM = parse_int_mapping(os.getenv("LLM_PROVIDER_RPM", ""))
+    LLM_PROVIDER_TPM = parse_int_mapping(os.getenv("LLM_PROVIDER_TPM", ""))
+    LLM_PROVIDER_MAX_CONCURRENCY = parse_int_mapping(
+        os.getenv("LLM_PROVIDER_MAX_CONCURRENCY", "")
+    )
+    LLM_CONFIG_RPM = int(os.getenv("LLM_CONFIG_RPM", "0"))
+    LLM_CONFIG_TPM = int(os.getenv("LLM_CONFIG_TPM", "0"))
+    LLM_CONFIG_MAX_CONCURRENCY = int(os.getenv("LLM_CONFIG_MAX_CONCURRENCY", "0"))
+    # Share of each budget that background work (indexing summaries, podcasts) may
+    # not use, kept free for interactive chat
+    LLM_INTERACTIVE_RESERVE = float(os.getenv("LLM_INTERACTIVE_RESERVE", "0.2"))
+    # Retries for rate-limited or failed calls; a 429 also pauses the LLM config for
+    # the provider's Retry-After or the exponential backoff
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+    LLM_RETRY_BASE_DELAY_SECONDS = float(os.getenv("LLM_RETRY_BASE_DELAY_SECONDS", "2"))
+
     # OAuth JWT
     SECRET_KEY = os.getenv("SECRET_KEY")
 
@@ -119,6 +261,30 @@ class Config:
             f"exceeds the maximum of 2000 allowed by PGVector."
         )
 
+    # Check HNSW iterative scan mode
+    if HNSW_ITERATIVE_SCAN not in (
+        "off",
+        "strict_order",
+        "relaxed_order",
+    ):
+        raise ValueError(
+            f"HNSW_ITERATIVE_SCAN must be off, strict_order or relaxed_order, "
+            f"got {HNSW_ITERATIVE_SCAN}."
+        )
+
+    # Check HNSW parameters against the ranges pgvector accepts
+    if not 2 <= HNSW_M <= 100:
+        raise ValueError(f"HNSW_M must be between 2 and 100, got {HNSW_M}.")
+    if not max(4, 2 * HNSW_M) <= HNSW_EF_CONSTRUCTION <= 1000:
+        raise ValueError(
+            f"HNSW_EF_CONSTRUCTION must be between {max(4, 2 * HNSW_M)} and 1000, "
+            f"got {HNSW_EF_CONSTRUCTION}."
+        )
+    if HNSW_EF_SEARCH is not None and not 1 <= HNSW_EF_SEARCH <= 1000:
+        raise ValueError(
+            f"HNSW_EF_SEARCH must be between 1 and 1000, got {HNSW_EF_SEARCH}."
+        )
+
     @classmethod
     def get_settings(cls):
         """Get all settings as a dictionary."""
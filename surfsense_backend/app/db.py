@@ -1,6 +1,6 @@
 from collections.abc import AsyncGenerator
 from datetime import UTC, datetime
-from enum import Enum
+from enum import Enum, StrEnum
 
 from fastapi import Depends
 from fastapi_users.db import SQLAlchemyBaseUserTableUUID, SQLAlchemyUserDatabase
@@ -13,15 +13,22 @@ from sqlalchemy import (
     Column,
     Enum as SQLAlchemyEnum,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
     UniqueConstraint,
     text,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase, Mapped, declared_attr, relationship
+from sqlalchemy.orm import (
+    DeclarativeBase,
+    Mapped,
+    declared_attr,
+    deferred,
+    relationship,
+)
 
 from app.config import config
 from app.retriver.chunks_hybrid_search import ChucksHybridSearchRetriever
@@ -115,6 +122,13 @@ class LogStatus(str, Enum):
     FAILED = "FAILED"
 
 
+class JobStatus(StrEnum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+
 class Base(DeclarativeBase):
     pass
 
@@ -161,6 +175,8 @@ class Document(BaseModel, TimestampMixin):
     content = Column(Text, nullable=False)
     content_hash = Column(String, nullable=False, index=True, unique=True)
     embedding = Column(Vector(config.embedding_model_instance.dimension))
+    # Maintained by the documents_content_tsv_update trigger (see setup_indexes)
+    content_tsv = deferred(Column(TSVECTOR, nullable=True))
 
     search_space_id = Column(
         Integer, ForeignKey("searchspaces.id", ondelete="CASCADE"), nullable=False
@@ -170,18 +186,74 @@ class Document(BaseModel, TimestampMixin):
         "Chunk", back_populates="document", cascade="all, delete-orphan"
     )
 
+    # Stable identity of the source item (e.g. Notion page id) for connector
+    # documents, so a changed item updates its document instead of adding a new one
+    connector_id = Column(
+        Integer,
+        ForeignKey("search_source_connectors.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    external_id = Column(String, nullable=True)
+
+    __table_args__ = (
+        Index(
+            "uq_documents_search_space_id_connector_id_external_id",
+            "search_space_id",
+            "connector_id",
+            "external_id",
+            unique=True,
+        ),
+    )
+
 
 class Chunk(BaseModel, TimestampMixin):
     __tablename__ = "chunks"
 
     content = Column(Text, nullable=False)
     embedding = Column(Vector(config.embedding_model_instance.dimension))
+    # Order of the chunk within its document (NULL for chunks created before
+    # positions were tracked, which are ordered by id)
+    position = Column(Integer, nullable=True)
+    # Maintained by the chunks_content_tsv_update trigger (see setup_indexes)
+    content_tsv = deferred(Column(TSVECTOR, nullable=True))
 
     document_id = Column(
         Integer, ForeignKey("documents.id", ondelete="CASCADE"), nullable=False
     )
     document = relationship("Document", back_populates="chunks")
 
+    # Copied from the parent document by the chunks_document_fields trigger so
+    # vector search can filter chunks without joining documents
+    search_space_id = Column(
+        Integer, ForeignKey("searchspaces.id", ondelete="CASCADE"), nullable=False
+    )
+    document_type = Column(SQLAlchemyEnum(DocumentType), nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ix_chunks_search_space_id_document_type",
+            "search_space_id",
+            "document_type",
+        ),
+    )
+
+
+class EmbeddingCache(Base, TimestampMixin):
+    """Chunk embeddings keyed by embedding model and sha256 of the chunk text."""
+
+    __tablename__ = "embedding_cache"
+
+    model = Column(String, primary_key=True)
+    text_hash = Column(String(64), primary_key=True)
+    # Dimensionless so entries for models of different sizes can coexist
+    embedding = Column(Vector(), nullable=False)
+    last_used_at = Column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(UTC),
+        index=True,
+    )
+
 
 class Podcast(BaseModel, TimestampMixin):
     __tablename__ = "podcasts"
@@ -244,6 +316,9 @@ class SearchSourceConnector(BaseModel, TimestampMixin):
     is_indexable = Column(Boolean, nullable=False, default=False)
     last_indexed_at = Column(TIMESTAMP(timezone=True), nullable=True)
     config = Column(JSON, nullable=False)
+    # Progress of an unfinished indexing run (see IndexingCheckpoint), committed with
+    # each batch of documents so an interrupted run can resume
+    indexing_checkpoint = Column(JSON, nullable=True)
 
     user_id = Column(
         UUID(as_uuid=True), ForeignKey("user.id", ondelete="CASCADE"), nullable=False
@@ -291,6 +366,49 @@ class Log(BaseModel, TimestampMixin):
     search_space = relationship("SearchSpace", back_populates="logs")
 
 
+class Job(BaseModel, TimestampMixin):
+    """A background job waiting for or run by a job worker (see app.services.job_queue)."""
+
+    __tablename__ = "jobs"
+
+    job_type = Column(String(100), nullable=False, index=True)
+    # Keyword arguments for the job's handler
+    payload = Column(JSON, nullable=False, default={})
+    status = Column(
+        SQLAlchemyEnum(JobStatus), nullable=False, default=JobStatus.PENDING, index=True
+    )
+    # Higher priorities are claimed first
+    priority = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    # Pending jobs are not claimed before this time (set by retry backoff)
+    run_after = Column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(UTC),
+    )
+    # Worker running the job and its last heartbeat
+    locked_by = Column(String(200), nullable=True)
+    locked_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    search_space_id = Column(
+        Integer, ForeignKey("searchspaces.id", ondelete="CASCADE"), nullable=False
+    )
+    # Log entry mirroring the job's status for the logs UI
+    log_id = Column(Integer, ForeignKey("logs.id", ondelete="SET NULL"), nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ix_jobs_pending",
+            "job_type",
+            "priority",
+            "run_after",
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+    )
+
+
 if config.AUTH_TYPE == "GOOGLE":
 
     class OAuthAccount(SQLAlchemyBaseOAuthAccountTableUUID, Base):
@@ -372,27 +490,97 @@ async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 
 async def setup_indexes():
     async with engine.begin() as conn:
+        # Keep the stored tsvector columns in sync with content
+        for table in ("documents", "chunks"):
+            await conn.execute(
+                text(f"DROP TRIGGER IF EXISTS {table}_content_tsv_update ON {table}")
+            )
+            await conn.execute(
+                text(
+                    f"CREATE TRIGGER {table}_content_tsv_update "
+                    f"BEFORE INSERT OR UPDATE OF content ON {table} FOR EACH ROW "
+                    "EXECUTE FUNCTION tsvector_update_trigger(content_tsv, 'pg_catalog.english', content)"
+                )
+            )
+
+        # Keep the search space and document type copied onto chunks in sync
+        await conn.execute(
+            text(
+                """
+                CREATE OR REPLACE FUNCTION chunks_set_document_fields() RETURNS trigger AS $$
+                BEGIN
+                    SELECT search_space_id, document_type
+                    INTO NEW.search_space_id, NEW.document_type
+                    FROM documents WHERE id = NEW.document_id;
+                    RETURN NEW;
+                END;
+                $$ LANGUAGE plpgsql
+                """
+            )
+        )
+        await conn.execute(
+            text("DROP TRIGGER IF EXISTS chunks_document_fields ON chunks")
+        )
+        await conn.execute(
+            text(
+                "CREATE TRIGGER chunks_document_fields "
+                "BEFORE INSERT OR UPDATE OF document_id ON chunks FOR EACH ROW "
+                "EXECUTE FUNCTION chunks_set_document_fields()"
+            )
+        )
+        await conn.execute(
+            text(
+                """
+                CREATE OR REPLACE FUNCTION documents_sync_chunk_fields() RETURNS trigger AS $$
+                BEGIN
+                    UPDATE chunks
+                    SET search_space_id = NEW.search_space_id,
+                        document_type = NEW.document_type
+                    WHERE document_id = NEW.id;
+                    RETURN NEW;
+                END;
+                $$ LANGUAGE plpgsql
+                """
+            )
+        )
+        await conn.execute(
+            text("DROP TRIGGER IF EXISTS documents_chunk_fields ON documents")
+        )
+        await conn.execute(
+            text(
+                "CREATE TRIGGER documents_chunk_fields "
+                "AFTER UPDATE OF search_space_id, document_type ON documents FOR EACH ROW "
+                "WHEN (OLD.search_space_id IS DISTINCT FROM NEW.search_space_id "
+                "OR OLD.document_type IS DISTINCT FROM NEW.document_type) "
+                "EXECUTE FUNCTION documents_sync_chunk_fields()"
+            )
+        )
+
         # Create indexes
+        hnsw_options = (
+            f"WITH (m = {config.HNSW_M}, "
+            f"ef_construction = {config.HNSW_EF_CONSTRUCTION})"
+        )
         # Document Summary Indexes
         await conn.execute(
             text(
-                "CREATE INDEX IF NOT EXISTS document_vector_index ON documents USING hnsw (embedding public.vector_cosine_ops)"
+                f"CREATE INDEX IF NOT EXISTS document_vector_index ON documents USING hnsw (embedding public.vector_cosine_ops) {hnsw_options}"
             )
         )
         await conn.execute(
             text(
-                "CREATE INDEX IF NOT EXISTS document_search_index ON documents USING gin (to_tsvector('english', content))"
+                "CREATE INDEX IF NOT EXISTS document_search_tsv_index ON documents USING gin (content_tsv)"
             )
         )
         # Document Chuck Indexes
         await conn.execute(
             text(
-                "CREATE INDEX IF NOT EXISTS chucks_vector_index ON chunks USING hnsw (embedding public.vector_cosine_ops)"
+                f"CREATE INDEX IF NOT EXISTS chucks_vector_index ON chunks USING hnsw (embedding public.vector_cosine_ops) {hnsw_options}"
             )
         )
         await conn.execute(
             text(
-                "CREATE INDEX IF NOT EXISTS chucks_search_index ON chunks USING gin (to_tsvector('english', content))"
+                "CREATE INDEX IF NOT EXISTS chucks_search_tsv_index ON chunks USING gin (content_tsv)"
             )
         )
 
@@ -8,12 +8,50 @@ class ChucksHybridSearchRetriever:
         """
         self.db_session = db_session
 
+    @staticmethod
+    def _result_columns() -> tuple:
+        """
+        Columns selected for chunk results.
+
+        Only the document fields the results need are selected, so retrieval never
+        loads Document.content.
+        """
+        from app.db import Chunk, Document
+
+        return (
+            Chunk.id,
+            Chunk.content,
+            Document.id.label("document_id"),
+            Document.title,
+            Document.document_type,
+            Document.document_metadata,
+            Document.search_space_id,
+        )
+
+    @staticmethod
+    def _serialize_result(row, score) -> dict:
+        """Convert a row selected with _result_columns() to a result dictionary."""
+        return {
+            "chunk_id": row.id,
+            "content": row.content,
+            "score": float(score),  # Ensure score is a Python float
+            "document": {
+                "id": row.document_id,
+                "title": row.title,
+                "document_type": row.document_type.value
+                if row.document_type is not None
+                else None,
+                "metadata": row.document_metadata,
+            },
+        }
+
     async def vector_search(
         self,
         query_text: str,
         top_k: int,
         user_id: str,
         search_space_id: int | None = None,
+        ef_search: int | None = None,
     ) -> list:
         """
         Perform vector similarity search on chunks.
@@ -23,39 +61,40 @@ class ChucksHybridSearchRetriever:
             top_k: Number of results to return
             user_id: The ID of the user performing the search
             search_space_id: Optional search space ID to filter results
+            ef_search: Optional HNSW candidate list size, overriding HNSW_EF_SEARCH
 
         Returns:
-            List of chunks sorted by vector similarity
+            List of chunk rows (see _result_columns) sorted by vector similarity
         """
         from sqlalchemy import select
-        from sqlalchemy.orm import joinedload
 
-        from app.config import config
         from app.db import Chunk, Document, SearchSpace
+        from app.retriver.query_embedding_cache import embed_query
+        from app.retriver.vector_search_settings import apply_vector_search_settings
 
         # Get embedding for the query
-        embedding_model = config.embedding_model_instance
-        query_embedding = embedding_model.embed(query_text)
+        query_embedding = await embed_query(query_text)
 
         # Build the base query with user ownership check
         query = (
-            select(Chunk)
-            .options(joinedload(Chunk.document).joinedload(Document.search_space))
+            select(*self._result_columns())
+            .select_from(Chunk)
             .join(Document, Chunk.document_id == Document.id)
-            .join(SearchSpace, Document.search_space_id == SearchSpace.id)
+            .join(SearchSpace, Chunk.search_space_id == SearchSpace.id)
             .where(SearchSpace.user_id == user_id)
         )
 
         # Add search space filter if provided
         if search_space_id is not None:
-            query = query.where(Document.search_space_id == search_space_id)
+            query = query.where(Chunk.search_space_id == search_space_id)
 
         # Add vector similarity ordering
         query = query.order_by(Chunk.embedding.op("<=>")(query_embedding)).limit(top_k)
 
         # Execute the query
+        await apply_vector_search_settings(self.db_session, ef_search)
         result = await self.db_session.execute(query)
-        chunks = result.scalars().all()
+        chunks = result.all()
 
         return chunks
 
@@ -76,23 +115,22 @@ class ChucksHybridSearchRetriever:
             search_space_id: Optional search space ID to filter results
 
         Returns:
-            List of chunks sorted by text relevance
+            List of chunk rows (see _result_columns) sorted by text relevance
         """
         from sqlalchemy import func, select
-        from sqlalchemy.orm import joinedload
 
         from app.db import Chunk, Document, SearchSpace
 
-        # Create tsvector and tsquery for PostgreSQL full-text search
-        tsvector = func.to_tsvector("english", Chunk.content)
+        # Stored tsvector column and tsquery for PostgreSQL full-text search
+        tsvector = Chunk.content_tsv
         tsquery = func.plainto_tsquery("english", query_text)
 
         # Build the base query with user ownership check
         query = (
-            select(Chunk)
-            .options(joinedload(Chunk.document).joinedload(Document.search_space))
+            select(*self._result_columns())
+            .select_from(Chunk)
             .join(Document, Chunk.document_id == Document.id)
-            .join(SearchSpace, Document.search_space_id == SearchSpace.id)
+            .join(SearchSpace, Chunk.search_space_id == SearchSpace.id)
             .where(SearchSpace.user_id == user_id)
             .where(
                 tsvector.op("@@")(tsquery)
@@ -101,14 +139,14 @@ class ChucksHybridSearchRetriever:
 
         # Add search space filter if provided
         if search_space_id is not None:
-            query = query.where(Document.search_space_id == search_space_id)
+            query = query.where(Chunk.search_space_id == search_space_id)
 
         # Add text search ranking
         query = query.order_by(func.ts_rank_cd(tsvector, tsquery).desc()).limit(top_k)
 
         # Execute the query
         result = await self.db_session.execute(query)
-        chunks = result.scalars().all()
+        chunks = result.all()
 
         return chunks
 
@@ -119,6 +157,7 @@ class ChucksHybridSearchRetriever:
         user_id: str,
         search_space_id: int | None = None,
         document_type: str | None = None,
+        ef_search: int | None = None,
     ) -> list:
         """
         Combine vector similarity and full-text search results using Reciprocal Rank Fusion.
@@ -129,26 +168,26 @@ class ChucksHybridSearchRetriever:
             user_id: The ID of the user performing the search
             search_space_id: Optional search space ID to filter results
             document_type: Optional document type to filter results (e.g., "FILE", "CRAWLED_URL")
+            ef_search: Optional HNSW candidate list size, overriding HNSW_EF_SEARCH
 
         Returns:
             List of dictionaries containing chunk data and relevance scores
         """
         from sqlalchemy import func, select, text
-        from sqlalchemy.orm import joinedload
 
-        from app.config import config
         from app.db import Chunk, Document, DocumentType, SearchSpace
+        from app.retriver.query_embedding_cache import embed_query
+        from app.retriver.vector_search_settings import apply_vector_search_settings
 
         # Get embedding for the query
-        embedding_model = config.embedding_model_instance
-        query_embedding = embedding_model.embed(query_text)
+        query_embedding = await embed_query(query_text)
 
         # Constants for RRF calculation
         k = 60  # Constant for RRF calculation
         n_results = top_k * 2  # Get more results for better fusion
 
-        # Create tsvector and tsquery for PostgreSQL full-text search
-        tsvector = func.to_tsvector("english", Chunk.content)
+        # Stored tsvector column and tsquery for PostgreSQL full-text search
+        tsvector = Chunk.content_tsv
         tsquery = func.plainto_tsquery("english", query_text)
 
         # Base conditions for document filtering
@@ -156,7 +195,7 @@ class ChucksHybridSearchRetriever:
 
         # Add search space filter if provided
         if search_space_id is not None:
-            base_conditions.append(Document.search_space_id == search_space_id)
+            base_conditions.append(Chunk.search_space_id == search_space_id)
 
         # Add document type filter if provided
         if document_type is not None:
@@ -164,32 +203,32 @@ class ChucksHybridSearchRetriever:
             if isinstance(document_type, str):
                 try:
                     doc_type_enum = DocumentType[document_type]
-                    base_conditions.append(Document.document_type == doc_type_enum)
+                    base_conditions.append(Chunk.document_type == doc_type_enum)
                 except KeyError:
                     # If the document type doesn't exist in the enum, return empty results
                     return []
             else:
-                base_conditions.append(Document.document_type == document_type)
-
-        # CTE for semantic search with user ownership check
-        semantic_search_cte = (
-            select(
-                Chunk.id,
-                func.rank()
-                .over(order_by=Chunk.embedding.op("<=>")(query_embedding))
-                .label("rank"),
-            )
-            .join(Document, Chunk.document_id == Document.id)
-            .join(SearchSpace, Document.search_space_id == SearchSpace.id)
+                base_conditions.append(Chunk.document_type == document_type)
+
+        # CTE for semantic search with user ownership check. The nearest chunks are
+        # selected with ORDER BY ... LIMIT first and ranked afterwards, so the scan can
+        # use the HNSW index instead of ranking every chunk that passes the filters
+        # (apply_vector_search_settings keeps the filtered scan from running short).
+        distance = Chunk.embedding.op("<=>")(query_embedding)
+        nearest_chunks = (
+            select(Chunk.id, distance.label("distance"))
+            .join(SearchSpace, Chunk.search_space_id == SearchSpace.id)
             .where(*base_conditions)
-        )
-
-        semantic_search_cte = (
-            semantic_search_cte.order_by(Chunk.embedding.op("<=>")(query_embedding))
+            .order_by(distance)
             .limit(n_results)
-            .cte("semantic_search")
+            .subquery("nearest_chunks")
         )
 
+        semantic_search_cte = select(
+            nearest_chunks.c.id,
+            func.rank().over(order_by=nearest_chunks.c.distance).label("rank"),
+        ).cte("semantic_search")
+
         # CTE for keyword search with user ownership check
         keyword_search_cte = (
             select(
@@ -198,8 +237,7 @@ class ChucksHybridSearchRetriever:
                 .over(order_by=func.ts_rank_cd(tsvector, tsquery).desc())
                 .label("rank"),
             )
-            .join(Document, Chunk.document_id == Document.id)
-            .join(SearchSpace, Document.search_space_id == SearchSpace.id)
+            .join(SearchSpace, Chunk.search_space_id == SearchSpace.id)
             .where(*base_conditions)
             .where(tsvector.op("@@")(tsquery))
         )
@@ -213,7 +251,7 @@ class ChucksHybridSearchRetriever:
         # Final combined query using a FULL OUTER JOIN with RRF scoring
         final_query = (
             select(
-                Chunk,
+                *self._result_columns(),
                 (
                     func.coalesce(1.0 / (k + semantic_search_cte.c.rank), 0.0)
                     + func.coalesce(1.0 / (k + keyword_search_cte.c.rank), 0.0)
@@ -231,12 +269,13 @@ class ChucksHybridSearchRetriever:
                 Chunk.id
                 == func.coalesce(semantic_search_cte.c.id, keyword_search_cte.c.id),
             )
-            .options(joinedload(Chunk.document))
+            .join(Document, Chunk.document_id == Document.id)
             .order_by(text("score DESC"))
             .limit(top_k)
         )
 
         # Execute the query
+        await apply_vector_search_settings(self.db_session, ef_search)
         result = await self.db_session.execute(final_query)
         chunks_with_scores = result.all()
 
@@ -245,22 +284,204 @@ class ChucksHybridSearchRetriever:
             return []
 
         # Convert to serializable dictionaries if no reranker is available or if reranking failed
-        serialized_results = []
-        for chunk, score in chunks_with_scores:
-            serialized_results.append(
-                {
-                    "chunk_id": chunk.id,
-                    "content": chunk.content,
-                    "score": float(score),  # Ensure score is a Python float
-                    "document": {
-                        "id": chunk.document.id,
-                        "title": chunk.document.title,
-                        "document_type": chunk.document.document_type.value
-                        if hasattr(chunk.document, "document_type")
-                        else None,
-                        "metadata": chunk.document.document_metadata,
-                    },
-                }
+        return [self._serialize_result(row, row.score) for row in chunks_with_scores]
+
+    async def hybrid_search_batch(
+        self,
+        query_texts: list[str],
+        top_k: int,
+        user_id: str,
+        search_space_id: int | None = None,
+        document_types: list[str] | None = None,
+        ef_search: int | None = None,
+    ) -> dict[tuple[str, str], list]:
+        """
+        Run hybrid_search for every (query, document type) pair in a single SQL statement.
+
+        The query embeddings and document types are sent as VALUES lists and each pair
+        is ranked in a LATERAL subquery, so the RRF scores match what hybrid_search
+        returns for the same query and document type.
+
+        Args:
+            query_texts: The search query texts
+            top_k: Number of results to return per (query, document type) pair
+            user_id: The ID of the user performing the search
+            search_space_id: Optional search space ID to filter results
+            document_types: Document types to search (e.g., "FILE", "CRAWLED_URL")
+            ef_search: Optional HNSW candidate list size, overriding HNSW_EF_SEARCH
+
+        Returns:
+            Dictionary mapping (query_text, document_type) to the same list of
+            dictionaries hybrid_search would return for that pair
+        """
+        from sqlalchemy import (
+            Integer,
+            String,
+            Text,
+            cast,
+            column,
+            func,
+            select,
+            true,
+            values,
+        )
+
+        from app.db import Chunk, Document, DocumentType, SearchSpace
+        from app.retriver.query_embedding_cache import embed_queries
+        from app.retriver.vector_search_settings import apply_vector_search_settings
+
+        query_texts = list(dict.fromkeys(query_texts))
+        document_types = list(dict.fromkeys(document_types or []))
+        results = {
+            (query_text, document_type): []
+            for query_text in query_texts
+            for document_type in document_types
+        }
+
+        # Unknown document types have no results, same as hybrid_search
+        valid_types = [
+            document_type
+            for document_type in document_types
+            if document_type in DocumentType.__members__
+        ]
+        if not query_texts or not valid_types:
+            return results
+
+        embedding_type = Chunk.embedding.type
+        query_embeddings = await embed_queries(query_texts)
+
+        # Constants for RRF calculation
+        k = 60  # Constant for RRF calculation
+        n_results = top_k * 2  # Get more results for better fusion
+
+        queries = (
+            values(
+                column("query_index", Integer),
+                column("query_text", Text),
+                column("embedding", Text),
+                name="queries",
+            )
+            .data(
+                [
+                    (
+                        index,
+                        query_text,
+                        "[" + ",".join(str(float(v)) for v in query_embedding) + "]",
+                    )
+                    for index, (query_text, query_embedding) in enumerate(
+                        zip(query_texts, query_embeddings, strict=True)
+                    )
+                ]
+            )
+            .cte("queries")
+        )
+        doc_types = (
+            values(column("requested_type", String), name="doc_types")
+            .data([(document_type,) for document_type in valid_types])
+            .cte("doc_types")
+        )
+
+        query_embedding = cast(queries.c.embedding, embedding_type)
+        tsvector = Chunk.content_tsv
+        tsquery = func.plainto_tsquery("english", queries.c.query_text)
+
+        # Base conditions for document filtering
+        base_conditions = [
+            SearchSpace.user_id == user_id,
+            Chunk.document_type
+            == cast(doc_types.c.requested_type, Chunk.document_type.type),
+        ]
+
+        # Add search space filter if provided
+        if search_space_id is not None:
+            base_conditions.append(Chunk.search_space_id == search_space_id)
+
+        # Semantic search for each (query, document type) pair, nearest chunks first
+        # and ranked afterwards as in hybrid_search
+        distance = Chunk.embedding.op("<=>")(query_embedding)
+        nearest_chunks = (
+            select(Chunk.id, distance.label("distance"))
+            .join(SearchSpace, Chunk.search_space_id == SearchSpace.id)
+            .where(*base_conditions)
+            .order_by(distance)
+            .limit(n_results)
+            .correlate(queries, doc_types)
+            .subquery("nearest_chunks")
+        )
+        semantic_search = (
+            select(
+                nearest_chunks.c.id,
+                func.rank().over(order_by=nearest_chunks.c.distance).label("rank"),
+            )
+            .correlate(queries, doc_types)
+            .subquery("semantic_search")
+        )
+
+        # Keyword search for each (query, document type) pair
+        keyword_search = (
+            select(
+                Chunk.id,
+                func.rank()
+                .over(order_by=func.ts_rank_cd(tsvector, tsquery).desc())
+                .label("rank"),
+            )
+            .join(SearchSpace, Chunk.search_space_id == SearchSpace.id)
+            .where(*base_conditions)
+            .where(tsvector.op("@@")(tsquery))
+            .order_by(func.ts_rank_cd(tsvector, tsquery).desc())
+            .limit(n_results)
+            .correlate(queries, doc_types)
+            .subquery("keyword_search")
+        )
+
+        # RRF scoring per pair, keeping the top_k results of each
+        score = (
+            func.coalesce(1.0 / (k + semantic_search.c.rank), 0.0)
+            + func.coalesce(1.0 / (k + keyword_search.c.rank), 0.0)
+        ).label("score")
+        fused = (
+            select(
+                func.coalesce(semantic_search.c.id, keyword_search.c.id).label("id"),
+                score,
+            )
+            .select_from(
+                semantic_search.outerjoin(
+                    keyword_search,
+                    semantic_search.c.id == keyword_search.c.id,
+                    full=True,
+                )
+            )
+            .order_by(score.desc())
+            .limit(top_k)
+            .lateral("fused")
+        )
+
+        final_query = (
+            select(
+                queries.c.query_index,
+                doc_types.c.requested_type,
+                fused.c.score,
+                *self._result_columns(),
+            )
+            .select_from(queries)
+            .join(doc_types, true())
+            .join(fused, true())
+            .join(Chunk, Chunk.id == fused.c.id)
+            .join(Document, Chunk.document_id == Document.id)
+            .order_by(
+                queries.c.query_index,
+                doc_types.c.requested_type,
+                fused.c.score.desc(),
+            )
+        )
+
+        # Execute the query
+        await apply_vector_search_settings(self.db_session, ef_search)
+        result = await self.db_session.execute(final_query)
+
+        for row in result.all():
+            results[(query_texts[row.query_index], row.requested_type)].append(
+                self._serialize_result(row, row.score)
             )
 
-        return serialized_results
+        return results
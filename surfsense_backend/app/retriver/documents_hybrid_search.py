@@ -8,12 +8,31 @@ class DocumentHybridSearchRetriever:
         """
         self.db_session = db_session
 
+    @staticmethod
+    def _result_columns() -> tuple:
+        """
+        Columns selected for document results.
+
+        Only the fields the results need are selected, so searches never load
+        Document.content or Document.embedding.
+        """
+        from app.db import Document
+
+        return (
+            Document.id,
+            Document.title,
+            Document.document_type,
+            Document.document_metadata,
+            Document.search_space_id,
+        )
+
     async def vector_search(
         self,
         query_text: str,
         top_k: int,
         user_id: str,
         search_space_id: int | None = None,
+        ef_search: int | None = None,
     ) -> list:
         """
         Perform vector similarity search on documents.
@@ -23,24 +42,23 @@ class DocumentHybridSearchRetriever:
             top_k: Number of results to return
             user_id: The ID of the user performing the search
             search_space_id: Optional search space ID to filter results
+            ef_search: Optional HNSW candidate list size, overriding HNSW_EF_SEARCH
 
         Returns:
-            List of documents sorted by vector similarity
+            List of document rows (see _result_columns) sorted by vector similarity
         """
         from sqlalchemy import select
-        from sqlalchemy.orm import joinedload
 
-        from app.config import config
         from app.db import Document, SearchSpace
+        from app.retriver.query_embedding_cache import embed_query
+        from app.retriver.vector_search_settings import apply_vector_search_settings
 
         # Get embedding for the query
-        embedding_model = config.embedding_model_instance
-        query_embedding = embedding_model.embed(query_text)
+        query_embedding = await embed_query(query_text)
 
         # Build the base query with user ownership check
         query = (
-            select(Document)
-            .options(joinedload(Document.search_space))
+            select(*self._result_columns())
             .join(SearchSpace, Document.search_space_id == SearchSpace.id)
             .where(SearchSpace.user_id == user_id)
         )
@@ -55,8 +73,9 @@ class DocumentHybridSearchRetriever:
         )
 
         # Execute the query
+        await apply_vector_search_settings(self.db_session, ef_search)
         result = await self.db_session.execute(query)
-        documents = result.scalars().all()
+        documents = result.all()
 
         return documents
 
@@ -77,21 +96,19 @@ class DocumentHybridSearchRetriever:
             search_space_id: Optional search space ID to filter results
 
         Returns:
-            List of documents sorted by text relevance
+            List of document rows (see _result_columns) sorted by text relevance
         """
         from sqlalchemy import func, select
-        from sqlalchemy.orm import joinedload
 
         from app.db import Document, SearchSpace
 
-        # Create tsvector and tsquery for PostgreSQL full-text search
-        tsvector = func.to_tsvector("english", Document.content)
+        # Stored tsvector column and tsquery for PostgreSQL full-text search
+        tsvector = Document.content_tsv
         tsquery = func.plainto_tsquery("english", query_text)
 
         # Build the base query with user ownership check
         query = (
-            select(Document)
-            .options(joinedload(Document.search_space))
+            select(*self._result_columns())
             .join(SearchSpace, Document.search_space_id == SearchSpace.id)
             .where(SearchSpace.user_id == user_id)
             .where(
@@ -108,7 +125,7 @@ class DocumentHybridSearchRetriever:
 
         # Execute the query
         result = await self.db_session.execute(query)
-        documents = result.scalars().all()
+        documents = result.all()
 
         return documents
 
@@ -119,6 +136,7 @@ class DocumentHybridSearchRetriever:
         user_id: str,
         search_space_id: int | None = None,
         document_type: str | None = None,
+        ef_search: int | None = None,
     ) -> list:
         """
         Combine vector similarity and full-text search results using Reciprocal Rank Fusion.
@@ -129,24 +147,24 @@ class DocumentHybridSearchRetriever:
             user_id: The ID of the user performing the search
             search_space_id: Optional search space ID to filter results
             document_type: Optional document type to filter results (e.g., "FILE", "CRAWLED_URL")
+            ef_search: Optional HNSW candidate list size, overriding HNSW_EF_SEARCH
 
         """
         from sqlalchemy import func, select, text
-        from sqlalchemy.orm import joinedload
 
-        from app.config import config
-        from app.db import Document, DocumentType, SearchSpace
+        from app.db import Chunk, Document, DocumentType, SearchSpace
+        from app.retriver.query_embedding_cache import embed_query
+        from app.retriver.vector_search_settings import apply_vector_search_settings
 
         # Get embedding for the query
-        embedding_model = config.embedding_model_instance
-        query_embedding = embedding_model.embed(query_text)
+        query_embedding = await embed_query(query_text)
 
         # Constants for RRF calculation
         k = 60  # Constant for RRF calculation
         n_results = top_k * 2  # Get more results for better fusion
 
-        # Create tsvector and tsquery for PostgreSQL full-text search
-        tsvector = func.to_tsvector("english", Document.content)
+        # Stored tsvector column and tsquery for PostgreSQL full-text search
+        tsvector = Document.content_tsv
         tsquery = func.plainto_tsquery("english", query_text)
 
         # Base conditions for document filtering
@@ -209,7 +227,7 @@ class DocumentHybridSearchRetriever:
         # Final combined query using a FULL OUTER JOIN with RRF scoring
         final_query = (
             select(
-                Document,
+                *self._result_columns(),
                 (
                     func.coalesce(1.0 / (k + semantic_search_cte.c.rank), 0.0)
                     + func.coalesce(1.0 / (k + keyword_search_cte.c.rank), 0.0)
@@ -227,12 +245,12 @@ class DocumentHybridSearchRetriever:
                 Document.id
                 == func.coalesce(semantic_search_cte.c.id, keyword_search_cte.c.id),
             )
-            .options(joinedload(Document.search_space))
             .order_by(text("score DESC"))
             .limit(top_k)
         )
 
         # Execute the query
+        await apply_vector_search_settings(self.db_session, ef_search)
         result = await self.db_session.execute(final_query)
         documents_with_scores = result.all()
 
@@ -240,19 +258,44 @@ class DocumentHybridSearchRetriever:
         if not documents_with_scores:
             return []
 
+        # Fetch the chunks of all ranked documents in one query
+        document_ids = [document.id for document in documents_with_scores]
+        chunks_query = (
+            select(Chunk.id, Chunk.document_id, Chunk.content)
+            .where(Chunk.document_id.in_(document_ids))
+            .order_by(Chunk.document_id, Chunk.position, Chunk.id)
+        )
+        chunks_result = await self.db_session.execute(chunks_query)
+        chunks_by_document = {}
+        for chunk in chunks_result.all():
+            chunks_by_document.setdefault(chunk.document_id, []).append(chunk)
+
+        # Documents without chunks fall back to their full content, so only
+        # load Document.content for those
+        contents_by_document = {}
+        documents_without_chunks = [
+            document_id
+            for document_id in document_ids
+            if document_id not in chunks_by_document
+        ]
+        if documents_without_chunks:
+            contents_result = await self.db_session.execute(
+                select(Document.id, Document.content).where(
+                    Document.id.in_(documents_without_chunks)
+                )
+            )
+            contents_by_document = dict(contents_result.all())
+
         # Convert to serializable dictionaries - return individual chunks
         serialized_results = []
-        for document, score in documents_with_scores:
-            # Fetch associated chunks for this document
-            from sqlalchemy import select
-
-            from app.db import Chunk
-
-            chunks_query = (
-                select(Chunk).where(Chunk.document_id == document.id).order_by(Chunk.id)
+        for document in documents_with_scores:
+            chunks = chunks_by_document.get(document.id, [])
+            score = float(document.score)  # Ensure score is a Python float
+            document_type = (
+                document.document_type.value
+                if document.document_type is not None
+                else None
             )
-            chunks_result = await self.db_session.execute(chunks_query)
-            chunks = chunks_result.scalars().all()
 
             # Return individual chunks instead of concatenated content
             if chunks:
@@ -262,11 +305,9 @@ class DocumentHybridSearchRetriever:
                             "document_id": chunk.id,
                             "title": document.title,
                             "content": chunk.content,  # Use chunk content instead of document content
-                            "document_type": document.document_type.value
-                            if hasattr(document, "document_type")
-                            else None,
+                            "document_type": document_type,
                             "metadata": document.document_metadata,
-                            "score": float(score),  # Ensure score is a Python float
+                            "score": score,
                             "search_space_id": document.search_space_id,
                         }
                     )
@@ -276,12 +317,10 @@ class DocumentHybridSearchRetriever:
                     {
                         "document_id": document.id,
                         "title": document.title,
-                        "content": document.content,
-                        "document_type": document.document_type.value
-                        if hasattr(document, "document_type")
-                        else None,
+                        "content": contents_by_document.get(document.id, ""),
+                        "document_type": document_type,
                         "metadata": document.document_metadata,
-                        "score": float(score),  # Ensure score is a Python float
+                        "score": score,
                         "search_space_id": document.search_space_id,
                     }
                 )
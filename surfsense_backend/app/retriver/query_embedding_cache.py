@@ -0,0 +1,144 @@
+import threading
+from collections import OrderedDict
+
+from app.config import config
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded, thread-safe LRU cache of query embeddings.
+
+    Entries are keyed by (embedding model, normalized query text) so a model change
+    never serves stale vectors.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of embeddings to keep. 0 disables caching.
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, str], list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(query_text: str) -> str:
+        """Collapse whitespace so trivially different queries share an entry."""
+        return " ".join(query_text.split())
+
+    async def embed(self, query_text: str) -> list[float]:
+        """
+        Get the embedding for a query, encoding it only on a cache miss.
+
+        Misses are encoded on the search compute executor so the event loop stays free.
+
+        Args:
+            query_text: The search query text
+
+        Returns:
+            The query embedding
+        """
+        normalized_text = self.normalize(query_text)
+        key = (config.EMBEDDING_MODEL, normalized_text)
+
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return embedding
+            self.misses += 1
+
+        from app.services.compute_executor import run_search_compute
+
+        embedding = await run_search_compute(
+            config.embedding_model_instance.embed, normalized_text
+        )
+
+        if self.max_size > 0:
+            with self._lock:
+                self._entries[key] = embedding
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+
+        return embedding
+
+    async def embed_many(self, query_texts: list[str]) -> list[list[float]]:
+        """
+        Get the embeddings for several queries, encoding all misses in one batch.
+
+        Args:
+            query_texts: The search query texts
+
+        Returns:
+            The query embeddings, in the same order as query_texts
+        """
+        keys = [(config.EMBEDDING_MODEL, self.normalize(text)) for text in query_texts]
+
+        embeddings: dict[tuple[str, str], list[float]] = {}
+        with self._lock:
+            for key in keys:
+                if key in embeddings:
+                    continue
+                embedding = self._entries.get(key)
+                if embedding is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    embeddings[key] = embedding
+            missing = list(dict.fromkeys(key for key in keys if key not in embeddings))
+            self.misses += len(missing)
+
+        if missing:
+            from app.services.compute_executor import run_search_compute
+
+            new_embeddings = await run_search_compute(
+                config.embedding_model_instance.embed_batch,
+                [normalized_text for _, normalized_text in missing],
+            )
+            embeddings.update(zip(missing, new_embeddings, strict=True))
+
+            if self.max_size > 0:
+                with self._lock:
+                    for key in missing:
+                        self._entries[key] = embeddings[key]
+                        self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_size:
+                        self._entries.popitem(last=False)
+
+        return [embeddings[key] for key in keys]
+
+    def stats(self) -> dict[str, int]:
+        """Get hit/miss counters and current size of the cache."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# Process-wide cache shared by the chunk and document retrievers
+query_embedding_cache = QueryEmbeddingCache(max_size=config.QUERY_EMBEDDING_CACHE_SIZE)
+
+
+async def embed_query(query_text: str) -> list[float]:
+    """Get the embedding for a search query from the process-wide cache."""
+    return await query_embedding_cache.embed(query_text)
+
+
+async def embed_queries(query_texts: list[str]) -> list[list[float]]:
+    """Get the embeddings for several search queries from the process-wide cache."""
+    return await query_embedding_cache.embed_many(query_texts)
@@ -0,0 +1,96 @@
+import logging
+import re
+
+from app.config import config
+
+logger = logging.getLogger(__name__)
+
+# First pgvector version with hnsw.iterative_scan
+ITERATIVE_SCAN_MIN_VERSION = (0, 8, 0)
+
+# Installed pgvector version, looked up once per process
+_pgvector_version: tuple[int, ...] | None = None
+
+
+def _parse_version(version: str) -> tuple[int, ...]:
+    return tuple(int(part) for part in re.findall(r"\d+", version)[:3])
+
+
+async def get_pgvector_version(db_session) -> tuple[int, ...]:
+    """
+    Get the version of the vector extension installed in the database.
+
+    Args:
+        db_session: SQLAlchemy AsyncSession to query with
+
+    Returns:
+        The version as a tuple of ints, or () when the extension is not installed
+    """
+    global _pgvector_version
+    if _pgvector_version is None:
+        from sqlalchemy import text
+
+        result = await db_session.execute(
+            text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+        )
+        version = result.scalar()
+        _pgvector_version = _parse_version(version) if version else ()
+        if config.HNSW_ITERATIVE_SCAN != "off" and (
+            _pgvector_version < ITERATIVE_SCAN_MIN_VERSION
+        ):
+            logger.warning(
+                f"pgvector {version} does not support hnsw.iterative_scan (needs "
+                ">= 0.8.0); filtered vector searches will scan exactly instead of "
+                "using the HNSW index. Run ALTER EXTENSION vector UPDATE after "
+                "upgrading pgvector."
+            )
+    return _pgvector_version
+
+
+async def apply_vector_search_settings(
+    db_session, ef_search: int | None = None
+) -> None:
+    """
+    Apply the configured pgvector settings to the session's current transaction.
+
+    Vector searches filter by search space and document type while ordering by
+    distance. An HNSW scan only returns ef_search neighbours from the whole table
+    before those filters apply, so a small search space could get few or no
+    results. With iterative scans (HNSW_ITERATIVE_SCAN, pgvector >= 0.8.0) the scan
+    keeps going until enough rows pass the filters. Where iterative scans are off
+    or unsupported, index scans are disabled for the transaction so every row that
+    passes the filters is ranked exactly.
+
+    Args:
+        db_session: SQLAlchemy AsyncSession the vector search will run on
+        ef_search: Optional HNSW candidate list size for this search, overriding
+            HNSW_EF_SEARCH
+    """
+    from sqlalchemy import text
+
+    ef_search = ef_search or config.HNSW_EF_SEARCH
+    iterative_scan = config.HNSW_ITERATIVE_SCAN
+    if (
+        iterative_scan != "off"
+        and await get_pgvector_version(db_session) < ITERATIVE_SCAN_MIN_VERSION
+    ):
+        iterative_scan = "off"
+
+    # set_config(..., true) only lasts until the end of the current transaction
+    if iterative_scan == "off":
+        # Bitmap scans stay enabled, so the search space filters still use their
+        # indexes
+        await db_session.execute(
+            text("SELECT set_config('enable_indexscan', 'off', true)")
+        )
+        return
+
+    await db_session.execute(
+        text("SELECT set_config('hnsw.iterative_scan', :mode, true)"),
+        {"mode": iterative_scan},
+    )
+    if ef_search:
+        await db_session.execute(
+            text("SELECT set_config('hnsw.ef_search', :ef_search, true)"),
+            {"ef_search": str(ef_search)},
+        )
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import StreamingResponse
 from langchain.schema import AIMessage, HumanMessage
 from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from app.config import config
 from app.db import Chat, SearchSpace, User, get_async_session
 from app.schemas import (
     AISDKChatRequest,
@@ -13,6 +14,7 @@ from app.schemas import (
     ChatReadWithoutMessages,
     ChatUpdate,
 )
+from app.services.streaming_service import gzip_stream
 from app.tasks.stream_connector_search_results import stream_connector_search_results
 from app.users import current_active_user
 from app.utils.check_ownership import check_ownership
@@ -23,6 +25,7 @@ router = APIRouter()
 @router.post("/chat")
 async def handle_chat_data(
     request: AISDKChatRequest,
+    http_request: Request,
     session: AsyncSession = Depends(get_async_session),
     user: User = Depends(current_active_user),
 ):
@@ -66,21 +69,27 @@ async def handle_chat_data(
         elif message["role"] == "assistant":
             langchain_chat_history.append(AIMessage(content=message["content"]))
 
-    response = StreamingResponse(
-        stream_connector_search_results(
-            user_query,
-            user.id,
-            search_space_id,
-            session,
-            research_mode,
-            selected_connectors,
-            langchain_chat_history,
-            search_mode_str,
-            document_ids_to_add_in_context,
-        )
+    stream = stream_connector_search_results(
+        user_query,
+        user.id,
+        search_space_id,
+        session,
+        research_mode,
+        selected_connectors,
+        langchain_chat_history,
+        search_mode_str,
+        document_ids_to_add_in_context,
+    )
+
+    compress = config.CHAT_STREAM_COMPRESSION and "gzip" in http_request.headers.get(
+        "accept-encoding", ""
     )
+    response = StreamingResponse(gzip_stream(stream) if compress else stream)
 
     response.headers["x-vercel-ai-data-stream"] = "v1"
+    if compress:
+        response.headers["Content-Encoding"] = "gzip"
+        response.headers["Vary"] = "Accept-Encoding"
     return response
 
 
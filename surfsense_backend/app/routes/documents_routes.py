@@ -1,8 +1,9 @@
 # Force asyncio to use standard event loop before unstructured imports
 import asyncio
 
-from fastapi import APIRouter, BackgroundTasks, Depends, Form, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, Form, HTTPException, UploadFile
 from litellm import atranscription
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
@@ -22,7 +23,9 @@ from app.schemas import (
     DocumentsCreate,
     DocumentUpdate,
     DocumentWithChunksRead,
+    ExtensionDocumentContent,
 )
+from app.services.job_queue import PermanentJobError, enqueue_job, job_handler
 from app.services.task_logging_service import TaskLoggingService
 from app.tasks.document_processors import (
     add_crawled_url_document,
@@ -35,6 +38,11 @@ from app.tasks.document_processors import (
 )
 from app.users import current_active_user
 from app.utils.check_ownership import check_ownership
+from app.utils.document_converters import (
+    embed_text,
+    generate_content_hash,
+    sync_document_chunks,
+)
 
 try:
     asyncio.set_event_loop_policy(asyncio.DefaultEventLoopPolicy())
@@ -55,7 +63,6 @@ async def create_documents(
     request: DocumentsCreate,
     session: AsyncSession = Depends(get_async_session),
     user: User = Depends(current_active_user),
-    fastapi_background_tasks: BackgroundTasks = BackgroundTasks(),
 ):
     try:
         # Check if the user owns the search space
@@ -63,27 +70,42 @@ async def create_documents(
 
         if request.document_type == DocumentType.EXTENSION:
             for individual_document in request.content:
-                fastapi_background_tasks.add_task(
-                    process_extension_document_with_new_session,
-                    individual_document,
+                await enqueue_job(
+                    session,
+                    "process_extension_document",
                     request.search_space_id,
-                    str(user.id),
+                    {
+                        "individual_document": individual_document.model_dump(),
+                        "search_space_id": request.search_space_id,
+                        "user_id": str(user.id),
+                    },
+                    description=f"extension document {individual_document.metadata.VisitedWebPageTitle}",
                 )
         elif request.document_type == DocumentType.CRAWLED_URL:
             for url in request.content:
-                fastapi_background_tasks.add_task(
-                    process_crawled_url_with_new_session,
-                    url,
+                await enqueue_job(
+                    session,
+                    "process_crawled_url",
                     request.search_space_id,
-                    str(user.id),
+                    {
+                        "url": url,
+                        "search_space_id": request.search_space_id,
+                        "user_id": str(user.id),
+                    },
+                    description=f"crawl of {url}",
                 )
         elif request.document_type == DocumentType.YOUTUBE_VIDEO:
             for url in request.content:
-                fastapi_background_tasks.add_task(
-                    process_youtube_video_with_new_session,
-                    url,
+                await enqueue_job(
+                    session,
+                    "process_youtube_video",
                     request.search_space_id,
-                    str(user.id),
+                    {
+                        "url": url,
+                        "search_space_id": request.search_space_id,
+                        "user_id": str(user.id),
+                    },
+                    description=f"YouTube video {url}",
                 )
         else:
             raise HTTPException(status_code=400, detail="Invalid document type")
@@ -105,7 +127,6 @@ async def create_documents_file_upload(
     search_space_id: int = Form(...),
     session: AsyncSession = Depends(get_async_session),
     user: User = Depends(current_active_user),
-    fastapi_background_tasks: BackgroundTasks = BackgroundTasks(),
 ):
     try:
         await check_ownership(session, SearchSpace, search_space_id, user)
@@ -119,9 +140,11 @@ async def create_documents_file_upload(
                 import os
                 import tempfile
 
-                # Create temp file
+                # Create temp file where the job workers can read it
                 with tempfile.NamedTemporaryFile(
-                    delete=False, suffix=os.path.splitext(file.filename)[1]
+                    delete=False,
+                    suffix=os.path.splitext(file.filename)[1],
+                    dir=app_config.UPLOAD_TEMP_DIR,
                 ) as temp_file:
                     temp_path = temp_file.name
 
@@ -130,12 +153,17 @@ async def create_documents_file_upload(
                 with open(temp_path, "wb") as f:
                     f.write(content)
 
-                fastapi_background_tasks.add_task(
-                    process_file_in_background_with_new_session,
-                    temp_path,
-                    file.filename,
+                await enqueue_job(
+                    session,
+                    "process_file_upload",
                     search_space_id,
-                    str(user.id),
+                    {
+                        "file_path": temp_path,
+                        "filename": file.filename,
+                        "search_space_id": search_space_id,
+                        "user_id": str(user.id),
+                    },
+                    description=f"processing of {file.filename}",
                 )
             except Exception as e:
                 raise HTTPException(
@@ -253,8 +281,32 @@ async def update_document(
             )
 
         update_data = document_update.model_dump(exclude_unset=True)
+        content = update_data.pop("content", None)
         for key, value in update_data.items():
             setattr(db_document, key, value)
+
+        # Re-chunk edited text content, re-embedding only the chunks that changed
+        if isinstance(content, str) and content != db_document.content:
+            content_hash = generate_content_hash(content, db_document.search_space_id)
+            result = await session.execute(
+                select(Document.id).filter(
+                    Document.content_hash == content_hash,
+                    Document.id != document_id,
+                )
+            )
+            existing_document_id = result.scalars().first()
+            if existing_document_id is not None:
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Document {existing_document_id} in this search space already has this content",
+                )
+
+            db_document.content = content
+            db_document.content_hash = content_hash
+            db_document.embedding = await embed_text(content)
+            await sync_document_chunks(session, db_document.id, content)
+        elif content is not None:
+            db_document.content = content
         await session.commit()
         await session.refresh(db_document)
 
@@ -270,6 +322,13 @@ async def update_document(
         )
     except HTTPException:
         raise
+    except IntegrityError as e:
+        await session.rollback()
+        # Another document got the same content between the check and the commit
+        raise HTTPException(
+            status_code=409,
+            detail=f"A document in this search space already has this content: {e!s}",
+        ) from e
     except Exception as e:
         await session.rollback()
         raise HTTPException(
@@ -344,8 +403,10 @@ async def get_document_by_chunk_id(
                 detail="Document not found or you don't have access to it",
             )
 
-        # Sort chunks by creation time
-        sorted_chunks = sorted(document.chunks, key=lambda x: x.created_at)
+        # Sort chunks by position in the document, then creation time
+        sorted_chunks = sorted(
+            document.chunks, key=lambda x: (x.position or 0, x.created_at)
+        )
 
         # Return the document with its chunks
         return DocumentWithChunksRead(
@@ -366,6 +427,18 @@ async def get_document_by_chunk_id(
         ) from e
 
 
+@job_handler("process_extension_document")
+async def process_extension_document_job(
+    individual_document: dict, search_space_id: int, user_id: str
+):
+    """Job handler for an extension document queued by create_documents."""
+    await process_extension_document_with_new_session(
+        ExtensionDocumentContent.model_validate(individual_document),
+        search_space_id,
+        user_id,
+    )
+
+
 async def process_extension_document_with_new_session(
     individual_document, search_space_id: int, user_id: str
 ):
@@ -417,8 +490,11 @@ async def process_extension_document_with_new_session(
             import logging
 
             logging.error(f"Error processing extension document: {e!s}")
+            # Let the job queue retry the job
+            raise
 
 
+@job_handler("process_crawled_url")
 async def process_crawled_url_with_new_session(
     url: str, search_space_id: int, user_id: str
 ):
@@ -469,8 +545,11 @@ async def process_crawled_url_with_new_session(
             import logging
 
             logging.error(f"Error processing crawled URL: {e!s}")
+            # Let the job queue retry the job
+            raise
 
 
+@job_handler("process_file_upload")
 async def process_file_in_background_with_new_session(
     file_path: str, filename: str, search_space_id: int, user_id: str
 ):
@@ -478,6 +557,11 @@ async def process_file_in_background_with_new_session(
     from app.db import async_session_maker
     from app.services.task_logging_service import TaskLoggingService
 
+    # Processing deletes the file once it is read, so a retry after that point
+    # cannot succeed
+    if not os.path.exists(file_path):
+        raise PermanentJobError(f"Uploaded file {filename} is no longer available")
+
     async with async_session_maker() as session:
         # Initialize task logging service
         task_logger = TaskLoggingService(session, search_space_id)
@@ -517,8 +601,11 @@ async def process_file_in_background_with_new_session(
             import logging
 
             logging.error(f"Error processing file: {e!s}")
+            # Let the job queue retry the job
+            raise
 
 
+@job_handler("process_youtube_video")
 async def process_youtube_video_with_new_session(
     url: str, search_space_id: int, user_id: str
 ):
@@ -569,6 +656,8 @@ async def process_youtube_video_with_new_session(
             import logging
 
             logging.error(f"Error processing YouTube video: {e!s}")
+            # Let the job queue retry the job
+            raise
 
 
 async def process_file_in_background(
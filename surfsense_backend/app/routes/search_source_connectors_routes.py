@@ -14,7 +14,7 @@ import logging
 from datetime import datetime, timedelta
 from typing import Any
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field, ValidationError
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -35,6 +35,7 @@ from app.schemas import (
     SearchSourceConnectorRead,
     SearchSourceConnectorUpdate,
 )
+from app.services.job_queue import PermanentJobError, enqueue_job, job_handler
 from app.tasks.connector_indexers import (
     index_airtable_records,
     index_clickup_tasks,
@@ -56,6 +57,9 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Job type of connector indexing runs (see run_connector_indexing_job)
+INDEX_CONNECTOR_JOB = "index_connector"
+
 
 # Use Pydantic's BaseModel here
 class GitHubPATRequest(BaseModel):
@@ -332,7 +336,6 @@ async def index_connector_content(
     ),
     session: AsyncSession = Depends(get_async_session),
     user: User = Depends(current_active_user),
-    background_tasks: BackgroundTasks = None,
 ):
     """
     Index content from a connector to a search space.
@@ -348,7 +351,6 @@ async def index_connector_content(
     Args:
         connector_id: ID of the connector to use
         search_space_id: ID of the search space to store indexed content
-        background_tasks: FastAPI background tasks
 
     Returns:
         Dictionary with indexing status
@@ -388,171 +390,72 @@ async def index_connector_content(
         indexing_to = end_date if end_date else today_str
 
         if connector.connector_type == SearchSourceConnectorType.SLACK_CONNECTOR:
-            # Run indexing in background
             logger.info(
                 f"Triggering Slack indexing for connector {connector_id} into search space {search_space_id} from {indexing_from} to {indexing_to}"
             )
-            background_tasks.add_task(
-                run_slack_indexing_with_new_session,
-                connector_id,
-                search_space_id,
-                str(user.id),
-                indexing_from,
-                indexing_to,
-            )
             response_message = "Slack indexing started in the background."
 
         elif connector.connector_type == SearchSourceConnectorType.NOTION_CONNECTOR:
-            # Run indexing in background
             logger.info(
                 f"Triggering Notion indexing for connector {connector_id} into search space {search_space_id} from {indexing_from} to {indexing_to}"
             )
-            background_tasks.add_task(
-                run_notion_indexing_with_new_session,
-                connector_id,
-                search_space_id,
-                str(user.id),
-                indexing_from,
-                indexing_to,
-            )
             response_message = "Notion indexing started in the background."
 
         elif connector.connector_type == SearchSourceConnectorType.GITHUB_CONNECTOR:
-            # Run indexing in background
             logger.info(
                 f"Triggering GitHub indexing for connector {connector_id} into search space {search_space_id} from {indexing_from} to {indexing_to}"
             )
-            background_tasks.add_task(
-                run_github_indexing_with_new_session,
-                connector_id,
-                search_space_id,
-                str(user.id),
-                indexing_from,
-                indexing_to,
-            )
             response_message = "GitHub indexing started in the background."
 
         elif connector.connector_type == SearchSourceConnectorType.LINEAR_CONNECTOR:
-            # Run indexing in background
             logger.info(
                 f"Triggering Linear indexing for connector {connector_id} into search space {search_space_id} from {indexing_from} to {indexing_to}"
             )
-            background_tasks.add_task(
-                run_linear_indexing_with_new_session,
-                connector_id,
-                search_space_id,
-                str(user.id),
-                indexing_from,
-                indexing_to,
-            )
             response_message = "Linear indexing started in the background."
 
         elif connector.connector_type == SearchSourceConnectorType.JIRA_CONNECTOR:
-            # Run indexing in background
             logger.info(
                 f"Triggering Jira indexing for connector {connector_id} into search space {search_space_id} from {indexing_from} to {indexing_to}"
             )
-            background_tasks.add_task(
-                run_jira_indexing_with_new_session,
-                connector_id,
-                search_space_id,
-                str(user.id),
-                indexing_from,
-                indexing_to,
-            )
             response_message = "Jira indexing started in the background."
 
         elif connector.connector_type == SearchSourceConnectorType.CONFLUENCE_CONNECTOR:
-            # Run indexing in background
             logger.info(
                 f"Triggering Confluence indexing for connector {connector_id} into search space {search_space_id} from {indexing_from} to {indexing_to}"
             )
-            background_tasks.add_task(
-                run_confluence_indexing_with_new_session,
-                connector_id,
-                search_space_id,
-                str(user.id),
-                indexing_from,
-                indexing_to,
-            )
             response_message = "Confluence indexing started in the background."
 
         elif connector.connector_type == SearchSourceConnectorType.CLICKUP_CONNECTOR:
-            # Run indexing in background
             logger.info(
                 f"Triggering ClickUp indexing for connector {connector_id} into search space {search_space_id} from {indexing_from} to {indexing_to}"
             )
-            background_tasks.add_task(
-                run_clickup_indexing_with_new_session,
-                connector_id,
-                search_space_id,
-                str(user.id),
-                indexing_from,
-                indexing_to,
-            )
             response_message = "ClickUp indexing started in the background."
 
         elif (
             connector.connector_type
             == SearchSourceConnectorType.GOOGLE_CALENDAR_CONNECTOR
         ):
-            # Run indexing in background
             logger.info(
                 f"Triggering Google Calendar indexing for connector {connector_id} into search space {search_space_id} from {indexing_from} to {indexing_to}"
             )
-            background_tasks.add_task(
-                run_google_calendar_indexing_with_new_session,
-                connector_id,
-                search_space_id,
-                str(user.id),
-                indexing_from,
-                indexing_to,
-            )
             response_message = "Google Calendar indexing started in the background."
         elif connector.connector_type == SearchSourceConnectorType.AIRTABLE_CONNECTOR:
-            # Run indexing in background
             logger.info(
                 f"Triggering Airtable indexing for connector {connector_id} into search space {search_space_id} from {indexing_from} to {indexing_to}"
             )
-            background_tasks.add_task(
-                run_airtable_indexing_with_new_session,
-                connector_id,
-                search_space_id,
-                str(user.id),
-                indexing_from,
-                indexing_to,
-            )
             response_message = "Airtable indexing started in the background."
         elif (
             connector.connector_type == SearchSourceConnectorType.GOOGLE_GMAIL_CONNECTOR
         ):
-            # Run indexing in background
             logger.info(
                 f"Triggering Google Gmail indexing for connector {connector_id} into search space {search_space_id} from {indexing_from} to {indexing_to}"
             )
-            background_tasks.add_task(
-                run_google_gmail_indexing_with_new_session,
-                connector_id,
-                search_space_id,
-                str(user.id),
-                indexing_from,
-                indexing_to,
-            )
             response_message = "Google Gmail indexing started in the background."
 
         elif connector.connector_type == SearchSourceConnectorType.DISCORD_CONNECTOR:
-            # Run indexing in background
             logger.info(
                 f"Triggering Discord indexing for connector {connector_id} into search space {search_space_id} from {indexing_from} to {indexing_to}"
             )
-            background_tasks.add_task(
-                run_discord_indexing_with_new_session,
-                connector_id,
-                search_space_id,
-                str(user.id),
-                indexing_from,
-                indexing_to,
-            )
             response_message = "Discord indexing started in the background."
 
         else:
@@ -561,6 +464,22 @@ async def index_connector_content(
                 detail=f"Indexing not supported for connector type: {connector.connector_type}",
             )
 
+        # Run indexing in a job worker
+        await enqueue_job(
+            session,
+            INDEX_CONNECTOR_JOB,
+            search_space_id,
+            {
+                "connector_id": connector_id,
+                "search_space_id": search_space_id,
+                "user_id": str(user.id),
+                "start_date": indexing_from,
+                "end_date": indexing_to,
+            },
+            description=f"{connector.connector_type.value} indexing for connector {connector_id}",
+        )
+        await session.commit()
+
         return {
             "message": response_message,
             "connector_id": connector_id,
@@ -667,6 +586,8 @@ async def run_slack_indexing(
             )
     except Exception as e:
         logger.error(f"Error in background Slack indexing task: {e!s}")
+        # Let the job queue retry the run
+        raise
 
 
 async def run_notion_indexing_with_new_session(
@@ -729,6 +650,8 @@ async def run_notion_indexing(
             )
     except Exception as e:
         logger.error(f"Error in background Notion indexing task: {e!s}")
+        # Let the job queue retry the run
+        raise
 
 
 # Add new helper functions for GitHub indexing
@@ -787,7 +710,8 @@ async def run_github_indexing(
             f"Critical error in run_github_indexing for connector {connector_id}: {e}",
             exc_info=True,
         )
-        # Optionally update status in DB to indicate failure
+        # Let the job queue retry the run
+        raise
 
 
 # Add new helper functions for Linear indexing
@@ -846,7 +770,8 @@ async def run_linear_indexing(
             f"Critical error in run_linear_indexing for connector {connector_id}: {e}",
             exc_info=True,
         )
-        # Optionally update status in DB to indicate failure
+        # Let the job queue retry the run
+        raise
 
 
 # Add new helper functions for discord indexing
@@ -909,6 +834,8 @@ async def run_discord_indexing(
             )
     except Exception as e:
         logger.error(f"Error in background Discord indexing task: {e!s}")
+        # Let the job queue retry the run
+        raise
 
 
 # Add new helper functions for Jira indexing
@@ -966,7 +893,8 @@ async def run_jira_indexing(
             f"Critical error in run_jira_indexing for connector {connector_id}: {e}",
             exc_info=True,
         )
-        # Optionally update status in DB to indicate failure
+        # Let the job queue retry the run
+        raise
 
 
 # Add new helper functions for Confluence indexing
@@ -1026,7 +954,8 @@ async def run_confluence_indexing(
             f"Critical error in run_confluence_indexing for connector {connector_id}: {e}",
             exc_info=True,
         )
-        # Optionally update status in DB to indicate failure
+        # Let the job queue retry the run
+        raise
 
 
 # Add new helper functions for ClickUp indexing
@@ -1084,7 +1013,8 @@ async def run_clickup_indexing(
             f"Critical error in run_clickup_indexing for connector {connector_id}: {e}",
             exc_info=True,
         )
-        # Optionally update status in DB to indicate failure
+        # Let the job queue retry the run
+        raise
 
 
 # Add new helper functions for Airtable indexing
@@ -1142,7 +1072,8 @@ async def run_airtable_indexing(
             f"Critical error in run_airtable_indexing for connector {connector_id}: {e}",
             exc_info=True,
         )
-        # Optionally update status in DB to indicate failure
+        # Let the job queue retry the run
+        raise
 
 
 # Add new helper functions for Google Calendar indexing
@@ -1202,7 +1133,8 @@ async def run_google_calendar_indexing(
             f"Critical error in run_google_calendar_indexing for connector {connector_id}: {e}",
             exc_info=True,
         )
-        # Optionally update status in DB to indicate failure
+        # Let the job queue retry the run
+        raise
 
 
 async def run_google_gmail_indexing_with_new_session(
@@ -1261,4 +1193,52 @@ async def run_google_gmail_indexing(
             f"Critical error in run_google_gmail_indexing for connector {connector_id}: {e}",
             exc_info=True,
         )
-        # Optionally update status in DB to indicate failure
+        # Let the job queue retry the run
+        raise
+
+
+# Indexing run for each connector type, called by run_connector_indexing_job
+CONNECTOR_INDEXING_RUNS = {
+    SearchSourceConnectorType.SLACK_CONNECTOR: run_slack_indexing_with_new_session,
+    SearchSourceConnectorType.NOTION_CONNECTOR: run_notion_indexing_with_new_session,
+    SearchSourceConnectorType.GITHUB_CONNECTOR: run_github_indexing_with_new_session,
+    SearchSourceConnectorType.LINEAR_CONNECTOR: run_linear_indexing_with_new_session,
+    SearchSourceConnectorType.JIRA_CONNECTOR: run_jira_indexing_with_new_session,
+    SearchSourceConnectorType.CONFLUENCE_CONNECTOR: run_confluence_indexing_with_new_session,
+    SearchSourceConnectorType.CLICKUP_CONNECTOR: run_clickup_indexing_with_new_session,
+    SearchSourceConnectorType.GOOGLE_CALENDAR_CONNECTOR: run_google_calendar_indexing_with_new_session,
+    SearchSourceConnectorType.AIRTABLE_CONNECTOR: run_airtable_indexing_with_new_session,
+    SearchSourceConnectorType.GOOGLE_GMAIL_CONNECTOR: run_google_gmail_indexing_with_new_session,
+    SearchSourceConnectorType.DISCORD_CONNECTOR: run_discord_indexing_with_new_session,
+}
+
+
+@job_handler(INDEX_CONNECTOR_JOB)
+async def run_connector_indexing_job(
+    connector_id: int,
+    search_space_id: int,
+    user_id: str,
+    start_date: str,
+    end_date: str,
+):
+    """
+    Job handler for connector indexing queued by index_connector_content.
+
+    Args:
+        connector_id: ID of the connector to index
+        search_space_id: ID of the search space
+        user_id: ID of the user
+        start_date: Start date for indexing
+        end_date: End date for indexing
+    """
+    async with async_session_maker() as session:
+        connector = await session.get(SearchSourceConnector, connector_id)
+    if connector is None:
+        raise PermanentJobError(f"Connector {connector_id} no longer exists")
+
+    run_indexing = CONNECTOR_INDEXING_RUNS.get(connector.connector_type)
+    if run_indexing is None:
+        raise PermanentJobError(
+            f"Indexing not supported for connector type: {connector.connector_type}"
+        )
+    await run_indexing(connector_id, search_space_id, user_id, start_date, end_date)
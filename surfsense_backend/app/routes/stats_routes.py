@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends
+
+from app.db import User
+from app.retriver.query_embedding_cache import query_embedding_cache
+from app.services.compute_executor import get_compute_stats
+from app.services.llm_governor import get_llm_governor_stats
+from app.users import current_superuser
+from app.utils.token_count_cache import token_count_cache
+
+router = APIRouter()
+
+
+@router.get("/compute-stats")
+async def read_compute_stats(user: User = Depends(current_superuser)):
+    """
+    Queue depth and latency of the compute executors and LLM rate limiters.
+
+    The LLM rate limiter stats cover every user's LLM configs, so only
+    superusers can read them.
+    """
+    return {
+        "executors": get_compute_stats(),
+        "query_embedding_cache": query_embedding_cache.stats(),
+        "token_count_cache": token_count_cache.stats(),
+        "llm_governor": get_llm_governor_stats(),
+    }
@@ -0,0 +1,168 @@
+import asyncio
+import functools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import config
+
+
+class ComputeExecutor:
+    """
+    Bounded thread pool for CPU-bound model work.
+
+    Embedding, chunking, reranking and token counting are synchronous; calling them
+    directly from async code stalls every other request on the event loop. Work is
+    submitted here instead, and callers wait without blocking the loop. At most
+    max_workers + max_queue_size calls are admitted at once; further callers wait for
+    a slot, so a large backfill applies backpressure instead of growing an unbounded
+    queue. The underlying models release the GIL for their numeric work, so threads
+    run in parallel and avoid reloading the models in every process.
+    """
+
+    def __init__(
+        self, name: str, max_workers: int, max_queue_size: int, window: int = 1024
+    ):
+        """
+        Initialize the executor.
+
+        Args:
+            name: Name used for worker threads and logging
+            max_workers: Number of worker threads
+            max_queue_size: Number of calls allowed to wait for a free worker
+            window: Number of recent calls kept for latency percentiles
+        """
+        self.name = name
+        self.max_workers = max(max_workers, 1)
+        self.max_queue_size = max(max_queue_size, 0)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix=f"compute-{name}"
+        )
+        self._slots: asyncio.Semaphore | None = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._wait_ms: deque[float] = deque(maxlen=window)
+        self._run_ms: deque[float] = deque(maxlen=window)
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running event loop
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers + self.max_queue_size)
+        return self._slots
+
+    def _call(self, submitted_at: float, func, *args, **kwargs):
+        started_at = time.perf_counter()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._wait_ms.append((started_at - submitted_at) * 1000)
+
+        succeeded = False
+        try:
+            result = func(*args, **kwargs)
+            succeeded = True
+            return result
+        finally:
+            with self._lock:
+                self._running -= 1
+                if succeeded:
+                    self._completed += 1
+                else:
+                    self._failed += 1
+                self._run_ms.append((time.perf_counter() - started_at) * 1000)
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Run a synchronous function on the pool and await its result.
+
+        Args:
+            func: The function to call
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            The function's return value; exceptions are re-raised in the caller
+        """
+        async with self._get_slots():
+            submitted_at = time.perf_counter()
+            with self._lock:
+                self._queued += 1
+
+            future = self._executor.submit(
+                functools.partial(self._call, submitted_at, func, *args, **kwargs)
+            )
+            try:
+                return await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                # A call cancelled before a worker picked it up never runs _call
+                if future.cancel():
+                    with self._lock:
+                        self._queued -= 1
+                raise
+
+    @staticmethod
+    def _percentile(values: list[float], percentile: float) -> float:
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        index = min(int(len(ordered) * percentile / 100), len(ordered) - 1)
+        return round(ordered[index], 2)
+
+    def stats(self) -> dict:
+        """Get queue depth, throughput counters and recent latency percentiles."""
+        with self._lock:
+            wait_ms = list(self._wait_ms)
+            run_ms = list(self._run_ms)
+            stats = {
+                "max_workers": self.max_workers,
+                "max_queue_size": self.max_queue_size,
+                "queued": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+            }
+
+        stats.update(
+            {
+                "wait_ms_p50": self._percentile(wait_ms, 50),
+                "wait_ms_p99": self._percentile(wait_ms, 99),
+                "run_ms_p50": self._percentile(run_ms, 50),
+                "run_ms_p99": self._percentile(run_ms, 99),
+            }
+        )
+        return stats
+
+
+# Separate pools so a large ingestion backlog never delays search and chat work
+search_executor = ComputeExecutor(
+    "search",
+    max_workers=config.COMPUTE_SEARCH_WORKERS,
+    max_queue_size=config.COMPUTE_SEARCH_QUEUE_SIZE,
+)
+ingestion_executor = ComputeExecutor(
+    "ingestion",
+    max_workers=config.COMPUTE_INGESTION_WORKERS,
+    max_queue_size=config.COMPUTE_INGESTION_QUEUE_SIZE,
+)
+
+
+async def run_search_compute(func, *args, **kwargs):
+    """Run CPU-bound search work (query embedding, reranking, token counting)."""
+    return await search_executor.run(func, *args, **kwargs)
+
+
+async def run_ingestion_compute(func, *args, **kwargs):
+    """Run CPU-bound ingestion work (chunking and document embedding)."""
+    return await ingestion_executor.run(func, *args, **kwargs)
+
+
+def get_compute_stats() -> dict[str, dict]:
+    """Get stats for every compute executor."""
+    return {
+        executor.name: executor.stats()
+        for executor in (search_executor, ingestion_executor)
+    }
@@ -18,6 +18,11 @@ from app.db import (
 from app.retriver.chunks_hybrid_search import ChucksHybridSearchRetriever
 from app.retriver.documents_hybrid_search import DocumentHybridSearchRetriever
 
+# Start of the placeholder source ids drawn by services created with
+# with_session(..., private_source_ids=True); far below any real id so
+# assign_source_ids can tell them apart
+PRIVATE_SOURCE_ID_BASE = -(10**9)
+
 
 class ConnectorService:
     def __init__(self, session: AsyncSession, user_id: str | None = None):
@@ -25,12 +30,142 @@ class ConnectorService:
         self.chunk_retriever = ChucksHybridSearchRetriever(session)
         self.document_retriever = DocumentHybridSearchRetriever(session)
         self.user_id = user_id
-        self.source_id_counter = (
-            100000  # High starting value to avoid collisions with existing IDs
-        )
+        # Held in a dict so services created by with_session() share the counter
+        self._source_id_state = {
+            "value": 100000  # High starting value to avoid collisions with existing IDs
+        }
         self.counter_lock = (
             asyncio.Lock()
         )  # Lock to protect counter in multithreaded environments
+        # Chunk search results fetched ahead of time by prefetch_chunk_searches(),
+        # keyed by (query, document type, user, search space, top_k)
+        self._prefetched_chunk_searches: dict[tuple, list[dict[str, Any]]] = {}
+
+    @property
+    def source_id_counter(self) -> int:
+        return self._source_id_state["value"]
+
+    @source_id_counter.setter
+    def source_id_counter(self, value: int) -> None:
+        self._source_id_state["value"] = value
+
+    def with_session(
+        self, session: AsyncSession, private_source_ids: bool = False
+    ) -> "ConnectorService":
+        """
+        Create a ConnectorService bound to another session that shares this
+        service's source id counter and lock.
+
+        An AsyncSession cannot run queries concurrently, so concurrent searches
+        each need their own session while still drawing unique source ids.
+
+        Args:
+            session: The session the new service should query with
+            private_source_ids: Draw placeholder source ids from a counter of the
+                new service's own instead; pass its results to assign_source_ids
+                to give them real ids in a deterministic order
+
+        Returns:
+            ConnectorService: A service sharing this one's counter state
+        """
+        service = ConnectorService(session, user_id=self.user_id)
+        if private_source_ids:
+            service._source_id_state = {"value": PRIVATE_SOURCE_ID_BASE}
+        else:
+            service._source_id_state = self._source_id_state
+            service.counter_lock = self.counter_lock
+        service._prefetched_chunk_searches = self._prefetched_chunk_searches
+        return service
+
+    def assign_source_ids(
+        self,
+        private_service: "ConnectorService",
+        source_object: dict[str, Any] | None,
+        chunks: list[dict[str, Any]],
+    ) -> None:
+        """
+        Replace the placeholder ids of a search run on a private_source_ids service
+        with ids drawn from this service's counter.
+
+        Args:
+            private_service: Service created with with_session(...,
+                private_source_ids=True) that ran the search
+            source_object: The search's source object, updated in place
+            chunks: The search's chunks, updated in place
+        """
+        used = private_service.source_id_counter - PRIVATE_SOURCE_ID_BASE
+        first_id = self.source_id_counter
+
+        def assign(item: dict[str, Any], key: str) -> None:
+            value = item.get(key)
+            if (
+                isinstance(value, int)
+                and PRIVATE_SOURCE_ID_BASE <= value < PRIVATE_SOURCE_ID_BASE + used
+            ):
+                item[key] = first_id + value - PRIVATE_SOURCE_ID_BASE
+
+        for source in (source_object or {}).get("sources", []):
+            assign(source, "id")
+        for chunk in chunks:
+            assign(chunk, "chunk_id")
+            if isinstance(chunk.get("document"), dict):
+                assign(chunk["document"], "id")
+        self.source_id_counter = first_id + used
+
+    async def prefetch_chunk_searches(
+        self,
+        user_queries: list[str],
+        user_id: str,
+        search_space_id: int,
+        document_types: list[str],
+        top_k: int = 20,
+    ) -> None:
+        """
+        Run the chunk hybrid searches for every (query, document type) pair in one
+        statement and keep the results for the search_* methods to reuse.
+
+        Args:
+            user_queries: The queries that will be searched
+            user_id: The user's ID
+            search_space_id: The search space ID
+            document_types: Document types that will be searched
+            top_k: Number of results per (query, document type) pair
+        """
+        results = await self.chunk_retriever.hybrid_search_batch(
+            query_texts=user_queries,
+            top_k=top_k,
+            user_id=user_id,
+            search_space_id=search_space_id,
+            document_types=document_types,
+        )
+        for (query_text, document_type), chunks in results.items():
+            self._prefetched_chunk_searches[
+                (query_text, document_type, user_id, search_space_id, top_k)
+            ] = chunks
+
+    async def _chunk_hybrid_search(
+        self,
+        query_text: str,
+        top_k: int,
+        user_id: str,
+        search_space_id: int,
+        document_type: str,
+    ) -> list[dict[str, Any]]:
+        """
+        Chunk hybrid search that reuses results from prefetch_chunk_searches() when
+        available and queries the retriever otherwise.
+        """
+        key = (query_text, document_type, user_id, search_space_id, top_k)
+        if key in self._prefetched_chunk_searches:
+            return self._prefetched_chunk_searches[key]
+
+        return await self.chunk_retriever.hybrid_search(
+            query_text=query_text,
+            top_k=top_k,
+            user_id=user_id,
+            search_space_id=search_space_id,
+            document_type=document_type,
+        )
 
     async def initialize_counter(self):
         """
@@ -72,7 +207,7 @@ class ConnectorService:
             tuple: (sources_info, langchain_documents)
         """
         if search_mode == SearchMode.CHUNKS:
-            crawled_urls_chunks = await self.chunk_retriever.hybrid_search(
+            crawled_urls_chunks = await self._chunk_hybrid_search(
                 query_text=user_query,
                 top_k=top_k,
                 user_id=user_id,
@@ -146,7 +281,7 @@ class ConnectorService:
             tuple: (sources_info, langchain_documents)
         """
         if search_mode == SearchMode.CHUNKS:
-            files_chunks = await self.chunk_retriever.hybrid_search(
+            files_chunks = await self._chunk_hybrid_search(
                 query_text=user_query,
                 top_k=top_k,
                 user_id=user_id,
@@ -377,7 +512,7 @@ class ConnectorService:
             tuple: (sources_info, langchain_documents)
         """
         if search_mode == SearchMode.CHUNKS:
-            slack_chunks = await self.chunk_retriever.hybrid_search(
+            slack_chunks = await self._chunk_hybrid_search(
                 query_text=user_query,
                 top_k=top_k,
                 user_id=user_id,
@@ -473,7 +608,7 @@ class ConnectorService:
             tuple: (sources_info, langchain_documents)
         """
         if search_mode == SearchMode.CHUNKS:
-            notion_chunks = await self.chunk_retriever.hybrid_search(
+            notion_chunks = await self._chunk_hybrid_search(
                 query_text=user_query,
                 top_k=top_k,
                 user_id=user_id,
@@ -570,7 +705,7 @@ class ConnectorService:
             tuple: (sources_info, langchain_documents)
         """
         if search_mode == SearchMode.CHUNKS:
-            extension_chunks = await self.chunk_retriever.hybrid_search(
+            extension_chunks = await self._chunk_hybrid_search(
                 query_text=user_query,
                 top_k=top_k,
                 user_id=user_id,
@@ -691,7 +826,7 @@ class ConnectorService:
             tuple: (sources_info, langchain_documents)
         """
         if search_mode == SearchMode.CHUNKS:
-            youtube_chunks = await self.chunk_retriever.hybrid_search(
+            youtube_chunks = await self._chunk_hybrid_search(
                 query_text=user_query,
                 top_k=top_k,
                 user_id=user_id,
@@ -784,7 +919,7 @@ class ConnectorService:
             tuple: (sources_info, langchain_documents)
         """
         if search_mode == SearchMode.CHUNKS:
-            github_chunks = await self.chunk_retriever.hybrid_search(
+            github_chunks = await self._chunk_hybrid_search(
                 query_text=user_query,
                 top_k=top_k,
                 user_id=user_id,
@@ -865,7 +1000,7 @@ class ConnectorService:
             tuple: (sources_info, langchain_documents)
         """
         if search_mode == SearchMode.CHUNKS:
-            linear_chunks = await self.chunk_retriever.hybrid_search(
+            linear_chunks = await self._chunk_hybrid_search(
                 query_text=user_query,
                 top_k=top_k,
                 user_id=user_id,
@@ -975,7 +1110,7 @@ class ConnectorService:
             tuple: (sources_info, langchain_documents)
         """
         if search_mode == SearchMode.CHUNKS:
-            jira_chunks = await self.chunk_retriever.hybrid_search(
+            jira_chunks = await self._chunk_hybrid_search(
                 query_text=user_query,
                 top_k=top_k,
                 user_id=user_id,
@@ -1096,7 +1231,7 @@ class ConnectorService:
             tuple: (sources_info, langchain_documents)
         """
         if search_mode == SearchMode.CHUNKS:
-            calendar_chunks = await self.chunk_retriever.hybrid_search(
+            calendar_chunks = await self._chunk_hybrid_search(
                 query_text=user_query,
                 top_k=top_k,
                 user_id=user_id,
@@ -1231,7 +1366,7 @@ class ConnectorService:
             tuple: (sources_info, langchain_documents)
         """
         if search_mode == SearchMode.CHUNKS:
-            airtable_chunks = await self.chunk_retriever.hybrid_search(
+            airtable_chunks = await self._chunk_hybrid_search(
                 query_text=user_query,
                 top_k=top_k,
                 user_id=user_id,
@@ -1319,7 +1454,7 @@ class ConnectorService:
             tuple: (sources_info, langchain_documents)
         """
         if search_mode == SearchMode.CHUNKS:
-            gmail_chunks = await self.chunk_retriever.hybrid_search(
+            gmail_chunks = await self._chunk_hybrid_search(
                 query_text=user_query,
                 top_k=top_k,
                 user_id=user_id,
@@ -1445,7 +1580,7 @@ class ConnectorService:
             tuple: (sources_info, langchain_documents)
         """
         if search_mode == SearchMode.CHUNKS:
-            confluence_chunks = await self.chunk_retriever.hybrid_search(
+            confluence_chunks = await self._chunk_hybrid_search(
                 query_text=user_query,
                 top_k=top_k,
                 user_id=user_id,
@@ -1542,7 +1677,7 @@ class ConnectorService:
             tuple: (sources_info, langchain_documents)
         """
         if search_mode == SearchMode.CHUNKS:
-            clickup_chunks = await self.chunk_retriever.hybrid_search(
+            clickup_chunks = await self._chunk_hybrid_search(
                 query_text=user_query,
                 top_k=top_k,
                 user_id=user_id,
@@ -1775,7 +1910,7 @@ class ConnectorService:
             tuple: (sources_info, langchain_documents)
         """
         if search_mode == SearchMode.CHUNKS:
-            discord_chunks = await self.chunk_retriever.hybrid_search(
+            discord_chunks = await self._chunk_hybrid_search(
                 query_text=user_query,
                 top_k=top_k,
                 user_id=user_id,
@@ -4,13 +4,127 @@ Docling Document Processing Service for SurfSense
 SSL-safe implementation with pre-downloaded models
 """
 
+import asyncio
 import logging
 import os
 import ssl
+from collections.abc import Awaitable, Callable
 from typing import Any
 
+from langchain_core.prompts import PromptTemplate
+
 logger = logging.getLogger(__name__)
 
+# Tokens kept free in a combine prompt for its instructions and the summary
+COMBINE_RESERVED_TOKENS = 2000
+
+# Template for merging a group of neighbouring section summaries when they do not
+# all fit in one combine prompt
+MERGE_TEMPLATE = PromptTemplate(
+    input_variables=["summaries", "document_title"],
+    template="""<INSTRUCTIONS>
+You are merging consecutive section summaries of "{document_title}" into one summary of that part of the document.
+
+Keep every key concept, fact and detail, in document order, and remove repetition.
+A later step combines this summary with the summaries of the other parts.
+
+<section_summaries>
+{summaries}
+</section_summaries>
+</INSTRUCTIONS>""",
+)
+
+
+def count_text_tokens(texts: list[str], model_name: str) -> list[int]:
+    """Count the tokens of each text for the given model."""
+    from litellm import token_counter
+
+    return [token_counter(text=text, model=model_name) for text in texts]
+
+
+def group_by_token_budget(token_counts: list[int], budget: int) -> list[list[int]]:
+    """
+    Split consecutive items into groups that each fit in a token budget.
+
+    Args:
+        token_counts: Token count of each item, in order
+        budget: Maximum total tokens per group
+
+    Returns:
+        Lists of item indexes. No group of two or more items goes over the budget;
+        an item that does not fit next to its neighbours is left in a group of its
+        own.
+    """
+    groups: list[list[int]] = []
+    group: list[int] = []
+    group_tokens = 0
+    for index, tokens in enumerate(token_counts):
+        if group and group_tokens + tokens > budget:
+            groups.append(group)
+            group, group_tokens = [], 0
+        group.append(index)
+        group_tokens += tokens
+    if group:
+        groups.append(group)
+    return groups
+
+
+async def reduce_to_token_budget(
+    summaries: list[str],
+    budget: int,
+    count_tokens: Callable[[list[str]], Awaitable[list[int]]],
+    truncate: Callable[[list[str], int], Awaitable[list[str]]],
+    merge: Callable[[list[str], int], Awaitable[str]],
+) -> list[str]:
+    """
+    Merge neighbouring summaries until together they fit in a token budget.
+
+    Each level merges the groups from group_by_token_budget and keeps summaries
+    that are alone in their group as they are. A summary over the budget by itself
+    is truncated to the budget first. When no two neighbours fit together, every
+    summary is truncated to an equal share of the budget instead.
+
+    Args:
+        summaries: Summaries in document order
+        budget: Maximum total tokens of the returned summaries
+        count_tokens: Returns the token count of each text
+        truncate: Cuts each text to at most the given number of tokens
+        merge: Merges a group of summaries into one; gets the merge level
+
+    Returns:
+        Summaries in document order whose token counts add up to at most budget
+    """
+    level = 0
+    while True:
+        token_counts = await count_tokens(summaries)
+        if sum(token_counts) <= budget:
+            return summaries
+
+        if any(tokens > budget for tokens in token_counts):
+            summaries = await truncate(summaries, budget)
+            continue
+
+        groups = group_by_token_budget(token_counts, budget)
+        if len(groups) == len(summaries):
+            summaries = await truncate(summaries, budget // len(summaries))
+            continue
+
+        level += 1
+        logger.info(
+            f"🔄 Merging {len(summaries)} summaries into {len(groups)} (level {level})"
+        )
+
+        async def merge_group(
+            group: list[int], summaries: list[str] = summaries, level: int = level
+        ) -> str:
+            if len(group) == 1:
+                return summaries[group[0]]
+            return await merge([summaries[index] for index in group], level)
+
+        summaries = list(
+            await asyncio.gather(*(merge_group(group) for group in groups))
+        )
+
 
 class DoclingService:
     """Docling service for enhanced document processing with SSL fixes."""
@@ -257,10 +371,20 @@ class DoclingService:
         # Import chunker from config
         # Create LLM-optimized chunks (8K tokens max for safety)
         from chonkie import OverlapRefinery, RecursiveChunker
-        from langchain_core.prompts import PromptTemplate
+
+        from app.config import config
+        from app.services.compute_executor import run_ingestion_compute
+        from app.utils.document_converters import get_model_context_window
+
+        model_name = getattr(llm, "model", "gpt-3.5-turbo")
+        # Tokens left for section summaries in a combine prompt after the
+        # instructions and the output
+        summary_budget = max(
+            get_model_context_window(model_name) - COMBINE_RESERVED_TOKENS, 1000
+        )
 
         llm_chunker = RecursiveChunker(
-            chunk_size=8000  # Conservative for most LLMs
+            chunk_size=min(8000, summary_budget)  # Conservative for most LLMs
         )
 
         # Apply overlap refinery for context preservation (10% overlap = 800 tokens)
@@ -269,9 +393,9 @@ class DoclingService:
             method="suffix",  # Add next chunk context to current chunk
         )
 
-        # First chunk the content, then apply overlap refinery
-        initial_chunks = llm_chunker.chunk(content)
-        chunks = overlap_refinery.refine(initial_chunks)
+        # First chunk the content, then apply overlap refinery (CPU-bound)
+        initial_chunks = await run_ingestion_compute(llm_chunker.chunk, content)
+        chunks = await run_ingestion_compute(overlap_refinery.refine, initial_chunks)
         total_chunks = len(chunks)
 
         logger.info(f"📄 Split into {total_chunks} chunks for LLM processing")
@@ -296,36 +420,71 @@ Chunk {chunk_number}/{total_chunks}:
 </INSTRUCTIONS>""",
         )
 
-        # Process each chunk individually
-        chunk_summaries = []
-        for i, chunk in enumerate(chunks, 1):
-            try:
-                logger.info(
-                    f"🔄 Processing chunk {i}/{total_chunks} ({len(chunk.text)} chars)"
-                )
+        # Summarise chunks concurrently; the LLM governor still applies the
+        # provider's rate limits
+        slots = asyncio.Semaphore(max(config.LARGE_DOCUMENT_SUMMARY_CONCURRENCY, 1))
+        chunk_chain = chunk_template | llm
 
-                chunk_chain = chunk_template | llm
-                chunk_result = await chunk_chain.ainvoke(
-                    {
-                        "chunk": chunk.text,
-                        "chunk_number": i,
-                        "total_chunks": total_chunks,
-                    }
-                )
+        async def summarize_chunk(i: int, chunk) -> str:
+            async with slots:
+                try:
+                    logger.info(
+                        f"🔄 Processing chunk {i}/{total_chunks} ({len(chunk.text)} chars)"
+                    )
+
+                    chunk_result = await chunk_chain.ainvoke(
+                        {
+                            "chunk": chunk.text,
+                            "chunk_number": i,
+                            "total_chunks": total_chunks,
+                        }
+                    )
 
-                chunk_summary = chunk_result.content
-                chunk_summaries.append(f"=== Section {i} ===\n{chunk_summary}")
+                    logger.info(f"✅ Completed chunk {i}/{total_chunks}")
+                    return f"=== Section {i} ===\n{chunk_result.content}"
 
-                logger.info(f"✅ Completed chunk {i}/{total_chunks}")
+                except Exception as e:
+                    logger.error(f"❌ Failed to process chunk {i}/{total_chunks}: {e}")
+                    return f"=== Section {i} ===\n[Processing failed]"
 
-            except Exception as e:
-                logger.error(f"❌ Failed to process chunk {i}/{total_chunks}: {e}")
-                chunk_summaries.append(f"=== Section {i} ===\n[Processing failed]")
+        chunk_summaries = await asyncio.gather(
+            *(summarize_chunk(i, chunk) for i, chunk in enumerate(chunks, 1))
+        )
 
         # Combine summaries into final document summary
         logger.info(f"🔄 Combining {len(chunk_summaries)} chunk summaries")
 
         try:
+            # Merge groups of neighbouring summaries until they all fit in one
+            # combine prompt
+            from app.utils.document_converters import truncate_to_token_limit
+
+            def truncate_all(texts: list[str], max_tokens: int) -> list[str]:
+                return [
+                    truncate_to_token_limit(text, max_tokens, model_name)
+                    for text in texts
+                ]
+
+            async def count_tokens(texts: list[str]) -> list[int]:
+                return await run_ingestion_compute(count_text_tokens, texts, model_name)
+
+            async def truncate(texts: list[str], max_tokens: int) -> list[str]:
+                return await run_ingestion_compute(truncate_all, texts, max_tokens)
+
+            async def merge(group: list[str], level: int) -> str:
+                async with slots:
+                    result = await (MERGE_TEMPLATE | llm).ainvoke(
+                        {
+                            "summaries": "\n\n".join(group),
+                            "document_title": document_title,
+                        }
+                    )
+                    return f"=== Merged part (level {level}) ===\n{result.content}"
+
+            summaries = await reduce_to_token_budget(
+                list(chunk_summaries), summary_budget, count_tokens, truncate, merge
+            )
+
             combine_template = PromptTemplate(
                 input_variables=["summaries", "document_title"],
                 template="""<INSTRUCTIONS>
@@ -344,7 +503,7 @@ Ensure:
 </INSTRUCTIONS>""",
             )
 
-            combined_summaries = "\n\n".join(chunk_summaries)
+            combined_summaries = "\n\n".join(summaries)
             combine_chain = combine_template | llm
 
             final_result = await combine_chain.ainvoke(
@@ -0,0 +1,342 @@
+"""
+Shared embedding server and its client.
+
+One process owns the embedding model and coalesces concurrent embed requests from
+API workers and indexers into micro-batches. Workers set EMBEDDING_SERVER_URL and
+talk to it through EmbeddingServerClient instead of loading their own model copy.
+
+Run the server with:
+    python -m app.services.embedding_server
+
+This module must not import app.config: the client is created while app.config is
+being imported, and the server loads the model itself.
+
+Wire format: every frame is a 4-byte big-endian length followed by the payload.
+Requests are one JSON frame ({"op": "embed", "texts": [...]} or {"op": "info"}).
+Responses are one JSON frame; a successful embed is followed by a second frame
+holding the float32 embeddings row by row.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_LENGTH = struct.Struct("!I")
+
+
+def parse_server_url(url: str) -> tuple[str, str | tuple[str, int]]:
+    """
+    Parse an embedding server URL.
+
+    Args:
+        url: unix:///path/to/socket or tcp://host:port
+
+    Returns:
+        Tuple of (family, address) where family is "unix" or "tcp"
+    """
+    parsed = urlparse(url)
+    if parsed.scheme == "unix":
+        return "unix", parsed.path
+    if parsed.scheme == "tcp" and parsed.hostname and parsed.port:
+        return "tcp", (parsed.hostname, parsed.port)
+    raise ValueError(
+        f"Invalid EMBEDDING_SERVER_URL {url!r}: "
+        "expected unix:///path/to/socket or tcp://host:port"
+    )
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray()
+    while len(buffer) < size:
+        data = sock.recv(size - len(buffer))
+        if not data:
+            raise ConnectionError("Embedding server closed the connection")
+        buffer.extend(data)
+    return bytes(buffer)
+
+
+def _recv_frame(sock: socket.socket) -> bytes:
+    (size,) = _LENGTH.unpack(_recv_exactly(sock, _LENGTH.size))
+    return _recv_exactly(sock, size)
+
+
+def _send_frame(sock: socket.socket, payload: bytes) -> None:
+    sock.sendall(_LENGTH.pack(len(payload)) + payload)
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> bytes:
+    (size,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+    return await reader.readexactly(size)
+
+
+def _write_frame(writer: asyncio.StreamWriter, payload: bytes) -> None:
+    writer.write(_LENGTH.pack(len(payload)) + payload)
+
+
+class EmbeddingServerClient:
+    """
+    Embeddings client with the same interface as chonkie's embeddings.
+
+    Thread-safe: each thread keeps its own connection, so calls from the compute
+    executors run concurrently and are batched together by the server.
+    """
+
+    def __init__(self, url: str, connect_timeout: float = 30.0):
+        """
+        Connect to the embedding server and fetch the model's properties.
+
+        Args:
+            url: Embedding server URL (see parse_server_url)
+            connect_timeout: Seconds to keep retrying while the server starts up
+        """
+        self.url = url
+        self._family, self._address = parse_server_url(url)
+        self._local = threading.local()
+
+        deadline = time.monotonic() + connect_timeout
+        while True:
+            try:
+                info = self._request({"op": "info"})
+                break
+            except OSError as e:
+                if time.monotonic() >= deadline:
+                    raise ConnectionError(
+                        f"Could not reach the embedding server at {url}: {e}"
+                    ) from e
+                time.sleep(0.5)
+
+        self.model_name = info["model"]
+        self.dimension = info["dimension"]
+        self.max_seq_length = info["max_seq_length"]
+
+    def _connect(self) -> socket.socket:
+        if self._family == "unix":
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.connect(self._address)
+        return sock
+
+    def _request(self, request: dict) -> dict | np.ndarray:
+        # Retry once on a fresh connection in case the server restarted
+        for attempt in range(2):
+            sock = getattr(self._local, "sock", None)
+            try:
+                if sock is None:
+                    sock = self._local.sock = self._connect()
+                _send_frame(sock, json.dumps(request).encode())
+                response = json.loads(_recv_frame(sock))
+                if not response["ok"]:
+                    raise RuntimeError(f"Embedding server error: {response['error']}")
+                if request["op"] != "embed":
+                    return response
+                return np.frombuffer(_recv_frame(sock), dtype=np.float32).reshape(
+                    response["shape"]
+                )
+            except OSError:
+                if sock is not None:
+                    sock.close()
+                self._local.sock = None
+                if attempt == 1:
+                    raise
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embed a single text."""
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: list[str]) -> list[np.ndarray]:
+        """Embed texts; the server may batch them with other callers' texts."""
+        if not texts:
+            return []
+        return list(self._request({"op": "embed", "texts": list(texts)}))
+
+
+class _PendingRequest:
+    def __init__(self, texts: list[str], future: asyncio.Future):
+        self.texts = texts
+        self.future = future
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent embed requests into batches for the model.
+
+    A batch is sent to the model once it holds max_batch_size texts or max_wait_ms
+    has passed since its first request arrived. Requests that arrive while a batch
+    is encoding are collected into the next one.
+    """
+
+    def __init__(self, model, max_batch_size: int, max_wait_ms: float):
+        self.model = model
+        self.max_batch_size = max(max_batch_size, 1)
+        self.max_wait = max(max_wait_ms, 0) / 1000
+        self._queue: asyncio.Queue[_PendingRequest] = asyncio.Queue()
+        # The model is used from a single thread, one batch at a time
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="embedding-server"
+        )
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_PendingRequest(texts, future))
+        return await future
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        embeddings = []
+        for start in range(0, len(texts), self.max_batch_size):
+            embeddings.extend(
+                self.model.embed_batch(texts[start : start + self.max_batch_size])
+            )
+        return np.asarray(embeddings, dtype=np.float32)
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            size = len(batch[0].texts)
+            deadline = loop.time() + self.max_wait
+
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    pending = await asyncio.wait_for(self._queue.get(), timeout)
+                except TimeoutError:
+                    break
+                batch.append(pending)
+                size += len(pending.texts)
+
+            texts = [text for pending in batch for text in pending.texts]
+            try:
+                embeddings = await loop.run_in_executor(
+                    self._executor, self._encode, texts
+                )
+            except Exception as e:
+                logger.error(f"Embedding batch of {len(texts)} texts failed: {e!s}")
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(e)
+                continue
+
+            offset = 0
+            for pending in batch:
+                count = len(pending.texts)
+                if not pending.future.done():
+                    pending.future.set_result(embeddings[offset : offset + count])
+                offset += count
+
+            logger.debug(f"Embedded {len(texts)} texts from {len(batch)} requests")
+
+
+class EmbeddingServer:
+    """Serve a MicroBatcher over a Unix socket or TCP."""
+
+    def __init__(self, model, model_name: str, batcher: MicroBatcher):
+        self.model = model
+        self.model_name = model_name
+        self.batcher = batcher
+
+    def _info(self) -> dict:
+        return {
+            "ok": True,
+            "model": self.model_name,
+            "dimension": getattr(self.model, "dimension", None),
+            "max_seq_length": getattr(self.model, "max_seq_length", 512),
+        }
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                try:
+                    request = json.loads(await _read_frame(reader))
+                except asyncio.IncompleteReadError:
+                    break
+
+                try:
+                    if request.get("op") == "info":
+                        _write_frame(writer, json.dumps(self._info()).encode())
+                    elif request.get("op") == "embed":
+                        embeddings = await self.batcher.embed(request["texts"])
+                        _write_frame(
+                            writer,
+                            json.dumps(
+                                {"ok": True, "shape": list(embeddings.shape)}
+                            ).encode(),
+                        )
+                        _write_frame(writer, embeddings.tobytes())
+                    else:
+                        raise ValueError(f"Unknown op {request.get('op')!r}")
+                except Exception as e:
+                    _write_frame(
+                        writer, json.dumps({"ok": False, "error": str(e)}).encode()
+                    )
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, url: str) -> None:
+        family, address = parse_server_url(url)
+        if family == "unix":
+            if os.path.exists(address):
+                os.unlink(address)
+            server = await asyncio.start_unix_server(self.handle_connection, address)
+        else:
+            host, port = address
+            server = await asyncio.start_server(self.handle_connection, host, port)
+
+        batcher_task = asyncio.create_task(self.batcher.run())
+        logger.info(f"Embedding server for {self.model_name} listening on {url}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher_task.cancel()
+
+
+def main() -> None:
+    from pathlib import Path
+
+    from chonkie import AutoEmbeddings
+    from dotenv import load_dotenv
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    # Same .env as app.config
+    load_dotenv(Path(__file__).resolve().parent.parent.parent / ".env")
+
+    url = os.getenv("EMBEDDING_SERVER_URL")
+    if not url:
+        raise SystemExit("Set EMBEDDING_SERVER_URL to run the embedding server")
+
+    model_name = os.getenv("EMBEDDING_MODEL")
+    model = AutoEmbeddings.get_embeddings(model_name)
+    batcher = MicroBatcher(
+        model,
+        max_batch_size=int(os.getenv("EMBEDDING_SERVER_MAX_BATCH_SIZE", "64")),
+        max_wait_ms=float(os.getenv("EMBEDDING_SERVER_MAX_WAIT_MS", "5")),
+    )
+    asyncio.run(EmbeddingServer(model, model_name, batcher).serve(url))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,442 @@
+"""
+Postgres-backed background job queue.
+
+API routes enqueue jobs in the request's transaction instead of running them in the
+API process. Job workers (python job_worker.py) claim them with
+SELECT ... FOR UPDATE SKIP LOCKED, so any number of workers can poll the same table
+without handing one job to two of them. Each job type runs with its own concurrency
+limit, failed jobs are retried with exponential backoff, and a job whose worker stops
+heartbeating is handed to another worker. Every job has a Log entry that mirrors its
+status, so queued, running, retried and failed jobs show up in the logs UI.
+
+Handlers are async functions registered with @job_handler and called with the job's
+payload as keyword arguments.
+"""
+
+import asyncio
+import contextlib
+import importlib
+import logging
+import os
+import socket
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import config
+from app.db import Job, JobStatus, Log, LogLevel, LogStatus, async_session_maker
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[..., Awaitable[None]]
+
+# Job type -> handler, filled in by @job_handler when the modules below are imported
+JOB_HANDLERS: dict[str, JobHandler] = {}
+
+# Modules defining job handlers, imported by workers before they start
+JOB_HANDLER_MODULES = (
+    "app.routes.documents_routes",
+    "app.routes.search_source_connectors_routes",
+)
+
+# Log.source of the entries mirroring job status
+JOB_LOG_SOURCE = "job_queue"
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying the job cannot succeed."""
+
+
+def job_handler(job_type: str) -> Callable[[JobHandler], JobHandler]:
+    """
+    Register a function as the handler for a job type.
+
+    Args:
+        job_type: Name jobs of this type are enqueued under
+
+    Returns:
+        Decorator returning the function unchanged
+    """
+
+    def register(func: JobHandler) -> JobHandler:
+        JOB_HANDLERS[job_type] = func
+        return func
+
+    return register
+
+
+def load_job_handlers() -> dict[str, JobHandler]:
+    """Import every module that registers job handlers and return the handlers."""
+    for module in JOB_HANDLER_MODULES:
+        importlib.import_module(module)
+    return JOB_HANDLERS
+
+
+async def _update_job_log(
+    session: AsyncSession,
+    job: Job,
+    status: LogStatus,
+    level: LogLevel,
+    message: str,
+    **metadata,
+) -> None:
+    if job.log_id is None:
+        return
+    log_entry = await session.get(Log, job.log_id)
+    if log_entry is None:
+        return
+
+    log_entry.status = status
+    log_entry.level = level
+    log_entry.message = message
+    # Assign a new dict so the JSON column is marked as changed
+    log_entry.log_metadata = {
+        **(log_entry.log_metadata or {}),
+        "job_id": job.id,
+        "job_status": job.status.value,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        **metadata,
+    }
+
+
+async def enqueue_job(
+    session: AsyncSession,
+    job_type: str,
+    search_space_id: int,
+    payload: dict,
+    *,
+    priority: int = 0,
+    max_attempts: int | None = None,
+    description: str | None = None,
+) -> Job:
+    """
+    Add a job to the queue.
+
+    The job is only flushed; it becomes visible to workers when the caller commits.
+
+    Args:
+        session: Database session
+        job_type: Registered job type
+        search_space_id: ID of the search space the job belongs to
+        payload: JSON-serializable keyword arguments for the handler
+        priority: Jobs with higher priority are claimed first
+        max_attempts: Attempts before the job fails (defaults to JOB_MAX_ATTEMPTS)
+        description: Human-readable description for the job's log entry
+
+    Returns:
+        The new job
+    """
+    description = description or job_type
+    log_entry = Log(
+        level=LogLevel.INFO,
+        status=LogStatus.IN_PROGRESS,
+        message=f"Queued {description}",
+        source=JOB_LOG_SOURCE,
+        log_metadata={
+            "task_name": job_type,
+            "job_status": JobStatus.PENDING.value,
+            "queued_at": datetime.now(UTC).isoformat(),
+        },
+        search_space_id=search_space_id,
+    )
+    session.add(log_entry)
+    await session.flush()
+
+    job = Job(
+        job_type=job_type,
+        payload=payload,
+        status=JobStatus.PENDING,
+        priority=priority,
+        attempts=0,
+        max_attempts=max_attempts or config.JOB_MAX_ATTEMPTS,
+        search_space_id=search_space_id,
+        log_id=log_entry.id,
+    )
+    session.add(job)
+    await session.flush()
+    log_entry.log_metadata = {**log_entry.log_metadata, "job_id": job.id}
+
+    logger.info(f"Queued {job_type} job {job.id}: {description}")
+    return job
+
+
+async def claim_job(
+    session: AsyncSession, job_types: list[str], worker_id: str
+) -> Job | None:
+    """
+    Claim the next due job of the given types and mark it running.
+
+    Rows locked by other workers' claims are skipped rather than waited for.
+
+    Args:
+        session: Database session (committed by this function)
+        job_types: Job types this worker slot runs
+        worker_id: Identifier of the claiming worker
+
+    Returns:
+        The claimed job, or None when no job is due
+    """
+    next_job_id = (
+        select(Job.id)
+        .where(
+            Job.status == JobStatus.PENDING,
+            Job.job_type.in_(job_types),
+            Job.run_after <= func.now(),
+        )
+        .order_by(Job.priority.desc(), Job.run_after, Job.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    result = await session.execute(
+        update(Job)
+        .where(Job.id == next_job_id)
+        .values(
+            status=JobStatus.RUNNING,
+            attempts=Job.attempts + 1,
+            locked_by=worker_id,
+            locked_at=func.now(),
+        )
+        .returning(Job)
+        .execution_options(synchronize_session=False)
+    )
+    job = result.scalars().first()
+    if job is None:
+        await session.rollback()
+        return None
+
+    await _update_job_log(
+        session,
+        job,
+        LogStatus.IN_PROGRESS,
+        LogLevel.INFO,
+        f"Running {job.job_type} job (attempt {job.attempts} of {job.max_attempts})",
+        worker=worker_id,
+        started_at=datetime.now(UTC).isoformat(),
+    )
+    await session.commit()
+    return job
+
+
+async def complete_job(session: AsyncSession, job: Job) -> None:
+    """Mark a running job as succeeded."""
+    job.status = JobStatus.SUCCEEDED
+    job.locked_by = None
+    job.locked_at = None
+    await _update_job_log(
+        session,
+        job,
+        LogStatus.SUCCESS,
+        LogLevel.INFO,
+        f"Completed {job.job_type} job",
+        completed_at=datetime.now(UTC).isoformat(),
+    )
+
+
+async def fail_job(
+    session: AsyncSession, job: Job, error: str, retryable: bool = True
+) -> None:
+    """
+    Record a failed attempt and schedule a retry or fail the job.
+
+    Retries wait JOB_RETRY_BASE_DELAY_SECONDS, doubling per attempt up to
+    JOB_RETRY_MAX_DELAY_SECONDS.
+
+    Args:
+        session: Database session
+        job: The job whose attempt failed
+        error: Error message of the attempt
+        retryable: Whether another attempt could succeed
+    """
+    job.locked_by = None
+    job.locked_at = None
+    job.last_error = error
+
+    if retryable and job.attempts < job.max_attempts:
+        delay = min(
+            config.JOB_RETRY_BASE_DELAY_SECONDS * 2 ** (job.attempts - 1),
+            config.JOB_RETRY_MAX_DELAY_SECONDS,
+        )
+        job.status = JobStatus.PENDING
+        job.run_after = datetime.now(UTC) + timedelta(seconds=delay)
+        await _update_job_log(
+            session,
+            job,
+            LogStatus.IN_PROGRESS,
+            LogLevel.WARNING,
+            f"Retrying {job.job_type} job in {delay:.0f}s after attempt "
+            f"{job.attempts} failed: {error}",
+            last_error=error,
+            next_attempt_at=job.run_after.isoformat(),
+        )
+        logger.warning(
+            f"{job.job_type} job {job.id} failed (attempt {job.attempts}), "
+            f"retrying in {delay:.0f}s: {error}"
+        )
+        return
+
+    job.status = JobStatus.FAILED
+    await _update_job_log(
+        session,
+        job,
+        LogStatus.FAILED,
+        LogLevel.ERROR,
+        f"Failed {job.job_type} job after {job.attempts} attempts: {error}",
+        last_error=error,
+        failed_at=datetime.now(UTC).isoformat(),
+    )
+    logger.error(f"{job.job_type} job {job.id} failed permanently: {error}")
+
+
+async def requeue_stale_jobs(session: AsyncSession) -> int:
+    """
+    Retry or fail running jobs whose worker stopped heartbeating.
+
+    Args:
+        session: Database session (committed by this function)
+
+    Returns:
+        Number of stale jobs found
+    """
+    cutoff = datetime.now(UTC) - timedelta(seconds=config.JOB_LOCK_TIMEOUT_SECONDS)
+    result = await session.execute(
+        select(Job)
+        .where(Job.status == JobStatus.RUNNING, Job.locked_at < cutoff)
+        .with_for_update(skip_locked=True)
+    )
+    stale_jobs = result.scalars().all()
+    for job in stale_jobs:
+        await fail_job(
+            session, job, f"Worker {job.locked_by} stopped responding", retryable=True
+        )
+    await session.commit()
+    return len(stale_jobs)
+
+
+class JobWorker:
+    """
+    Run queued jobs with a fixed number of concurrent slots per job type.
+
+    Each slot claims and runs one job at a time, so a slow job type (e.g. connector
+    syncs) never starves another (e.g. file uploads).
+    """
+
+    def __init__(
+        self,
+        job_types: list[str] | None = None,
+        concurrency: dict[str, int] | None = None,
+        worker_id: str | None = None,
+    ):
+        """
+        Initialize the worker.
+
+        Args:
+            job_types: Job types to run (defaults to every registered type)
+            concurrency: Jobs run at once per type (defaults to JOB_WORKER_CONCURRENCY,
+                falling back to JOB_WORKER_DEFAULT_CONCURRENCY)
+            worker_id: Identifier stored on claimed jobs (defaults to host:pid)
+        """
+        concurrency = (
+            config.JOB_WORKER_CONCURRENCY if concurrency is None else concurrency
+        )
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.concurrency = {
+            job_type: concurrency.get(job_type, config.JOB_WORKER_DEFAULT_CONCURRENCY)
+            for job_type in (job_types or JOB_HANDLERS)
+        }
+        unknown = set(self.concurrency) - set(JOB_HANDLERS)
+        if unknown:
+            raise ValueError(f"No handler registered for job types: {sorted(unknown)}")
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        """Stop claiming jobs; running jobs are finished first."""
+        self._stopping.set()
+
+    async def _sleep(self, seconds: float) -> None:
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(self._stopping.wait(), seconds)
+
+    async def run(self) -> None:
+        """Run until stop() is called and every running job has finished."""
+        logger.info(f"Job worker {self.worker_id} starting: {self.concurrency}")
+        slots = [
+            self._run_slot(job_type)
+            for job_type, count in self.concurrency.items()
+            for _ in range(count)
+        ]
+        await asyncio.gather(self._requeue_stale_loop(), *slots)
+        logger.info(f"Job worker {self.worker_id} stopped")
+
+    async def _requeue_stale_loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                async with async_session_maker() as session:
+                    stale = await requeue_stale_jobs(session)
+                if stale:
+                    logger.warning(f"Recovered {stale} jobs from unresponsive workers")
+            except Exception as e:
+                logger.error(f"Failed to recover stale jobs: {e!s}")
+            await self._sleep(config.JOB_LOCK_TIMEOUT_SECONDS / 2)
+
+    async def _run_slot(self, job_type: str) -> None:
+        while not self._stopping.is_set():
+            try:
+                async with async_session_maker() as session:
+                    job = await claim_job(session, [job_type], self.worker_id)
+            except Exception as e:
+                logger.error(f"Failed to claim {job_type} job: {e!s}")
+                job = None
+
+            if job is None:
+                await self._sleep(config.JOB_POLL_INTERVAL_SECONDS)
+                continue
+
+            await self.run_job(job)
+
+    async def _heartbeat(self, job_id: int) -> None:
+        while True:
+            await asyncio.sleep(config.JOB_LOCK_TIMEOUT_SECONDS / 3)
+            try:
+                async with async_session_maker() as session:
+                    await session.execute(
+                        update(Job)
+                        .where(Job.id == job_id, Job.locked_by == self.worker_id)
+                        .values(locked_at=func.now())
+                    )
+                    await session.commit()
+            except Exception as e:
+                logger.error(f"Failed to heartbeat job {job_id}: {e!s}")
+
+    async def run_job(self, job: Job) -> None:
+        """Run a claimed job and record its outcome."""
+        logger.info(f"Running {job.job_type} job {job.id} (attempt {job.attempts})")
+        heartbeat = asyncio.create_task(self._heartbeat(job.id))
+        error = None
+        retryable = True
+        try:
+            await JOB_HANDLERS[job.job_type](**job.payload)
+        except PermanentJobError as e:
+            error = str(e)
+            retryable = False
+        except Exception as e:
+            logger.error(f"{job.job_type} job {job.id} raised: {e!s}", exc_info=True)
+            error = f"{type(e).__name__}: {e!s}"
+        finally:
+            heartbeat.cancel()
+
+        async with async_session_maker() as session:
+            current = await session.get(Job, job.id, with_for_update=True)
+            if current is None or current.locked_by != self.worker_id:
+                # Deleted with its search space, or recovered by another worker
+                logger.warning(f"Job {job.id} is no longer held by this worker")
+                return
+
+            if error is None:
+                await complete_job(session, current)
+            else:
+                await fail_job(session, current, error, retryable)
+            await session.commit()
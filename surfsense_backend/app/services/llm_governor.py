@@ -0,0 +1,439 @@
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+
+import litellm
+from langchain_community.chat_models import ChatLiteLLM
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+
+from app.config import config
+
+logger = logging.getLogger(__name__)
+
+# Errors worth another attempt; RateLimitError also pauses the LLM config
+RETRYABLE_ERRORS = (
+    litellm.RateLimitError,
+    litellm.Timeout,
+    litellm.APIConnectionError,
+    litellm.ServiceUnavailableError,
+    litellm.InternalServerError,
+)
+
+
+class LLMPriority:
+    INTERACTIVE = "interactive"
+    BACKGROUND = "background"
+
+
+def estimate_tokens(messages: list[BaseMessage]) -> int:
+    """Rough prompt size (4 characters per token) used to reserve token budget."""
+    return sum(len(str(message.content)) // 4 + 4 for message in messages)
+
+
+def _total_tokens(usage) -> int | None:
+    # litellm reports usage as a dict or a Usage object depending on the version
+    if not usage:
+        return None
+    if isinstance(usage, dict):
+        return usage.get("total_tokens")
+    return getattr(usage, "total_tokens", None)
+
+
+def _retry_after_seconds(error: Exception) -> float | None:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or getattr(
+        error, "litellm_response_headers", None
+    )
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Budget of a per-minute quantity that refills continuously."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_seconds(self, amount: float, reserve: float) -> float:
+        """
+        Seconds until amount can be taken without dipping into the reserve.
+
+        Args:
+            amount: Quantity to take; amounts above the capacity wait for a full bucket
+            reserve: Fraction of the capacity that must stay in the bucket
+
+        Returns:
+            0 when the amount is available now
+        """
+        self._refill()
+        floor = self.capacity * reserve
+        shortfall = floor + min(amount, self.capacity - floor) - self.level
+        return shortfall / self.rate if shortfall > 0 else 0.0
+
+    def take(self, amount: float) -> None:
+        # The level may go negative (a large or underestimated call), which delays
+        # later callers until the debt is refilled
+        self._refill()
+        self.level -= amount
+
+
+class RateLimiter:
+    """Requests, tokens and concurrent calls allowed for one provider or LLM config."""
+
+    def __init__(self, key: str, window: int = 1024):
+        self.key = key
+        self.requests: TokenBucket | None = None
+        self.tokens: TokenBucket | None = None
+        self.max_concurrency = 0
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self.waiting = {LLMPriority.INTERACTIVE: 0, LLMPriority.BACKGROUND: 0}
+        self._requests_per_minute = 0
+        self._tokens_per_minute = 0
+        self._completed = 0
+        self._failed = 0
+        self._rate_limited = 0
+        self._tokens_used = 0
+        self._wait_ms = {
+            LLMPriority.INTERACTIVE: deque(maxlen=window),
+            LLMPriority.BACKGROUND: deque(maxlen=window),
+        }
+
+    def configure(
+        self, requests_per_minute: int, tokens_per_minute: int, max_concurrency: int
+    ) -> None:
+        """Apply limits; 0 disables a limit. Unchanged limits keep their budget."""
+        if requests_per_minute != self._requests_per_minute:
+            self._requests_per_minute = requests_per_minute
+            self.requests = (
+                TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+            )
+        if tokens_per_minute != self._tokens_per_minute:
+            self._tokens_per_minute = tokens_per_minute
+            self.tokens = (
+                TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+            )
+        self.max_concurrency = max(max_concurrency, 0)
+
+    def wait_seconds(self, tokens: int, priority: str) -> float | None:
+        """
+        Seconds until a call fits in this limiter.
+
+        Returns:
+            0 when the call may start now, None when it must wait for another call
+            to finish (a concurrency slot, or an interactive caller ahead of it)
+        """
+        reserve = 0.0
+        concurrency = self.max_concurrency
+        if priority == LLMPriority.BACKGROUND:
+            if self.waiting[LLMPriority.INTERACTIVE]:
+                return None
+            reserve = config.LLM_INTERACTIVE_RESERVE
+            if concurrency:
+                concurrency = max(int(concurrency * (1 - reserve)), 1)
+
+        if concurrency and self.in_flight >= concurrency:
+            return None
+
+        wait = max(self.cooldown_until - time.monotonic(), 0.0)
+        if self.requests:
+            wait = max(wait, self.requests.wait_seconds(1, reserve))
+        if self.tokens:
+            wait = max(wait, self.tokens.wait_seconds(tokens, reserve))
+        return wait
+
+    def start(self, tokens: int, priority: str, waited_ms: float) -> None:
+        self.in_flight += 1
+        if self.requests:
+            self.requests.take(1)
+        if self.tokens:
+            self.tokens.take(tokens)
+        self._wait_ms[priority].append(waited_ms)
+
+    def finish(self, reserved_tokens: int, used_tokens: int | None, failed: bool):
+        self.in_flight -= 1
+        if failed:
+            self._failed += 1
+        else:
+            self._completed += 1
+        if used_tokens is not None:
+            self._tokens_used += used_tokens
+            if self.tokens:
+                # Settle the reservation against the tokens actually used
+                self.tokens.take(used_tokens - reserved_tokens)
+
+    def rate_limited(self, pause_seconds: float) -> None:
+        self._rate_limited += 1
+        self.cooldown_until = max(self.cooldown_until, time.monotonic() + pause_seconds)
+
+    @staticmethod
+    def _percentile(values: list[float], percentile: float) -> float:
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        index = min(int(len(ordered) * percentile / 100), len(ordered) - 1)
+        return round(ordered[index], 2)
+
+    def stats(self) -> dict:
+        """Get limits, live usage, counters and recent wait percentiles."""
+        stats = {
+            "requests_per_minute": self._requests_per_minute,
+            "tokens_per_minute": self._tokens_per_minute,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rate_limited": self._rate_limited,
+            "tokens_used": self._tokens_used,
+            "cooldown_seconds": round(
+                max(self.cooldown_until - time.monotonic(), 0.0), 2
+            ),
+        }
+        for priority, wait_ms in self._wait_ms.items():
+            values = list(wait_ms)
+            stats[f"{priority}_waiting"] = self.waiting[priority]
+            stats[f"{priority}_wait_ms_p50"] = self._percentile(values, 50)
+            stats[f"{priority}_wait_ms_p99"] = self._percentile(values, 99)
+        return stats
+
+
+class LLMReservation:
+    """A started call holding budget in its limiters until it finishes."""
+
+    def __init__(
+        self,
+        governor: "LLMGovernor",
+        limiters: list[RateLimiter],
+        tokens: int,
+        priority: str,
+    ):
+        self.governor = governor
+        self.limiters = limiters
+        self.tokens = tokens
+        self.priority = priority
+        # Set by the caller from the provider's usage report when available
+        self.used_tokens: int | None = None
+
+    async def __aenter__(self) -> "LLMReservation":
+        await self.governor.acquire(self.limiters, self.tokens, self.priority)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        for limiter in self.limiters:
+            limiter.finish(self.tokens, self.used_tokens, failed=exc is not None)
+        await self.governor.notify()
+
+
+class LLMGovernor:
+    """
+    Process-wide admission control for user LLM calls.
+
+    Indexing summaries, document processing, research and chat all call the same
+    providers. Without a shared limit a large sync plus a few reports trips the
+    provider's rate limits and every caller fails at once. Each call waits here
+    until both its provider and its LLM config have a free concurrency slot and
+    enough request and token budget. Background calls leave a reserve of every
+    budget to interactive calls and never overtake a waiting interactive call, so
+    chat stays responsive during a backfill. A 429 pauses the LLM config for the
+    provider's Retry-After so the other callers stop hitting the limit too.
+    """
+
+    def __init__(self):
+        self._limiters: dict[str, RateLimiter] = {}
+        self._changed: asyncio.Condition | None = None
+
+    def _get_changed(self) -> asyncio.Condition:
+        # Created lazily so it binds to the running event loop
+        if self._changed is None:
+            self._changed = asyncio.Condition()
+        return self._changed
+
+    def limiter(
+        self,
+        key: str,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_concurrency: int,
+    ) -> RateLimiter:
+        """Get the limiter for a key, creating it or updating its limits."""
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            limiter = self._limiters[key] = RateLimiter(key)
+        limiter.configure(requests_per_minute, tokens_per_minute, max_concurrency)
+        return limiter
+
+    def reserve(
+        self, limiters: list[RateLimiter], tokens: int, priority: str
+    ) -> LLMReservation:
+        """Reserve budget for one call: `async with governor.reserve(...)`."""
+        return LLMReservation(self, limiters, tokens, priority)
+
+    async def acquire(
+        self, limiters: list[RateLimiter], tokens: int, priority: str
+    ) -> None:
+        """Wait until the call fits in every limiter, then take its budget."""
+        changed = self._get_changed()
+        started_at = time.perf_counter()
+        for limiter in limiters:
+            limiter.waiting[priority] += 1
+        try:
+            async with changed:
+                while True:
+                    waits = [
+                        limiter.wait_seconds(tokens, priority) for limiter in limiters
+                    ]
+                    if all(wait == 0 for wait in waits):
+                        waited_ms = (time.perf_counter() - started_at) * 1000
+                        for limiter in limiters:
+                            limiter.start(tokens, priority, waited_ms)
+                        break
+                    # Budgets refill with time; slots free up when a call finishes
+                    timed = [wait for wait in waits if wait]
+                    with contextlib.suppress(TimeoutError):
+                        await asyncio.wait_for(
+                            changed.wait(), min(timed) if timed else None
+                        )
+        finally:
+            for limiter in limiters:
+                limiter.waiting[priority] -= 1
+
+        # Background callers held back by this caller can re-check
+        await self.notify()
+
+    async def notify(self) -> None:
+        changed = self._get_changed()
+        async with changed:
+            changed.notify_all()
+
+    def stats(self) -> dict[str, dict]:
+        """Get stats for every provider and LLM config limiter."""
+        return {key: limiter.stats() for key, limiter in self._limiters.items()}
+
+
+llm_governor = LLMGovernor()
+
+
+def get_llm_governor_stats() -> dict[str, dict]:
+    """Get stats for every LLM rate limiter in this process."""
+    return llm_governor.stats()
+
+
+class GovernedChatLiteLLM(ChatLiteLLM):
+    """
+    ChatLiteLLM whose calls are admitted, retried and metered by llm_governor.
+
+    Only the async paths (ainvoke, astream and what builds on them) are governed.
+    The governor's waits are asyncio primitives, so the sync _generate and _stream
+    call the provider directly without rate limiting or governor retries; the app
+    only calls its LLMs asynchronously.
+    """
+
+    # Limiter keys and their (requests/min, tokens/min, max concurrency) limits;
+    # instances with the same key share one budget
+    provider_key: str
+    provider_limits: tuple[int, int, int] = (0, 0, 0)
+    config_key: str
+    config_limits: tuple[int, int, int] = (0, 0, 0)
+    llm_priority: str = LLMPriority.BACKGROUND
+
+    def _limiters(self) -> list[RateLimiter]:
+        return [
+            llm_governor.limiter(self.provider_key, *self.provider_limits),
+            llm_governor.limiter(self.config_key, *self.config_limits),
+        ]
+
+    def _reserved_tokens(self, messages: list[BaseMessage], kwargs: dict) -> int:
+        return estimate_tokens(messages) + (
+            kwargs.get("max_tokens") or self.max_tokens or 0
+        )
+
+    async def _before_retry(self, attempt: int, error: Exception) -> None:
+        delay = config.LLM_RETRY_BASE_DELAY_SECONDS * 2**attempt
+        logger.warning(
+            f"LLM call to {self.model} failed ({type(error).__name__}), "
+            f"retrying (attempt {attempt + 1} of {config.LLM_MAX_RETRIES})"
+        )
+        if isinstance(error, litellm.RateLimitError):
+            # The config's next acquire waits out the pause, and so does every
+            # other caller sharing it
+            llm_governor.limiter(self.config_key, *self.config_limits).rate_limited(
+                _retry_after_seconds(error) or delay
+            )
+        else:
+            await asyncio.sleep(delay)
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs,
+    ) -> ChatResult:
+        reserved_tokens = self._reserved_tokens(messages, kwargs)
+        attempt = 0
+        while True:
+            try:
+                async with llm_governor.reserve(
+                    self._limiters(), reserved_tokens, self.llm_priority
+                ) as reservation:
+                    result = await super()._agenerate(
+                        messages, stop=stop, run_manager=run_manager, **kwargs
+                    )
+                    reservation.used_tokens = _total_tokens(
+                        (result.llm_output or {}).get("token_usage")
+                    )
+                    return result
+            except RETRYABLE_ERRORS as e:
+                if attempt >= config.LLM_MAX_RETRIES:
+                    raise
+                await self._before_retry(attempt, e)
+                attempt += 1
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs,
+    ):
+        reserved_tokens = self._reserved_tokens(messages, kwargs)
+        attempt = 0
+        while True:
+            streamed = False
+            try:
+                async with llm_governor.reserve(
+                    self._limiters(), reserved_tokens, self.llm_priority
+                ) as reservation:
+                    output_chars = 0
+                    async for chunk in super()._astream(
+                        messages, stop=stop, run_manager=run_manager, **kwargs
+                    ):
+                        streamed = True
+                        output_chars += len(chunk.text)
+                        yield chunk
+                    reservation.used_tokens = (
+                        estimate_tokens(messages) + output_chars // 4
+                    )
+                    return
+            except RETRYABLE_ERRORS as e:
+                # A stream that already produced output cannot be replayed
+                if streamed or attempt >= config.LLM_MAX_RETRIES:
+                    raise
+                await self._before_retry(attempt, e)
+                attempt += 1
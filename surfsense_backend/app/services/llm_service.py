@@ -4,7 +4,9 @@ from langchain_community.chat_models import ChatLiteLLM
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from app.config import config
 from app.db import LLMConfig, User
+from app.services.llm_governor import GovernedChatLiteLLM, LLMPriority
 
 logger = logging.getLogger(__name__)
 
@@ -15,12 +17,24 @@ class LLMRole:
     STRATEGIC = "strategic"
 
 
+# Long context LLMs summarise documents in the background; the fast and strategic
+# LLMs answer chat and research requests
+ROLE_PRIORITIES = {
+    LLMRole.LONG_CONTEXT: LLMPriority.BACKGROUND,
+    LLMRole.FAST: LLMPriority.INTERACTIVE,
+    LLMRole.STRATEGIC: LLMPriority.INTERACTIVE,
+}
+
+
 async def get_user_llm_instance(
     session: AsyncSession, user_id: str, role: str
 ) -> ChatLiteLLM | None:
     """
     Get a ChatLiteLLM instance for a specific user and role.
 
+    Calls made through the instance are rate limited by the LLM governor at the
+    role's priority (see ROLE_PRIORITIES).
+
     Args:
         session: Database session
         user_id: User ID
@@ -88,21 +102,41 @@ async def get_user_llm_instance(
             )
             model_string = f"{provider_prefix}/{llm_config.model_name}"
 
-        # Create ChatLiteLLM instance
+        # Create ChatLiteLLM instance; the governor retries failed calls itself
         litellm_kwargs = {
             "model": model_string,
             "api_key": llm_config.api_key,
+            "max_retries": 1,
         }
 
         # Add optional parameters
         if llm_config.api_base:
             litellm_kwargs["api_base"] = llm_config.api_base
 
-        # Add any additional litellm parameters
-        if llm_config.litellm_params:
-            litellm_kwargs.update(llm_config.litellm_params)
-
-        return ChatLiteLLM(**litellm_kwargs)
+        # Add any additional litellm parameters, except the governor's own limits
+        litellm_params = dict(llm_config.litellm_params or {})
+        config_limits = (
+            int(litellm_params.pop("rpm", config.LLM_CONFIG_RPM)),
+            int(litellm_params.pop("tpm", config.LLM_CONFIG_TPM)),
+            int(
+                litellm_params.pop("max_concurrency", config.LLM_CONFIG_MAX_CONCURRENCY)
+            ),
+        )
+        litellm_kwargs.update(litellm_params)
+
+        provider = model_string.split("/", 1)[0]
+        return GovernedChatLiteLLM(
+            **litellm_kwargs,
+            provider_key=f"provider:{provider}",
+            provider_limits=(
+                config.LLM_PROVIDER_RPM.get(provider, 0),
+                config.LLM_PROVIDER_TPM.get(provider, 0),
+                config.LLM_PROVIDER_MAX_CONCURRENCY.get(provider, 0),
+            ),
+            config_key=f"llm_config:{llm_config.id}",
+            config_limits=config_limits,
+            llm_priority=ROLE_PRIORITIES[role],
+        )
 
     except Exception as e:
         logger.error(
@@ -1,12 +1,44 @@
-import json
+import zlib
+from collections import deque
+from collections.abc import AsyncIterator
 from typing import Any
 
+import orjson
+
+from app.config import config
+
+# Terminal messages kept in message_annotations; older ones were already streamed
+MAX_TERMINAL_MESSAGES = 200
+
+
+def encode_json(value: Any) -> str:
+    """Serialize a stream part payload with orjson (deques become lists)."""
+    return orjson.dumps(value, default=list).decode()
+
+
+async def gzip_stream(chunks: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    """
+    Gzip a text stream, flushing after every part so none is held back.
+
+    Args:
+        chunks: The stream parts
+
+    Yields:
+        bytes: Gzip data that decodes to the parts received so far
+    """
+    compressor = zlib.compressobj(config.CHAT_STREAM_COMPRESSION_LEVEL, wbits=31)
+    async for chunk in chunks:
+        yield compressor.compress(chunk.encode()) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
 
 class StreamingService:
     def __init__(self):
         self.terminal_idx = 1
+        # Sources already sent in full, by (source type, id)
+        self.sent_source_keys: set[tuple[str, str]] = set()
         self.message_annotations = [
-            {"type": "TERMINAL_INFO", "content": []},
+            {"type": "TERMINAL_INFO", "content": deque(maxlen=MAX_TERMINAL_MESSAGES)},
             {"type": "SOURCES", "content": []},
             {"type": "ANSWER", "content": []},
             {"type": "FURTHER_QUESTIONS", "content": []},
@@ -23,7 +55,7 @@ class StreamingService:
         Returns:
             str: The formatted annotations string
         """
-        return f"8:{json.dumps(self.message_annotations)}\n"
+        return f"8:{encode_json(self.message_annotations)}\n"
 
     def format_terminal_info_delta(self, text: str, message_type: str = "info") -> str:
         """
@@ -44,12 +76,16 @@ class StreamingService:
 
         # Return only the delta annotation
         annotation = {"type": "TERMINAL_INFO", "data": message}
-        return f"8:[{json.dumps(annotation)}]\n"
+        return f"8:[{encode_json(annotation)}]\n"
 
     def format_sources_delta(self, sources: list[dict[str, Any]]) -> str:
         """
         Format sources as a delta annotation
 
+        Each source is sent in full only once per stream; later updates list the
+        ids of already sent sources under "refs" (by source type) instead of
+        repeating their descriptions.
+
         Args:
             sources: List of source objects
 
@@ -61,23 +97,35 @@ class StreamingService:
 
         # Return only the delta annotation
         nodes = []
+        refs: dict[str, list[str]] = {}
 
         for group in sources:
+            source_type = group.get("type", "")
             for source in group.get("sources", []):
+                source_id = str(source.get("id", ""))
+                key = (source_type, source_id)
+                if key in self.sent_source_keys:
+                    refs.setdefault(source_type, []).append(source_id)
+                    continue
+                self.sent_source_keys.add(key)
+
                 node = {
-                    "id": str(source.get("id", "")),
+                    "id": source_id,
                     "text": source.get("description", ""),
                     "url": source.get("url", ""),
                     "metadata": {
                         "title": source.get("title", ""),
-                        "source_type": group.get("type", ""),
+                        "source_type": source_type,
                         "group_name": group.get("name", ""),
                     },
                 }
                 nodes.append(node)
 
-        annotation = {"type": "sources", "data": {"nodes": nodes}}
-        return f"8:[{json.dumps(annotation)}]\n"
+        data: dict[str, Any] = {"nodes": nodes}
+        if refs:
+            data["refs"] = refs
+        annotation = {"type": "sources", "data": data}
+        return f"8:[{encode_json(annotation)}]\n"
 
     def format_answer_delta(self, answer_chunk: str) -> str:
         """
@@ -97,7 +145,29 @@ class StreamingService:
 
         # Return only the delta annotation with the new chunk
         annotation = {"type": "ANSWER", "content": [answer_chunk]}
-        return f"8:[{json.dumps(annotation)}]\n"
+        return f"8:[{encode_json(annotation)}]\n"
+
+    def format_section_delta(self, section_id: int, title: str, delta: str) -> str:
+        """
+        Format text appended to one section of a multi-section answer
+
+        Only the new text is sent; clients append it to the section, so a report
+        streams in time and bytes linear in its length. Sections are not kept in
+        message_annotations.
+
+        Args:
+            section_id: Zero-based index of the section
+            title: The section title
+            delta: Text appended to the section since the previous delta
+
+        Returns:
+            str: The formatted annotation delta string
+        """
+        annotation = {
+            "type": "ANSWER_SECTION",
+            "data": {"section_id": section_id, "title": title, "delta": delta},
+        }
+        return f"8:[{encode_json(annotation)}]\n"
 
     def format_answer_annotation(self, answer_lines: list[str]) -> str:
         """
@@ -114,7 +184,7 @@ class StreamingService:
 
         # Return the full answer annotation
         annotation = {"type": "ANSWER", "content": answer_lines}
-        return f"8:[{json.dumps(annotation)}]\n"
+        return f"8:[{encode_json(annotation)}]\n"
 
     def format_further_questions_delta(
         self, further_questions: list[dict[str, Any]]
@@ -140,7 +210,7 @@ class StreamingService:
                 if question.get("question", "") != ""
             ],
         }
-        return f"8:[{json.dumps(annotation)}]\n"
+        return f"8:[{encode_json(annotation)}]\n"
 
     def format_text_chunk(self, text: str) -> str:
         """
@@ -152,7 +222,7 @@ class StreamingService:
         Returns:
             str: The formatted text part string
         """
-        return f"0:{json.dumps(text)}\n"
+        return f"0:{encode_json(text)}\n"
 
     def format_error(self, error_message: str) -> str:
         """
@@ -164,7 +234,7 @@ class StreamingService:
         Returns:
             str: The formatted error part string
         """
-        return f"3:{json.dumps(error_message)}\n"
+        return f"3:{encode_json(error_message)}\n"
 
     def format_completion(
         self, prompt_tokens: int = 156, completion_tokens: int = 204
@@ -188,4 +258,4 @@ class StreamingService:
                 "totalTokens": total_tokens,
             },
         }
-        return f"d:{json.dumps(completion_data)}\n"
+        return f"d:{encode_json(completion_data)}\n"
@@ -5,23 +5,22 @@ Airtable connector indexer.
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import config
 from app.connectors.airtable_connector import AirtableConnector
-from app.db import Document, DocumentType, SearchSourceConnectorType
+from app.db import DocumentType, SearchSourceConnectorType
 from app.schemas.airtable_auth_credentials import AirtableAuthCredentialsBase
+from app.services.job_queue import PermanentJobError
 from app.services.llm_service import get_user_long_context_llm
 from app.services.task_logging_service import TaskLoggingService
-from app.utils.document_converters import (
-    create_document_chunks,
-    generate_content_hash,
-    generate_document_summary,
-)
 
 from .base import (
+    ConnectorIndexingError,
+    ConnectorItem,
+    DocumentBatchWriter,
     calculate_date_range,
-    check_duplicate_document_by_hash,
     get_connector_by_id,
+    index_connector_items,
     logger,
+    single_indexing_unit,
     update_connector_last_indexed,
 )
 
@@ -51,6 +50,10 @@ async def index_airtable_records(
 
     Returns:
         Tuple of (number_of_documents_processed, error_message)
+
+    Raises:
+        PermanentJobError: If the connector is missing or misconfigured
+        ConnectorIndexingError: If the run failed and may succeed when retried
     """
     task_logger = TaskLoggingService(session, search_space_id)
     log_entry = await task_logger.log_task_start(
@@ -79,7 +82,7 @@ async def index_airtable_records(
                 "Connector not found",
                 {"error_type": "ConnectorNotFound"},
             )
-            return 0, f"Connector with ID {connector_id} not found"
+            raise PermanentJobError(f"Connector with ID {connector_id} not found")
 
         # Create credentials from connector config
         config_data = connector.config
@@ -92,7 +95,7 @@ async def index_airtable_records(
                 str(e),
                 {"error_type": "InvalidCredentials"},
             )
-            return 0, f"Invalid Airtable credentials: {e!s}"
+            raise PermanentJobError(f"Invalid Airtable credentials: {e!s}") from e
 
         # Check if credentials are expired
         if credentials.is_expired:
@@ -102,7 +105,9 @@ async def index_airtable_records(
                 "Credentials expired",
                 {"error_type": "ExpiredCredentials"},
             )
-            return 0, "Airtable credentials have expired. Please re-authenticate."
+            raise PermanentJobError(
+                "Airtable credentials have expired. Please re-authenticate."
+            )
 
         # Calculate date range for indexing
         start_date_str, end_date_str = calculate_date_range(
@@ -130,7 +135,7 @@ async def index_airtable_records(
                     "API Error",
                     {"error_type": "APIError"},
                 )
-                return 0, f"Failed to fetch Airtable bases: {error}"
+                raise ConnectorIndexingError(f"Failed to fetch Airtable bases: {error}")
 
             if not bases:
                 success_msg = "No Airtable bases found or accessible"
@@ -213,110 +218,62 @@ async def index_airtable_records(
 
                     logger.info(f"Found {len(records)} records in table {table_name}")
 
-                    documents_indexed = 0
+                    writer = DocumentBatchWriter(session)
                     skipped_messages = []
                     documents_skipped = 0
-                    # Process each record
-                    for record in records:
-                        try:
-                            # Generate markdown content
-                            markdown_content = (
-                                airtable_connector.format_record_to_markdown(
-                                    record, f"{base_name} - {table_name}"
-                                )
-                            )
-
-                            if not markdown_content.strip():
-                                logger.warning(
-                                    f"Skipping message with no content: {record.get('id')}"
-                                )
-                                skipped_messages.append(
-                                    f"{record.get('id')} (no content)"
-                                )
-                                documents_skipped += 1
-                                continue
-
-                            # Generate content hash
-                            content_hash = generate_content_hash(
-                                markdown_content, search_space_id
-                            )
-
-                            # Check if document already exists
-                            existing_document_by_hash = (
-                                await check_duplicate_document_by_hash(
-                                    session, content_hash
-                                )
-                            )
-
-                            if existing_document_by_hash:
-                                logger.info(
-                                    f"Document with content hash {content_hash} already exists for message {record.get('id')}. Skipping processing."
-                                )
-                                documents_skipped += 1
-                                continue
-
-                            # Generate document summary
-                            user_llm = await get_user_long_context_llm(session, user_id)
-
-                            if user_llm:
-                                document_metadata = {
-                                    "record_id": record.get("id", "Unknown"),
-                                    "created_time": record.get("CREATED_TIME()", ""),
-                                    "document_type": "Airtable Record",
-                                    "connector_type": "Airtable",
-                                }
-                                (
-                                    summary_content,
-                                    summary_embedding,
-                                ) = await generate_document_summary(
-                                    markdown_content, user_llm, document_metadata
-                                )
-                            else:
-                                # Fallback to simple summary if no LLM configured
-                                summary_content = f"Airtable Record: {record.get('id', 'Unknown')}\n\n"
-                                summary_embedding = (
-                                    config.embedding_model_instance.embed(
-                                        summary_content
-                                    )
-                                )
-
-                            # Process chunks
-                            chunks = await create_document_chunks(markdown_content)
-
-                            # Create and store new document
-                            logger.info(
-                                f"Creating new document for Airtable record: {record.get('id', 'Unknown')}"
-                            )
-                            document = Document(
-                                search_space_id=search_space_id,
-                                title=f"Airtable Record: {record.get('id', 'Unknown')}",
-                                document_type=DocumentType.AIRTABLE_CONNECTOR,
-                                document_metadata={
-                                    "record_id": record.get("id", "Unknown"),
-                                    "created_time": record.get("CREATED_TIME()", ""),
-                                },
-                                content=summary_content,
-                                content_hash=content_hash,
-                                embedding=summary_embedding,
-                                chunks=chunks,
-                            )
-
-                            session.add(document)
-                            documents_indexed += 1
-                            logger.info(
-                                f"Successfully indexed new Airtable record {summary_content}"
-                            )
+                    user_llm = await get_user_long_context_llm(session, user_id)
+
+                    def format_record(
+                        record,
+                        table_label=f"{base_name} - {table_name}",
+                        skipped_messages=skipped_messages,
+                    ) -> ConnectorItem | None:
+                        nonlocal documents_skipped
+
+                        # Generate markdown content
+                        markdown_content = airtable_connector.format_record_to_markdown(
+                            record, table_label
+                        )
 
-                        except Exception as e:
-                            logger.error(
-                                f"Error processing the Airtable record {record.get('id', 'Unknown')}: {e!s}",
-                                exc_info=True,
-                            )
-                            skipped_messages.append(
-                                f"{record.get('id', 'Unknown')} (processing error)"
+                        if not markdown_content.strip():
+                            logger.warning(
+                                f"Skipping message with no content: {record.get('id')}"
                             )
+                            skipped_messages.append(f"{record.get('id')} (no content)")
                             documents_skipped += 1
-                            continue  # Skip this message and continue with others
+                            return None
+
+                        record_id = record.get("id", "Unknown")
+                        return ConnectorItem(
+                            title=f"Airtable Record: {record_id}",
+                            content=markdown_content,
+                            external_id=record_id,
+                            document_metadata={
+                                "record_id": record_id,
+                                "created_time": record.get("CREATED_TIME()", ""),
+                            },
+                            summary_metadata={
+                                "record_id": record_id,
+                                "created_time": record.get("CREATED_TIME()", ""),
+                                "document_type": "Airtable Record",
+                                "connector_type": "Airtable",
+                            },
+                            # Fallback to simple summary if no LLM configured
+                            fallback_summary=f"Airtable Record: {record_id}\n\n",
+                        )
+
+                    # Summaries, embeddings and writes overlap in a staged pipeline
+                    documents_indexed, pipeline_skipped = await index_connector_items(
+                        writer,
+                        single_indexing_unit(records),
+                        format_record,
+                        search_space_id=search_space_id,
+                        connector_id=connector_id,
+                        document_type=DocumentType.AIRTABLE_CONNECTOR,
+                        user_llm=user_llm,
+                        skipped_items=skipped_messages,
+                    )
+                    documents_skipped += pipeline_skipped
 
                     # Update the last_indexed_at timestamp for the connector only if requested
                     total_processed = documents_indexed
@@ -326,6 +283,7 @@ async def index_airtable_records(
                         )
 
                     # Commit all changes
+                    await writer.flush()
                     await session.commit()
                     logger.info(
                         "Successfully committed all Airtable document changes to database"
@@ -351,12 +309,17 @@ async def index_airtable_records(
                         None,
                     )  # Return None as the error message to indicate success
 
+        except ConnectorIndexingError:
+            raise
         except Exception as e:
             logger.error(
                 f"Fetching Airtable bases for connector {connector_id} failed: {e!s}",
                 exc_info=True,
             )
 
+    except (ConnectorIndexingError, PermanentJobError):
+        # Already logged where it was raised
+        raise
     except SQLAlchemyError as db_error:
         await session.rollback()
         await task_logger.log_task_failure(
@@ -368,7 +331,7 @@ async def index_airtable_records(
         logger.error(
             f"Database error during Airtable indexing: {db_error!s}", exc_info=True
         )
-        return 0, f"Database error: {db_error!s}"
+        raise ConnectorIndexingError(f"Database error: {db_error!s}") from db_error
     except Exception as e:
         await session.rollback()
         await task_logger.log_task_failure(
@@ -378,4 +341,4 @@ async def index_airtable_records(
             {"error_type": type(e).__name__},
         )
         logger.error(f"Error during Airtable indexing: {e!s}", exc_info=True)
-        return 0, f"Failed to index Airtable records: {e!s}"
+        raise ConnectorIndexingError(f"Failed to index Airtable records: {e!s}") from e
@@ -2,39 +2,330 @@
 Base functionality and shared imports for connector indexers.
 """
 
+import asyncio
 import logging
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from typing import Any
 
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from app.config import config
 from app.db import (
+    Chunk,
     Document,
+    DocumentType,
     SearchSourceConnector,
     SearchSourceConnectorType,
 )
+from app.utils.document_converters import (
+    create_chunk_rows_batch,
+    embed_text,
+    generate_content_hash,
+    generate_document_summary,
+    get_existing_content_hashes,
+    sync_document_chunks,
+)
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
 
-async def check_duplicate_document_by_hash(
-    session: AsyncSession, content_hash: str
-) -> Document | None:
+class ConnectorIndexingError(Exception):
+    """
+    Raised by an indexer when its run failed and may succeed if retried.
+
+    Failures caused by the connector's configuration or credentials raise
+    PermanentJobError instead, so the job queue does not retry them.
     """
-    Check if a document with the given content hash already exists.
+
+
+async def get_documents_by_source(
+    session: AsyncSession,
+    search_space_id: int,
+    connector_id: int,
+    external_ids: list[str],
+) -> dict[str, Document]:
+    """
+    Get the documents previously indexed for several source items.
 
     Args:
         session: Database session
-        content_hash: Hash of the document content
+        search_space_id: ID of the search space
+        connector_id: ID of the connector the items came from
+        external_ids: The items' IDs in the source
 
     Returns:
-        Existing document if found, None otherwise
+        Dictionary mapping external ID to its existing document; misses are absent
     """
-    existing_doc_result = await session.execute(
-        select(Document).where(Document.content_hash == content_hash)
+    if not external_ids:
+        return {}
+
+    result = await session.execute(
+        select(Document).where(
+            Document.search_space_id == search_space_id,
+            Document.connector_id == connector_id,
+            Document.external_id.in_(
+                [str(external_id) for external_id in external_ids]
+            ),
+        )
     )
-    return existing_doc_result.scalars().first()
+    return {document.external_id: document for document in result.scalars()}
+
+
+class DocumentBatchWriter:
+    """
+    Write connector documents and their chunks in committed batches.
+
+    New documents are buffered as plain rows rather than ORM objects. Each batch is
+    written with one multi-row INSERT ... RETURNING for the documents and
+    executemany INSERTs for their chunks (vector columns included), then committed.
+    Memory use and transaction size stay bounded no matter how many items a sync
+    produces, and the session's unit of work never holds more than one batch.
+
+    When the batch INSERT fails, the rows are retried one by one inside SAVEPOINTs
+    so a single bad row only fails its own item. Callers that pass a key with each
+    document can register a flush callback to learn which items were committed and
+    which failed.
+    """
+
+    def __init__(self, session: AsyncSession, batch_size: int | None = None):
+        """
+        Initialize the writer.
+
+        Args:
+            session: Database session, committed after every batch
+            batch_size: Documents per batch (defaults to INDEXING_WRITE_BATCH_SIZE)
+        """
+        self.session = session
+        self.batch_size = max(batch_size or config.INDEXING_WRITE_BATCH_SIZE, 1)
+        self.documents_written = 0
+        self.documents_failed = 0
+        self._documents: list[dict] = []
+        self._chunks: list[list[dict]] = []
+        self._keys: list = []
+        self._updated_keys: list = []
+        self._pending_hashes: set[str] = set()
+        self._pending_sources: set[tuple] = set()
+        self._flush_callbacks: list[Callable[[list, list], None]] = []
+
+    def is_pending(
+        self, content_hash: str, connector_id=None, external_id=None
+    ) -> bool:
+        """Whether a document with this content or source item is already buffered."""
+        return content_hash in self._pending_hashes or (
+            external_id is not None
+            and (connector_id, str(external_id)) in self._pending_sources
+        )
+
+    def add_flush_callback(self, callback: Callable[[list, list], None]) -> None:
+        """
+        Register a callback run as callback(written_keys, failed_keys) after each flush.
+
+        Written keys belong to documents committed by the flush; failed keys to
+        documents that could not be written. Documents added without a key are not
+        reported.
+        """
+        self._flush_callbacks.append(callback)
+
+    def remove_flush_callback(self, callback: Callable[[list, list], None]) -> None:
+        """Unregister a callback added with add_flush_callback."""
+        self._flush_callbacks.remove(callback)
+
+    async def add(self, document: dict, chunks: list[dict], key=None) -> None:
+        """
+        Buffer a new document, writing the batch once it is full.
+
+        Args:
+            document: Column values for the documents row
+            chunks: Column values for its chunks rows (without document_id)
+            key: Optional caller object identifying the item in flush callbacks
+        """
+        self._documents.append(document)
+        self._chunks.append(chunks)
+        self._keys.append(key)
+        self._pending_hashes.add(document["content_hash"])
+        if document.get("external_id") is not None:
+            self._pending_sources.add(
+                (document.get("connector_id"), document["external_id"])
+            )
+        await self._flush_if_full()
+
+    async def mark_updated(self, key=None) -> None:
+        """Count a document updated through the session toward the current batch."""
+        self._updated_keys.append(key)
+        await self._flush_if_full()
+
+    async def _flush_if_full(self) -> None:
+        if len(self._documents) + len(self._updated_keys) >= self.batch_size:
+            await self.flush()
+
+    async def _insert_documents(
+        self, documents: list[dict], chunks: list[list[dict]]
+    ) -> None:
+        result = await self.session.execute(
+            insert(Document).returning(Document.id, sort_by_parameter_order=True),
+            documents,
+        )
+        document_ids = result.scalars().all()
+        chunk_rows = [
+            {**chunk, "document_id": document_id}
+            for document_id, document_chunks in zip(document_ids, chunks, strict=True)
+            for chunk in document_chunks
+        ]
+        if chunk_rows:
+            await self.session.execute(insert(Chunk), chunk_rows)
+
+    async def _insert_rows_individually(
+        self, documents: list[dict], chunks: list[list[dict]]
+    ) -> list[int]:
+        """Insert each document in its own SAVEPOINT; returns the failed positions."""
+        failed = []
+        for index, (document, document_chunks) in enumerate(
+            zip(documents, chunks, strict=True)
+        ):
+            try:
+                async with self.session.begin_nested():
+                    await self._insert_documents([document], [document_chunks])
+            except Exception as e:
+                logger.error(f"Failed to write document {document.get('title')}: {e!s}")
+                failed.append(index)
+        return failed
+
+    def _notify(self, written_keys: list, failed_keys: list) -> None:
+        written_keys = [key for key in written_keys if key is not None]
+        failed_keys = [key for key in failed_keys if key is not None]
+        if not written_keys and not failed_keys:
+            return
+        for callback in list(self._flush_callbacks):
+            callback(written_keys, failed_keys)
+
+    async def flush(self) -> int:
+        """
+        Write the buffered documents and chunks and commit.
+
+        Rows that cannot be inserted are left out and reported as failed. If the
+        commit itself fails, every document of the batch is reported as failed and
+        the error is raised.
+
+        Returns:
+            Number of new documents written
+        """
+        documents, chunks, keys = self._documents, self._chunks, self._keys
+        updated_keys = self._updated_keys
+        self._documents, self._chunks, self._keys = [], [], []
+        self._updated_keys = []
+        self._pending_hashes.clear()
+        self._pending_sources.clear()
+
+        failed: list[int] = []
+        try:
+            if documents:
+                try:
+                    async with self.session.begin_nested():
+                        await self._insert_documents(documents, chunks)
+                except Exception as e:
+                    logger.warning(
+                        f"Batch write of {len(documents)} documents failed, "
+                        f"retrying row by row: {e!s}"
+                    )
+                    failed = await self._insert_rows_individually(documents, chunks)
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            self.documents_failed += len(documents) + len(updated_keys)
+            self._notify([], keys + updated_keys)
+            raise
+
+        failed_positions = set(failed)
+        written = len(documents) - len(failed)
+        self.documents_written += written
+        self.documents_failed += len(failed)
+        if documents:
+            logger.info(
+                f"Wrote batch of {written} documents"
+                + (f" ({len(failed)} failed)" if failed else "")
+            )
+        self._notify(
+            [key for i, key in enumerate(keys) if i not in failed_positions]
+            + updated_keys,
+            [keys[i] for i in failed],
+        )
+        return written
+
+
+def _new_document_row(
+    *,
+    search_space_id: int,
+    connector_id: int,
+    external_id: str | None,
+    document_type: DocumentType,
+    title: str,
+    document_metadata: dict,
+    content: str,
+    content_hash: str,
+    embedding,
+) -> dict:
+    return {
+        "search_space_id": search_space_id,
+        "connector_id": connector_id,
+        "external_id": None if external_id is None else str(external_id),
+        "title": title,
+        "document_type": document_type,
+        "document_metadata": document_metadata,
+        "content": content,
+        "content_hash": content_hash,
+        "embedding": embedding,
+    }
+
+
+async def update_connector_document(
+    writer: DocumentBatchWriter,
+    document: Document,
+    *,
+    title: str,
+    document_metadata: dict,
+    content: str,
+    content_hash: str,
+    embedding,
+    chunk_content: str,
+    chunker=None,
+    key=None,
+) -> None:
+    """
+    Update a previously indexed source item's document in place.
+
+    The document keeps its ID and gets the new content, hash and summary embedding;
+    only the chunks whose text changed are re-embedded (see sync_document_chunks).
+
+    Args:
+        writer: Batch writer for the indexing run
+        document: The item's existing document
+        title: Document title
+        document_metadata: Document metadata
+        content: Document content (usually the summary)
+        content_hash: Hash of the item's content
+        embedding: Embedding of the document content
+        chunk_content: Full content to split into chunks
+        chunker: Optional chunker to use instead of config.chunker_instance
+        key: Optional caller object identifying the item in flush callbacks
+    """
+    document.title = title
+    document.document_metadata = document_metadata
+    document.content = content
+    document.content_hash = content_hash
+    document.embedding = embedding
+    chunk_counts = await sync_document_chunks(
+        writer.session, document.id, chunk_content, chunker
+    )
+    logger.info(
+        f"Updated document {document.id} for {document.document_type.value} item "
+        f"{document.external_id}: {chunk_counts}"
+    )
+    await writer.mark_updated(key)
 
 
 async def get_connector_by_id(
@@ -139,6 +430,547 @@ async def update_connector_last_indexed(
         logger.info(f"Updated last_indexed_at to {connector.last_indexed_at}")
 
 
+class IndexingCheckpoint:
+    """
+    Durable progress of a connector indexing run.
+
+    Indexers that fetch in separate units (a Slack channel, a GitHub repository) record
+    each finished unit with the end of the window it was indexed through. A unit is only
+    recorded once all its documents are committed, and the checkpoint lives on the
+    connector row, so it is committed with the next batch. A run that dies part-way does
+    not advance last_indexed_at, so the next run with the same requested start finds the
+    saved checkpoint. It keeps the original window start, skips finished units, and
+    fetches the others only from where they left off. Items written before the
+    interruption are skipped by the content hash lookup.
+    """
+
+    def __init__(
+        self,
+        connector: SearchSourceConnector,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        requested_start_date: str | None = None,
+    ):
+        """
+        Load the connector's checkpoint if it belongs to an interrupted run of this
+        sync.
+
+        Args:
+            connector: The connector being indexed
+            start_date: Start of the run's window, in any string format that sorts
+                chronologically (replaced by the saved start when resuming)
+            end_date: End of the run's window in the same format
+            requested_start_date: Start date the caller asked for (None when the
+                window is derived from last_indexed_at)
+        """
+        self.connector = connector
+        self.end_date = end_date
+        # A first sync derives its start from the current time, so runs are matched
+        # on what they were asked to do rather than on the computed window
+        self._run_key = [
+            connector.last_indexed_at.isoformat()
+            if connector.last_indexed_at
+            else None,
+            requested_start_date,
+        ]
+
+        saved = connector.indexing_checkpoint or {}
+        if saved and saved.get("run_key") == self._run_key:
+            self.start_date = saved.get("start_date")
+            self._cursors = dict(saved.get("cursors", {}))
+            logger.info(
+                f"Resuming indexing for connector {connector.id} from "
+                f"{self.start_date}: {len(self._cursors)} units already indexed"
+            )
+        else:
+            self.start_date = start_date
+            self._cursors = {}
+
+    def is_unit_done(self, unit_id) -> bool:
+        """Whether the unit was already indexed through the end of this run's window."""
+        unit_id = str(unit_id)
+        if unit_id not in self._cursors:
+            return False
+        cursor = self._cursors[unit_id]
+        return self.end_date is None or (cursor is not None and cursor >= self.end_date)
+
+    def unit_start_date(self, unit_id) -> str | None:
+        """Date to fetch the unit from: where it was indexed through, or the start."""
+        return self._cursors.get(str(unit_id)) or self.start_date
+
+    def mark_unit_done(self, unit_id) -> None:
+        """Record the unit as indexed once its documents are committed."""
+        self._cursors[str(unit_id)] = self.end_date
+        # Assign a new dict so SQLAlchemy detects the change to the JSON column
+        self.connector.indexing_checkpoint = {
+            "run_key": self._run_key,
+            "start_date": self.start_date,
+            "cursors": dict(self._cursors),
+        }
+
+    def clear(self) -> None:
+        """Drop the checkpoint once the run has finished."""
+        self.connector.indexing_checkpoint = None
+
+
+# Marks the end of a stage's input
+_END = object()
+
+# Items per content-hash and source lookup in index_connector_items
+DEDUPE_BATCH_SIZE = 100
+
+
+class _PipelineEntry:
+    __slots__ = ("source", "value")
+
+    def __init__(self, source):
+        self.source = source
+        self.value = source
+
+
+class IndexingPipeline:
+    """
+    Run items through async stages connected by bounded queues.
+
+    Every stage has its own workers and reads from a queue of at most queue_size
+    items, so a fast stage blocks (backpressure) instead of buffering the whole
+    source, and slow network-bound stages overlap with CPU-bound ones. A stage
+    function takes an item and returns it (possibly changed) to pass it on, or None
+    to drop it. A batch stage takes a list of up to batch_size waiting items and
+    returns the ones to pass on. An exception fails only the items being processed.
+    """
+
+    def __init__(self, name: str, queue_size: int | None = None):
+        """
+        Initialize the pipeline.
+
+        Args:
+            name: Name used in logs
+            queue_size: Items allowed to wait in front of each stage (defaults to
+                INDEXING_PIPELINE_QUEUE_SIZE)
+        """
+        self.name = name
+        self.queue_size = max(queue_size or config.INDEXING_PIPELINE_QUEUE_SIZE, 1)
+        self._stages: list[tuple[str, Callable, int, int | None]] = []
+        self.stats: dict[str, dict[str, int]] = {}
+
+    def add_stage(
+        self,
+        name: str,
+        func: Callable[[Any], Awaitable[Any]],
+        concurrency: int = 1,
+        batch_size: int | None = None,
+    ) -> "IndexingPipeline":
+        """
+        Append a stage.
+
+        Args:
+            name: Stage name used in logs and stats
+            func: Async function applied to each item (or to each batch)
+            concurrency: Number of workers running the stage
+            batch_size: Process items in lists of up to this many items
+
+        Returns:
+            The pipeline, so stages can be chained
+        """
+        self._stages.append((name, func, max(concurrency, 1), batch_size))
+        self.stats[name] = {"processed": 0, "dropped": 0, "failed": 0}
+        return self
+
+    async def run(
+        self,
+        source: AsyncIterable,
+        on_item_done: Callable[[Any, Any, bool], None] | None = None,
+    ) -> dict[str, dict[str, int]]:
+        """
+        Feed every item from source through the stages and wait for all of them.
+
+        Args:
+            source: Async iterable of items; it is only advanced while the first
+                stage has room, so items are fetched as the pipeline drains
+            on_item_done: Called as on_item_done(source_item, value, succeeded) when
+                an item leaves the pipeline, whether it finished, was dropped or failed
+
+        Returns:
+            Processed, dropped and failed counts per stage
+        """
+        queues = [asyncio.Queue(self.queue_size) for _ in self._stages]
+
+        def finish(entry: _PipelineEntry, succeeded: bool) -> None:
+            if on_item_done:
+                on_item_done(entry.source, entry.value, succeeded)
+
+        async def feed() -> None:
+            async for item in source:
+                await queues[0].put(_PipelineEntry(item))
+            for _ in range(self._stages[0][2]):
+                await queues[0].put(_END)
+
+        async def next_entries(queue: asyncio.Queue, batch_size: int | None):
+            entry = await queue.get()
+            if entry is _END:
+                return None
+            entries = [entry]
+            while batch_size and len(entries) < batch_size:
+                try:
+                    entry = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if entry is _END:
+                    # Leave the end marker for this worker's next call
+                    queue.put_nowait(_END)
+                    break
+                entries.append(entry)
+            return entries
+
+        async def worker(index: int) -> None:
+            name, func, _, batch_size = self._stages[index]
+            stats = self.stats[name]
+            next_queue = queues[index + 1] if index + 1 < len(queues) else None
+
+            while (
+                entries := await next_entries(queues[index], batch_size)
+            ) is not None:
+                try:
+                    if batch_size:
+                        kept = {
+                            id(value)
+                            for value in await func([e.value for e in entries])
+                        }
+                        results = [
+                            e.value if id(e.value) in kept else None for e in entries
+                        ]
+                    else:
+                        results = [await func(entries[0].value)]
+                except Exception as e:
+                    logger.error(
+                        f"{self.name} pipeline stage {name} failed for "
+                        f"{len(entries)} items: {e!s}",
+                        exc_info=True,
+                    )
+                    stats["failed"] += len(entries)
+                    for entry in entries:
+                        finish(entry, False)
+                    continue
+
+                for entry, result in zip(entries, results, strict=True):
+                    stats["processed"] += 1
+                    if result is None:
+                        stats["dropped"] += 1
+                        finish(entry, True)
+                        continue
+                    entry.value = result
+                    if next_queue is None:
+                        finish(entry, True)
+                    else:
+                        await next_queue.put(entry)
+
+        async def run_stage(index: int) -> None:
+            concurrency = self._stages[index][2]
+            await asyncio.gather(*(worker(index) for _ in range(concurrency)))
+            if index + 1 < len(queues):
+                for _ in range(self._stages[index + 1][2]):
+                    await queues[index + 1].put(_END)
+
+        tasks = [asyncio.create_task(feed())] + [
+            asyncio.create_task(run_stage(index)) for index in range(len(queues))
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        logger.info(f"{self.name} pipeline finished: {self.stats}")
+        return self.stats
+
+
+@dataclass
+class ConnectorItem:
+    """
+    A source item on its way through index_connector_items.
+
+    The indexer's format function fills in the descriptive fields; the pipeline fills
+    in the rest.
+    """
+
+    title: str
+    # Full text of the item, summarised and split into chunks
+    content: str
+    document_metadata: dict
+    external_id: str | None = None
+    # Metadata for an LLM summary; None stores fallback_summary instead
+    summary_metadata: dict | None = None
+    # Document content when there is no LLM summary (defaults to content)
+    fallback_summary: str | None = None
+    # Text the content hash is computed from (defaults to content)
+    hashed_content: str | None = None
+    # Text split into chunks (defaults to content)
+    chunk_content: str | None = None
+    chunker: Any = None
+
+    content_hash: str = ""
+    existing_document: Document | None = None
+    summary_content: str = ""
+    summary_embedding: Any = None
+    chunk_rows: list[dict] = field(default_factory=list)
+    # Unit the item was fetched in, and whether it was handed to the writer
+    unit_id: Any = None
+    queued: bool = False
+    # Set by the writer's flush: True once committed, False if the write failed
+    written: bool | None = None
+
+
+async def single_indexing_unit(
+    raw_items: list, unit_id: str | None = None
+) -> AsyncIterator[tuple[str | None, list]]:
+    """Wrap already fetched items as the only unit for index_connector_items."""
+    yield unit_id, raw_items
+
+
+async def index_connector_items(
+    writer: DocumentBatchWriter,
+    units: AsyncIterable[tuple[str | None, list]],
+    format_item: Callable[[Any], ConnectorItem | None],
+    *,
+    search_space_id: int,
+    connector_id: int,
+    document_type: DocumentType,
+    user_llm=None,
+    checkpoint: IndexingCheckpoint | None = None,
+    skipped_items: list[str] | None = None,
+    session_lock: asyncio.Lock | None = None,
+) -> tuple[int, int]:
+    """
+    Index source items through a staged IndexingPipeline.
+
+    Stages: format -> dedupe (one content hash and source lookup per batch) ->
+    summarise (concurrent LLM calls) -> chunk and embed (several documents per model
+    batch) -> write (DocumentBatchWriter). Fetching happens in the units iterator
+    while earlier items are still being summarised and embedded. The session is
+    only used by the dedupe and write stages, one at a time. Items are counted as
+    indexed once the writer has committed them; the writer is flushed before this
+    returns.
+
+    Args:
+        writer: Batch writer for the indexing run
+        units: Async iterable of (unit_id, raw_items) as they are fetched; a unit is
+            marked done in the checkpoint once all its items were committed or
+            skipped, and never if one of them failed
+        format_item: Turns a raw item into a ConnectorItem, or None to skip it
+        search_space_id: ID of the search space
+        connector_id: ID of the connector
+        document_type: Type of the documents
+        user_llm: LLM for document summaries; items fall back to their
+            fallback_summary without one
+        checkpoint: Optional checkpoint to record finished units in
+        skipped_items: Optional list to append failed items' titles to
+        session_lock: Lock the units iterator holds while it uses the session (the
+            pipeline creates its own when the iterator does not use the session)
+
+    Returns:
+        Tuple of (documents_indexed, documents_skipped), where skipped documents
+        include items that failed
+    """
+    session = writer.session
+    session_lock = session_lock or asyncio.Lock()
+    counts = {"indexed": 0, "skipped": 0}
+    seen_hashes: set[str] = set()
+    pending_by_unit: dict = {}
+    failed_units: set = set()
+
+    async def source():
+        async for unit_id, raw_items in units:
+            if not raw_items:
+                if checkpoint and unit_id is not None:
+                    checkpoint.mark_unit_done(unit_id)
+                continue
+            pending_by_unit[unit_id] = pending_by_unit.get(unit_id, 0) + len(raw_items)
+            for raw_item in raw_items:
+                yield unit_id, raw_item
+
+    def release_item(unit_id, failed: bool) -> None:
+        if failed:
+            failed_units.add(unit_id)
+        pending_by_unit[unit_id] -= 1
+        if pending_by_unit[unit_id] == 0:
+            del pending_by_unit[unit_id]
+            if checkpoint and unit_id is not None and unit_id not in failed_units:
+                checkpoint.mark_unit_done(unit_id)
+
+    def batch_written(written_items: list, failed_items: list) -> None:
+        # Runs after the flush committed, so finished units are safe to record
+        counts["indexed"] += len(written_items)
+        counts["skipped"] += len(failed_items)
+        for item in written_items:
+            item.written = True
+            release_item(item.unit_id, False)
+        for item in failed_items:
+            item.written = False
+            if skipped_items is not None:
+                skipped_items.append(f"{item.title} (write error)")
+            release_item(item.unit_id, True)
+
+    def item_done(source_item, value, succeeded: bool) -> None:
+        unit_id = source_item[0]
+        if isinstance(value, ConnectorItem) and value.written is not None:
+            # Already released by the flush that wrote (or failed to write) it
+            return
+        if not succeeded:
+            counts["skipped"] += 1
+            if skipped_items is not None and isinstance(value, ConnectorItem):
+                skipped_items.append(f"{value.title} (processing error)")
+            release_item(unit_id, True)
+        elif not (isinstance(value, ConnectorItem) and value.queued):
+            # Dropped before reaching the writer; queued items are released by
+            # the flush that commits them
+            release_item(unit_id, False)
+
+    async def format_stage(source_item):
+        item = format_item(source_item[1])
+        if item is None:
+            counts["skipped"] += 1
+            return None
+        item.unit_id = source_item[0]
+        item.content_hash = generate_content_hash(
+            item.hashed_content or item.content, search_space_id
+        )
+        return item
+
+    async def dedupe_stage(items: list[ConnectorItem]) -> list[ConnectorItem]:
+        async with session_lock:
+            existing_hashes = await get_existing_content_hashes(
+                session, [item.content_hash for item in items]
+            )
+            new_items = []
+            for item in items:
+                if (
+                    item.content_hash in existing_hashes
+                    or item.content_hash in seen_hashes
+                ):
+                    logger.info(
+                        f"Document with content hash {item.content_hash} already exists "
+                        f"for {item.title}. Skipping processing."
+                    )
+                    counts["skipped"] += 1
+                    continue
+                seen_hashes.add(item.content_hash)
+                new_items.append(item)
+
+            existing_documents = await get_documents_by_source(
+                session,
+                search_space_id,
+                connector_id,
+                [
+                    item.external_id
+                    for item in new_items
+                    if item.external_id is not None
+                ],
+            )
+        for item in new_items:
+            if item.external_id is not None:
+                item.existing_document = existing_documents.get(str(item.external_id))
+        return new_items
+
+    async def summarise_stage(item: ConnectorItem) -> ConnectorItem:
+        if user_llm and item.summary_metadata is not None:
+            (
+                item.summary_content,
+                item.summary_embedding,
+            ) = await generate_document_summary(
+                item.content, user_llm, item.summary_metadata
+            )
+        else:
+            item.summary_content = (
+                item.content if item.fallback_summary is None else item.fallback_summary
+            )
+            item.summary_embedding = await embed_text(item.summary_content)
+        return item
+
+    async def embed_stage(items: list[ConnectorItem]) -> list[ConnectorItem]:
+        # Updated documents re-chunk incrementally in the write stage instead
+        new_items = [item for item in items if item.existing_document is None]
+        chunk_rows = await create_chunk_rows_batch(
+            [
+                (
+                    item.content if item.chunk_content is None else item.chunk_content,
+                    item.chunker,
+                )
+                for item in new_items
+            ]
+        )
+        for item, rows in zip(new_items, chunk_rows, strict=True):
+            item.chunk_rows = rows
+        return items
+
+    async def write_stage(item: ConnectorItem) -> ConnectorItem | None:
+        async with session_lock:
+            if writer.is_pending(item.content_hash, connector_id, item.external_id):
+                counts["skipped"] += 1
+                return None
+            if item.existing_document is not None:
+                await update_connector_document(
+                    writer,
+                    item.existing_document,
+                    title=item.title,
+                    document_metadata=item.document_metadata,
+                    content=item.summary_content,
+                    content_hash=item.content_hash,
+                    embedding=item.summary_embedding,
+                    chunk_content=item.content
+                    if item.chunk_content is None
+                    else item.chunk_content,
+                    chunker=item.chunker,
+                    key=item,
+                )
+            else:
+                await writer.add(
+                    _new_document_row(
+                        search_space_id=search_space_id,
+                        connector_id=connector_id,
+                        external_id=item.external_id,
+                        document_type=document_type,
+                        title=item.title,
+                        document_metadata=item.document_metadata,
+                        content=item.summary_content,
+                        content_hash=item.content_hash,
+                        embedding=item.summary_embedding,
+                    ),
+                    item.chunk_rows,
+                    key=item,
+                )
+            item.queued = True
+        logger.info(f"Indexed {document_type.value} item {item.title}")
+        return item
+
+    pipeline = (
+        IndexingPipeline(document_type.value)
+        .add_stage("format", format_stage)
+        .add_stage("dedupe", dedupe_stage, batch_size=DEDUPE_BATCH_SIZE)
+        .add_stage(
+            "summarise",
+            summarise_stage,
+            concurrency=config.INDEXING_SUMMARY_CONCURRENCY,
+        )
+        .add_stage(
+            "embed",
+            embed_stage,
+            concurrency=config.INDEXING_EMBED_CONCURRENCY,
+            batch_size=config.INDEXING_EMBED_BATCH_DOCUMENTS,
+        )
+        .add_stage("write", write_stage)
+    )
+    writer.add_flush_callback(batch_written)
+    try:
+        await pipeline.run(source(), on_item_done=item_done)
+        await writer.flush()
+    finally:
+        writer.remove_flush_callback(batch_written)
+    return counts["indexed"], counts["skipped"]
+
+
 def build_document_metadata_string(
     metadata_sections: list[tuple[str, list[str]]],
 ) -> str:
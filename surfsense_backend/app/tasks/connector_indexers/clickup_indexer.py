@@ -2,25 +2,24 @@
 ClickUp connector indexer.
 """
 
+import asyncio
 from datetime import datetime
 
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import config
 from app.connectors.clickup_connector import ClickUpConnector
-from app.db import Document, DocumentType, SearchSourceConnectorType
+from app.db import DocumentType, SearchSourceConnectorType
+from app.services.job_queue import PermanentJobError
 from app.services.llm_service import get_user_long_context_llm
 from app.services.task_logging_service import TaskLoggingService
-from app.utils.document_converters import (
-    create_document_chunks,
-    generate_content_hash,
-    generate_document_summary,
-)
 
 from .base import (
-    check_duplicate_document_by_hash,
+    ConnectorIndexingError,
+    ConnectorItem,
+    DocumentBatchWriter,
     get_connector_by_id,
+    index_connector_items,
     logger,
     update_connector_last_indexed,
 )
@@ -49,6 +48,10 @@ async def index_clickup_tasks(
 
     Returns:
         Tuple of (number of indexed tasks, error message if any)
+
+    Raises:
+        PermanentJobError: If the connector is missing or misconfigured
+        ConnectorIndexingError: If the run failed and may succeed when retried
     """
     task_logger = TaskLoggingService(session, search_space_id)
 
@@ -78,7 +81,7 @@ async def index_clickup_tasks(
                 "Connector not found",
                 {"error_type": "ConnectorNotFound"},
             )
-            return 0, error_msg
+            raise PermanentJobError(error_msg)
 
         # Extract ClickUp configuration
         clickup_api_token = connector.config.get("CLICKUP_API_TOKEN")
@@ -91,7 +94,7 @@ async def index_clickup_tasks(
                 "Missing ClickUp token",
                 {"error_type": "MissingToken"},
             )
-            return 0, error_msg
+            raise PermanentJobError(error_msg)
 
         await task_logger.log_task_progress(
             log_entry,
@@ -119,175 +122,154 @@ async def index_clickup_tasks(
                 "No workspaces found",
                 {"error_type": "NoWorkspacesFound"},
             )
-            return 0, error_msg
+            raise PermanentJobError(error_msg)
 
-        documents_indexed = 0
+        writer = DocumentBatchWriter(session)
         documents_skipped = 0
-
-        # Iterate workspaces and fetch tasks
-        for workspace in workspaces:
-            workspace_id = workspace.get("id")
-            workspace_name = workspace.get("name", "Unknown Workspace")
-            if not workspace_id:
-                continue
-
-            await task_logger.log_task_progress(
-                log_entry,
-                f"Processing workspace: {workspace_name}",
-                {"stage": "workspace_processing", "workspace_id": workspace_id},
-            )
-
-            # Fetch tasks for date range if provided
-            if start_date and end_date:
-                tasks, error = clickup_client.get_tasks_in_date_range(
-                    workspace_id=workspace_id,
-                    start_date=start_date,
-                    end_date=end_date,
-                    include_closed=True,
-                )
-                if error:
-                    logger.warning(
-                        f"Error fetching tasks from workspace {workspace_name}: {error}"
-                    )
+        user_llm = await get_user_long_context_llm(session, user_id)
+        # The workspace iterator logs progress while the pipeline writes documents
+        session_lock = asyncio.Lock()
+
+        async def fetch_workspaces():
+            """Fetch each workspace's tasks while earlier tasks are indexed."""
+            for workspace in workspaces:
+                workspace_id = workspace.get("id")
+                workspace_name = workspace.get("name", "Unknown Workspace")
+                if not workspace_id:
                     continue
-            else:
-                tasks = clickup_client.get_workspace_tasks(
-                    workspace_id=workspace_id, include_closed=True
-                )
-
-            await task_logger.log_task_progress(
-                log_entry,
-                f"Found {len(tasks)} tasks in workspace {workspace_name}",
-                {"stage": "tasks_found", "task_count": len(tasks)},
-            )
 
-            for task in tasks:
-                try:
-                    task_id = task.get("id")
-                    task_name = task.get("name", "Untitled Task")
-                    task_description = task.get("description", "")
-                    task_status = task.get("status", {}).get("status", "Unknown")
-                    task_priority = (
-                        task.get("priority", {}).get("priority", "Unknown")
-                        if task.get("priority")
-                        else "None"
-                    )
-                    task_assignees = task.get("assignees", [])
-                    task_due_date = task.get("due_date")
-                    task_created = task.get("date_created")
-                    task_updated = task.get("date_updated")
-
-                    task_list = task.get("list", {})
-                    task_list_name = task_list.get("name", "Unknown List")
-                    task_space = task.get("space", {})
-                    task_space_name = task_space.get("name", "Unknown Space")
-
-                    # Build task content string
-                    content_parts: list[str] = [f"Task: {task_name}"]
-                    if task_description:
-                        content_parts.append(f"Description: {task_description}")
-                    content_parts.extend(
-                        [
-                            f"Status: {task_status}",
-                            f"Priority: {task_priority}",
-                            f"List: {task_list_name}",
-                            f"Space: {task_space_name}",
-                        ]
+                async with session_lock:
+                    await task_logger.log_task_progress(
+                        log_entry,
+                        f"Processing workspace: {workspace_name}",
+                        {"stage": "workspace_processing", "workspace_id": workspace_id},
                     )
-                    if task_assignees:
-                        assignee_names = [
-                            assignee.get("username", "Unknown")
-                            for assignee in task_assignees
-                        ]
-                        content_parts.append(f"Assignees: {', '.join(assignee_names)}")
-                    if task_due_date:
-                        content_parts.append(f"Due Date: {task_due_date}")
-
-                    task_content = "\n".join(content_parts)
-                    if not task_content.strip():
-                        logger.warning(f"Skipping task with no content: {task_name}")
-                        documents_skipped += 1
-                        continue
 
-                    # Hash for duplicates
-                    content_hash = generate_content_hash(task_content, search_space_id)
-                    existing_document_by_hash = await check_duplicate_document_by_hash(
-                        session, content_hash
+                # Fetch tasks for date range if provided
+                if start_date and end_date:
+                    tasks, error = await asyncio.to_thread(
+                        clickup_client.get_tasks_in_date_range,
+                        workspace_id=workspace_id,
+                        start_date=start_date,
+                        end_date=end_date,
+                        include_closed=True,
                     )
-                    if existing_document_by_hash:
-                        logger.info(
-                            f"Document with content hash {content_hash} already exists for task {task_name}. Skipping processing."
+                    if error:
+                        logger.warning(
+                            f"Error fetching tasks from workspace {workspace_name}: {error}"
                         )
-                        documents_skipped += 1
                         continue
+                else:
+                    tasks = await asyncio.to_thread(
+                        clickup_client.get_workspace_tasks,
+                        workspace_id=workspace_id,
+                        include_closed=True,
+                    )
 
-                    # Generate summary with metadata
-                    user_llm = await get_user_long_context_llm(session, user_id)
-
-                    if user_llm:
-                        document_metadata = {
-                            "task_id": task_id,
-                            "task_name": task_name,
-                            "task_status": task_status,
-                            "task_priority": task_priority,
-                            "task_list": task_list_name,
-                            "task_space": task_space_name,
-                            "assignees": len(task_assignees),
-                            "document_type": "ClickUp Task",
-                            "connector_type": "ClickUp",
-                        }
-                        (
-                            summary_content,
-                            summary_embedding,
-                        ) = await generate_document_summary(
-                            task_content, user_llm, document_metadata
-                        )
-                    else:
-                        # Fallback to simple summary if no LLM configured
-                        summary_content = task_content
-                        summary_embedding = config.embedding_model_instance.embed(
-                            task_content
-                        )
-
-                    chunks = await create_document_chunks(task_content)
-
-                    document = Document(
-                        search_space_id=search_space_id,
-                        title=f"Task - {task_name}",
-                        document_type=DocumentType.CLICKUP_CONNECTOR,
-                        document_metadata={
-                            "task_id": task_id,
-                            "task_name": task_name,
-                            "task_status": task_status,
-                            "task_priority": task_priority,
-                            "task_assignees": task_assignees,
-                            "task_due_date": task_due_date,
-                            "task_created": task_created,
-                            "task_updated": task_updated,
-                            "indexed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        },
-                        content=summary_content,
-                        content_hash=content_hash,
-                        embedding=summary_embedding,
-                        chunks=chunks,
+                async with session_lock:
+                    await task_logger.log_task_progress(
+                        log_entry,
+                        f"Found {len(tasks)} tasks in workspace {workspace_name}",
+                        {"stage": "tasks_found", "task_count": len(tasks)},
                     )
 
-                    session.add(document)
-                    documents_indexed += 1
-                    logger.info(f"Successfully indexed new task {task_name}")
+                yield workspace_id, tasks
 
-                except Exception as e:
-                    logger.error(
-                        f"Error processing task {task.get('name', 'Unknown')}: {e!s}",
-                        exc_info=True,
-                    )
-                    documents_skipped += 1
+        def format_task(task) -> ConnectorItem | None:
+            nonlocal documents_skipped
+
+            task_id = task.get("id")
+            task_name = task.get("name", "Untitled Task")
+            task_description = task.get("description", "")
+            task_status = task.get("status", {}).get("status", "Unknown")
+            task_priority = (
+                task.get("priority", {}).get("priority", "Unknown")
+                if task.get("priority")
+                else "None"
+            )
+            task_assignees = task.get("assignees", [])
+            task_due_date = task.get("due_date")
+            task_created = task.get("date_created")
+            task_updated = task.get("date_updated")
+
+            task_list = task.get("list", {})
+            task_list_name = task_list.get("name", "Unknown List")
+            task_space = task.get("space", {})
+            task_space_name = task_space.get("name", "Unknown Space")
+
+            # Build task content string
+            content_parts: list[str] = [f"Task: {task_name}"]
+            if task_description:
+                content_parts.append(f"Description: {task_description}")
+            content_parts.extend(
+                [
+                    f"Status: {task_status}",
+                    f"Priority: {task_priority}",
+                    f"List: {task_list_name}",
+                    f"Space: {task_space_name}",
+                ]
+            )
+            if task_assignees:
+                assignee_names = [
+                    assignee.get("username", "Unknown") for assignee in task_assignees
+                ]
+                content_parts.append(f"Assignees: {', '.join(assignee_names)}")
+            if task_due_date:
+                content_parts.append(f"Due Date: {task_due_date}")
+
+            task_content = "\n".join(content_parts)
+            if not task_content.strip():
+                logger.warning(f"Skipping task with no content: {task_name}")
+                documents_skipped += 1
+                return None
+
+            return ConnectorItem(
+                title=f"Task - {task_name}",
+                content=task_content,
+                external_id=task_id,
+                document_metadata={
+                    "task_id": task_id,
+                    "task_name": task_name,
+                    "task_status": task_status,
+                    "task_priority": task_priority,
+                    "task_assignees": task_assignees,
+                    "task_due_date": task_due_date,
+                    "task_created": task_created,
+                    "task_updated": task_updated,
+                    "indexed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                },
+                summary_metadata={
+                    "task_id": task_id,
+                    "task_name": task_name,
+                    "task_status": task_status,
+                    "task_priority": task_priority,
+                    "task_list": task_list_name,
+                    "task_space": task_space_name,
+                    "assignees": len(task_assignees),
+                    "document_type": "ClickUp Task",
+                    "connector_type": "ClickUp",
+                },
+            )
+
+        # Fetching, summaries, embeddings and writes overlap in a staged pipeline
+        documents_indexed, pipeline_skipped = await index_connector_items(
+            writer,
+            fetch_workspaces(),
+            format_task,
+            search_space_id=search_space_id,
+            connector_id=connector_id,
+            document_type=DocumentType.CLICKUP_CONNECTOR,
+            user_llm=user_llm,
+            session_lock=session_lock,
+        )
+        documents_skipped += pipeline_skipped
 
         total_processed = documents_indexed
 
         if total_processed > 0:
             await update_connector_last_indexed(session, connector, update_last_indexed)
 
+        await writer.flush()
         await session.commit()
 
         await task_logger.log_task_success(
@@ -305,6 +287,9 @@ async def index_clickup_tasks(
         )
         return total_processed, None
 
+    except (ConnectorIndexingError, PermanentJobError):
+        # Already logged where it was raised
+        raise
     except SQLAlchemyError as db_error:
         await session.rollback()
         await task_logger.log_task_failure(
@@ -314,7 +299,7 @@ async def index_clickup_tasks(
             {"error_type": "SQLAlchemyError"},
         )
         logger.error(f"Database error: {db_error!s}", exc_info=True)
-        return 0, f"Database error: {db_error!s}"
+        raise ConnectorIndexingError(f"Database error: {db_error!s}") from db_error
     except Exception as e:
         await session.rollback()
         await task_logger.log_task_failure(
@@ -324,4 +309,4 @@ async def index_clickup_tasks(
             {"error_type": type(e).__name__},
         )
         logger.error(f"Failed to index ClickUp tasks: {e!s}", exc_info=True)
-        return 0, f"Failed to index ClickUp tasks: {e!s}"
+        raise ConnectorIndexingError(f"Failed to index ClickUp tasks: {e!s}") from e
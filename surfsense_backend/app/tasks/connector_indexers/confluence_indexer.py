@@ -7,22 +7,21 @@ from datetime import datetime
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import config
 from app.connectors.confluence_connector import ConfluenceConnector
-from app.db import Document, DocumentType, SearchSourceConnectorType
+from app.db import DocumentType, SearchSourceConnectorType
+from app.services.job_queue import PermanentJobError
 from app.services.llm_service import get_user_long_context_llm
 from app.services.task_logging_service import TaskLoggingService
-from app.utils.document_converters import (
-    create_document_chunks,
-    generate_content_hash,
-    generate_document_summary,
-)
 
 from .base import (
+    ConnectorIndexingError,
+    ConnectorItem,
+    DocumentBatchWriter,
     calculate_date_range,
-    check_duplicate_document_by_hash,
     get_connector_by_id,
+    index_connector_items,
     logger,
+    single_indexing_unit,
     update_connector_last_indexed,
 )
 
@@ -50,6 +49,10 @@ async def index_confluence_pages(
 
     Returns:
         Tuple containing (number of documents indexed, error message or None)
+
+    Raises:
+        PermanentJobError: If the connector is missing or misconfigured
+        ConnectorIndexingError: If the run failed and may succeed when retried
     """
     task_logger = TaskLoggingService(session, search_space_id)
 
@@ -79,7 +82,7 @@ async def index_confluence_pages(
                 "Connector not found",
                 {"error_type": "ConnectorNotFound"},
             )
-            return 0, f"Connector with ID {connector_id} not found"
+            raise PermanentJobError(f"Connector with ID {connector_id} not found")
 
         # Get the Confluence credentials from the connector config
         confluence_email = connector.config.get("CONFLUENCE_EMAIL")
@@ -93,7 +96,9 @@ async def index_confluence_pages(
                 "Missing Confluence credentials",
                 {"error_type": "MissingCredentials"},
             )
-            return 0, "Confluence credentials not found in connector config"
+            raise PermanentJobError(
+                "Confluence credentials not found in connector config"
+            )
 
         # Initialize Confluence client
         await task_logger.log_task_progress(
@@ -159,150 +164,119 @@ async def index_confluence_pages(
                         "API Error",
                         {"error_type": "APIError"},
                     )
-                    return 0, f"Failed to get Confluence pages: {error}"
+                    raise ConnectorIndexingError(
+                        f"Failed to get Confluence pages: {error}"
+                    )
 
             logger.info(f"Retrieved {len(pages)} pages from Confluence API")
 
+        except ConnectorIndexingError:
+            raise
         except Exception as e:
             logger.error(f"Error fetching Confluence pages: {e!s}", exc_info=True)
-            return 0, f"Error fetching Confluence pages: {e!s}"
+            raise ConnectorIndexingError(
+                f"Error fetching Confluence pages: {e!s}"
+            ) from e
 
         # Process and index each page
-        documents_indexed = 0
+        writer = DocumentBatchWriter(session)
         skipped_pages = []
         documents_skipped = 0
+        user_llm = await get_user_long_context_llm(session, user_id)
 
-        for page in pages:
-            try:
-                page_id = page.get("id")
-                page_title = page.get("title", "")
-                space_id = page.get("spaceId", "")
+        def format_page(page) -> ConnectorItem | None:
+            nonlocal documents_skipped
 
-                if not page_id or not page_title:
-                    logger.warning(
-                        f"Skipping page with missing ID or title: {page_id or 'Unknown'}"
+            page_id = page.get("id")
+            page_title = page.get("title", "")
+            if not page_id or not page_title:
+                logger.warning(
+                    f"Skipping page with missing ID or title: {page_id or 'Unknown'}"
+                )
+                skipped_pages.append(f"{page_title or 'Unknown'} (missing data)")
+                documents_skipped += 1
+                return None
+
+            # Extract page content
+            page_content = ""
+            if page.get("body") and page["body"].get("storage"):
+                page_content = page["body"]["storage"].get("value", "")
+
+            # Add comments to content
+            comments = page.get("comments", [])
+            comments_content = ""
+            if comments:
+                comments_content = "\n\n## Comments\n\n"
+                for comment in comments:
+                    comment_body = ""
+                    if comment.get("body") and comment["body"].get("storage"):
+                        comment_body = comment["body"]["storage"].get("value", "")
+
+                    comment_author = comment.get("version", {}).get(
+                        "authorId", "Unknown"
                     )
-                    skipped_pages.append(f"{page_title or 'Unknown'} (missing data)")
-                    documents_skipped += 1
-                    continue
-
-                # Extract page content
-                page_content = ""
-                if page.get("body") and page["body"].get("storage"):
-                    page_content = page["body"]["storage"].get("value", "")
-
-                # Add comments to content
-                comments = page.get("comments", [])
-                comments_content = ""
-                if comments:
-                    comments_content = "\n\n## Comments\n\n"
-                    for comment in comments:
-                        comment_body = ""
-                        if comment.get("body") and comment["body"].get("storage"):
-                            comment_body = comment["body"]["storage"].get("value", "")
-
-                        comment_author = comment.get("version", {}).get(
-                            "authorId", "Unknown"
-                        )
-                        comment_date = comment.get("version", {}).get("createdAt", "")
+                    comment_date = comment.get("version", {}).get("createdAt", "")
 
-                        comments_content += f"**Comment by {comment_author}** ({comment_date}):\n{comment_body}\n\n"
+                    comments_content += f"**Comment by {comment_author}** ({comment_date}):\n{comment_body}\n\n"
 
-                # Combine page content with comments
-                full_content = f"# {page_title}\n\n{page_content}{comments_content}"
+            # Combine page content with comments
+            full_content = f"# {page_title}\n\n{page_content}{comments_content}"
 
-                if not full_content.strip():
-                    logger.warning(f"Skipping page with no content: {page_title}")
-                    skipped_pages.append(f"{page_title} (no content)")
-                    documents_skipped += 1
-                    continue
-
-                # Generate content hash
-                content_hash = generate_content_hash(full_content, search_space_id)
-
-                # Check if document already exists
-                existing_document_by_hash = await check_duplicate_document_by_hash(
-                    session, content_hash
-                )
-
-                if existing_document_by_hash:
-                    logger.info(
-                        f"Document with content hash {content_hash} already exists for page {page_title}. Skipping processing."
-                    )
-                    documents_skipped += 1
-                    continue
-
-                # Generate summary with metadata
-                user_llm = await get_user_long_context_llm(session, user_id)
-                comment_count = len(comments)
-
-                if user_llm:
-                    document_metadata = {
-                        "page_title": page_title,
-                        "page_id": page_id,
-                        "space_id": space_id,
-                        "comment_count": comment_count,
-                        "document_type": "Confluence Page",
-                        "connector_type": "Confluence",
-                    }
-                    (
-                        summary_content,
-                        summary_embedding,
-                    ) = await generate_document_summary(
-                        full_content, user_llm, document_metadata
-                    )
-                else:
-                    # Fallback to simple summary if no LLM configured
-                    summary_content = (
-                        f"Confluence Page: {page_title}\n\nSpace ID: {space_id}\n\n"
-                    )
-                    if page_content:
-                        # Take first 500 characters of content for summary
-                        content_preview = page_content[:500]
-                        if len(page_content) > 500:
-                            content_preview += "..."
-                        summary_content += f"Content Preview: {content_preview}\n\n"
-                    summary_content += f"Comments: {comment_count}"
-                    summary_embedding = config.embedding_model_instance.embed(
-                        summary_content
-                    )
+            if not full_content.strip():
+                logger.warning(f"Skipping page with no content: {page_title}")
+                skipped_pages.append(f"{page_title} (no content)")
+                documents_skipped += 1
+                return None
 
-                # Process chunks - using the full page content with comments
-                chunks = await create_document_chunks(full_content)
-
-                # Create and store new document
-                logger.info(f"Creating new document for page {page_title}")
-                document = Document(
-                    search_space_id=search_space_id,
-                    title=f"Confluence - {page_title}",
-                    document_type=DocumentType.CONFLUENCE_CONNECTOR,
-                    document_metadata={
-                        "page_id": page_id,
-                        "page_title": page_title,
-                        "space_id": space_id,
-                        "comment_count": comment_count,
-                        "indexed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    },
-                    content=summary_content,
-                    content_hash=content_hash,
-                    embedding=summary_embedding,
-                    chunks=chunks,
-                )
+            space_id = page.get("spaceId", "")
+            comment_count = len(comments)
 
-                session.add(document)
-                documents_indexed += 1
-                logger.info(f"Successfully indexed new page {page_title}")
+            # Fallback to simple summary if no LLM configured
+            fallback_summary = (
+                f"Confluence Page: {page_title}\n\nSpace ID: {space_id}\n\n"
+            )
+            if page_content:
+                # Take first 500 characters of content for summary
+                content_preview = page_content[:500]
+                if len(page_content) > 500:
+                    content_preview += "..."
+                fallback_summary += f"Content Preview: {content_preview}\n\n"
+            fallback_summary += f"Comments: {comment_count}"
+
+            return ConnectorItem(
+                title=f"Confluence - {page_title}",
+                content=full_content,
+                external_id=page_id,
+                document_metadata={
+                    "page_id": page_id,
+                    "page_title": page_title,
+                    "space_id": space_id,
+                    "comment_count": comment_count,
+                    "indexed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                },
+                summary_metadata={
+                    "page_title": page_title,
+                    "page_id": page_id,
+                    "space_id": space_id,
+                    "comment_count": comment_count,
+                    "document_type": "Confluence Page",
+                    "connector_type": "Confluence",
+                },
+                fallback_summary=fallback_summary,
+            )
 
-            except Exception as e:
-                logger.error(
-                    f"Error processing page {page.get('title', 'Unknown')}: {e!s}",
-                    exc_info=True,
-                )
-                skipped_pages.append(
-                    f"{page.get('title', 'Unknown')} (processing error)"
-                )
-                documents_skipped += 1
-                continue  # Skip this page and continue with others
+        # Summaries, embeddings and writes overlap in a staged pipeline
+        documents_indexed, pipeline_skipped = await index_connector_items(
+            writer,
+            single_indexing_unit(pages),
+            format_page,
+            search_space_id=search_space_id,
+            connector_id=connector_id,
+            document_type=DocumentType.CONFLUENCE_CONNECTOR,
+            user_llm=user_llm,
+            skipped_items=skipped_pages,
+        )
+        documents_skipped += pipeline_skipped
 
         # Update the last_indexed_at timestamp for the connector only if requested
         total_processed = documents_indexed
@@ -310,6 +284,7 @@ async def index_confluence_pages(
             await update_connector_last_indexed(session, connector, update_last_indexed)
 
         # Commit all changes
+        await writer.flush()
         await session.commit()
         logger.info(
             "Successfully committed all Confluence document changes to database"
@@ -335,6 +310,9 @@ async def index_confluence_pages(
             None,
         )  # Return None as the error message to indicate success
 
+    except (ConnectorIndexingError, PermanentJobError):
+        # Already logged where it was raised
+        raise
     except SQLAlchemyError as db_error:
         await session.rollback()
         await task_logger.log_task_failure(
@@ -344,7 +322,7 @@ async def index_confluence_pages(
             {"error_type": "SQLAlchemyError"},
         )
         logger.error(f"Database error: {db_error!s}", exc_info=True)
-        return 0, f"Database error: {db_error!s}"
+        raise ConnectorIndexingError(f"Database error: {db_error!s}") from db_error
     except Exception as e:
         await session.rollback()
         await task_logger.log_task_failure(
@@ -354,4 +332,4 @@ async def index_confluence_pages(
             {"error_type": type(e).__name__},
         )
         logger.error(f"Failed to index Confluence pages: {e!s}", exc_info=True)
-        return 0, f"Failed to index Confluence pages: {e!s}"
+        raise ConnectorIndexingError(f"Failed to index Confluence pages: {e!s}") from e
@@ -9,19 +9,19 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.connectors.discord_connector import DiscordConnector
-from app.db import Document, DocumentType, SearchSourceConnectorType
+from app.db import DocumentType, SearchSourceConnectorType
+from app.services.job_queue import PermanentJobError
 from app.services.llm_service import get_user_long_context_llm
 from app.services.task_logging_service import TaskLoggingService
-from app.utils.document_converters import (
-    create_document_chunks,
-    generate_content_hash,
-    generate_document_summary,
-)
 
 from .base import (
+    ConnectorIndexingError,
+    ConnectorItem,
+    DocumentBatchWriter,
+    IndexingCheckpoint,
     build_document_metadata_string,
-    check_duplicate_document_by_hash,
     get_connector_by_id,
+    index_connector_items,
     logger,
     update_connector_last_indexed,
 )
@@ -50,6 +50,10 @@ async def index_discord_messages(
 
     Returns:
         Tuple containing (number of documents indexed, error message or None)
+
+    Raises:
+        PermanentJobError: If the connector is missing or misconfigured
+        ConnectorIndexingError: If the run failed and may succeed when retried
     """
     task_logger = TaskLoggingService(session, search_space_id)
 
@@ -85,9 +89,8 @@ async def index_discord_messages(
                 "Connector not found",
                 {"error_type": "ConnectorNotFound"},
             )
-            return (
-                0,
-                f"Connector with ID {connector_id} not found or is not a Discord connector",
+            raise PermanentJobError(
+                f"Connector with ID {connector_id} not found or is not a Discord connector"
             )
 
         # Get the Discord token from the connector config
@@ -99,7 +102,7 @@ async def index_discord_messages(
                 "Missing Discord token",
                 {"error_type": "MissingToken"},
             )
-            return 0, "Discord token not found in connector config"
+            raise PermanentJobError("Discord token not found in connector config")
 
         logger.info(f"Starting Discord indexing for connector {connector_id}")
 
@@ -187,7 +190,7 @@ async def index_discord_messages(
             )
             logger.error(f"Failed to get Discord guilds: {e!s}", exc_info=True)
             await discord_client.close_bot()
-            return 0, f"Failed to get Discord guilds: {e!s}"
+            raise ConnectorIndexingError(f"Failed to get Discord guilds: {e!s}") from e
 
         if not guilds:
             await task_logger.log_task_success(
@@ -199,11 +202,18 @@ async def index_discord_messages(
             await discord_client.close_bot()
             return 0, "No Discord guilds found"
 
-        # Track results
-        documents_indexed = 0
+        writer = DocumentBatchWriter(session)
+        checkpoint = IndexingCheckpoint(
+            connector, start_date_iso, end_date_iso, requested_start_date=start_date
+        )
         documents_skipped = 0
         skipped_channels: list[str] = []
 
+        # Get user's long context LLM
+        user_llm = await get_user_long_context_llm(session, user_id)
+        if not user_llm:
+            logger.error(f"No long context LLM configured for user {user_id}")
+
         # Process each guild and channel
         await task_logger.log_task_progress(
             log_entry,
@@ -211,7 +221,10 @@ async def index_discord_messages(
             {"stage": "process_guilds", "total_guilds": len(guilds)},
         )
 
-        try:
+        async def fetch_channels():
+            """Fetch each channel's messages while earlier channels are indexed."""
+            nonlocal documents_skipped
+
             for guild in guilds:
                 guild_id = guild["id"]
                 guild_name = guild["name"]
@@ -219,184 +232,159 @@ async def index_discord_messages(
 
                 try:
                     channels = await discord_client.get_text_channels(guild_id)
-                    if not channels:
-                        logger.info(
-                            f"No channels found in guild {guild_name}. Skipping."
-                        )
-                        skipped_channels.append(f"{guild_name} (no channels)")
-                        documents_skipped += 1
-                        continue
-
-                    for channel in channels:
-                        channel_id = channel["id"]
-                        channel_name = channel["name"]
+                except Exception as e:
+                    logger.error(
+                        f"Error processing guild {guild_name}: {e!s}", exc_info=True
+                    )
+                    skipped_channels.append(f"{guild_name} (processing error)")
+                    documents_skipped += 1
+                    continue
 
-                        try:
-                            messages = await discord_client.get_channel_history(
-                                channel_id=channel_id,
-                                start_date=start_date_iso,
-                                end_date=end_date_iso,
-                            )
-                        except Exception as e:
-                            logger.error(
-                                f"Failed to get messages for channel {channel_name}: {e!s}"
-                            )
-                            skipped_channels.append(
-                                f"{guild_name}#{channel_name} (fetch error)"
-                            )
-                            documents_skipped += 1
-                            continue
+                if not channels:
+                    logger.info(f"No channels found in guild {guild_name}. Skipping.")
+                    skipped_channels.append(f"{guild_name} (no channels)")
+                    documents_skipped += 1
+                    continue
 
-                        if not messages:
-                            logger.info(
-                                f"No messages found in channel {channel_name} for the specified date range."
-                            )
-                            documents_skipped += 1
-                            continue
-
-                        # Filter/format messages
-                        formatted_messages: list[dict] = []
-                        for msg in messages:
-                            # Optionally skip system messages
-                            if msg.get("type") in ["system"]:
-                                continue
-                            formatted_messages.append(msg)
-
-                        if not formatted_messages:
-                            logger.info(
-                                f"No valid messages found in channel {channel_name} after filtering."
-                            )
-                            documents_skipped += 1
-                            continue
+                for channel in channels:
+                    channel_id = channel["id"]
+                    channel_name = channel["name"]
 
-                        # Convert messages to markdown format
-                        channel_content = (
-                            f"# Discord Channel: {guild_name} / {channel_name}\n\n"
+                    if checkpoint.is_unit_done(channel_id):
+                        logger.info(
+                            f"Channel {guild_name}#{channel_name} was indexed by an interrupted run. Skipping."
                         )
-                        for msg in formatted_messages:
-                            user_name = msg.get("author_name", "Unknown User")
-                            timestamp = msg.get("created_at", "Unknown Time")
-                            text = msg.get("content", "")
-                            channel_content += (
-                                f"## {user_name} ({timestamp})\n\n{text}\n\n---\n\n"
-                            )
+                        continue
 
-                        # Metadata sections
-                        metadata_sections = [
-                            (
-                                "METADATA",
-                                [
-                                    f"GUILD_NAME: {guild_name}",
-                                    f"GUILD_ID: {guild_id}",
-                                    f"CHANNEL_NAME: {channel_name}",
-                                    f"CHANNEL_ID: {channel_id}",
-                                    f"MESSAGE_COUNT: {len(formatted_messages)}",
-                                ],
-                            ),
-                            (
-                                "CONTENT",
-                                [
-                                    "FORMAT: markdown",
-                                    "TEXT_START",
-                                    channel_content,
-                                    "TEXT_END",
-                                ],
-                            ),
-                        ]
-
-                        combined_document_string = build_document_metadata_string(
-                            metadata_sections
-                        )
-                        content_hash = generate_content_hash(
-                            combined_document_string, search_space_id
+                    if not user_llm:
+                        skipped_channels.append(
+                            f"{guild_name}#{channel_name} (no LLM configured)"
                         )
+                        documents_skipped += 1
+                        continue
 
-                        # Skip duplicates by hash
-                        existing_document_by_hash = (
-                            await check_duplicate_document_by_hash(
-                                session, content_hash
-                            )
+                    try:
+                        # Resume where an interrupted run left off
+                        messages = await discord_client.get_channel_history(
+                            channel_id=channel_id,
+                            start_date=checkpoint.unit_start_date(channel_id),
+                            end_date=end_date_iso,
                         )
-                        if existing_document_by_hash:
-                            logger.info(
-                                f"Document with content hash {content_hash} already exists for channel {guild_name}#{channel_name}. Skipping processing."
-                            )
-                            documents_skipped += 1
-                            continue
-
-                        # Get user's long context LLM
-                        user_llm = await get_user_long_context_llm(session, user_id)
-                        if not user_llm:
-                            logger.error(
-                                f"No long context LLM configured for user {user_id}"
-                            )
-                            skipped_channels.append(
-                                f"{guild_name}#{channel_name} (no LLM configured)"
-                            )
-                            documents_skipped += 1
-                            continue
-
-                        # Generate summary with metadata
-                        document_metadata = {
-                            "guild_name": guild_name,
-                            "channel_name": channel_name,
-                            "message_count": len(formatted_messages),
-                            "document_type": "Discord Channel Messages",
-                            "connector_type": "Discord",
-                        }
-                        (
-                            summary_content,
-                            summary_embedding,
-                        ) = await generate_document_summary(
-                            combined_document_string, user_llm, document_metadata
+                    except Exception as e:
+                        logger.error(
+                            f"Failed to get messages for channel {channel_name}: {e!s}"
                         )
-
-                        # Chunks from channel content
-                        chunks = await create_document_chunks(channel_content)
-
-                        # Create and store new document
-                        document = Document(
-                            search_space_id=search_space_id,
-                            title=f"Discord - {guild_name}#{channel_name}",
-                            document_type=DocumentType.DISCORD_CONNECTOR,
-                            document_metadata={
-                                "guild_name": guild_name,
-                                "guild_id": guild_id,
-                                "channel_name": channel_name,
-                                "channel_id": channel_id,
-                                "message_count": len(formatted_messages),
-                                "start_date": start_date_iso,
-                                "end_date": end_date_iso,
-                                "indexed_at": datetime.now(UTC).strftime(
-                                    "%Y-%m-%d %H:%M:%S"
-                                ),
-                            },
-                            content=summary_content,
-                            content_hash=content_hash,
-                            embedding=summary_embedding,
-                            chunks=chunks,
+                        skipped_channels.append(
+                            f"{guild_name}#{channel_name} (fetch error)"
                         )
+                        documents_skipped += 1
+                        continue
 
-                        session.add(document)
-                        documents_indexed += 1
+                    # Filter/format messages, optionally skipping system messages
+                    formatted_messages = [
+                        msg for msg in messages or [] if msg.get("type") != "system"
+                    ]
+                    if not formatted_messages:
                         logger.info(
-                            f"Successfully indexed new channel {guild_name}#{channel_name} with {len(formatted_messages)} messages"
+                            f"No valid messages found in channel {channel_name} for the specified date range."
                         )
+                        documents_skipped += 1
+                        yield channel_id, []
+                        continue
 
-                except Exception as e:
-                    logger.error(
-                        f"Error processing guild {guild_name}: {e!s}", exc_info=True
+                    yield (
+                        channel_id,
+                        [
+                            (
+                                guild_id,
+                                guild_name,
+                                channel_id,
+                                channel_name,
+                                formatted_messages,
+                            )
+                        ],
                     )
-                    skipped_channels.append(f"{guild_name} (processing error)")
-                    documents_skipped += 1
-                    continue
+
+        def format_channel(raw_item) -> ConnectorItem:
+            guild_id, guild_name, channel_id, channel_name, messages = raw_item
+
+            # Convert messages to markdown format
+            channel_content = f"# Discord Channel: {guild_name} / {channel_name}\n\n"
+            for msg in messages:
+                user_name = msg.get("author_name", "Unknown User")
+                timestamp = msg.get("created_at", "Unknown Time")
+                text = msg.get("content", "")
+                channel_content += f"## {user_name} ({timestamp})\n\n{text}\n\n---\n\n"
+
+            # Metadata sections
+            metadata_sections = [
+                (
+                    "METADATA",
+                    [
+                        f"GUILD_NAME: {guild_name}",
+                        f"GUILD_ID: {guild_id}",
+                        f"CHANNEL_NAME: {channel_name}",
+                        f"CHANNEL_ID: {channel_id}",
+                        f"MESSAGE_COUNT: {len(messages)}",
+                    ],
+                ),
+                (
+                    "CONTENT",
+                    [
+                        "FORMAT: markdown",
+                        "TEXT_START",
+                        channel_content,
+                        "TEXT_END",
+                    ],
+                ),
+            ]
+
+            return ConnectorItem(
+                title=f"Discord - {guild_name}#{channel_name}",
+                content=build_document_metadata_string(metadata_sections),
+                chunk_content=channel_content,
+                document_metadata={
+                    "guild_name": guild_name,
+                    "guild_id": guild_id,
+                    "channel_name": channel_name,
+                    "channel_id": channel_id,
+                    "message_count": len(messages),
+                    "start_date": start_date_iso,
+                    "end_date": end_date_iso,
+                    "indexed_at": datetime.now(UTC).strftime("%Y-%m-%d %H:%M:%S"),
+                },
+                summary_metadata={
+                    "guild_name": guild_name,
+                    "channel_name": channel_name,
+                    "message_count": len(messages),
+                    "document_type": "Discord Channel Messages",
+                    "connector_type": "Discord",
+                },
+            )
+
+        # Fetching, summarising and writing overlap in a staged pipeline
+        try:
+            documents_indexed, pipeline_skipped = await index_connector_items(
+                writer,
+                fetch_channels(),
+                format_channel,
+                search_space_id=search_space_id,
+                connector_id=connector_id,
+                document_type=DocumentType.DISCORD_CONNECTOR,
+                user_llm=user_llm,
+                checkpoint=checkpoint,
+                skipped_items=skipped_channels,
+            )
         finally:
             await discord_client.close_bot()
+        documents_skipped += pipeline_skipped
 
         # Update last_indexed_at only if we indexed at least one
         if documents_indexed > 0:
             await update_connector_last_indexed(session, connector, update_last_indexed)
 
+        checkpoint.clear()
+        await writer.flush()
         await session.commit()
 
         # Prepare result message
@@ -428,6 +416,9 @@ async def index_discord_messages(
         )
         return documents_indexed, result_message
 
+    except (ConnectorIndexingError, PermanentJobError):
+        # Already logged where it was raised
+        raise
     except SQLAlchemyError as db_error:
         await session.rollback()
         await task_logger.log_task_failure(
@@ -437,7 +428,7 @@ async def index_discord_messages(
             {"error_type": "SQLAlchemyError"},
         )
         logger.error(f"Database error: {db_error!s}", exc_info=True)
-        return 0, f"Database error: {db_error!s}"
+        raise ConnectorIndexingError(f"Database error: {db_error!s}") from db_error
     except Exception as e:
         await session.rollback()
         await task_logger.log_task_failure(
@@ -447,4 +438,4 @@ async def index_discord_messages(
             {"error_type": type(e).__name__},
         )
         logger.error(f"Failed to index Discord messages: {e!s}", exc_info=True)
-        return 0, f"Failed to index Discord messages: {e!s}"
+        raise ConnectorIndexingError(f"Failed to index Discord messages: {e!s}") from e
@@ -2,6 +2,7 @@
 GitHub connector indexer.
 """
 
+import asyncio
 from datetime import UTC, datetime
 
 from sqlalchemy.exc import SQLAlchemyError
@@ -9,18 +10,18 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import config
 from app.connectors.github_connector import GitHubConnector
-from app.db import Document, DocumentType, SearchSourceConnectorType
+from app.db import DocumentType, SearchSourceConnectorType
+from app.services.job_queue import PermanentJobError
 from app.services.llm_service import get_user_long_context_llm
 from app.services.task_logging_service import TaskLoggingService
-from app.utils.document_converters import (
-    create_document_chunks,
-    generate_content_hash,
-    generate_document_summary,
-)
 
 from .base import (
-    check_duplicate_document_by_hash,
+    ConnectorIndexingError,
+    ConnectorItem,
+    DocumentBatchWriter,
+    IndexingCheckpoint,
     get_connector_by_id,
+    index_connector_items,
     logger,
 )
 
@@ -48,6 +49,10 @@ async def index_github_repos(
 
     Returns:
         Tuple containing (number of documents indexed, error message or None)
+
+    Raises:
+        PermanentJobError: If the connector is missing or misconfigured
+        ConnectorIndexingError: If the run failed and may succeed when retried
     """
     task_logger = TaskLoggingService(session, search_space_id)
 
@@ -65,6 +70,7 @@ async def index_github_repos(
     )
 
     documents_processed = 0
+    writer = DocumentBatchWriter(session)
     errors = []
 
     try:
@@ -86,9 +92,8 @@ async def index_github_repos(
                 "Connector not found",
                 {"error_type": "ConnectorNotFound"},
             )
-            return (
-                0,
-                f"Connector with ID {connector_id} not found or is not a GitHub connector",
+            raise PermanentJobError(
+                f"Connector with ID {connector_id} not found or is not a GitHub connector"
             )
 
         # 2. Get the GitHub PAT and selected repositories from the connector config
@@ -102,7 +107,9 @@ async def index_github_repos(
                 "Missing GitHub PAT",
                 {"error_type": "MissingToken"},
             )
-            return 0, "GitHub Personal Access Token (PAT) not found in connector config"
+            raise PermanentJobError(
+                "GitHub Personal Access Token (PAT) not found in connector config"
+            )
 
         if not repo_full_names_to_index or not isinstance(
             repo_full_names_to_index, list
@@ -113,7 +120,9 @@ async def index_github_repos(
                 "Invalid repo configuration",
                 {"error_type": "InvalidConfiguration"},
             )
-            return 0, "'repo_full_names' not found or is not a list in connector config"
+            raise PermanentJobError(
+                "'repo_full_names' not found or is not a list in connector config"
+            )
 
         # 3. Initialize GitHub connector client
         await task_logger.log_task_progress(
@@ -134,7 +143,7 @@ async def index_github_repos(
                 str(e),
                 {"error_type": "ClientInitializationError"},
             )
-            return 0, f"Failed to initialize GitHub client: {e!s}"
+            raise PermanentJobError(f"Failed to initialize GitHub client: {e!s}") from e
 
         # 4. Validate selected repositories
         await task_logger.log_task_progress(
@@ -157,151 +166,124 @@ async def index_github_repos(
             )
 
         # 6. Iterate through selected repositories and index files
-        for repo_full_name in repo_full_names_to_index:
-            if not repo_full_name or not isinstance(repo_full_name, str):
-                logger.warning(f"Skipping invalid repository entry: {repo_full_name}")
-                continue
-
-            logger.info(f"Processing repository: {repo_full_name}")
-            try:
-                files_to_index = github_client.get_repository_files(repo_full_name)
-                if not files_to_index:
-                    logger.info(
-                        f"No indexable files found in repository: {repo_full_name}"
+        checkpoint = IndexingCheckpoint(connector, requested_start_date=start_date)
+        user_llm = await get_user_long_context_llm(session, user_id)
+        code_chunker = getattr(config, "code_chunker_instance", None)
+
+        async def fetch_repositories():
+            """Fetch each repository's files while earlier ones are indexed."""
+            for repo_full_name in repo_full_names_to_index:
+                if not repo_full_name or not isinstance(repo_full_name, str):
+                    logger.warning(
+                        f"Skipping invalid repository entry: {repo_full_name}"
                     )
                     continue
 
-                logger.info(
-                    f"Found {len(files_to_index)} files to process in {repo_full_name}"
-                )
-
-                for file_info in files_to_index:
-                    file_path = file_info.get("path")
-                    file_url = file_info.get("url")
-                    file_sha = file_info.get("sha")
-                    file_type = file_info.get("type")  # 'code' or 'doc'
-                    full_path_key = f"{repo_full_name}/{file_path}"
-
-                    if not file_path or not file_url or not file_sha:
-                        logger.warning(
-                            f"Skipping file with missing info in {repo_full_name}: {file_info}"
-                        )
-                        continue
-
-                    # Get file content
-                    file_content = github_client.get_file_content(
-                        repo_full_name, file_path
+                if checkpoint.is_unit_done(repo_full_name):
+                    logger.info(
+                        f"Repository {repo_full_name} was indexed by an interrupted run. Skipping."
                     )
+                    continue
 
-                    if file_content is None:
-                        logger.warning(
-                            f"Could not retrieve content for {full_path_key}. Skipping."
-                        )
-                        continue  # Skip if content fetch failed
-
-                    content_hash = generate_content_hash(file_content, search_space_id)
-
-                    # Check if document with this content hash already exists
-                    existing_document_by_hash = await check_duplicate_document_by_hash(
-                        session, content_hash
+                logger.info(f"Processing repository: {repo_full_name}")
+                files = []
+                try:
+                    files_to_index = await asyncio.to_thread(
+                        github_client.get_repository_files, repo_full_name
                     )
-
-                    if existing_document_by_hash:
+                    if not files_to_index:
                         logger.info(
-                            f"Document with content hash {content_hash} already exists for file {full_path_key}. Skipping processing."
-                        )
-                        continue
-
-                    # Generate summary with metadata
-                    user_llm = await get_user_long_context_llm(session, user_id)
-                    if user_llm:
-                        # Extract file extension from file path
-                        file_extension = (
-                            file_path.split(".")[-1] if "." in file_path else None
-                        )
-                        document_metadata = {
-                            "file_path": full_path_key,
-                            "repository": repo_full_name,
-                            "file_type": file_extension or "unknown",
-                            "document_type": "GitHub Repository File",
-                            "connector_type": "GitHub",
-                        }
-                        (
-                            summary_content,
-                            summary_embedding,
-                        ) = await generate_document_summary(
-                            file_content, user_llm, document_metadata
+                            f"No indexable files found in repository: {repo_full_name}"
                         )
                     else:
-                        # Fallback to simple summary if no LLM configured
-                        summary_content = (
-                            f"GitHub file: {full_path_key}\n\n{file_content[:1000]}..."
-                        )
-                        summary_embedding = config.embedding_model_instance.embed(
-                            summary_content
+                        logger.info(
+                            f"Found {len(files_to_index)} files to process in {repo_full_name}"
                         )
 
-                    # Chunk the content
-                    try:
-                        chunks_data = [await create_document_chunks(file_content)][0]
-
-                        # Use code chunker if available, otherwise regular chunker
-                        if hasattr(config, "code_chunker_instance"):
-                            chunks_data = [
-                                {
-                                    "content": chunk.text,
-                                    "embedding": config.embedding_model_instance.embed(
-                                        chunk.text
-                                    ),
-                                }
-                                for chunk in config.code_chunker_instance.chunk(
-                                    file_content
-                                )
-                            ]
-                        else:
-                            chunks_data = await create_document_chunks(file_content)
-
-                    except Exception as chunk_err:
-                        logger.error(
-                            f"Failed to chunk file {full_path_key}: {chunk_err}"
-                        )
-                        errors.append(
-                            f"Chunking failed for {full_path_key}: {chunk_err}"
+                    for file_info in files_to_index or []:
+                        file_path = file_info.get("path")
+                        full_path_key = f"{repo_full_name}/{file_path}"
+
+                        if (
+                            not file_path
+                            or not file_info.get("url")
+                            or not file_info.get("sha")
+                        ):
+                            logger.warning(
+                                f"Skipping file with missing info in {repo_full_name}: {file_info}"
+                            )
+                            continue
+
+                        # Get file content
+                        file_content = await asyncio.to_thread(
+                            github_client.get_file_content, repo_full_name, file_path
                         )
-                        continue  # Skip this file if chunking fails
-
-                    doc_metadata = {
-                        "repository_full_name": repo_full_name,
-                        "file_path": file_path,
-                        "full_path": full_path_key,  # For easier lookup
-                        "url": file_url,
-                        "sha": file_sha,
-                        "type": file_type,
-                        "indexed_at": datetime.now(UTC).isoformat(),
-                    }
-
-                    # Create new document
-                    logger.info(f"Creating new document for file: {full_path_key}")
-                    document = Document(
-                        title=f"GitHub - {file_path}",
-                        document_type=DocumentType.GITHUB_CONNECTOR,
-                        document_metadata=doc_metadata,
-                        content=summary_content,  # Store summary
-                        content_hash=content_hash,
-                        embedding=summary_embedding,
-                        search_space_id=search_space_id,
-                        chunks=chunks_data,  # Associate chunks directly
+                        if file_content is None:
+                            logger.warning(
+                                f"Could not retrieve content for {full_path_key}. Skipping."
+                            )
+                            continue  # Skip if content fetch failed
+
+                        files.append((repo_full_name, file_info, file_content))
+                except Exception as repo_err:
+                    logger.error(
+                        f"Failed to process repository {repo_full_name}: {repo_err}"
                     )
-                    session.add(document)
-                    documents_processed += 1
+                    errors.append(f"Failed processing {repo_full_name}: {repo_err}")
+                    continue
 
-            except Exception as repo_err:
-                logger.error(
-                    f"Failed to process repository {repo_full_name}: {repo_err}"
-                )
-                errors.append(f"Failed processing {repo_full_name}: {repo_err}")
+                yield repo_full_name, files
+
+        def format_file(raw_item) -> ConnectorItem:
+            repo_full_name, file_info, file_content = raw_item
+            file_path = file_info["path"]
+            full_path_key = f"{repo_full_name}/{file_path}"
+            # Extract file extension from file path
+            file_extension = file_path.split(".")[-1] if "." in file_path else None
+
+            return ConnectorItem(
+                title=f"GitHub - {file_path}",
+                content=file_content,
+                external_id=full_path_key,
+                document_metadata={
+                    "repository_full_name": repo_full_name,
+                    "file_path": file_path,
+                    "full_path": full_path_key,  # For easier lookup
+                    "url": file_info["url"],
+                    "sha": file_info["sha"],
+                    "type": file_info.get("type"),  # 'code' or 'doc'
+                    "indexed_at": datetime.now(UTC).isoformat(),
+                },
+                summary_metadata={
+                    "file_path": full_path_key,
+                    "repository": repo_full_name,
+                    "file_type": file_extension or "unknown",
+                    "document_type": "GitHub Repository File",
+                    "connector_type": "GitHub",
+                },
+                # Fallback to simple summary if no LLM configured
+                fallback_summary=f"GitHub file: {full_path_key}\n\n{file_content[:1000]}...",
+                # Use code chunker if available, otherwise regular chunker
+                chunker=code_chunker,
+            )
+
+        # Fetching, summarising and writing overlap in a staged pipeline; files that
+        # failed are listed in errors and retried if this run is resumed
+        documents_processed, _ = await index_connector_items(
+            writer,
+            fetch_repositories(),
+            format_file,
+            search_space_id=search_space_id,
+            connector_id=connector_id,
+            document_type=DocumentType.GITHUB_CONNECTOR,
+            user_llm=user_llm,
+            checkpoint=checkpoint,
+            skipped_items=errors,
+        )
 
         # Commit all changes at the end
+        checkpoint.clear()
+        await writer.flush()
         await session.commit()
         logger.info(
             f"Finished GitHub indexing for connector {connector_id}. Processed {documents_processed} files."
@@ -318,6 +300,9 @@ async def index_github_repos(
             },
         )
 
+    except (ConnectorIndexingError, PermanentJobError):
+        # Already logged where it was raised
+        raise
     except SQLAlchemyError as db_err:
         await session.rollback()
         await task_logger.log_task_failure(
@@ -330,7 +315,7 @@ async def index_github_repos(
             f"Database error during GitHub indexing for connector {connector_id}: {db_err}"
         )
         errors.append(f"Database error: {db_err}")
-        return documents_processed, "; ".join(errors) if errors else str(db_err)
+        raise ConnectorIndexingError("; ".join(errors)) from db_err
     except Exception as e:
         await session.rollback()
         await task_logger.log_task_failure(
@@ -344,7 +329,7 @@ async def index_github_repos(
             exc_info=True,
         )
         errors.append(f"Unexpected error: {e}")
-        return documents_processed, "; ".join(errors) if errors else str(e)
+        raise ConnectorIndexingError("; ".join(errors)) from e
 
     error_message = "; ".join(errors) if errors else None
     return documents_processed, error_message
@@ -8,20 +8,20 @@ from google.oauth2.credentials import Credentials
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import config
 from app.connectors.google_calendar_connector import GoogleCalendarConnector
-from app.db import Document, DocumentType, SearchSourceConnectorType
+from app.db import DocumentType, SearchSourceConnectorType
+from app.services.job_queue import PermanentJobError
 from app.services.llm_service import get_user_long_context_llm
 from app.services.task_logging_service import TaskLoggingService
-from app.utils.document_converters import (
-    create_document_chunks,
-    generate_content_hash,
-    generate_document_summary,
-)
 
 from .base import (
+    ConnectorIndexingError,
+    ConnectorItem,
+    DocumentBatchWriter,
     get_connector_by_id,
+    index_connector_items,
     logger,
+    single_indexing_unit,
     update_connector_last_indexed,
 )
 
@@ -49,6 +49,10 @@ async def index_google_calendar_events(
 
     Returns:
         Tuple containing (number of documents indexed, error message or None)
+
+    Raises:
+        PermanentJobError: If the connector is missing or misconfigured
+        ConnectorIndexingError: If the run failed and may succeed when retried
     """
     task_logger = TaskLoggingService(session, search_space_id)
 
@@ -78,7 +82,7 @@ async def index_google_calendar_events(
                 "Connector not found",
                 {"error_type": "ConnectorNotFound"},
             )
-            return 0, f"Connector with ID {connector_id} not found"
+            raise PermanentJobError(f"Connector with ID {connector_id} not found")
 
         # Get the Google Calendar credentials from the connector config
         exp = connector.config.get("expiry").replace("Z", "")
@@ -103,7 +107,9 @@ async def index_google_calendar_events(
                 "Missing Google Calendar credentials",
                 {"error_type": "MissingCredentials"},
             )
-            return 0, "Google Calendar credentials not found in connector config"
+            raise PermanentJobError(
+                "Google Calendar credentials not found in connector config"
+            )
 
         # Initialize Google Calendar client
         await task_logger.log_task_progress(
@@ -207,137 +213,108 @@ async def index_google_calendar_events(
                         "API Error",
                         {"error_type": "APIError"},
                     )
-                    return 0, f"Failed to get Google Calendar events: {error}"
+                    raise ConnectorIndexingError(
+                        f"Failed to get Google Calendar events: {error}"
+                    )
 
             logger.info(f"Retrieved {len(events)} events from Google Calendar API")
 
+        except ConnectorIndexingError:
+            raise
         except Exception as e:
             logger.error(f"Error fetching Google Calendar events: {e!s}", exc_info=True)
-            return 0, f"Error fetching Google Calendar events: {e!s}"
+            raise ConnectorIndexingError(
+                f"Error fetching Google Calendar events: {e!s}"
+            ) from e
 
-        documents_indexed = 0
+        writer = DocumentBatchWriter(session)
         documents_skipped = 0
         skipped_events = []
+        user_llm = await get_user_long_context_llm(session, user_id)
 
-        for event in events:
-            try:
-                event_id = event.get("id")
-                event_summary = event.get("summary", "No Title")
-                calendar_id = event.get("calendarId", "")
-
-                if not event_id:
-                    logger.warning(f"Skipping event with missing ID: {event_summary}")
-                    skipped_events.append(f"{event_summary} (missing ID)")
-                    documents_skipped += 1
-                    continue
-
-                event_markdown = calendar_client.format_event_to_markdown(event)
-                if not event_markdown.strip():
-                    logger.warning(f"Skipping event with no content: {event_summary}")
-                    skipped_events.append(f"{event_summary} (no content)")
-                    documents_skipped += 1
-                    continue
-
-                start = event.get("start", {})
-                end = event.get("end", {})
-                start_time = start.get("dateTime") or start.get("date", "")
-                end_time = end.get("dateTime") or end.get("date", "")
-                location = event.get("location", "")
-                description = event.get("description", "")
-
-                content_hash = generate_content_hash(event_markdown, search_space_id)
-
-                # Duplicate check via simple query using helper in base
-                from .base import (
-                    check_duplicate_document_by_hash,  # local import to avoid circular at module import
-                )
+        def format_event(event) -> ConnectorItem | None:
+            nonlocal documents_skipped
 
-                existing_document_by_hash = await check_duplicate_document_by_hash(
-                    session, content_hash
-                )
-                if existing_document_by_hash:
-                    logger.info(
-                        f"Document with content hash {content_hash} already exists for event {event_summary}. Skipping processing."
-                    )
-                    documents_skipped += 1
-                    continue
-
-                # Generate summary with metadata
-                user_llm = await get_user_long_context_llm(session, user_id)
-
-                if user_llm:
-                    document_metadata = {
-                        "event_id": event_id,
-                        "event_summary": event_summary,
-                        "calendar_id": calendar_id,
-                        "start_time": start_time,
-                        "end_time": end_time,
-                        "location": location or "No location",
-                        "document_type": "Google Calendar Event",
-                        "connector_type": "Google Calendar",
-                    }
-                    (
-                        summary_content,
-                        summary_embedding,
-                    ) = await generate_document_summary(
-                        event_markdown, user_llm, document_metadata
-                    )
-                else:
-                    # Fallback to simple summary if no LLM configured
-                    summary_content = f"Google Calendar Event: {event_summary}\n\n"
-                    summary_content += f"Calendar: {calendar_id}\n"
-                    summary_content += f"Start: {start_time}\n"
-                    summary_content += f"End: {end_time}\n"
-                    if location:
-                        summary_content += f"Location: {location}\n"
-                    if description:
-                        desc_preview = description[:300]
-                        if len(description) > 300:
-                            desc_preview += "..."
-                        summary_content += f"Description: {desc_preview}\n"
-                    summary_embedding = config.embedding_model_instance.embed(
-                        summary_content
-                    )
-                chunks = await create_document_chunks(event_markdown)
-
-                document = Document(
-                    search_space_id=search_space_id,
-                    title=f"Calendar Event - {event_summary}",
-                    document_type=DocumentType.GOOGLE_CALENDAR_CONNECTOR,
-                    document_metadata={
-                        "event_id": event_id,
-                        "event_summary": event_summary,
-                        "calendar_id": calendar_id,
-                        "start_time": start_time,
-                        "end_time": end_time,
-                        "location": location,
-                        "indexed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    },
-                    content=summary_content,
-                    content_hash=content_hash,
-                    embedding=summary_embedding,
-                    chunks=chunks,
-                )
-
-                session.add(document)
-                documents_indexed += 1
-                logger.info(f"Successfully indexed new event {event_summary}")
+            event_id = event.get("id")
+            event_summary = event.get("summary", "No Title")
+            if not event_id:
+                logger.warning(f"Skipping event with missing ID: {event_summary}")
+                skipped_events.append(f"{event_summary} (missing ID)")
+                documents_skipped += 1
+                return None
 
-            except Exception as e:
-                logger.error(
-                    f"Error processing event {event.get('summary', 'Unknown')}: {e!s}",
-                    exc_info=True,
-                )
-                skipped_events.append(
-                    f"{event.get('summary', 'Unknown')} (processing error)"
-                )
+            event_markdown = calendar_client.format_event_to_markdown(event)
+            if not event_markdown.strip():
+                logger.warning(f"Skipping event with no content: {event_summary}")
+                skipped_events.append(f"{event_summary} (no content)")
                 documents_skipped += 1
-                continue
+                return None
+
+            calendar_id = event.get("calendarId", "")
+            start = event.get("start", {})
+            end = event.get("end", {})
+            start_time = start.get("dateTime") or start.get("date", "")
+            end_time = end.get("dateTime") or end.get("date", "")
+            location = event.get("location", "")
+            description = event.get("description", "")
+
+            # Fallback to simple summary if no LLM configured
+            fallback_summary = f"Google Calendar Event: {event_summary}\n\n"
+            fallback_summary += f"Calendar: {calendar_id}\n"
+            fallback_summary += f"Start: {start_time}\n"
+            fallback_summary += f"End: {end_time}\n"
+            if location:
+                fallback_summary += f"Location: {location}\n"
+            if description:
+                desc_preview = description[:300]
+                if len(description) > 300:
+                    desc_preview += "..."
+                fallback_summary += f"Description: {desc_preview}\n"
+
+            return ConnectorItem(
+                title=f"Calendar Event - {event_summary}",
+                content=event_markdown,
+                external_id=event_id,
+                document_metadata={
+                    "event_id": event_id,
+                    "event_summary": event_summary,
+                    "calendar_id": calendar_id,
+                    "start_time": start_time,
+                    "end_time": end_time,
+                    "location": location,
+                    "indexed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                },
+                summary_metadata={
+                    "event_id": event_id,
+                    "event_summary": event_summary,
+                    "calendar_id": calendar_id,
+                    "start_time": start_time,
+                    "end_time": end_time,
+                    "location": location or "No location",
+                    "document_type": "Google Calendar Event",
+                    "connector_type": "Google Calendar",
+                },
+                fallback_summary=fallback_summary,
+            )
+
+        # Summaries, embeddings and writes overlap in a staged pipeline
+        documents_indexed, pipeline_skipped = await index_connector_items(
+            writer,
+            single_indexing_unit(events),
+            format_event,
+            search_space_id=search_space_id,
+            connector_id=connector_id,
+            document_type=DocumentType.GOOGLE_CALENDAR_CONNECTOR,
+            user_llm=user_llm,
+            skipped_items=skipped_events,
+        )
+        documents_skipped += pipeline_skipped
 
         total_processed = documents_indexed
         if total_processed > 0:
             await update_connector_last_indexed(session, connector, update_last_indexed)
 
+        await writer.flush()
         await session.commit()
 
         await task_logger.log_task_success(
@@ -356,6 +333,9 @@ async def index_google_calendar_events(
         )
         return total_processed, None
 
+    except (ConnectorIndexingError, PermanentJobError):
+        # Already logged where it was raised
+        raise
     except SQLAlchemyError as db_error:
         await session.rollback()
         await task_logger.log_task_failure(
@@ -365,7 +345,7 @@ async def index_google_calendar_events(
             {"error_type": "SQLAlchemyError"},
         )
         logger.error(f"Database error: {db_error!s}", exc_info=True)
-        return 0, f"Database error: {db_error!s}"
+        raise ConnectorIndexingError(f"Database error: {db_error!s}") from db_error
     except Exception as e:
         await session.rollback()
         await task_logger.log_task_failure(
@@ -375,4 +355,6 @@ async def index_google_calendar_events(
             {"error_type": type(e).__name__},
         )
         logger.error(f"Failed to index Google Calendar events: {e!s}", exc_info=True)
-        return 0, f"Failed to index Google Calendar events: {e!s}"
+        raise ConnectorIndexingError(
+            f"Failed to index Google Calendar events: {e!s}"
+        ) from e
@@ -8,25 +8,23 @@ from google.oauth2.credentials import Credentials
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import config
 from app.connectors.google_gmail_connector import GoogleGmailConnector
 from app.db import (
-    Document,
     DocumentType,
     SearchSourceConnectorType,
 )
+from app.services.job_queue import PermanentJobError
 from app.services.llm_service import get_user_long_context_llm
 from app.services.task_logging_service import TaskLoggingService
-from app.utils.document_converters import (
-    create_document_chunks,
-    generate_content_hash,
-    generate_document_summary,
-)
 
 from .base import (
-    check_duplicate_document_by_hash,
+    ConnectorIndexingError,
+    ConnectorItem,
+    DocumentBatchWriter,
     get_connector_by_id,
+    index_connector_items,
     logger,
+    single_indexing_unit,
     update_connector_last_indexed,
 )
 
@@ -56,6 +54,10 @@ async def index_google_gmail_messages(
 
     Returns:
         Tuple of (number_of_indexed_messages, status_message)
+
+    Raises:
+        PermanentJobError: If the connector is missing or misconfigured
+        ConnectorIndexingError: If the run failed and may succeed when retried
     """
     task_logger = TaskLoggingService(session, search_space_id)
 
@@ -91,7 +93,7 @@ async def index_google_gmail_messages(
             await task_logger.log_task_failure(
                 log_entry, error_msg, {"error_type": "ConnectorNotFound"}
             )
-            return 0, error_msg
+            raise PermanentJobError(error_msg)
 
         # Create credentials from connector config
         config_data = connector.config
@@ -117,7 +119,9 @@ async def index_google_gmail_messages(
                 "Missing Google gmail credentials",
                 {"error_type": "MissingCredentials"},
             )
-            return 0, "Google gmail credentials not found in connector config"
+            raise PermanentJobError(
+                "Google gmail credentials not found in connector config"
+            )
 
         # Initialize Google gmail client
         await task_logger.log_task_progress(
@@ -139,7 +143,7 @@ async def index_google_gmail_messages(
             await task_logger.log_task_failure(
                 log_entry, f"Failed to fetch messages: {error}", {}
             )
-            return 0, f"Failed to fetch Gmail messages: {error}"
+            raise ConnectorIndexingError(f"Failed to fetch Gmail messages: {error}")
 
         if not messages:
             success_msg = "No Google gmail messages found in the specified date range"
@@ -150,125 +154,92 @@ async def index_google_gmail_messages(
 
         logger.info(f"Found {len(messages)} Google gmail messages to index")
 
-        documents_indexed = 0
+        writer = DocumentBatchWriter(session)
         skipped_messages = []
         documents_skipped = 0
-        for message in messages:
-            try:
-                # Extract message information
-                message_id = message.get("id", "")
-                thread_id = message.get("threadId", "")
-
-                # Extract headers for subject and sender
-                payload = message.get("payload", {})
-                headers = payload.get("headers", [])
-
-                subject = "No Subject"
-                sender = "Unknown Sender"
-                date_str = "Unknown Date"
-
-                for header in headers:
-                    name = header.get("name", "").lower()
-                    value = header.get("value", "")
-                    if name == "subject":
-                        subject = value
-                    elif name == "from":
-                        sender = value
-                    elif name == "date":
-                        date_str = value
-
-                if not message_id:
-                    logger.warning(f"Skipping message with missing ID: {subject}")
-                    skipped_messages.append(f"{subject} (missing ID)")
-                    documents_skipped += 1
-                    continue
-
-                # Format message to markdown
-                markdown_content = gmail_connector.format_message_to_markdown(message)
-
-                if not markdown_content.strip():
-                    logger.warning(f"Skipping message with no content: {subject}")
-                    skipped_messages.append(f"{subject} (no content)")
-                    documents_skipped += 1
-                    continue
-
-                # Generate content hash
-                content_hash = generate_content_hash(markdown_content, search_space_id)
-
-                # Check if document already exists
-                existing_document_by_hash = await check_duplicate_document_by_hash(
-                    session, content_hash
-                )
-
-                if existing_document_by_hash:
-                    logger.info(
-                        f"Document with content hash {content_hash} already exists for message {message_id}. Skipping processing."
-                    )
-                    documents_skipped += 1
-                    continue
-
-                # Generate summary with metadata
-                user_llm = await get_user_long_context_llm(session, user_id)
-
-                if user_llm:
-                    document_metadata = {
-                        "message_id": message_id,
-                        "thread_id": thread_id,
-                        "subject": subject,
-                        "sender": sender,
-                        "date": date_str,
-                        "document_type": "Gmail Message",
-                        "connector_type": "Google Gmail",
-                    }
-                    (
-                        summary_content,
-                        summary_embedding,
-                    ) = await generate_document_summary(
-                        markdown_content, user_llm, document_metadata
-                    )
-                else:
-                    # Fallback to simple summary if no LLM configured
-                    summary_content = f"Google Gmail Message: {subject}\n\n"
-                    summary_content += f"Sender: {sender}\n"
-                    summary_content += f"Date: {date_str}\n"
-                    summary_embedding = config.embedding_model_instance.embed(
-                        summary_content
-                    )
-
-                # Process chunks
-                chunks = await create_document_chunks(markdown_content)
-
-                # Create and store new document
-                logger.info(f"Creating new document for Gmail message: {subject}")
-                document = Document(
-                    search_space_id=search_space_id,
-                    title=f"Gmail: {subject}",
-                    document_type=DocumentType.GOOGLE_GMAIL_CONNECTOR,
-                    document_metadata={
-                        "message_id": message_id,
-                        "thread_id": thread_id,
-                        "subject": subject,
-                        "sender": sender,
-                        "date": date_str,
-                        "connector_id": connector_id,
-                    },
-                    content=summary_content,
-                    content_hash=content_hash,
-                    embedding=summary_embedding,
-                    chunks=chunks,
-                )
-                session.add(document)
-                documents_indexed += 1
-                logger.info(f"Successfully indexed new email {summary_content}")
-
-            except Exception as e:
-                logger.error(
-                    f"Error processing the email {message_id}: {e!s}",
-                    exc_info=True,
-                )
-                skipped_messages.append(f"{subject} (processing error)")
+        user_llm = await get_user_long_context_llm(session, user_id)
+
+        def format_message(message) -> ConnectorItem | None:
+            nonlocal documents_skipped
+
+            # Extract message information
+            message_id = message.get("id", "")
+            thread_id = message.get("threadId", "")
+
+            # Extract headers for subject and sender
+            payload = message.get("payload", {})
+            headers = payload.get("headers", [])
+
+            subject = "No Subject"
+            sender = "Unknown Sender"
+            date_str = "Unknown Date"
+
+            for header in headers:
+                name = header.get("name", "").lower()
+                value = header.get("value", "")
+                if name == "subject":
+                    subject = value
+                elif name == "from":
+                    sender = value
+                elif name == "date":
+                    date_str = value
+
+            if not message_id:
+                logger.warning(f"Skipping message with missing ID: {subject}")
+                skipped_messages.append(f"{subject} (missing ID)")
                 documents_skipped += 1
-                continue  # Skip this message and continue with others
+                return None
+
+            # Format message to markdown
+            markdown_content = gmail_connector.format_message_to_markdown(message)
+
+            if not markdown_content.strip():
+                logger.warning(f"Skipping message with no content: {subject}")
+                skipped_messages.append(f"{subject} (no content)")
+                documents_skipped += 1
+                return None
+
+            # Fallback to simple summary if no LLM configured
+            fallback_summary = f"Google Gmail Message: {subject}\n\n"
+            fallback_summary += f"Sender: {sender}\n"
+            fallback_summary += f"Date: {date_str}\n"
+
+            return ConnectorItem(
+                title=f"Gmail: {subject}",
+                content=markdown_content,
+                external_id=message_id,
+                document_metadata={
+                    "message_id": message_id,
+                    "thread_id": thread_id,
+                    "subject": subject,
+                    "sender": sender,
+                    "date": date_str,
+                    "connector_id": connector_id,
+                },
+                summary_metadata={
+                    "message_id": message_id,
+                    "thread_id": thread_id,
+                    "subject": subject,
+                    "sender": sender,
+                    "date": date_str,
+                    "document_type": "Gmail Message",
+                    "connector_type": "Google Gmail",
+                },
+                fallback_summary=fallback_summary,
+            )
+
+        # Summaries, embeddings and writes overlap in a staged pipeline
+        documents_indexed, pipeline_skipped = await index_connector_items(
+            writer,
+            single_indexing_unit(messages),
+            format_message,
+            search_space_id=search_space_id,
+            connector_id=connector_id,
+            document_type=DocumentType.GOOGLE_GMAIL_CONNECTOR,
+            user_llm=user_llm,
+            skipped_items=skipped_messages,
+        )
+        documents_skipped += pipeline_skipped
 
         # Update the last_indexed_at timestamp for the connector only if requested
         total_processed = documents_indexed
@@ -276,6 +247,7 @@ async def index_google_gmail_messages(
             await update_connector_last_indexed(session, connector, update_last_indexed)
 
         # Commit all changes
+        await writer.flush()
         await session.commit()
         logger.info(
             "Successfully committed all Google gmail document changes to database"
@@ -301,6 +273,9 @@ async def index_google_gmail_messages(
             None,
         )  # Return None as the error message to indicate success
 
+    except (ConnectorIndexingError, PermanentJobError):
+        # Already logged where it was raised
+        raise
     except SQLAlchemyError as db_error:
         await session.rollback()
         await task_logger.log_task_failure(
@@ -310,7 +285,7 @@ async def index_google_gmail_messages(
             {"error_type": "SQLAlchemyError"},
         )
         logger.error(f"Database error: {db_error!s}", exc_info=True)
-        return 0, f"Database error: {db_error!s}"
+        raise ConnectorIndexingError(f"Database error: {db_error!s}") from db_error
     except Exception as e:
         await session.rollback()
         await task_logger.log_task_failure(
@@ -320,4 +295,6 @@ async def index_google_gmail_messages(
             {"error_type": type(e).__name__},
         )
         logger.error(f"Failed to index Google gmail emails: {e!s}", exc_info=True)
-        return 0, f"Failed to index Google gmail emails: {e!s}"
+        raise ConnectorIndexingError(
+            f"Failed to index Google gmail emails: {e!s}"
+        ) from e
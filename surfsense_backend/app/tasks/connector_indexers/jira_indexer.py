@@ -7,22 +7,21 @@ from datetime import datetime
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import config
 from app.connectors.jira_connector import JiraConnector
-from app.db import Document, DocumentType, SearchSourceConnectorType
+from app.db import DocumentType, SearchSourceConnectorType
+from app.services.job_queue import PermanentJobError
 from app.services.llm_service import get_user_long_context_llm
 from app.services.task_logging_service import TaskLoggingService
-from app.utils.document_converters import (
-    create_document_chunks,
-    generate_content_hash,
-    generate_document_summary,
-)
 
 from .base import (
+    ConnectorIndexingError,
+    ConnectorItem,
+    DocumentBatchWriter,
     calculate_date_range,
-    check_duplicate_document_by_hash,
     get_connector_by_id,
+    index_connector_items,
     logger,
+    single_indexing_unit,
     update_connector_last_indexed,
 )
 
@@ -50,6 +49,10 @@ async def index_jira_issues(
 
     Returns:
         Tuple containing (number of documents indexed, error message or None)
+
+    Raises:
+        PermanentJobError: If the connector is missing or misconfigured
+        ConnectorIndexingError: If the run failed and may succeed when retried
     """
     task_logger = TaskLoggingService(session, search_space_id)
 
@@ -79,7 +82,7 @@ async def index_jira_issues(
                 "Connector not found",
                 {"error_type": "ConnectorNotFound"},
             )
-            return 0, f"Connector with ID {connector_id} not found"
+            raise PermanentJobError(f"Connector with ID {connector_id} not found")
 
         # Get the Jira credentials from the connector config
         jira_email = connector.config.get("JIRA_EMAIL")
@@ -93,7 +96,7 @@ async def index_jira_issues(
                 "Missing Jira credentials",
                 {"error_type": "MissingCredentials"},
             )
-            return 0, "Jira credentials not found in connector config"
+            raise PermanentJobError("Jira credentials not found in connector config")
 
         # Initialize Jira client
         await task_logger.log_task_progress(
@@ -157,137 +160,96 @@ async def index_jira_issues(
                         "API Error",
                         {"error_type": "APIError"},
                     )
-                    return 0, f"Failed to get Jira issues: {error}"
+                    raise ConnectorIndexingError(f"Failed to get Jira issues: {error}")
 
             logger.info(f"Retrieved {len(issues)} issues from Jira API")
 
+        except ConnectorIndexingError:
+            raise
         except Exception as e:
             logger.error(f"Error fetching Jira issues: {e!s}", exc_info=True)
-            return 0, f"Error fetching Jira issues: {e!s}"
+            raise ConnectorIndexingError(f"Error fetching Jira issues: {e!s}") from e
 
         # Process and index each issue
-        documents_indexed = 0
+        writer = DocumentBatchWriter(session)
         skipped_issues = []
         documents_skipped = 0
+        user_llm = await get_user_long_context_llm(session, user_id)
 
-        for issue in issues:
-            try:
-                issue_id = issue.get("key")
-                issue_identifier = issue.get("key", "")
-                issue_title = issue.get("id", "")
-
-                if not issue_id or not issue_title:
-                    logger.warning(
-                        f"Skipping issue with missing ID or title: {issue_id or 'Unknown'}"
-                    )
-                    skipped_issues.append(
-                        f"{issue_identifier or 'Unknown'} (missing data)"
-                    )
-                    documents_skipped += 1
-                    continue
-
-                # Format the issue for better readability
-                formatted_issue = jira_client.format_issue(issue)
-
-                # Convert to markdown
-                issue_content = jira_client.format_issue_to_markdown(formatted_issue)
+        def format_issue(issue) -> ConnectorItem | None:
+            nonlocal documents_skipped
 
-                if not issue_content:
-                    logger.warning(
-                        f"Skipping issue with no content: {issue_identifier} - {issue_title}"
-                    )
-                    skipped_issues.append(f"{issue_identifier} (no content)")
-                    documents_skipped += 1
-                    continue
-
-                # Generate content hash
-                content_hash = generate_content_hash(issue_content, search_space_id)
-
-                # Check if document already exists
-                existing_document_by_hash = await check_duplicate_document_by_hash(
-                    session, content_hash
+            issue_id = issue.get("key")
+            issue_identifier = issue.get("key", "")
+            issue_title = issue.get("id", "")
+            if not issue_id or not issue_title:
+                logger.warning(
+                    f"Skipping issue with missing ID or title: {issue_identifier or 'Unknown'}"
                 )
+                skipped_issues.append(f"{issue_identifier or 'Unknown'} (missing data)")
+                documents_skipped += 1
+                return None
 
-                if existing_document_by_hash:
-                    logger.info(
-                        f"Document with content hash {content_hash} already exists for issue {issue_identifier}. Skipping processing."
-                    )
-                    documents_skipped += 1
-                    continue
-
-                # Generate summary with metadata
-                user_llm = await get_user_long_context_llm(session, user_id)
-                comment_count = len(formatted_issue.get("comments", []))
-
-                if user_llm:
-                    document_metadata = {
-                        "issue_key": issue_identifier,
-                        "issue_title": issue_title,
-                        "status": formatted_issue.get("status", "Unknown"),
-                        "priority": formatted_issue.get("priority", "Unknown"),
-                        "comment_count": comment_count,
-                        "document_type": "Jira Issue",
-                        "connector_type": "Jira",
-                    }
-                    (
-                        summary_content,
-                        summary_embedding,
-                    ) = await generate_document_summary(
-                        issue_content, user_llm, document_metadata
-                    )
-                else:
-                    # Fallback to simple summary if no LLM configured
-                    summary_content = f"Jira Issue {issue_identifier}: {issue_title}\n\nStatus: {formatted_issue.get('status', 'Unknown')}\n\n"
-                    if formatted_issue.get("description"):
-                        summary_content += (
-                            f"Description: {formatted_issue.get('description')}\n\n"
-                        )
-                    summary_content += f"Comments: {comment_count}"
-                    summary_embedding = config.embedding_model_instance.embed(
-                        summary_content
-                    )
+            # Format the issue for better readability
+            formatted_issue = jira_client.format_issue(issue)
 
-                # Process chunks - using the full issue content with comments
-                chunks = await create_document_chunks(issue_content)
+            # Convert to markdown
+            issue_content = jira_client.format_issue_to_markdown(formatted_issue)
 
-                # Create and store new document
-                logger.info(
-                    f"Creating new document for issue {issue_identifier} - {issue_title}"
-                )
-                document = Document(
-                    search_space_id=search_space_id,
-                    title=f"Jira - {issue_identifier}: {issue_title}",
-                    document_type=DocumentType.JIRA_CONNECTOR,
-                    document_metadata={
-                        "issue_id": issue_id,
-                        "issue_identifier": issue_identifier,
-                        "issue_title": issue_title,
-                        "state": formatted_issue.get("status", "Unknown"),
-                        "comment_count": comment_count,
-                        "indexed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    },
-                    content=summary_content,
-                    content_hash=content_hash,
-                    embedding=summary_embedding,
-                    chunks=chunks,
+            if not issue_content:
+                logger.warning(
+                    f"Skipping issue with no content: {issue_identifier} - {issue_title}"
                 )
+                skipped_issues.append(f"{issue_identifier} (no content)")
+                documents_skipped += 1
+                return None
 
-                session.add(document)
-                documents_indexed += 1
-                logger.info(
-                    f"Successfully indexed new issue {issue_identifier} - {issue_title}"
-                )
+            comment_count = len(formatted_issue.get("comments", []))
 
-            except Exception as e:
-                logger.error(
-                    f"Error processing issue {issue.get('identifier', 'Unknown')}: {e!s}",
-                    exc_info=True,
-                )
-                skipped_issues.append(
-                    f"{issue.get('identifier', 'Unknown')} (processing error)"
+            # Fallback to simple summary if no LLM configured
+            fallback_summary = f"Jira Issue {issue_identifier}: {issue_title}\n\nStatus: {formatted_issue.get('status', 'Unknown')}\n\n"
+            if formatted_issue.get("description"):
+                fallback_summary += (
+                    f"Description: {formatted_issue.get('description')}\n\n"
                 )
-                documents_skipped += 1
-                continue  # Skip this issue and continue with others
+            fallback_summary += f"Comments: {comment_count}"
+
+            return ConnectorItem(
+                title=f"Jira - {issue_identifier}: {issue_title}",
+                content=issue_content,
+                external_id=issue_id,
+                document_metadata={
+                    "issue_id": issue_id,
+                    "issue_identifier": issue_identifier,
+                    "issue_title": issue_title,
+                    "state": formatted_issue.get("status", "Unknown"),
+                    "comment_count": comment_count,
+                    "indexed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                },
+                summary_metadata={
+                    "issue_key": issue_identifier,
+                    "issue_title": issue_title,
+                    "status": formatted_issue.get("status", "Unknown"),
+                    "priority": formatted_issue.get("priority", "Unknown"),
+                    "comment_count": comment_count,
+                    "document_type": "Jira Issue",
+                    "connector_type": "Jira",
+                },
+                fallback_summary=fallback_summary,
+            )
+
+        # Summaries, embeddings and writes overlap in a staged pipeline
+        documents_indexed, pipeline_skipped = await index_connector_items(
+            writer,
+            single_indexing_unit(issues),
+            format_issue,
+            search_space_id=search_space_id,
+            connector_id=connector_id,
+            document_type=DocumentType.JIRA_CONNECTOR,
+            user_llm=user_llm,
+            skipped_items=skipped_issues,
+        )
+        documents_skipped += pipeline_skipped
 
         # Update the last_indexed_at timestamp for the connector only if requested
         total_processed = documents_indexed
@@ -295,6 +257,7 @@ async def index_jira_issues(
             await update_connector_last_indexed(session, connector, update_last_indexed)
 
         # Commit all changes
+        await writer.flush()
         await session.commit()
         logger.info("Successfully committed all JIRA document changes to database")
 
@@ -318,6 +281,9 @@ async def index_jira_issues(
             None,
         )  # Return None as the error message to indicate success
 
+    except (ConnectorIndexingError, PermanentJobError):
+        # Already logged where it was raised
+        raise
     except SQLAlchemyError as db_error:
         await session.rollback()
         await task_logger.log_task_failure(
@@ -327,7 +293,7 @@ async def index_jira_issues(
             {"error_type": "SQLAlchemyError"},
         )
         logger.error(f"Database error: {db_error!s}", exc_info=True)
-        return 0, f"Database error: {db_error!s}"
+        raise ConnectorIndexingError(f"Database error: {db_error!s}") from db_error
     except Exception as e:
         await session.rollback()
         await task_logger.log_task_failure(
@@ -337,4 +303,4 @@ async def index_jira_issues(
             {"error_type": type(e).__name__},
         )
         logger.error(f"Failed to index JIRA issues: {e!s}", exc_info=True)
-        return 0, f"Failed to index JIRA issues: {e!s}"
+        raise ConnectorIndexingError(f"Failed to index JIRA issues: {e!s}") from e
@@ -7,22 +7,21 @@ from datetime import datetime
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import config
 from app.connectors.linear_connector import LinearConnector
-from app.db import Document, DocumentType, SearchSourceConnectorType
+from app.db import DocumentType, SearchSourceConnectorType
+from app.services.job_queue import PermanentJobError
 from app.services.llm_service import get_user_long_context_llm
 from app.services.task_logging_service import TaskLoggingService
-from app.utils.document_converters import (
-    create_document_chunks,
-    generate_content_hash,
-    generate_document_summary,
-)
 
 from .base import (
+    ConnectorIndexingError,
+    ConnectorItem,
+    DocumentBatchWriter,
     calculate_date_range,
-    check_duplicate_document_by_hash,
     get_connector_by_id,
+    index_connector_items,
     logger,
+    single_indexing_unit,
     update_connector_last_indexed,
 )
 
@@ -50,6 +49,10 @@ async def index_linear_issues(
 
     Returns:
         Tuple containing (number of documents indexed, error message or None)
+
+    Raises:
+        PermanentJobError: If the connector is missing or misconfigured
+        ConnectorIndexingError: If the run failed and may succeed when retried
     """
     task_logger = TaskLoggingService(session, search_space_id)
 
@@ -85,9 +88,8 @@ async def index_linear_issues(
                 "Connector not found",
                 {"error_type": "ConnectorNotFound"},
             )
-            return (
-                0,
-                f"Connector with ID {connector_id} not found or is not a Linear connector",
+            raise PermanentJobError(
+                f"Connector with ID {connector_id} not found or is not a Linear connector"
             )
 
         # Get the Linear token from the connector config
@@ -99,7 +101,7 @@ async def index_linear_issues(
                 "Missing Linear token",
                 {"error_type": "MissingToken"},
             )
-            return 0, "Linear API token not found in connector config"
+            raise PermanentJobError("Linear API token not found in connector config")
 
         # Initialize Linear client
         await task_logger.log_task_progress(
@@ -151,13 +153,17 @@ async def index_linear_issues(
                         )
                     return 0, None
                 else:
-                    return 0, f"Failed to get Linear issues: {error}"
+                    raise ConnectorIndexingError(
+                        f"Failed to get Linear issues: {error}"
+                    )
 
             logger.info(f"Retrieved {len(issues)} issues from Linear API")
 
+        except ConnectorIndexingError:
+            raise
         except Exception as e:
             logger.error(f"Exception when calling Linear API: {e!s}", exc_info=True)
-            return 0, f"Failed to get Linear issues: {e!s}"
+            raise ConnectorIndexingError(f"Failed to get Linear issues: {e!s}") from e
 
         if not issues:
             logger.info("No Linear issues found for the specified date range")
@@ -172,9 +178,10 @@ async def index_linear_issues(
             return 0, None  # Return None instead of error message when no issues found
 
         # Track the number of documents indexed
-        documents_indexed = 0
+        writer = DocumentBatchWriter(session)
         documents_skipped = 0
         skipped_issues = []
+        user_llm = await get_user_long_context_llm(session, user_id)
 
         await task_logger.log_task_progress(
             log_entry,
@@ -182,127 +189,85 @@ async def index_linear_issues(
             {"stage": "process_issues", "total_issues": len(issues)},
         )
 
-        # Process each issue
-        for issue in issues:
-            try:
-                issue_id = issue.get("id", "")
-                issue_identifier = issue.get("identifier", "")
-                issue_title = issue.get("title", "")
-
-                if not issue_id or not issue_title:
-                    logger.warning(
-                        f"Skipping issue with missing ID or title: {issue_id or 'Unknown'}"
-                    )
-                    skipped_issues.append(
-                        f"{issue_identifier or 'Unknown'} (missing data)"
-                    )
-                    documents_skipped += 1
-                    continue
-
-                # Format the issue first to get well-structured data
-                formatted_issue = linear_client.format_issue(issue)
+        def format_issue(issue) -> ConnectorItem | None:
+            nonlocal documents_skipped
 
-                # Convert issue to markdown format
-                issue_content = linear_client.format_issue_to_markdown(formatted_issue)
-
-                if not issue_content:
-                    logger.warning(
-                        f"Skipping issue with no content: {issue_identifier} - {issue_title}"
-                    )
-                    skipped_issues.append(f"{issue_identifier} (no content)")
-                    documents_skipped += 1
-                    continue
-
-                content_hash = generate_content_hash(issue_content, search_space_id)
-
-                # Check if document with this content hash already exists
-                existing_document_by_hash = await check_duplicate_document_by_hash(
-                    session, content_hash
+            issue_id = issue.get("id", "")
+            issue_identifier = issue.get("identifier", "")
+            issue_title = issue.get("title", "")
+            if not issue_id or not issue_title:
+                logger.warning(
+                    f"Skipping issue with missing ID or title: {issue_id or 'Unknown'}"
                 )
+                skipped_issues.append(f"{issue_identifier or 'Unknown'} (missing data)")
+                documents_skipped += 1
+                return None
 
-                if existing_document_by_hash:
-                    logger.info(
-                        f"Document with content hash {content_hash} already exists for issue {issue_identifier}. Skipping processing."
-                    )
-                    documents_skipped += 1
-                    continue
-
-                # Generate summary with metadata
-                user_llm = await get_user_long_context_llm(session, user_id)
-                state = formatted_issue.get("state", "Unknown")
-                description = formatted_issue.get("description", "")
-                comment_count = len(formatted_issue.get("comments", []))
-
-                if user_llm:
-                    document_metadata = {
-                        "issue_id": issue_identifier,
-                        "issue_title": issue_title,
-                        "state": state,
-                        "priority": formatted_issue.get("priority", "Unknown"),
-                        "comment_count": comment_count,
-                        "document_type": "Linear Issue",
-                        "connector_type": "Linear",
-                    }
-                    (
-                        summary_content,
-                        summary_embedding,
-                    ) = await generate_document_summary(
-                        issue_content, user_llm, document_metadata
-                    )
-                else:
-                    # Fallback to simple summary if no LLM configured
-                    # Truncate description if it's too long for the summary
-                    if description and len(description) > 500:
-                        description = description[:497] + "..."
-                    summary_content = f"Linear Issue {issue_identifier}: {issue_title}\n\nStatus: {state}\n\n"
-                    if description:
-                        summary_content += f"Description: {description}\n\n"
-                    summary_content += f"Comments: {comment_count}"
-                    summary_embedding = config.embedding_model_instance.embed(
-                        summary_content
-                    )
-
-                # Process chunks - using the full issue content with comments
-                chunks = await create_document_chunks(issue_content)
+            # Format the issue first to get well-structured data
+            formatted_issue = linear_client.format_issue(issue)
 
-                # Create and store new document
-                logger.info(
-                    f"Creating new document for issue {issue_identifier} - {issue_title}"
-                )
-                document = Document(
-                    search_space_id=search_space_id,
-                    title=f"Linear - {issue_identifier}: {issue_title}",
-                    document_type=DocumentType.LINEAR_CONNECTOR,
-                    document_metadata={
-                        "issue_id": issue_id,
-                        "issue_identifier": issue_identifier,
-                        "issue_title": issue_title,
-                        "state": state,
-                        "comment_count": comment_count,
-                        "indexed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    },
-                    content=summary_content,
-                    content_hash=content_hash,
-                    embedding=summary_embedding,
-                    chunks=chunks,
-                )
+            # Convert issue to markdown format
+            issue_content = linear_client.format_issue_to_markdown(formatted_issue)
 
-                session.add(document)
-                documents_indexed += 1
-                logger.info(
-                    f"Successfully indexed new issue {issue_identifier} - {issue_title}"
-                )
-
-            except Exception as e:
-                logger.error(
-                    f"Error processing issue {issue.get('identifier', 'Unknown')}: {e!s}",
-                    exc_info=True,
-                )
-                skipped_issues.append(
-                    f"{issue.get('identifier', 'Unknown')} (processing error)"
+            if not issue_content:
+                logger.warning(
+                    f"Skipping issue with no content: {issue_identifier} - {issue_title}"
                 )
+                skipped_issues.append(f"{issue_identifier} (no content)")
                 documents_skipped += 1
-                continue  # Skip this issue and continue with others
+                return None
+
+            state = formatted_issue.get("state", "Unknown")
+            description = formatted_issue.get("description", "")
+            comment_count = len(formatted_issue.get("comments", []))
+
+            # Fallback to simple summary if no LLM configured
+            # Truncate description if it's too long for the summary
+            if description and len(description) > 500:
+                description = description[:497] + "..."
+            fallback_summary = (
+                f"Linear Issue {issue_identifier}: {issue_title}\n\nStatus: {state}\n\n"
+            )
+            if description:
+                fallback_summary += f"Description: {description}\n\n"
+            fallback_summary += f"Comments: {comment_count}"
+
+            return ConnectorItem(
+                title=f"Linear - {issue_identifier}: {issue_title}",
+                content=issue_content,
+                external_id=issue_id,
+                document_metadata={
+                    "issue_id": issue_id,
+                    "issue_identifier": issue_identifier,
+                    "issue_title": issue_title,
+                    "state": state,
+                    "comment_count": comment_count,
+                    "indexed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                },
+                summary_metadata={
+                    "issue_id": issue_identifier,
+                    "issue_title": issue_title,
+                    "state": state,
+                    "priority": formatted_issue.get("priority", "Unknown"),
+                    "comment_count": comment_count,
+                    "document_type": "Linear Issue",
+                    "connector_type": "Linear",
+                },
+                fallback_summary=fallback_summary,
+            )
+
+        # Summaries, embeddings and writes overlap in a staged pipeline
+        documents_indexed, pipeline_skipped = await index_connector_items(
+            writer,
+            single_indexing_unit(issues),
+            format_issue,
+            search_space_id=search_space_id,
+            connector_id=connector_id,
+            document_type=DocumentType.LINEAR_CONNECTOR,
+            user_llm=user_llm,
+            skipped_items=skipped_issues,
+        )
+        documents_skipped += pipeline_skipped
 
         # Update the last_indexed_at timestamp for the connector only if requested
         total_processed = documents_indexed
@@ -310,6 +275,7 @@ async def index_linear_issues(
             await update_connector_last_indexed(session, connector, update_last_indexed)
 
         # Commit all changes
+        await writer.flush()
         await session.commit()
         logger.info("Successfully committed all Linear document changes to database")
 
@@ -333,6 +299,9 @@ async def index_linear_issues(
             None,
         )  # Return None as the error message to indicate success
 
+    except (ConnectorIndexingError, PermanentJobError):
+        # Already logged where it was raised
+        raise
     except SQLAlchemyError as db_error:
         await session.rollback()
         await task_logger.log_task_failure(
@@ -342,7 +311,7 @@ async def index_linear_issues(
             {"error_type": "SQLAlchemyError"},
         )
         logger.error(f"Database error: {db_error!s}", exc_info=True)
-        return 0, f"Database error: {db_error!s}"
+        raise ConnectorIndexingError(f"Database error: {db_error!s}") from db_error
     except Exception as e:
         await session.rollback()
         await task_logger.log_task_failure(
@@ -352,4 +321,4 @@ async def index_linear_issues(
             {"error_type": type(e).__name__},
         )
         logger.error(f"Failed to index Linear issues: {e!s}", exc_info=True)
-        return 0, f"Failed to index Linear issues: {e!s}"
+        raise ConnectorIndexingError(f"Failed to index Linear issues: {e!s}") from e
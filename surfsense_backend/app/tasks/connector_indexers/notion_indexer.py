@@ -8,20 +8,20 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.connectors.notion_history import NotionHistoryConnector
-from app.db import Document, DocumentType, SearchSourceConnectorType
+from app.db import DocumentType, SearchSourceConnectorType
+from app.services.job_queue import PermanentJobError
 from app.services.llm_service import get_user_long_context_llm
 from app.services.task_logging_service import TaskLoggingService
-from app.utils.document_converters import (
-    create_document_chunks,
-    generate_content_hash,
-    generate_document_summary,
-)
 
 from .base import (
+    ConnectorIndexingError,
+    ConnectorItem,
+    DocumentBatchWriter,
     build_document_metadata_string,
-    check_duplicate_document_by_hash,
     get_connector_by_id,
+    index_connector_items,
     logger,
+    single_indexing_unit,
     update_connector_last_indexed,
 )
 
@@ -49,6 +49,10 @@ async def index_notion_pages(
 
     Returns:
         Tuple containing (number of documents indexed, error message or None)
+
+    Raises:
+        PermanentJobError: If the connector is missing or misconfigured
+        ConnectorIndexingError: If the run failed and may succeed when retried
     """
     task_logger = TaskLoggingService(session, search_space_id)
 
@@ -84,9 +88,8 @@ async def index_notion_pages(
                 "Connector not found",
                 {"error_type": "ConnectorNotFound"},
             )
-            return (
-                0,
-                f"Connector with ID {connector_id} not found or is not a Notion connector",
+            raise PermanentJobError(
+                f"Connector with ID {connector_id} not found or is not a Notion connector"
             )
 
         # Get the Notion token from the connector config
@@ -98,7 +101,9 @@ async def index_notion_pages(
                 "Missing Notion token",
                 {"error_type": "MissingToken"},
             )
-            return 0, "Notion integration token not found in connector config"
+            raise PermanentJobError(
+                "Notion integration token not found in connector config"
+            )
 
         # Initialize Notion client
         await task_logger.log_task_progress(
@@ -171,7 +176,7 @@ async def index_notion_pages(
             )
             logger.error(f"Error fetching Notion pages: {e!s}", exc_info=True)
             await notion_client.close()
-            return 0, f"Failed to get Notion pages: {e!s}"
+            raise ConnectorIndexingError(f"Failed to get Notion pages: {e!s}") from e
 
         if not pages:
             await task_logger.log_task_success(
@@ -184,9 +189,12 @@ async def index_notion_pages(
             return 0, "No Notion pages found"
 
         # Track the number of documents indexed
-        documents_indexed = 0
+        writer = DocumentBatchWriter(session)
         documents_skipped = 0
         skipped_pages = []
+        user_llm = await get_user_long_context_llm(session, user_id)
+        if not user_llm:
+            logger.error(f"No long context LLM configured for user {user_id}")
 
         await task_logger.log_task_progress(
             log_entry,
@@ -194,164 +202,126 @@ async def index_notion_pages(
             {"stage": "process_pages", "total_pages": len(pages)},
         )
 
-        # Process each page
-        for page in pages:
-            try:
-                page_id = page.get("page_id")
-                page_title = page.get("title", f"Untitled page ({page_id})")
-                page_content = page.get("content", [])
-
-                logger.info(f"Processing Notion page: {page_title} ({page_id})")
-
-                if not page_content:
-                    logger.info(f"No content found in page {page_title}. Skipping.")
-                    skipped_pages.append(f"{page_title} (no content)")
-                    documents_skipped += 1
-                    continue
-
-                # Convert page content to markdown format
-                markdown_content = f"# Notion Page: {page_title}\n\n"
-
-                # Process blocks recursively
-                def process_blocks(blocks, level=0):
-                    result = ""
-                    for block in blocks:
-                        block_type = block.get("type")
-                        block_content = block.get("content", "")
-                        children = block.get("children", [])
-
-                        # Add indentation based on level
-                        indent = "  " * level
-
-                        # Format based on block type
-                        if block_type in ["paragraph", "text"]:
+        def format_page(page) -> ConnectorItem | None:
+            nonlocal documents_skipped
+
+            page_id = page.get("page_id")
+            page_title = page.get("title", f"Untitled page ({page_id})")
+            page_content = page.get("content", [])
+
+            logger.info(f"Processing Notion page: {page_title} ({page_id})")
+
+            if not page_content:
+                logger.info(f"No content found in page {page_title}. Skipping.")
+                skipped_pages.append(f"{page_title} (no content)")
+                documents_skipped += 1
+                return None
+
+            if not user_llm:
+                skipped_pages.append(f"{page_title} (no LLM configured)")
+                documents_skipped += 1
+                return None
+
+            # Convert page content to markdown format
+            markdown_content = f"# Notion Page: {page_title}\n\n"
+
+            # Process blocks recursively
+            def process_blocks(blocks, level=0):
+                result = ""
+                for block in blocks:
+                    block_type = block.get("type")
+                    block_content = block.get("content", "")
+                    children = block.get("children", [])
+
+                    # Add indentation based on level
+                    indent = "  " * level
+
+                    # Format based on block type
+                    if block_type in ["paragraph", "text"]:
+                        result += f"{indent}{block_content}\n\n"
+                    elif block_type in ["heading_1", "header"]:
+                        result += f"{indent}# {block_content}\n\n"
+                    elif block_type == "heading_2":
+                        result += f"{indent}## {block_content}\n\n"
+                    elif block_type == "heading_3":
+                        result += f"{indent}### {block_content}\n\n"
+                    elif block_type == "bulleted_list_item":
+                        result += f"{indent}* {block_content}\n"
+                    elif block_type == "numbered_list_item":
+                        result += f"{indent}1. {block_content}\n"
+                    elif block_type == "to_do":
+                        result += f"{indent}- [ ] {block_content}\n"
+                    elif block_type == "toggle":
+                        result += f"{indent}> {block_content}\n"
+                    elif block_type == "code":
+                        result += f"{indent}```\n{block_content}\n```\n\n"
+                    elif block_type == "quote":
+                        result += f"{indent}> {block_content}\n\n"
+                    elif block_type == "callout":
+                        result += f"{indent}> **Note:** {block_content}\n\n"
+                    elif block_type == "image":
+                        result += f"{indent}![Image]({block_content})\n\n"
+                    else:
+                        # Default for other block types
+                        if block_content:
                             result += f"{indent}{block_content}\n\n"
-                        elif block_type in ["heading_1", "header"]:
-                            result += f"{indent}# {block_content}\n\n"
-                        elif block_type == "heading_2":
-                            result += f"{indent}## {block_content}\n\n"
-                        elif block_type == "heading_3":
-                            result += f"{indent}### {block_content}\n\n"
-                        elif block_type == "bulleted_list_item":
-                            result += f"{indent}* {block_content}\n"
-                        elif block_type == "numbered_list_item":
-                            result += f"{indent}1. {block_content}\n"
-                        elif block_type == "to_do":
-                            result += f"{indent}- [ ] {block_content}\n"
-                        elif block_type == "toggle":
-                            result += f"{indent}> {block_content}\n"
-                        elif block_type == "code":
-                            result += f"{indent}```\n{block_content}\n```\n\n"
-                        elif block_type == "quote":
-                            result += f"{indent}> {block_content}\n\n"
-                        elif block_type == "callout":
-                            result += f"{indent}> **Note:** {block_content}\n\n"
-                        elif block_type == "image":
-                            result += f"{indent}![Image]({block_content})\n\n"
-                        else:
-                            # Default for other block types
-                            if block_content:
-                                result += f"{indent}{block_content}\n\n"
-
-                        # Process children recursively
-                        if children:
-                            result += process_blocks(children, level + 1)
-
-                    return result
-
-                logger.debug(
-                    f"Converting {len(page_content)} blocks to markdown for page {page_title}"
-                )
-                markdown_content += process_blocks(page_content)
-
-                # Format document metadata
-                metadata_sections = [
-                    ("METADATA", [f"PAGE_TITLE: {page_title}", f"PAGE_ID: {page_id}"]),
-                    (
-                        "CONTENT",
-                        [
-                            "FORMAT: markdown",
-                            "TEXT_START",
-                            markdown_content,
-                            "TEXT_END",
-                        ],
-                    ),
-                ]
-
-                # Build the document string
-                combined_document_string = build_document_metadata_string(
-                    metadata_sections
-                )
-                content_hash = generate_content_hash(
-                    combined_document_string, search_space_id
-                )
 
-                # Check if document with this content hash already exists
-                existing_document_by_hash = await check_duplicate_document_by_hash(
-                    session, content_hash
-                )
+                    # Process children recursively
+                    if children:
+                        result += process_blocks(children, level + 1)
 
-                if existing_document_by_hash:
-                    logger.info(
-                        f"Document with content hash {content_hash} already exists for page {page_title}. Skipping processing."
-                    )
-                    documents_skipped += 1
-                    continue
-
-                # Get user's long context LLM
-                user_llm = await get_user_long_context_llm(session, user_id)
-                if not user_llm:
-                    logger.error(f"No long context LLM configured for user {user_id}")
-                    skipped_pages.append(f"{page_title} (no LLM configured)")
-                    documents_skipped += 1
-                    continue
-
-                # Generate summary with metadata
-                logger.debug(f"Generating summary for page {page_title}")
-                document_metadata = {
+                return result
+
+            logger.debug(
+                f"Converting {len(page_content)} blocks to markdown for page {page_title}"
+            )
+            markdown_content += process_blocks(page_content)
+
+            # Format document metadata
+            metadata_sections = [
+                ("METADATA", [f"PAGE_TITLE: {page_title}", f"PAGE_ID: {page_id}"]),
+                (
+                    "CONTENT",
+                    [
+                        "FORMAT: markdown",
+                        "TEXT_START",
+                        markdown_content,
+                        "TEXT_END",
+                    ],
+                ),
+            ]
+
+            return ConnectorItem(
+                title=f"Notion - {page_title}",
+                content=markdown_content,
+                # Build the document string the content hash is computed from
+                hashed_content=build_document_metadata_string(metadata_sections),
+                external_id=page_id,
+                document_metadata={
+                    "page_title": page_title,
+                    "page_id": page_id,
+                    "indexed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                },
+                summary_metadata={
                     "page_title": page_title,
                     "page_id": page_id,
                     "document_type": "Notion Page",
                     "connector_type": "Notion",
-                }
-                summary_content, summary_embedding = await generate_document_summary(
-                    markdown_content, user_llm, document_metadata
-                )
-
-                # Process chunks
-                logger.debug(f"Chunking content for page {page_title}")
-                chunks = await create_document_chunks(markdown_content)
-
-                # Create and store new document
-                document = Document(
-                    search_space_id=search_space_id,
-                    title=f"Notion - {page_title}",
-                    document_type=DocumentType.NOTION_CONNECTOR,
-                    document_metadata={
-                        "page_title": page_title,
-                        "page_id": page_id,
-                        "indexed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    },
-                    content=summary_content,
-                    content_hash=content_hash,
-                    embedding=summary_embedding,
-                    chunks=chunks,
-                )
-
-                session.add(document)
-                documents_indexed += 1
-                logger.info(f"Successfully indexed new Notion page: {page_title}")
+                },
+            )
 
-            except Exception as e:
-                logger.error(
-                    f"Error processing Notion page {page.get('title', 'Unknown')}: {e!s}",
-                    exc_info=True,
-                )
-                skipped_pages.append(
-                    f"{page.get('title', 'Unknown')} (processing error)"
-                )
-                documents_skipped += 1
-                continue  # Skip this page and continue with others
+        # Summaries, embeddings and writes overlap in a staged pipeline
+        documents_indexed, pipeline_skipped = await index_connector_items(
+            writer,
+            single_indexing_unit(pages),
+            format_page,
+            search_space_id=search_space_id,
+            connector_id=connector_id,
+            document_type=DocumentType.NOTION_CONNECTOR,
+            user_llm=user_llm,
+            skipped_items=skipped_pages,
+        )
+        documents_skipped += pipeline_skipped
 
         # Update the last_indexed_at timestamp for the connector only if requested
         # and if we successfully indexed at least one page
@@ -360,6 +330,7 @@ async def index_notion_pages(
             await update_connector_last_indexed(session, connector, update_last_indexed)
 
         # Commit all changes
+        await writer.flush()
         await session.commit()
 
         # Prepare result message
@@ -391,6 +362,9 @@ async def index_notion_pages(
 
         return total_processed, result_message
 
+    except (ConnectorIndexingError, PermanentJobError):
+        # Already logged where it was raised
+        raise
     except SQLAlchemyError as db_error:
         await session.rollback()
         await task_logger.log_task_failure(
@@ -405,7 +379,7 @@ async def index_notion_pages(
         # Clean up the async client in case of error
         if "notion_client" in locals():
             await notion_client.close()
-        return 0, f"Database error: {db_error!s}"
+        raise ConnectorIndexingError(f"Database error: {db_error!s}") from db_error
     except Exception as e:
         await session.rollback()
         await task_logger.log_task_failure(
@@ -418,4 +392,4 @@ async def index_notion_pages(
         # Clean up the async client in case of error
         if "notion_client" in locals():
             await notion_client.close()
-        return 0, f"Failed to index Notion pages: {e!s}"
+        raise ConnectorIndexingError(f"Failed to index Notion pages: {e!s}") from e
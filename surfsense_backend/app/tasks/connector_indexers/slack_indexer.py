@@ -2,26 +2,27 @@
 Slack connector indexer.
 """
 
+import asyncio
 from datetime import datetime
 
 from slack_sdk.errors import SlackApiError
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import config
 from app.connectors.slack_history import SlackHistory
-from app.db import Document, DocumentType, SearchSourceConnectorType
+from app.db import DocumentType, SearchSourceConnectorType
+from app.services.job_queue import PermanentJobError
 from app.services.task_logging_service import TaskLoggingService
-from app.utils.document_converters import (
-    create_document_chunks,
-    generate_content_hash,
-)
 
 from .base import (
+    ConnectorIndexingError,
+    ConnectorItem,
+    DocumentBatchWriter,
+    IndexingCheckpoint,
     build_document_metadata_markdown,
     calculate_date_range,
-    check_duplicate_document_by_hash,
     get_connector_by_id,
+    index_connector_items,
     logger,
     update_connector_last_indexed,
 )
@@ -50,6 +51,10 @@ async def index_slack_messages(
 
     Returns:
         Tuple containing (number of documents indexed, error message or None)
+
+    Raises:
+        PermanentJobError: If the connector is missing or misconfigured
+        ConnectorIndexingError: If the run failed and may succeed when retried
     """
     task_logger = TaskLoggingService(session, search_space_id)
 
@@ -85,9 +90,8 @@ async def index_slack_messages(
                 "Connector not found",
                 {"error_type": "ConnectorNotFound"},
             )
-            return (
-                0,
-                f"Connector with ID {connector_id} not found or is not a Slack connector",
+            raise PermanentJobError(
+                f"Connector with ID {connector_id} not found or is not a Slack connector"
             )
 
         # Get the Slack token from the connector config
@@ -99,7 +103,7 @@ async def index_slack_messages(
                 "Missing Slack token",
                 {"error_type": "MissingToken"},
             )
-            return 0, "Slack token not found in connector config"
+            raise PermanentJobError("Slack token not found in connector config")
 
         # Initialize Slack client
         await task_logger.log_task_progress(
@@ -147,7 +151,7 @@ async def index_slack_messages(
                 str(e),
                 {"error_type": "ChannelFetchError"},
             )
-            return 0, f"Failed to get Slack channels: {e!s}"
+            raise ConnectorIndexingError(f"Failed to get Slack channels: {e!s}") from e
 
         if not channels:
             await task_logger.log_task_success(
@@ -157,8 +161,10 @@ async def index_slack_messages(
             )
             return 0, "No Slack channels found"
 
-        # Track the number of documents indexed
-        documents_indexed = 0
+        writer = DocumentBatchWriter(session)
+        checkpoint = IndexingCheckpoint(
+            connector, start_date_str, end_date_str, requested_start_date=start_date
+        )
         documents_skipped = 0
         skipped_channels = []
 
@@ -168,158 +174,154 @@ async def index_slack_messages(
             {"stage": "process_channels", "total_channels": len(channels)},
         )
 
-        # Process each channel
-        for channel_obj in channels:
-            channel_id = channel_obj["id"]
-            channel_name = channel_obj["name"]
-            is_private = channel_obj["is_private"]
-            is_member = channel_obj["is_member"]
-
-            try:
-                # If it's a private channel and the bot is not a member, skip.
-                if is_private and not is_member:
-                    logger.warning(
-                        f"Bot is not a member of private channel {channel_name} ({channel_id}). Skipping."
-                    )
-                    skipped_channels.append(
-                        f"{channel_name} (private, bot not a member)"
-                    )
-                    documents_skipped += 1
-                    continue
-
-                # Get messages for this channel
-                messages, error = slack_client.get_history_by_date_range(
-                    channel_id=channel_id,
-                    start_date=start_date_str,
-                    end_date=end_date_str,
-                    limit=1000,  # Limit to 1000 messages per channel
-                )
-
-                if error:
-                    logger.warning(
-                        f"Error getting messages from channel {channel_name}: {error}"
-                    )
-                    skipped_channels.append(f"{channel_name} (error: {error})")
-                    documents_skipped += 1
-                    continue  # Skip this channel if there's an error
-
-                if not messages:
-                    logger.info(
-                        f"No messages found in channel {channel_name} for the specified date range."
-                    )
-                    documents_skipped += 1
-                    continue  # Skip if no messages
-
-                # Format messages with user info
-                formatted_messages = []
-                for msg in messages:
-                    # Skip bot messages and system messages
-                    if msg.get("subtype") in [
-                        "bot_message",
-                        "channel_join",
-                        "channel_leave",
-                    ]:
+        async def fetch_channels():
+            """Fetch each channel's messages while earlier channels are indexed."""
+            nonlocal documents_skipped
+
+            for channel_obj in channels:
+                channel_id = channel_obj["id"]
+                channel_name = channel_obj["name"]
+                is_private = channel_obj["is_private"]
+                is_member = channel_obj["is_member"]
+
+                try:
+                    # If it's a private channel and the bot is not a member, skip.
+                    if is_private and not is_member:
+                        logger.warning(
+                            f"Bot is not a member of private channel {channel_name} ({channel_id}). Skipping."
+                        )
+                        skipped_channels.append(
+                            f"{channel_name} (private, bot not a member)"
+                        )
+                        documents_skipped += 1
                         continue
 
-                    formatted_msg = slack_client.format_message(
-                        msg, include_user_info=True
-                    )
-                    formatted_messages.append(formatted_msg)
+                    if checkpoint.is_unit_done(channel_id):
+                        logger.info(
+                            f"Channel {channel_name} was indexed by an interrupted run. Skipping."
+                        )
+                        continue
 
-                if not formatted_messages:
-                    logger.info(
-                        f"No valid messages found in channel {channel_name} after filtering."
-                    )
-                    documents_skipped += 1
-                    continue  # Skip if no valid messages after filtering
-
-                for msg in formatted_messages:
-                    timestamp = msg.get("datetime", "Unknown Time")
-                    msg_user_name = msg.get("user_name", "Unknown User")
-                    msg_user_email = msg.get("user_email", "Unknown Email")
-                    msg_text = msg.get("text", "")
-
-                    # Format document metadata
-                    metadata_sections = [
-                        (
-                            "METADATA",
-                            [
-                                f"CHANNEL_NAME: {channel_name}",
-                                f"CHANNEL_ID: {channel_id}",
-                                f"MESSAGE_TIMESTAMP: {timestamp}",
-                                f"MESSAGE_USER_NAME: {msg_user_name}",
-                                f"MESSAGE_USER_EMAIL: {msg_user_email}",
-                            ],
-                        ),
-                        (
-                            "CONTENT",
-                            ["FORMAT: markdown", "TEXT_START", msg_text, "TEXT_END"],
-                        ),
-                    ]
-
-                    # Build the document string
-                    combined_document_string = build_document_metadata_markdown(
-                        metadata_sections
-                    )
-                    content_hash = generate_content_hash(
-                        combined_document_string, search_space_id
+                    # Get messages for this channel, resuming where an interrupted run
+                    # left off
+                    messages, error = await asyncio.to_thread(
+                        slack_client.get_history_by_date_range,
+                        channel_id=channel_id,
+                        start_date=checkpoint.unit_start_date(channel_id),
+                        end_date=end_date_str,
+                        limit=1000,  # Limit to 1000 messages per channel
                     )
 
-                    # Check if document with this content hash already exists
-                    existing_document_by_hash = await check_duplicate_document_by_hash(
-                        session, content_hash
-                    )
+                    if error:
+                        logger.warning(
+                            f"Error getting messages from channel {channel_name}: {error}"
+                        )
+                        skipped_channels.append(f"{channel_name} (error: {error})")
+                        documents_skipped += 1
+                        continue  # Skip this channel if there's an error
+
+                    # Format messages with user info, skipping bot and system messages
+                    formatted_messages = []
+                    for msg in messages or []:
+                        if msg.get("subtype") in [
+                            "bot_message",
+                            "channel_join",
+                            "channel_leave",
+                        ]:
+                            continue
+
+                        formatted_messages.append(
+                            await asyncio.to_thread(
+                                slack_client.format_message,
+                                msg,
+                                include_user_info=True,
+                            )
+                        )
 
-                    if existing_document_by_hash:
+                    if not formatted_messages:
                         logger.info(
-                            f"Document with content hash {content_hash} already exists for channel {channel_name}. Skipping processing."
+                            f"No valid messages found in channel {channel_name} for the specified date range."
                         )
                         documents_skipped += 1
-                        continue
 
-                    # Process chunks
-                    chunks = await create_document_chunks(combined_document_string)
-                    doc_embedding = config.embedding_model_instance.embed(
-                        combined_document_string
+                except SlackApiError as slack_error:
+                    logger.error(
+                        f"Slack API error for channel {channel_name}: {slack_error!s}"
                     )
-
-                    # Create and store new document
-                    document = Document(
-                        search_space_id=search_space_id,
-                        title=f"Slack - {channel_name}",
-                        document_type=DocumentType.SLACK_CONNECTOR,
-                        document_metadata={
-                            "channel_name": channel_name,
-                            "channel_id": channel_id,
-                            "start_date": start_date_str,
-                            "end_date": end_date_str,
-                            "message_count": len(formatted_messages),
-                            "indexed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        },
-                        content=combined_document_string,
-                        embedding=doc_embedding,
-                        chunks=chunks,
-                        content_hash=content_hash,
-                    )
-
-                    session.add(document)
-                    documents_indexed += 1
-                logger.info(
-                    f"Successfully indexed new channel {channel_name} with {len(formatted_messages)} messages"
+                    skipped_channels.append(f"{channel_name} (Slack API error)")
+                    documents_skipped += 1
+                    continue  # Skip this channel and continue with others
+                except Exception as e:
+                    logger.error(f"Error processing channel {channel_name}: {e!s}")
+                    skipped_channels.append(f"{channel_name} (processing error)")
+                    documents_skipped += 1
+                    continue  # Skip this channel and continue with others
+
+                yield (
+                    channel_id,
+                    [
+                        (channel_name, channel_id, msg, len(formatted_messages))
+                        for msg in formatted_messages
+                    ],
                 )
 
-            except SlackApiError as slack_error:
-                logger.error(
-                    f"Slack API error for channel {channel_name}: {slack_error!s}"
-                )
-                skipped_channels.append(f"{channel_name} (Slack API error)")
-                documents_skipped += 1
-                continue  # Skip this channel and continue with others
-            except Exception as e:
-                logger.error(f"Error processing channel {channel_name}: {e!s}")
-                skipped_channels.append(f"{channel_name} (processing error)")
-                documents_skipped += 1
-                continue  # Skip this channel and continue with others
+        def format_message(raw_item) -> ConnectorItem:
+            channel_name, channel_id, msg, message_count = raw_item
+            timestamp = msg.get("datetime", "Unknown Time")
+            msg_user_name = msg.get("user_name", "Unknown User")
+            msg_user_email = msg.get("user_email", "Unknown Email")
+            msg_text = msg.get("text", "")
+
+            # Format document metadata
+            metadata_sections = [
+                (
+                    "METADATA",
+                    [
+                        f"CHANNEL_NAME: {channel_name}",
+                        f"CHANNEL_ID: {channel_id}",
+                        f"MESSAGE_TIMESTAMP: {timestamp}",
+                        f"MESSAGE_USER_NAME: {msg_user_name}",
+                        f"MESSAGE_USER_EMAIL: {msg_user_email}",
+                    ],
+                ),
+                (
+                    "CONTENT",
+                    ["FORMAT: markdown", "TEXT_START", msg_text, "TEXT_END"],
+                ),
+            ]
+
+            # Build the document string
+            combined_document_string = build_document_metadata_markdown(
+                metadata_sections
+            )
+            return ConnectorItem(
+                title=f"Slack - {channel_name}",
+                content=combined_document_string,
+                # One document per message: its channel and timestamp identify it,
+                # so an edited message updates its document in place
+                external_id=f"{channel_id}:{msg.get('timestamp')}",
+                document_metadata={
+                    "channel_name": channel_name,
+                    "channel_id": channel_id,
+                    "start_date": start_date_str,
+                    "end_date": end_date_str,
+                    "message_count": message_count,
+                    "indexed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                },
+            )
+
+        # Fetching, embedding and writing overlap in a staged pipeline
+        documents_indexed, pipeline_skipped = await index_connector_items(
+            writer,
+            fetch_channels(),
+            format_message,
+            search_space_id=search_space_id,
+            connector_id=connector_id,
+            document_type=DocumentType.SLACK_CONNECTOR,
+            checkpoint=checkpoint,
+            skipped_items=skipped_channels,
+        )
+        documents_skipped += pipeline_skipped
 
         # Update the last_indexed_at timestamp for the connector only if requested
         # and if we successfully indexed at least one channel
@@ -328,6 +330,8 @@ async def index_slack_messages(
             await update_connector_last_indexed(session, connector, update_last_indexed)
 
         # Commit all changes
+        checkpoint.clear()
+        await writer.flush()
         await session.commit()
 
         # Prepare result message
@@ -355,6 +359,9 @@ async def index_slack_messages(
         )
         return total_processed, result_message
 
+    except (ConnectorIndexingError, PermanentJobError):
+        # Already logged where it was raised
+        raise
     except SQLAlchemyError as db_error:
         await session.rollback()
         await task_logger.log_task_failure(
@@ -364,7 +371,7 @@ async def index_slack_messages(
             {"error_type": "SQLAlchemyError"},
         )
         logger.error(f"Database error: {db_error!s}")
-        return 0, f"Database error: {db_error!s}"
+        raise ConnectorIndexingError(f"Database error: {db_error!s}") from db_error
     except Exception as e:
         await session.rollback()
         await task_logger.log_task_failure(
@@ -374,4 +381,4 @@ async def index_slack_messages(
             {"error_type": type(e).__name__},
         )
         logger.error(f"Failed to index Slack messages: {e!s}")
-        return 0, f"Failed to index Slack messages: {e!s}"
+        raise ConnectorIndexingError(f"Failed to index Slack messages: {e!s}") from e
@@ -13,6 +13,7 @@ from app.services.llm_service import get_user_long_context_llm
 from app.utils.document_converters import (
     convert_document_to_markdown,
     create_document_chunks,
+    embed_text,
     generate_content_hash,
     generate_document_summary,
 )
@@ -253,11 +254,7 @@ async def add_received_file_document_using_docling(
             f"{metadata_section}\n\n# DOCUMENT SUMMARY\n\n{summary_content}"
         )
 
-        from app.config import config
-
-        summary_embedding = config.embedding_model_instance.embed(
-            enhanced_summary_content
-        )
+        summary_embedding = await embed_text(enhanced_summary_content)
 
         # Process chunks
         chunks = await create_document_chunks(file_in_markdown)
@@ -1,14 +1,33 @@
+import asyncio
 import hashlib
+import logging
+from collections import defaultdict
+from collections.abc import Iterable
+from functools import lru_cache
 
-from litellm import get_model_info, token_counter
+from litellm import decode, encode, get_model_info, token_counter
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import config
-from app.db import Chunk
+from app.db import Chunk, Document
 from app.prompts import SUMMARY_PROMPT_TEMPLATE
+from app.services.compute_executor import run_ingestion_compute
+from app.utils.embedding_cache import (
+    get_cached_embeddings,
+    hash_chunk_text,
+    is_embedding_cache_enabled,
+    store_embeddings,
+)
 
+# Content hashes per existence query in get_existing_content_hashes
+HASH_LOOKUP_BATCH_SIZE = 1000
 
+
+@lru_cache(maxsize=256)
 def get_model_context_window(model_name: str) -> int:
     """Get the total context window size for a model (input + output tokens)."""
+    # Memoized: model info is a static table lookup, but it ran for every document
     try:
         model_info = get_model_info(model_name)
         context_window = model_info.get("max_input_tokens", 4096)  # Default fallback
@@ -20,11 +39,68 @@ def get_model_context_window(model_name: str) -> int:
         return 4096  # Conservative fallback
 
 
+@lru_cache(maxsize=256)
+def _content_wrapper_tokens(model_name: str) -> int:
+    """Tokens the <DOCUMENT_CONTENT> wrapper and message framing add to content."""
+    return token_counter(
+        messages=[
+            {"role": "user", "content": "<DOCUMENT_CONTENT>\n\n\n\n</DOCUMENT_CONTENT>"}
+        ],
+        model=model_name,
+    )
+
+
+def _encode_text(text: str, model_name: str):
+    encoded = encode(model=model_name, text=text)
+    # tiktoken returns token ids, Hugging Face tokenizers an Encoding
+    return getattr(encoded, "ids", encoded), getattr(encoded, "offsets", None)
+
+
+def truncate_to_token_limit(text: str, max_tokens: int, model_name: str) -> str:
+    """
+    Cut text to at most max_tokens tokens of the model's tokenizer.
+
+    The text is tokenized once and cut at the token offset, instead of counting
+    the tokens of ever larger prefixes. Hugging Face tokenizers report the character
+    span of each token, so the cut is exact. For tiktoken the kept tokens are
+    decoded to find the cut; since a token boundary can fall inside a multi-byte
+    character, the result is re-counted and trimmed until it fits.
+
+    Args:
+        text: Text to truncate
+        max_tokens: Maximum number of tokens to keep
+        model_name: Model whose tokenizer is used
+
+    Returns:
+        The text itself when it fits, otherwise its longest prefix that fits
+    """
+    token_ids, offsets = _encode_text(text, model_name)
+    if len(token_ids) <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+
+    if offsets:
+        # Character end of the last kept token; special tokens span (0, 0)
+        return text[: max(end for _, end in offsets[:max_tokens])]
+
+    # Cut the original text at the decoded length so tokenizer normalisation
+    # never alters the content
+    end = len(decode(model=model_name, tokens=list(token_ids[:max_tokens])))
+    while end > 0:
+        token_count = len(_encode_text(text[:end], model_name)[0])
+        if token_count <= max_tokens:
+            break
+        # Drop the excess tokens' share of the characters, at least one
+        end -= max((token_count - max_tokens) * end // token_count, 1)
+    return text[: max(end, 0)]
+
+
 def optimize_content_for_context_window(
     content: str, document_metadata: dict | None, model_name: str
 ) -> str:
     """
-    Optimize content length to fit within model context window using binary search.
+    Truncate content so the summary prompt fits within the model context window.
 
     Args:
         content: Original document content
@@ -61,33 +137,15 @@ def optimize_content_for_context_window(
         print(f"Warning: Very limited tokens available for content: {available_tokens}")
         return content[:500]  # Fallback to first 500 chars
 
-    # Binary search to find optimal content length
-    left, right = 0, len(content)
-    optimal_length = 0
-
-    while left <= right:
-        mid = (left + right) // 2
-        test_content = content[:mid]
-
-        # Test token count for this content length
-        test_document = f"<DOCUMENT_CONTENT>\n\n{test_content}\n\n</DOCUMENT_CONTENT>"
-        test_tokens = token_counter(
-            messages=[{"role": "user", "content": test_document}], model=model_name
-        )
-
-        if test_tokens <= available_tokens:
-            optimal_length = mid
-            left = mid + 1
-        else:
-            right = mid - 1
-
-    optimized_content = (
-        content[:optimal_length] if optimal_length > 0 else content[:500]
+    optimized_content = truncate_to_token_limit(
+        content, available_tokens - _content_wrapper_tokens(model_name), model_name
     )
+    if not optimized_content:
+        optimized_content = content[:500]
 
-    if optimal_length < len(content):
+    if len(optimized_content) < len(content):
         print(
-            f"Content optimized: {len(content)} -> {optimal_length} chars "
+            f"Content optimized: {len(content)} -> {len(optimized_content)} chars "
             f"to fit in {available_tokens} available tokens"
         )
 
@@ -113,9 +171,9 @@ async def generate_document_summary(
     # Get model name from user_llm for token counting
     model_name = getattr(user_llm, "model", "gpt-3.5-turbo")  # Fallback to default
 
-    # Optimize content to fit within context window
-    optimized_content = optimize_content_for_context_window(
-        content, document_metadata, model_name
+    # Optimize content to fit within context window (token counting is CPU-bound)
+    optimized_content = await run_ingestion_compute(
+        optimize_content_for_context_window, content, document_metadata, model_name
     )
 
     summary_chain = SUMMARY_PROMPT_TEMPLATE | user_llm
@@ -140,28 +198,232 @@ async def generate_document_summary(
     else:
         enhanced_summary_content = summary_content
 
-    summary_embedding = config.embedding_model_instance.embed(enhanced_summary_content)
+    summary_embedding = await embed_text(enhanced_summary_content)
 
     return enhanced_summary_content, summary_embedding
 
 
-async def create_document_chunks(content: str) -> list[Chunk]:
+def embed_texts(texts: list[str]) -> list:
+    """
+    Embed texts with the embedding model's batch API.
+
+    Texts are encoded EMBEDDING_BATCH_SIZE at a time, which is much faster than one
+    embed() call per text, especially on CPU.
+
+    Args:
+        texts: Texts to embed
+
+    Returns:
+        List of embeddings in the same order as texts
+    """
+    batch_size = max(config.EMBEDDING_BATCH_SIZE, 1)
+    embeddings = []
+    for start in range(0, len(texts), batch_size):
+        embeddings.extend(
+            config.embedding_model_instance.embed_batch(
+                texts[start : start + batch_size]
+            )
+        )
+    return embeddings
+
+
+async def embed_text(text: str):
+    """Embed a single text on the ingestion compute executor."""
+    embeddings = await run_ingestion_compute(embed_texts, [text])
+    return embeddings[0]
+
+
+def _chunk_texts(content: str, chunker) -> list[str]:
+    return [chunk.text for chunk in (chunker or config.chunker_instance).chunk(content)]
+
+
+async def embed_chunk_texts(chunk_texts: list[str]) -> list:
+    """
+    Embed chunk texts, reusing cached embeddings for texts seen before.
+
+    The embedding cache is consulted in bulk first; only misses are encoded, each
+    distinct text once, and then added to the cache. Cache errors fall back to
+    encoding everything.
+
+    Args:
+        chunk_texts: Chunk texts to embed
+
+    Returns:
+        List of embeddings in the same order as chunk_texts
+    """
+    if not is_embedding_cache_enabled():
+        return await run_ingestion_compute(embed_texts, chunk_texts)
+
+    text_hashes = [hash_chunk_text(chunk_text) for chunk_text in chunk_texts]
+    try:
+        embeddings_by_hash = await get_cached_embeddings(
+            list(dict.fromkeys(text_hashes))
+        )
+    except Exception as e:
+        logging.error(f"Embedding cache lookup failed: {e!s}")
+        return await run_ingestion_compute(embed_texts, chunk_texts)
+
+    missing = {
+        text_hash: chunk_text
+        for text_hash, chunk_text in zip(text_hashes, chunk_texts, strict=True)
+        if text_hash not in embeddings_by_hash
+    }
+    if missing:
+        new_embeddings = dict(
+            zip(
+                missing,
+                await run_ingestion_compute(embed_texts, list(missing.values())),
+                strict=True,
+            )
+        )
+        embeddings_by_hash.update(new_embeddings)
+        try:
+            await store_embeddings(new_embeddings)
+        except Exception as e:
+            logging.error(f"Embedding cache update failed: {e!s}")
+
+    return [embeddings_by_hash[text_hash] for text_hash in text_hashes]
+
+
+async def create_chunk_rows(content: str, chunker=None) -> list[dict]:
+    """
+    Chunk and embed document content into rows for a bulk insert into chunks.
+
+    Chunking and embedding run on the ingestion compute executor so large documents
+    do not block the event loop, and unchanged chunks reuse cached embeddings.
+
+    Args:
+        content: Document content to chunk
+        chunker: Optional chunker to use instead of config.chunker_instance
+
+    Returns:
+        List of dictionaries with content, embedding and position (no document_id)
+    """
+    return (await create_chunk_rows_batch([(content, chunker)]))[0]
+
+
+async def create_chunk_rows_batch(
+    documents: list[tuple[str, object]],
+) -> list[list[dict]]:
+    """
+    Chunk several documents and embed all of their chunks together.
+
+    Small documents produce few chunks each; embedding them in one call keeps the
+    model's batches full.
+
+    Args:
+        documents: List of (content, chunker) pairs; chunker may be None to use
+            config.chunker_instance
+
+    Returns:
+        Chunk rows (as returned by create_chunk_rows) for each document, in order
+    """
+    chunk_texts_per_document = await asyncio.gather(
+        *(
+            run_ingestion_compute(_chunk_texts, content, chunker)
+            for content, chunker in documents
+        )
+    )
+    embeddings = iter(
+        await embed_chunk_texts(
+            [text for chunk_texts in chunk_texts_per_document for text in chunk_texts]
+        )
+    )
+    return [
+        [
+            {"content": chunk_text, "embedding": next(embeddings), "position": position}
+            for position, chunk_text in enumerate(chunk_texts)
+        ]
+        for chunk_texts in chunk_texts_per_document
+    ]
+
+
+async def create_document_chunks(content: str, chunker=None) -> list[Chunk]:
     """
     Create chunks from document content.
 
     Args:
         content: Document content to chunk
+        chunker: Optional chunker to use instead of config.chunker_instance
 
     Returns:
         List of Chunk objects with embeddings
     """
-    return [
-        Chunk(
-            content=chunk.text,
-            embedding=config.embedding_model_instance.embed(chunk.text),
-        )
-        for chunk in config.chunker_instance.chunk(content)
+    return [Chunk(**row) for row in await create_chunk_rows(content, chunker)]
+
+
+async def sync_document_chunks(
+    session: AsyncSession, document_id: int, content: str, chunker=None
+) -> dict[str, int]:
+    """
+    Re-chunk a document's new content, touching only the chunks that changed.
+
+    Existing chunk rows whose text still appears in the new content are kept with
+    their embeddings (only their position is updated); new texts are embedded and
+    inserted, and chunks whose text disappeared are deleted. Writes and model calls
+    are therefore proportional to the edit, not the document size.
+
+    Args:
+        session: Database session (not committed here)
+        document_id: ID of the document whose chunks to update
+        content: The document's new content
+        chunker: Optional chunker to use instead of config.chunker_instance
+
+    Returns:
+        Dictionary with counts of kept, added and deleted chunks
+    """
+    chunk_texts = await run_ingestion_compute(_chunk_texts, content, chunker)
+
+    result = await session.execute(
+        select(Chunk)
+        .where(Chunk.document_id == document_id)
+        .order_by(Chunk.position, Chunk.id)
+    )
+    unused_by_text = defaultdict(list)
+    for chunk in result.scalars():
+        unused_by_text[chunk.content].append(chunk)
+
+    # Reuse an existing row for each new chunk text, in document order
+    reused = [
+        unused_by_text[chunk_text].pop(0) if unused_by_text.get(chunk_text) else None
+        for chunk_text in chunk_texts
     ]
+    new_embeddings = iter(
+        await embed_chunk_texts(
+            [
+                chunk_text
+                for chunk_text, chunk in zip(chunk_texts, reused, strict=True)
+                if chunk is None
+            ]
+        )
+    )
+
+    added = 0
+    for position, (chunk_text, chunk) in enumerate(
+        zip(chunk_texts, reused, strict=True)
+    ):
+        if chunk is None:
+            session.add(
+                Chunk(
+                    document_id=document_id,
+                    content=chunk_text,
+                    embedding=next(new_embeddings),
+                    position=position,
+                )
+            )
+            added += 1
+        elif chunk.position != position:
+            chunk.position = position
+
+    stale_ids = [chunk.id for chunks in unused_by_text.values() for chunk in chunks]
+    if stale_ids:
+        await session.execute(delete(Chunk).where(Chunk.id.in_(stale_ids)))
+
+    return {
+        "kept": len(chunk_texts) - added,
+        "added": added,
+        "deleted": len(stale_ids),
+    }
 
 
 async def convert_element_to_markdown(element) -> str:
@@ -308,3 +570,34 @@ def generate_content_hash(content: str, search_space_id: int) -> str:
     """Generate SHA-256 hash for the given content combined with search space ID."""
     combined_data = f"{search_space_id}:{content}"
     return hashlib.sha256(combined_data.encode("utf-8")).hexdigest()
+
+
+async def get_existing_content_hashes(
+    session: AsyncSession, content_hashes: Iterable[str]
+) -> set[str]:
+    """
+    Find which content hashes already belong to a document.
+
+    Only the content_hash column is selected, so Postgres answers from the unique
+    index on it (an index-only scan) instead of loading whole document rows. Large
+    inputs are looked up HASH_LOOKUP_BATCH_SIZE hashes per query.
+
+    Args:
+        session: Database session
+        content_hashes: Hashes to look up (duplicates are fine)
+
+    Returns:
+        The subset of content_hashes that already exist
+    """
+    unique_hashes = list(dict.fromkeys(content_hashes))
+    existing = set()
+    for start in range(0, len(unique_hashes), HASH_LOOKUP_BATCH_SIZE):
+        result = await session.execute(
+            select(Document.content_hash).where(
+                Document.content_hash.in_(
+                    unique_hashes[start : start + HASH_LOOKUP_BATCH_SIZE]
+                )
+            )
+        )
+        existing.update(result.scalars())
+    return existing
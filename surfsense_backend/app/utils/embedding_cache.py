@@ -0,0 +1,139 @@
+import hashlib
+import logging
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.config import config
+from app.db import EmbeddingCache, async_session_maker
+
+logger = logging.getLogger(__name__)
+
+# Hashes per lookup / rows per insert statement
+CACHE_BATCH_SIZE = 1000
+
+# Hits only refresh last_used_at when it is older than this, so hot entries are not
+# rewritten on every re-index
+TOUCH_INTERVAL = timedelta(hours=1)
+
+_inserts_since_eviction = 0
+
+
+def hash_chunk_text(text: str) -> str:
+    """sha256 of a chunk's text, the cache key alongside the embedding model."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def is_embedding_cache_enabled() -> bool:
+    return config.EMBEDDING_CACHE_MAX_ENTRIES > 0
+
+
+async def get_cached_embeddings(text_hashes: list[str]) -> dict[str, object]:
+    """
+    Look up cached embeddings for the current embedding model.
+
+    Args:
+        text_hashes: sha256 hashes of the chunk texts
+
+    Returns:
+        Dictionary mapping each cached hash to its embedding; misses are absent
+    """
+    found = {}
+    if not text_hashes:
+        return found
+
+    touch_before = datetime.now(UTC) - TOUCH_INTERVAL
+    async with async_session_maker() as session:
+        for start in range(0, len(text_hashes), CACHE_BATCH_SIZE):
+            batch = text_hashes[start : start + CACHE_BATCH_SIZE]
+            result = await session.execute(
+                select(EmbeddingCache.text_hash, EmbeddingCache.embedding).where(
+                    EmbeddingCache.model == config.EMBEDDING_MODEL,
+                    EmbeddingCache.text_hash.in_(batch),
+                )
+            )
+            found.update({row.text_hash: row.embedding for row in result})
+
+        if found:
+            hit_hashes = list(found)
+            for start in range(0, len(hit_hashes), CACHE_BATCH_SIZE):
+                await session.execute(
+                    update(EmbeddingCache)
+                    .where(
+                        EmbeddingCache.model == config.EMBEDDING_MODEL,
+                        EmbeddingCache.text_hash.in_(
+                            hit_hashes[start : start + CACHE_BATCH_SIZE]
+                        ),
+                        EmbeddingCache.last_used_at < touch_before,
+                    )
+                    .values(last_used_at=func.now())
+                )
+            await session.commit()
+
+    return found
+
+
+async def store_embeddings(embeddings_by_hash: dict[str, object]) -> None:
+    """
+    Add freshly computed embeddings to the cache, evicting old entries when full.
+
+    Args:
+        embeddings_by_hash: Dictionary mapping chunk text hash to its embedding
+    """
+    global _inserts_since_eviction
+
+    if not embeddings_by_hash:
+        return
+
+    rows = [
+        {
+            "model": config.EMBEDDING_MODEL,
+            "text_hash": text_hash,
+            "embedding": embedding,
+        }
+        for text_hash, embedding in embeddings_by_hash.items()
+    ]
+    async with async_session_maker() as session:
+        for start in range(0, len(rows), CACHE_BATCH_SIZE):
+            await session.execute(
+                insert(EmbeddingCache)
+                .values(rows[start : start + CACHE_BATCH_SIZE])
+                .on_conflict_do_nothing(index_elements=["model", "text_hash"])
+            )
+        await session.commit()
+
+    # Counting the table is not free, so only check the size every ~1% of capacity
+    _inserts_since_eviction += len(rows)
+    if _inserts_since_eviction >= max(config.EMBEDDING_CACHE_MAX_ENTRIES // 100, 1):
+        _inserts_since_eviction = 0
+        await evict_embedding_cache()
+
+
+async def evict_embedding_cache() -> int:
+    """
+    Delete the least recently used entries above EMBEDDING_CACHE_MAX_ENTRIES.
+
+    Returns:
+        Number of entries deleted
+    """
+    async with async_session_maker() as session:
+        total = await session.scalar(select(func.count()).select_from(EmbeddingCache))
+        excess = total - config.EMBEDDING_CACHE_MAX_ENTRIES
+        if excess <= 0:
+            return 0
+
+        oldest = (
+            select(EmbeddingCache.model, EmbeddingCache.text_hash)
+            .order_by(EmbeddingCache.last_used_at)
+            .limit(excess)
+        )
+        result = await session.execute(
+            delete(EmbeddingCache).where(
+                tuple_(EmbeddingCache.model, EmbeddingCache.text_hash).in_(oldest)
+            )
+        )
+        await session.commit()
+
+    logger.info(f"Evicted {result.rowcount} entries from the embedding cache")
+    return result.rowcount
@@ -0,0 +1,87 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from litellm import token_counter
+
+from app.config import config
+
+
+class TokenCountCache:
+    """
+    Bounded, thread-safe LRU cache of token counts.
+
+    The QnA agent and every sub-section writer count the tokens of the same
+    formatted source documents to pack them into the context window. Entries are
+    keyed by (model, text hash): litellm picks the tokenizer from the model name,
+    and web search results reuse per-request chunk ids, so the text itself rather
+    than the chunk id identifies an entry.
+    """
+
+    def __init__(self, max_size: int = 50000):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of token counts to keep. 0 disables caching.
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, bytes], int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def count(self, text: str, model: str) -> int:
+        """
+        Get the token count of text as a single user message, tokenizing on a miss.
+
+        Args:
+            text: The message content
+            model: Model name used to select the tokenizer
+
+        Returns:
+            The token count, including the message framing tokens
+        """
+        key = (model, hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest())
+
+        with self._lock:
+            token_count = self._entries.get(key)
+            if token_count is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return token_count
+            self.misses += 1
+
+        token_count = token_counter(
+            messages=[{"role": "user", "content": text}], model=model
+        )
+
+        if self.max_size > 0:
+            with self._lock:
+                self._entries[key] = token_count
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+
+        return token_count
+
+    def stats(self) -> dict[str, int]:
+        """Get hit/miss counters and current size of the cache."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# Process-wide cache shared by the QnA agent and the sub-section writers
+token_count_cache = TokenCountCache(max_size=config.TOKEN_COUNT_CACHE_SIZE)
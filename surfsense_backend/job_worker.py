@@ -0,0 +1,43 @@
+import argparse
+import asyncio
+import logging
+import signal
+
+from dotenv import load_dotenv
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+load_dotenv()
+
+
+async def run_worker(job_types: list[str] | None) -> None:
+    from app.services.job_queue import JobWorker, load_job_handlers
+
+    load_job_handlers()
+    worker = JobWorker(job_types=job_types)
+
+    # Finish running jobs on SIGTERM/SIGINT instead of abandoning them
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, worker.stop)
+
+    await worker.run()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run SurfSense background jobs (uploads, crawls, connector syncs)"
+    )
+    parser.add_argument(
+        "--job-types",
+        nargs="+",
+        default=None,
+        help="Only run these job types (default: all registered types)",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(run_worker(args.job_types))
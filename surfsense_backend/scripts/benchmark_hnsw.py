@@ -0,0 +1,278 @@
+"""
+Benchmark pgvector HNSW recall against latency for different index settings.
+
+Loads a synthetic clustered corpus into a scratch table, computes exact top-k
+neighbours in NumPy, then for every (m, ef_construction) pair builds an HNSW index
+and reports recall@k with p50/p99 query latency for each ef_search value. Exact
+(sequential scan) latency is reported as a baseline.
+
+Usage:
+    python scripts/benchmark_hnsw.py --rows 100000 --dimension 384 \\
+        --m 16 32 --ef-construction 64 128 --ef-search 40 100 200
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+import numpy as np
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+TABLE_NAME = "hnsw_benchmark_vectors"
+INDEX_NAME = "hnsw_benchmark_vectors_index"
+INSERT_BATCH_SIZE = 1000
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help="SQLAlchemy asyncpg URL (defaults to DATABASE_URL from the environment)",
+    )
+    parser.add_argument("--rows", type=int, default=100_000, help="Corpus size")
+    parser.add_argument(
+        "--dimension",
+        type=int,
+        default=384,
+        help="Vector dimension (match your EMBEDDING_MODEL)",
+    )
+    parser.add_argument(
+        "--clusters",
+        type=int,
+        default=100,
+        help="Number of topic clusters in the synthetic corpus",
+    )
+    parser.add_argument("--queries", type=int, default=200, help="Queries per run")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query")
+    parser.add_argument("--m", type=int, nargs="+", default=[16])
+    parser.add_argument("--ef-construction", type=int, nargs="+", default=[64])
+    parser.add_argument(
+        "--ef-search", type=int, nargs="+", default=[10, 20, 40, 80, 160, 320]
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--keep-table",
+        action="store_true",
+        help=(
+            "Keep the benchmark table, and reuse it if it was loaded with the same "
+            "--rows, --dimension, --clusters and --seed"
+        ),
+    )
+    return parser.parse_args()
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_corpus(
+    rows: int, dimension: int, clusters: int, queries: int, seed: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Generate unit vectors grouped around random cluster centres.
+
+    Real embeddings are clustered by topic rather than uniform on the sphere, which
+    is the harder case for HNSW recall. Queries are perturbed corpus vectors.
+    """
+    rng = np.random.default_rng(seed)
+    centres = normalize(rng.standard_normal((clusters, dimension)))
+    assignments = rng.integers(0, clusters, rows)
+    corpus = normalize(
+        centres[assignments] + 0.5 * rng.standard_normal((rows, dimension))
+    ).astype(np.float32)
+
+    picks = rng.choice(rows, queries, replace=False)
+    query_vectors = normalize(
+        corpus[picks] + 0.3 * rng.standard_normal((queries, dimension))
+    ).astype(np.float32)
+    return corpus, query_vectors
+
+
+def exact_neighbours(corpus: np.ndarray, query_vectors: np.ndarray, k: int) -> list:
+    """Exact cosine top-k ids (1-based, matching the table) for each query."""
+    neighbours = []
+    for query_vector in query_vectors:
+        similarities = corpus @ query_vector
+        top = np.argpartition(-similarities, k)[:k]
+        neighbours.append(set((top + 1).tolist()))
+    return neighbours
+
+
+def to_pgvector(vector: np.ndarray) -> str:
+    return "[" + ",".join(f"{value:.6f}" for value in vector) + "]"
+
+
+def corpus_description(rows: int, dimension: int, clusters: int, seed: int) -> str:
+    """Parameters that determine the corpus, stored as the benchmark table's comment."""
+    return f"rows={rows} dimension={dimension} clusters={clusters} seed={seed}"
+
+
+async def load_corpus(
+    engine, corpus: np.ndarray, description: str, keep_table: bool
+) -> None:
+    """
+    Load the corpus into the benchmark table.
+
+    With keep_table, a table whose comment matches the corpus description was
+    loaded with the same corpus and is reused. The comment is only set once every
+    row is loaded, so an interrupted load is never reused.
+    """
+    rows, dimension = corpus.shape
+
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        if keep_table:
+            existing = await conn.scalar(
+                text("SELECT obj_description(to_regclass(:table), 'pg_class')"),
+                {"table": TABLE_NAME},
+            )
+            if existing == description:
+                print(f"Reusing existing {TABLE_NAME} ({description})")
+                return
+
+        await conn.execute(text(f"DROP TABLE IF EXISTS {TABLE_NAME}"))
+        await conn.execute(
+            text(
+                f"CREATE TABLE {TABLE_NAME} "
+                f"(id integer PRIMARY KEY, embedding vector({dimension}))"
+            )
+        )
+
+    insert = text(
+        f"INSERT INTO {TABLE_NAME} (id, embedding) "
+        "VALUES (:id, CAST(:embedding AS vector))"
+    )
+    started = time.perf_counter()
+    for start in range(0, rows, INSERT_BATCH_SIZE):
+        batch = corpus[start : start + INSERT_BATCH_SIZE]
+        async with engine.begin() as conn:
+            await conn.execute(
+                insert,
+                [
+                    {"id": start + offset + 1, "embedding": to_pgvector(vector)}
+                    for offset, vector in enumerate(batch)
+                ],
+            )
+    print(f"Loaded {rows} rows in {time.perf_counter() - started:.1f}s")
+
+    async with engine.begin() as conn:
+        await conn.execute(text(f"ANALYZE {TABLE_NAME}"))
+        # COMMENT does not take bind parameters; the description holds only
+        # numbers, names and spaces
+        await conn.execute(text(f"COMMENT ON TABLE {TABLE_NAME} IS '{description}'"))
+
+
+async def run_queries(
+    engine,
+    query_vectors: np.ndarray,
+    k: int,
+    settings: list[tuple[str, str]],
+) -> tuple[list[set], list[float]]:
+    """Run every query in its own transaction with the given settings applied."""
+    search = text(
+        f"SELECT id FROM {TABLE_NAME} "
+        "ORDER BY embedding <=> CAST(:embedding AS vector) LIMIT :k"
+    )
+    results = []
+    latencies = []
+
+    async with engine.connect() as conn:
+        for query_vector in query_vectors:
+            async with conn.begin():
+                for name, value in settings:
+                    await conn.execute(
+                        text("SELECT set_config(:name, :value, true)"),
+                        {"name": name, "value": value},
+                    )
+                started = time.perf_counter()
+                rows = await conn.execute(
+                    search, {"embedding": to_pgvector(query_vector), "k": k}
+                )
+                ids = {row.id for row in rows}
+                latencies.append((time.perf_counter() - started) * 1000)
+            results.append(ids)
+
+    return results, latencies
+
+
+def recall(results: list[set], truth: list[set], k: int) -> float:
+    hits = sum(
+        len(found & expected) for found, expected in zip(results, truth, strict=True)
+    )
+    return hits / (k * len(truth))
+
+
+def report(label: str, results, latencies, truth, k: int) -> None:
+    print(
+        f"{label:<36} recall@{k}={recall(results, truth, k):.4f}  "
+        f"p50={np.percentile(latencies, 50):8.2f}ms  "
+        f"p99={np.percentile(latencies, 99):8.2f}ms"
+    )
+
+
+async def main() -> None:
+    args = parse_args()
+    load_dotenv()
+
+    database_url = args.database_url or os.getenv("DATABASE_URL")
+    if not database_url:
+        raise SystemExit("Set DATABASE_URL or pass --database-url")
+
+    corpus, query_vectors = make_corpus(
+        args.rows, args.dimension, args.clusters, args.queries, args.seed
+    )
+    truth = exact_neighbours(corpus, query_vectors, args.k)
+
+    engine = create_async_engine(database_url)
+    try:
+        description = corpus_description(
+            args.rows, args.dimension, args.clusters, args.seed
+        )
+        await load_corpus(engine, corpus, description, args.keep_table)
+
+        # Exact baseline: no index exists yet, so this is a sequential scan
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP INDEX IF EXISTS {INDEX_NAME}"))
+        results, latencies = await run_queries(engine, query_vectors, args.k, [])
+        report("exact (sequential scan)", results, latencies, truth, args.k)
+
+        for m in args.m:
+            for ef_construction in args.ef_construction:
+                async with engine.begin() as conn:
+                    await conn.execute(text(f"DROP INDEX IF EXISTS {INDEX_NAME}"))
+                    started = time.perf_counter()
+                    await conn.execute(
+                        text(
+                            f"CREATE INDEX {INDEX_NAME} ON {TABLE_NAME} "
+                            "USING hnsw (embedding vector_cosine_ops) "
+                            f"WITH (m = {m}, ef_construction = {ef_construction})"
+                        )
+                    )
+                print(
+                    f"\nm={m} ef_construction={ef_construction}: "
+                    f"built in {time.perf_counter() - started:.1f}s"
+                )
+
+                for ef_search in args.ef_search:
+                    results, latencies = await run_queries(
+                        engine,
+                        query_vectors,
+                        args.k,
+                        [("hnsw.ef_search", str(ef_search))],
+                    )
+                    report(
+                        f"  ef_search={ef_search}", results, latencies, truth, args.k
+                    )
+    finally:
+        if not args.keep_table:
+            async with engine.begin() as conn:
+                await conn.execute(text(f"DROP TABLE IF EXISTS {TABLE_NAME}"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+import asyncio
+
+from app.services.docling_service import group_by_token_budget, reduce_to_token_budget
+
+
+async def count_tokens(texts: list[str]) -> list[int]:
+    # One token per character
+    return [len(text) for text in texts]
+
+
+async def truncate(texts: list[str], max_tokens: int) -> list[str]:
+    return [text[:max_tokens] for text in texts]
+
+
+def reduce(summaries: list[str], budget: int, merge) -> list[str]:
+    return asyncio.run(
+        reduce_to_token_budget(summaries, budget, count_tokens, truncate, merge)
+    )
+
+
+def test_group_by_token_budget_never_exceeds_budget():
+    assert group_by_token_budget([600, 600, 600], 1000) == [[0], [1], [2]]
+    assert group_by_token_budget([300, 300, 300, 300], 1000) == [[0, 1, 2], [3]]
+    assert group_by_token_budget([300, 800, 100, 100], 1000) == [[0], [1, 2, 3]]
+
+
+def test_group_by_token_budget_keeps_oversized_item_alone():
+    assert group_by_token_budget([5000], 1000) == [[0]]
+    assert group_by_token_budget([100, 5000, 100], 1000) == [[0], [1], [2]]
+
+
+def test_reduce_merges_until_sum_fits():
+    async def merge(group: list[str], level: int) -> str:
+        return "m" * (sum(len(text) for text in group) // 2)
+
+    summaries = reduce(["a" * 300] * 8, 1000, merge)
+
+    assert sum(len(text) for text in summaries) <= 1000
+
+
+def test_reduce_truncates_single_item_over_budget():
+    async def merge(group: list[str], level: int) -> str:
+        raise AssertionError("nothing to merge")
+
+    assert reduce(["a" * 5000], 1000, merge) == ["a" * 1000]
+
+
+def test_reduce_truncates_when_no_neighbours_fit_together():
+    async def merge(group: list[str], level: int) -> str:
+        raise AssertionError("no group fits the budget")
+
+    summaries = reduce(["a" * 600, "b" * 600, "c" * 600], 1000, merge)
+
+    assert summaries == ["a" * 333, "b" * 333, "c" * 333]
+
+
+def test_reduce_keeps_items_alone_in_their_group():
+    merged: list[list[str]] = []
+
+    async def merge(group: list[str], level: int) -> str:
+        merged.append(group)
+        return "m" * 100
+
+    summaries = reduce(["a" * 900, "b" * 400, "c" * 400], 1000, merge)
+
+    assert merged == [["b" * 400, "c" * 400]]
+    assert summaries == ["a" * 900, "m" * 100]
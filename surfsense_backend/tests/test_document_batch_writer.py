@@ -0,0 +1,145 @@
+import asyncio
+import contextlib
+
+import pytest
+
+from app.tasks.connector_indexers.base import DocumentBatchWriter
+
+
+class FakeResult:
+    def __init__(self, ids: list[int]):
+        self.ids = ids
+
+    def scalars(self):
+        return self
+
+    def all(self) -> list[int]:
+        return self.ids
+
+
+class FakeSession:
+    """
+    Records the statements the writer runs.
+
+    A document INSERT fails when any of its rows is titled "bad", like a batch
+    with one row that violates a constraint.
+    """
+
+    def __init__(self, fail_commit: bool = False):
+        self.fail_commit = fail_commit
+        self.events: list[str] = []
+        self.inserted_titles: list[str] = []
+        self.chunk_document_ids: list[int] = []
+        self.next_id = 1
+
+    async def execute(self, statement, rows):
+        if "document_id" in rows[0]:
+            self.chunk_document_ids.extend(row["document_id"] for row in rows)
+            return FakeResult([])
+        titles = [row["title"] for row in rows]
+        self.events.append(f"insert {titles}")
+        if "bad" in titles:
+            raise ValueError("violates a constraint")
+        self.inserted_titles.extend(titles)
+        ids = list(range(self.next_id, self.next_id + len(rows)))
+        self.next_id += len(rows)
+        return FakeResult(ids)
+
+    @contextlib.asynccontextmanager
+    async def _savepoint(self):
+        self.events.append("savepoint")
+        try:
+            yield
+        except Exception:
+            self.events.append("rollback to savepoint")
+            raise
+
+    def begin_nested(self):
+        return self._savepoint()
+
+    async def commit(self):
+        if self.fail_commit:
+            raise ValueError("connection lost")
+        self.events.append("commit")
+
+    async def rollback(self):
+        self.events.append("rollback")
+
+
+def document(title: str) -> dict:
+    return {"title": title, "content_hash": f"hash-{title}"}
+
+
+async def write(session: FakeSession, titles: list[str], batch_size: int = 10):
+    writer = DocumentBatchWriter(session, batch_size=batch_size)
+    flushes = []
+    writer.add_flush_callback(lambda written, failed: flushes.append((written, failed)))
+    for title in titles:
+        await writer.add(document(title), [{"content": title}], key=title)
+    await writer.flush()
+    return writer, flushes
+
+
+def test_clean_batch_is_written_in_one_statement():
+    session = FakeSession()
+
+    writer, flushes = asyncio.run(write(session, ["a", "b", "c"]))
+
+    assert session.events == ["savepoint", "insert ['a', 'b', 'c']", "commit"]
+    assert session.chunk_document_ids == [1, 2, 3]
+    assert writer.documents_written == 3
+    assert flushes == [(["a", "b", "c"], [])]
+
+
+def test_bad_row_falls_back_to_row_by_row_inserts():
+    session = FakeSession()
+
+    writer, flushes = asyncio.run(write(session, ["a", "bad", "c"]))
+
+    assert session.events == [
+        "savepoint",
+        "insert ['a', 'bad', 'c']",
+        "rollback to savepoint",
+        "savepoint",
+        "insert ['a']",
+        "savepoint",
+        "insert ['bad']",
+        "rollback to savepoint",
+        "savepoint",
+        "insert ['c']",
+        "commit",
+    ]
+    assert session.inserted_titles == ["a", "c"]
+    assert writer.documents_written == 2
+    assert writer.documents_failed == 1
+    assert flushes == [(["a", "c"], ["bad"])]
+
+
+def test_full_batches_are_committed_as_they_fill():
+    session = FakeSession()
+
+    writer, flushes = asyncio.run(write(session, ["a", "b", "c"], batch_size=2))
+
+    assert session.events.count("commit") == 2
+    assert flushes == [(["a", "b"], []), (["c"], [])]
+    assert writer.documents_written == 3
+
+
+def test_failed_commit_reports_whole_batch_as_failed():
+    session = FakeSession(fail_commit=True)
+    writer = DocumentBatchWriter(session, batch_size=10)
+    flushes = []
+    writer.add_flush_callback(lambda written, failed: flushes.append((written, failed)))
+
+    async def run():
+        await writer.add(document("a"), [], key="a")
+        await writer.mark_updated("updated")
+        await writer.flush()
+
+    with pytest.raises(ValueError, match="connection lost"):
+        asyncio.run(run())
+
+    assert session.events[-1] == "rollback"
+    assert writer.documents_written == 0
+    assert writer.documents_failed == 2
+    assert flushes == [([], ["a", "updated"])]
@@ -0,0 +1,159 @@
+import asyncio
+import contextlib
+
+import pytest
+
+from app.db import DocumentType
+from app.tasks.connector_indexers import base
+from app.tasks.connector_indexers.base import (
+    ConnectorItem,
+    DocumentBatchWriter,
+    index_connector_items,
+)
+
+
+class FakeResult:
+    def __init__(self, ids: list[int]):
+        self.ids = ids
+
+    def scalars(self):
+        return self
+
+    def all(self) -> list[int]:
+        return self.ids
+
+
+class FakeSession:
+    """
+    Tracks which document titles are committed.
+
+    A document INSERT fails when any of its rows is titled "bad".
+    """
+
+    def __init__(self):
+        self.pending: list[str] = []
+        self.committed: set[str] = set()
+        self.commits = 0
+
+    async def execute(self, statement, rows):
+        if "document_id" in rows[0]:
+            return FakeResult([])
+        titles = [row["title"] for row in rows]
+        if "bad" in titles:
+            raise ValueError("violates a constraint")
+        self.pending.extend(titles)
+        return FakeResult(list(range(len(rows))))
+
+    @contextlib.asynccontextmanager
+    async def _savepoint(self):
+        yield
+
+    def begin_nested(self):
+        return self._savepoint()
+
+    async def commit(self):
+        self.committed.update(self.pending)
+        self.pending = []
+        self.commits += 1
+
+    async def rollback(self):
+        self.pending = []
+
+
+class FakeCheckpoint:
+    """Records which documents were committed when each unit was marked done."""
+
+    def __init__(self, session: FakeSession):
+        self.session = session
+        self.done: dict[str, set[str]] = {}
+
+    def mark_unit_done(self, unit_id: str) -> None:
+        self.done[unit_id] = set(self.session.committed)
+
+
+@pytest.fixture(autouse=True)
+def fake_storage(monkeypatch):
+    async def get_existing_content_hashes(session, content_hashes):
+        return {"hash-a2"} & set(content_hashes)
+
+    async def get_documents_by_source(session, search_space_id, connector_id, ids):
+        return {}
+
+    async def embed_text(text):
+        if text is None:
+            raise ValueError("nothing to embed")
+        return [0.0] * 4
+
+    async def create_chunk_rows_batch(documents):
+        return [[{"content": content}] for content, _chunker in documents]
+
+    monkeypatch.setattr(
+        base, "get_existing_content_hashes", get_existing_content_hashes
+    )
+    monkeypatch.setattr(base, "get_documents_by_source", get_documents_by_source)
+    monkeypatch.setattr(base, "embed_text", embed_text)
+    monkeypatch.setattr(base, "create_chunk_rows_batch", create_chunk_rows_batch)
+    monkeypatch.setattr(
+        base, "generate_content_hash", lambda content, space_id: f"hash-{content}"
+    )
+
+
+async def fetch_units():
+    yield "A", ["a1", "a2", "a3"]
+    yield "B", []
+    yield "C", ["c1", "bad", "c3"]
+    yield "D", ["d1", "d2"]
+    yield "E", ["e1"]
+
+
+def format_item(raw_item: str) -> ConnectorItem:
+    # d2 has no content, so embedding its summary fails
+    content = None if raw_item == "d2" else raw_item
+    return ConnectorItem(
+        title=raw_item, content=content, document_metadata={}, external_id=raw_item
+    )
+
+
+def run_indexing():
+    session = FakeSession()
+    checkpoint = FakeCheckpoint(session)
+    skipped_items: list[str] = []
+    writer = DocumentBatchWriter(session, batch_size=2)
+    counts = asyncio.run(
+        index_connector_items(
+            writer,
+            fetch_units(),
+            format_item,
+            search_space_id=1,
+            connector_id=2,
+            document_type=DocumentType.SLACK_CONNECTOR,
+            checkpoint=checkpoint,
+            skipped_items=skipped_items,
+        )
+    )
+    return session, checkpoint, skipped_items, counts
+
+
+def test_counts_and_skipped_items():
+    session, _, skipped_items, counts = run_indexing()
+
+    # a2 is a duplicate, bad fails to write and d2 fails to embed
+    assert counts == (6, 3)
+    assert sorted(skipped_items) == ["bad (write error)", "d2 (processing error)"]
+    assert session.committed == {"a1", "a3", "c1", "c3", "d1", "e1"}
+
+
+def test_units_are_marked_done_only_after_their_documents_commit():
+    _, checkpoint, _, _ = run_indexing()
+
+    assert set(checkpoint.done) == {"A", "B", "E"}
+    assert {"a1", "a3"} <= checkpoint.done["A"]
+    assert "e1" in checkpoint.done["E"]
+
+
+def test_units_with_failed_items_are_never_marked_done():
+    _, checkpoint, _, _ = run_indexing()
+
+    # C lost "bad" at write time and D lost "d2" before it reached the writer
+    assert "C" not in checkpoint.done
+    assert "D" not in checkpoint.done
@@ -0,0 +1,220 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.db import Job, JobStatus, Log, LogLevel, LogStatus
+from app.services import job_queue
+from app.services.job_queue import (
+    JobWorker,
+    PermanentJobError,
+    claim_job,
+    complete_job,
+    fail_job,
+)
+
+JOB_TYPE = "test_job"
+WORKER_ID = "worker-1"
+
+
+class FakeResult:
+    def __init__(self, job: Job | None):
+        self.job = job
+
+    def scalars(self):
+        return self
+
+    def first(self) -> Job | None:
+        return self.job
+
+
+class FakeSession:
+    """Holds one job and its log entry; claim statements return the job if due."""
+
+    def __init__(self, job: Job | None, log_entry: Log | None = None):
+        self.job = job
+        self.log_entry = log_entry
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return FakeResult(self.job)
+
+    async def get(self, model, object_id, with_for_update: bool = False):
+        if model is Job:
+            return self.job
+        return self.log_entry
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+def make_job(attempts: int = 1, max_attempts: int = 3) -> tuple[Job, Log]:
+    log_entry = Log(
+        id=7,
+        level=LogLevel.INFO,
+        status=LogStatus.IN_PROGRESS,
+        message="Queued",
+        log_metadata={},
+    )
+    job = Job(
+        id=1,
+        job_type=JOB_TYPE,
+        payload={"value": 1},
+        status=JobStatus.RUNNING,
+        attempts=attempts,
+        max_attempts=max_attempts,
+        locked_by=WORKER_ID,
+        locked_at=datetime.now(UTC),
+        log_id=log_entry.id,
+    )
+    return job, log_entry
+
+
+def retry_delay(job: Job) -> float:
+    return (job.run_after - datetime.now(UTC)).total_seconds()
+
+
+def test_claim_job_marks_job_running_and_skips_locked_rows():
+    job, log_entry = make_job(attempts=1)
+    session = FakeSession(job, log_entry)
+
+    claimed = asyncio.run(claim_job(session, [JOB_TYPE], WORKER_ID))
+
+    assert claimed is job
+    assert session.commits == 1
+    sql = str(session.statements[0].compile(dialect=postgresql.dialect()))
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "attempts=(jobs.attempts + " in sql
+    assert log_entry.message == f"Running {JOB_TYPE} job (attempt 1 of 3)"
+    assert log_entry.log_metadata["worker"] == WORKER_ID
+
+
+def test_claim_job_without_due_job_rolls_back():
+    session = FakeSession(None)
+
+    assert asyncio.run(claim_job(session, [JOB_TYPE], WORKER_ID)) is None
+    assert session.rollbacks == 1
+    assert session.commits == 0
+
+
+@pytest.mark.parametrize(
+    ("attempts", "max_attempts", "delay"),
+    [(1, 3, 30), (2, 3, 60), (3, 10, 120), (8, 10, 900)],
+)
+def test_fail_job_retries_with_capped_exponential_backoff(
+    attempts, max_attempts, delay
+):
+    job, log_entry = make_job(attempts=attempts, max_attempts=max_attempts)
+
+    asyncio.run(fail_job(FakeSession(job, log_entry), job, "boom"))
+
+    assert job.status == JobStatus.PENDING
+    assert job.locked_by is None
+    assert job.locked_at is None
+    assert job.last_error == "boom"
+    assert retry_delay(job) == pytest.approx(delay, abs=5)
+    assert log_entry.status == LogStatus.IN_PROGRESS
+    assert log_entry.level == LogLevel.WARNING
+
+
+def test_fail_job_fails_after_last_attempt():
+    job, log_entry = make_job(attempts=3, max_attempts=3)
+
+    asyncio.run(fail_job(FakeSession(job, log_entry), job, "boom"))
+
+    assert job.status == JobStatus.FAILED
+    assert job.locked_by is None
+    assert log_entry.status == LogStatus.FAILED
+    assert log_entry.level == LogLevel.ERROR
+
+
+def test_fail_job_does_not_retry_permanent_failures():
+    job, log_entry = make_job(attempts=1, max_attempts=3)
+
+    asyncio.run(fail_job(FakeSession(job, log_entry), job, "bad config", False))
+
+    assert job.status == JobStatus.FAILED
+    assert log_entry.status == LogStatus.FAILED
+
+
+def test_complete_job_releases_the_lock():
+    job, log_entry = make_job()
+
+    asyncio.run(complete_job(FakeSession(job, log_entry), job))
+
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.locked_by is None
+    assert log_entry.status == LogStatus.SUCCESS
+
+
+def run_job_with_handler(monkeypatch, handler) -> tuple[Job, FakeSession]:
+    job, log_entry = make_job(attempts=1, max_attempts=3)
+    session = FakeSession(job, log_entry)
+    monkeypatch.setitem(job_queue.JOB_HANDLERS, JOB_TYPE, handler)
+    monkeypatch.setattr(job_queue, "async_session_maker", lambda: session)
+
+    worker = JobWorker(job_types=[JOB_TYPE], worker_id=WORKER_ID)
+    asyncio.run(worker.run_job(job))
+    return job, session
+
+
+def test_run_job_completes_successful_jobs(monkeypatch):
+    calls = []
+
+    async def handler(value):
+        calls.append(value)
+
+    job, session = run_job_with_handler(monkeypatch, handler)
+
+    assert calls == [1]
+    assert job.status == JobStatus.SUCCEEDED
+    assert session.commits == 1
+
+
+def test_run_job_retries_failed_jobs(monkeypatch):
+    async def handler(value):
+        raise RuntimeError("temporary outage")
+
+    job, _ = run_job_with_handler(monkeypatch, handler)
+
+    assert job.status == JobStatus.PENDING
+    assert job.last_error == "RuntimeError: temporary outage"
+    assert job.run_after > datetime.now(UTC) + timedelta(seconds=20)
+
+
+def test_run_job_fails_permanent_errors_without_retry(monkeypatch):
+    async def handler(value):
+        raise PermanentJobError("connector removed")
+
+    job, _ = run_job_with_handler(monkeypatch, handler)
+
+    assert job.status == JobStatus.FAILED
+    assert job.last_error == "connector removed"
+
+
+def test_run_job_leaves_jobs_recovered_by_another_worker(monkeypatch):
+    async def handler(value):
+        job.locked_by = "worker-2"
+
+    job, log_entry = make_job()
+    session = FakeSession(job, log_entry)
+    monkeypatch.setitem(job_queue.JOB_HANDLERS, JOB_TYPE, handler)
+    monkeypatch.setattr(job_queue, "async_session_maker", lambda: session)
+
+    asyncio.run(JobWorker(job_types=[JOB_TYPE], worker_id=WORKER_ID).run_job(job))
+
+    assert job.status == JobStatus.RUNNING
+    assert session.commits == 0